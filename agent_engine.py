@@ -12,7 +12,9 @@ if str(deepagents_path) not in sys.path:
     sys.path.insert(0, str(deepagents_path))
 
 from deepagents.graph import create_deep_agent
+from deepagents.backends.factory import CachedBackendFactory
 from deepagents.backends.filesystem import FilesystemBackend
+from deepagents.middleware.repo_map import RepoMapMiddleware
 from custom_middleware import ResourceLimitMiddleware, TodoCompletionMiddleware
 
 ANTI_RECURSION_PROMPT = """
@@ -48,9 +50,12 @@ This signals the system to terminate gracefully.
 If you reach 20 steps without a final answer, stop researching and output the best possible draft based on the information gathered so far. You must deliver a result rather than crashing.
 """
 
-def run_deep_agent(task: str, api_key: str, base_url: str, model_name: str, working_directory: str, callbacks=None, system_prompt: str = None, recursion_limit: int = 150):
+def run_deep_agent(task: str, api_key: str, base_url: str, model_name: str, working_directory: str, callbacks=None, system_prompt: str = None, recursion_limit: int = 150, repo_map: bool = False):
     """
     Runs the generic Deep Agent with the given configuration and system prompt.
+
+    When repo_map is True (enabled per persona in prompts_index.json), a compact map of
+    the working directory is injected into the system prompt before the first model call.
     """
     
     # Load default system prompt if not provided
@@ -81,12 +86,21 @@ def run_deep_agent(task: str, api_key: str, base_url: str, model_name: str, work
     # Backend Factory for Sandboxing
     # We create a factory that initializes the FilesystemBackend with the user's working directory
     # and enables virtual_mode to prevent escaping that directory.
-    def backend_factory(rt):
-        return FilesystemBackend(root_dir=working_directory, virtual_mode=True)
+    # The factory is cached so every tool call in this run reuses one backend instance
+    # (and whatever it caches) instead of building a new one per call.
+    backend_factory = CachedBackendFactory(
+        lambda rt: FilesystemBackend(root_dir=working_directory, virtual_mode=True)
+    )
 
     # Create custom middleware for resource limits
     resource_middleware = ResourceLimitMiddleware(max_file_reads=30, max_steps=50)
     todo_middleware = TodoCompletionMiddleware(completion_threshold=0.8)
+    extra_middleware = [resource_middleware, todo_middleware]
+
+    # Optional repository map, so exploration personas start with the project layout
+    # instead of spending their first steps on ls/glob
+    if repo_map:
+        extra_middleware.append(RepoMapMiddleware(root_dir=working_directory))
     
     # Create the Deep Agent
     # We pass the custom system prompt, backend factory, and custom middleware.
@@ -94,7 +108,7 @@ def run_deep_agent(task: str, api_key: str, base_url: str, model_name: str, work
         model=model,
         system_prompt=system_prompt,
         backend=backend_factory,
-        middleware=[resource_middleware, todo_middleware],
+        middleware=extra_middleware,
     )
 
     # Invoke the agent
@@ -108,7 +122,12 @@ def run_deep_agent(task: str, api_key: str, base_url: str, model_name: str, work
                 {"role": "user", "content": task}
             ]
         }
-        stream = agent.astream(inputs, config={"callbacks": callbacks, "recursion_limit": recursion_limit})
+        # "custom" carries live progress from running subagents (tool calls, todos, tokens)
+        stream = agent.astream(
+            inputs,
+            config={"callbacks": callbacks, "recursion_limit": recursion_limit},
+            stream_mode=["updates", "custom"],
+        )
     except Exception as e:
         # Fallback for sync/async compatibility issues or different agent structures
         print(f"Error starting stream: {e}")
@@ -4,6 +4,7 @@ import asyncio
 from dotenv import load_dotenv, set_key
 from pathlib import Path
 import json
+from collections import deque
 from agent_engine import run_deep_agent
 from langfuse.langchain import CallbackHandler
 
@@ -198,7 +199,7 @@ elif page == "Agent Runner":
                 
                 with st.spinner(f"Agent ({selected_label}) is planning and executing..."):
                     # Get agent and stream (updated to handle tuple return)
-                    agent, event_stream = run_deep_agent(task_input, api_key, base_url, model_name, working_dir_input, callbacks, system_prompt=system_prompt, recursion_limit=recursion_limit_run)
+                    agent, event_stream = run_deep_agent(task_input, api_key, base_url, model_name, working_dir_input, callbacks, system_prompt=system_prompt, recursion_limit=recursion_limit_run, repo_map=bool(selected_prompt and selected_prompt.get("repo_map")))
 
                     # Visualize Graph
                     try:
@@ -219,13 +220,49 @@ elif page == "Agent Runner":
                     # Status container for current activity
                     status_placeholder = st.empty()
 
-                    async for event in event_stream:
-                        # Update status based on event keys
-                        active_node = list(event.keys())[0] if event else "Unknown"
-                        status_placeholder.caption(f"⚙️ **Active Node:** `{active_node}`")
+                    # Live progress of running subagents, one panel per task (namespace).
+                    # Only the last few tool calls and the tail of the streamed text are kept.
+                    subagent_panels = {}
+
+                    def render_subagent_progress(event):
+                        namespace = event["namespace"][0]
+                        panel = subagent_panels.get(namespace)
+                        if panel is None:
+                            panel = {"placeholder": output_container.empty(), "lines": deque(maxlen=15), "text": "", "status": "running"}
+                            subagent_panels[namespace] = panel
+
+                        kind, data = event["event"], event["data"]
+                        if kind == "token":
+                            panel["text"] = (panel["text"] + data)[-600:]
+                        elif kind == "tool_call":
+                            panel["lines"].append(f"- 🛠️ `{data['name']}` `{data['args']}`")
+                        elif kind == "tool_result":
+                            panel["lines"].append(f"    - ↳ {data['status']}: {str(data['content'])[:200]}")
+                        elif kind == "todos":
+                            todos = ", ".join(f"{t.get('content')} ({t.get('status', 'pending')})" for t in data)
+                            panel["lines"].append(f"- 📝 {todos}")
+                        elif kind == "end":
+                            panel["status"] = data
+
+                        status_placeholder.caption(f"🤖 **Subagent:** `{event['subagent_type']}` ({panel['status']})")
+                        body = f"**🤖 Subagent `{event['subagent_type']}`** ({panel['status']})\n\n" + "\n".join(panel["lines"])
+                        if panel["text"]:
+                            body += "\n\n> " + " ".join(panel["text"].split())
+                        panel["placeholder"].markdown(body)
 
+                    async for mode, event in event_stream:
                         if show_debug:
                             debug_expander.write(event)
+
+                        # Progress streamed from inside a running subagent
+                        if mode == "custom":
+                            if isinstance(event, dict) and event.get("type") == "subagent_progress":
+                                render_subagent_progress(event)
+                            continue
+
+                        # Update status based on event keys
+                        active_node = list(event.keys())[0] if event else "Unknown"
+                        status_placeholder.caption(f"⚙️ **Active Node:** `{active_node}`")
                         
                         # Update Todo List in Planning Tab
                         current_todos = []
@@ -13,7 +13,7 @@ class ResourceLimitMiddleware(AgentMiddleware):
         Initialize the ResourceLimitMiddleware.
         
         Args:
-            max_file_reads: Maximum number of read_file tool calls allowed
+            max_file_reads: Maximum number of files read (read_file calls plus read_files entries)
             max_steps: Maximum number of agent steps before forcing completion
         """
         self.max_file_reads = max_file_reads
@@ -34,6 +34,8 @@ class ResourceLimitMiddleware(AgentMiddleware):
                 for tc in msg.tool_calls:
                     if tc.get("name") == "read_file":
                         self.file_reads += 1
+                    elif tc.get("name") == "read_files":
+                        self.file_reads += len(tc.get("args", {}).get("files", []))
         
         # Enforce step limit (hard stop at max_steps)
         if self.step_count >= self.max_steps:
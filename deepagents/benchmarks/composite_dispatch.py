@@ -0,0 +1,66 @@
+"""Micro-benchmark for `CompositeBackend` route dispatch cost.
+
+Times `_get_backend_and_key` (file operations) and `_match_route` (ls/grep/glob)
+with 1, 10 and 100 routes, for a path under a route and a path that misses every
+route, against the linear longest-prefix scan that dispatch used to do.
+
+Run from the `deepagents` project directory:
+
+    python benchmarks/composite_dispatch.py
+"""
+
+import argparse
+import timeit
+from collections.abc import Callable
+from functools import partial
+from types import SimpleNamespace
+
+from deepagents.backends import CompositeBackend, StateBackend
+from deepagents.backends.protocol import BackendProtocol
+
+
+def linear_get_backend_and_key(backend: CompositeBackend, key: str) -> tuple[BackendProtocol, str]:
+    """Previous `_get_backend_and_key`: scan the routes longest prefix first."""
+    for prefix, route_backend in backend.sorted_routes:
+        if key.startswith(prefix):
+            suffix = key[len(prefix) :]
+            return route_backend, f"/{suffix}" if suffix else "/"
+    return backend.default, key
+
+
+def linear_match_route(backend: CompositeBackend, path: str) -> tuple[str, BackendProtocol, str] | None:
+    """Previous ls/grep/glob route check, including the path within the route."""
+    for prefix, route_backend in backend.sorted_routes:
+        if path.startswith(prefix.rstrip("/")):
+            suffix = path[len(prefix) - 1 :]
+            return prefix, route_backend, suffix or "/"
+    return None
+
+
+def ns_per_call(func: Callable[[], object], number: int, repeat: int = 5) -> float:
+    """Time `number` calls of `func` `repeat` times; return the best mean cost in nanoseconds."""
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number * 1e9
+
+
+def main() -> None:
+    """Print dispatch cost per call for each route count."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=200_000, help="calls per measurement")
+    args = parser.parse_args()
+
+    runtime = SimpleNamespace(state={"files": {}})
+    print(f"{'routes':>6} {'path':>4}  {'get_backend_and_key (linear -> now)':>36}  {'ls/grep/glob match (linear -> now)':>35}")
+    for count in (1, 10, 100):
+        routes: dict[str, BackendProtocol] = {f"/tenants/t{i:03d}/memories/": StateBackend(runtime) for i in range(count)}  # type: ignore[arg-type]
+        composite = CompositeBackend(StateBackend(runtime), routes)  # type: ignore[arg-type]
+        paths = {"hit": f"/tenants/t{count // 2:03d}/memories/notes/a.md", "miss": "/workspace/src/app.py"}
+        for label, path in paths.items():
+            old_get = ns_per_call(partial(linear_get_backend_and_key, composite, path), args.number)
+            new_get = ns_per_call(partial(composite._get_backend_and_key, path), args.number)
+            old_match = ns_per_call(partial(linear_match_route, composite, path), args.number)
+            new_match = ns_per_call(partial(composite._match_route, path), args.number)
+            print(f"{count:>6} {label:>4}  {old_get:>17.0f} -> {new_get:>5.0f} ns  {old_match:>17.0f} -> {new_match:>5.0f} ns")
+
+
+if __name__ == "__main__":
+    main()
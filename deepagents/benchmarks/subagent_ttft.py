@@ -0,0 +1,82 @@
+"""Benchmark for the time to first token of a deep agent's first subagent task.
+
+Before a task's first model call, the agent has to be built (`create_deep_agent`)
+and the subagent's graph compiled. Subagent graphs used to be compiled eagerly for
+every subagent while building the agent; they are now compiled on the first task
+that uses them and shared process-wide between agents with the same configuration.
+This times both parts for the eager build, a lazy build with an empty graph cache
+and a lazy build with the graph already cached (e.g. a server building one agent
+per request). The eager mode compiles every graph right after the build, so it
+also pays for the cache keys the old build did not compute. No model is called.
+
+Run from the `deepagents` project directory:
+
+    python benchmarks/subagent_ttft.py
+"""
+
+import argparse
+import statistics
+import time
+
+from langchain_anthropic import ChatAnthropic
+
+from deepagents import create_deep_agent
+from deepagents.middleware import subagents
+
+_created: list[subagents._LazySubAgentGraph] = []
+_lazy_subagent_graph = subagents._lazy_subagent_graph
+
+
+def _recording_lazy_subagent_graph(*args: object) -> subagents._LazySubAgentGraph:
+    """Record each lazy graph `create_deep_agent` creates so the benchmark can compile it."""
+    graph = _lazy_subagent_graph(*args)  # type: ignore[arg-type]
+    _created.append(graph)
+    return graph
+
+
+subagents._lazy_subagent_graph = _recording_lazy_subagent_graph  # type: ignore[assignment]
+
+
+def build(count: int) -> list[subagents._LazySubAgentGraph]:
+    """Build a deep agent with `count` custom subagents; return its lazy subagent graphs."""
+    _created.clear()
+    model = ChatAnthropic(model_name="claude-sonnet-4-5", api_key="unused", timeout=None, stop=None)  # type: ignore[arg-type]
+    specs = [{"name": f"worker-{i}", "description": f"Worker {i}", "system_prompt": f"You are worker {i}."} for i in range(count)]
+    create_deep_agent(model=model, system_prompt="You are a helpful assistant.", subagents=specs)  # type: ignore[arg-type]
+    return list(_created)
+
+
+def timed_run(count: int, mode: str) -> tuple[float, float]:
+    """Seconds to build the agent and to get the first task's subagent graph."""
+    if mode != "lazy, warm cache":
+        subagents._subagent_graph_cache.clear()
+    start = time.perf_counter()
+    graphs = build(count)
+    if mode == "eager":
+        for graph in graphs:
+            graph.get()
+    built = time.perf_counter()
+    graphs[0].get()
+    return built - start, time.perf_counter() - built
+
+
+def main() -> None:
+    """Print build time and first-task graph time for each mode."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--subagents", type=int, default=3, help="custom subagents besides general-purpose")
+    parser.add_argument("--runs", type=int, default=10, help="runs per mode")
+    args = parser.parse_args()
+
+    timed_run(args.subagents, "eager")
+    print(f"{args.subagents + 1} subagents, median of {args.runs} runs")
+    print(f"{'mode':>17}  {'build':>9}  {'first task':>10}  {'total':>9}")
+    for mode in ("eager", "lazy, cold cache", "lazy, warm cache"):
+        runs = [timed_run(args.subagents, mode) for _ in range(args.runs)]
+        build_time = statistics.median(run[0] for run in runs)
+        task_time = statistics.median(run[1] for run in runs)
+        total = statistics.median(sum(run) for run in runs)
+        print(f"{mode:>17}  {build_time * 1000:>6.1f} ms  {task_time * 1000:>7.1f} ms  {total * 1000:>6.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
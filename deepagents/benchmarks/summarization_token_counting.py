@@ -0,0 +1,72 @@
+"""Benchmark for the per-step token counting overhead of `SummarizationMiddleware`.
+
+Replays an agent run whose history grows by one tool call (an AIMessage and its
+ToolMessage) per step up to `--messages` messages, and times what `before_model`
+spends on counting each step: the trigger check and the cutoff search. The
+incremental counter (`_count_tokens_incremental`, the default) is compared against
+recounting the whole history with `count_message_tokens` every step.
+
+Run from the `deepagents` project directory:
+
+    python benchmarks/summarization_token_counting.py
+"""
+
+import argparse
+import statistics
+import time
+
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage, AnyMessage, ToolMessage
+
+from deepagents.middleware.summarization import SummarizationMiddleware
+from deepagents.tokens import count_message_tokens
+
+
+def make_history(count: int) -> list[AnyMessage]:
+    """Build `count` messages of grep calls with short, medium and long results."""
+    messages: list[AnyMessage] = []
+    for i in range(count // 2):
+        tool_call_id = f"call_{i}"
+        messages.append(AIMessage("", tool_calls=[{"name": "grep", "args": {"pattern": f"handler_{i}"}, "id": tool_call_id}], id=f"ai_{i}"))
+        lines = (20, 50, 400)[i % 3]
+        body = "\n".join(f"src/pkg/mod{j}.py:{j}: def handler_{j}(request): return {j}" for j in range(lines))
+        messages.append(ToolMessage(body, tool_call_id=tool_call_id, id=f"tool_{i}"))
+    return messages
+
+
+def step_times(middleware: SummarizationMiddleware, history: list[AnyMessage], first: int) -> list[float]:
+    """Seconds spent counting tokens at each step, from `first` messages to the full history."""
+    times = []
+    for size in range(2, len(history) + 1, 2):
+        messages = history[:size]
+        start = time.perf_counter()
+        total = middleware.token_counter(messages)
+        middleware._should_summarize(messages, total)
+        middleware._determine_cutoff_index(messages)
+        if size >= first:
+            times.append(time.perf_counter() - start)
+    return times
+
+
+def main() -> None:
+    """Print per-step counting overhead for full recounts and incremental counting."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--messages", type=int, default=1000, help="history length at the end of the run")
+    parser.add_argument("--window", type=int, default=200, help="report the steps of the last WINDOW messages")
+    args = parser.parse_args()
+
+    history = make_history(args.messages)
+    model = GenericFakeChatModel(messages=iter([]))
+    print(f"{args.messages} messages, steps from {args.messages - args.window} messages on")
+    print(f"{'counter':>14}  {'median':>9}  {'p90':>9}")
+    for name in ("full recount", "incremental"):
+        middleware = SummarizationMiddleware(model=model, backend=None, trigger=("tokens", 10**9), keep=("tokens", 20_000))  # type: ignore[arg-type]
+        if name == "full recount":
+            middleware.token_counter = middleware._partial_token_counter = count_message_tokens
+        times = sorted(step_times(middleware, history, args.messages - args.window))
+        p90 = times[int(len(times) * 0.9)]
+        print(f"{name:>14}  {statistics.median(times) * 1000:>6.2f} ms  {p90 * 1000:>6.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,7 @@
 """Memory backends for pluggable file storage."""
 
 from deepagents.backends.composite import CompositeBackend
+from deepagents.backends.factory import CachedBackendFactory
 from deepagents.backends.filesystem import FilesystemBackend
 from deepagents.backends.protocol import BackendProtocol
 from deepagents.backends.state import StateBackend
@@ -8,6 +9,7 @@ from deepagents.backends.store import StoreBackend
 
 __all__ = [
     "BackendProtocol",
+    "CachedBackendFactory",
     "CompositeBackend",
     "FilesystemBackend",
     "StateBackend",
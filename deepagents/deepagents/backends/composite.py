@@ -18,20 +18,130 @@ Examples:
     ```
 """
 
+import asyncio
+import contextvars
+import heapq
+import logging
+import time
 from collections import defaultdict
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterator, Sequence
+from concurrent.futures import Future, ThreadPoolExecutor
+from copy import copy as shallow_copy
+from dataclasses import replace
+from functools import lru_cache, partial
+from itertools import chain, islice
+from typing import TYPE_CHECKING, Any, TypeVar, cast
 
 from deepagents.backends.protocol import (
     BackendProtocol,
+    BatchOp,
+    BatchResult,
+    DownloadOp,
     EditResult,
     ExecuteResponse,
     FileDownloadResponse,
+    FileEdit,
     FileInfo,
     FileUploadResponse,
     GrepMatch,
+    LsOp,
     SandboxBackendProtocol,
+    StatOp,
+    WriteOp,
     WriteResult,
+    _acopy_between,
+    _afinish_move,
+    _aiter_items,
+    _copy_between,
+    _finish_move,
+    _grep_match_sort_key,
+    path_sort_key,
 )
 from deepagents.backends.state import StateBackend
+from deepagents.backends.utils import apply_file_data_update
+
+if TYPE_CHECKING:
+    from langchain.tools import ToolRuntime
+
+logger = logging.getLogger(__name__)
+
+_T = TypeVar("_T")
+
+# Number of recently dispatched paths remembered per CompositeBackend
+_ROUTE_CACHE_SIZE = 4096
+
+
+def _materialize(iterate: Callable[..., Iterator[_T] | str], *args: Any) -> list[_T] | str:
+    """Call a backend's `*_iter` method and drain the (limited) iterator, so it can be fetched on a worker thread."""
+    result = iterate(*args)
+    return result if isinstance(result, str) else list(result)
+
+
+async def _amaterialize(iterate: Callable[..., Awaitable[AsyncIterator[_T] | str]], *args: Any) -> list[_T] | str:
+    """Async version of _materialize."""
+    result = await iterate(*args)
+    return result if isinstance(result, str) else [item async for item in result]
+
+
+def _drain(iterate: Callable[..., Iterator[_T]], *args: Any) -> list[_T]:
+    """Like _materialize, for `*_iter` methods that cannot return an error string."""
+    return list(iterate(*args))
+
+
+async def _adrain(iterate: Callable[..., Awaitable[AsyncIterator[_T]]], *args: Any) -> list[_T]:
+    """Async version of _drain."""
+    return [item async for item in await iterate(*args)]
+
+
+class _RouteTable:
+    """Route prefixes compiled into a trie keyed by path segments.
+
+    Lookup cost depends on the depth of the path rather than the number of
+    routes, and the deepest route on the path wins (same as longest-prefix-first
+    matching over whole segments).
+    """
+
+    __slots__ = ("_root",)
+
+    _ROUTE = None  # Node key holding (prefix, backend); segments are never None
+
+    def __init__(self, routes: dict[str, BackendProtocol]) -> None:
+        self._root: dict = {}
+        for prefix, backend in routes.items():
+            node = self._root
+            for segment in prefix.split("/"):
+                if segment:
+                    node = node.setdefault(segment, {})
+            node[self._ROUTE] = (prefix, backend)
+
+    def match(self, path: str, dirs_only: bool = False) -> tuple[str, BackendProtocol] | None:
+        """Find the deepest route containing `path`.
+
+        Args:
+            path: Absolute path starting with "/".
+            dirs_only: Only match against the directory part of `path`, so
+                "/memories" is a file at the root while "/memories/" is the route.
+
+        Returns:
+            Tuple of (route_prefix, backend), or None if no route matches.
+        """
+        if not path.startswith("/"):
+            return None
+        segments = path.split("/")
+        if dirs_only:
+            # Last segment is the file name ("" for paths ending in "/")
+            segments.pop()
+        node = self._root
+        found = node.get(self._ROUTE)
+        for segment in segments:
+            if not segment:
+                continue
+            child = node.get(segment)
+            if child is None:
+                break
+            node = child
+            found = node.get(self._ROUTE, found)
+        return found
 
 
 class CompositeBackend(BackendProtocol):
@@ -44,6 +154,7 @@ class CompositeBackend(BackendProtocol):
         default: Backend for paths that don't match any route.
         routes: Map of path prefixes to backends (e.g., {"/memories/": store_backend}).
         sorted_routes: Routes sorted by length (longest first) for correct matching.
+        route_timeout: Per-backend timeout in seconds for aggregated searches, or None.
 
     Examples:
         ```python
@@ -58,6 +169,9 @@ class CompositeBackend(BackendProtocol):
         self,
         default: BackendProtocol | StateBackend,
         routes: dict[str, BackendProtocol],
+        *,
+        route_timeout: float | None = None,
+        max_workers: int | None = None,
     ) -> None:
         """Initialize composite backend.
 
@@ -65,7 +179,25 @@ class CompositeBackend(BackendProtocol):
             default: Backend for paths that don't match any route.
             routes: Map of path prefixes to backends. Prefixes must start with "/"
                 and should end with "/" (e.g., "/memories/").
+            route_timeout: Timeout in seconds applied to each backend when a search
+                fans out across the default backend and all routes. Backends that
+                time out are skipped and the remaining results are returned.
+                Also bounds each backend's share of a `batch`, which raises
+                TimeoutError instead. None (default) waits indefinitely.
+            max_workers: Maximum threads used for sync fan-out. Defaults to one
+                thread per backend.
         """
+        self._set_backends(default, routes)
+
+        # Fan-out settings for aggregated grep/glob across backends
+        self.route_timeout = route_timeout
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers or len(routes) + 1,
+            thread_name_prefix="composite-backend",
+        )
+
+    def _set_backends(self, default: BackendProtocol, routes: dict[str, BackendProtocol]) -> None:
+        """Set the default backend and routes, and compile the route table."""
         # Default backend
         self.default = default
 
@@ -75,6 +207,29 @@ class CompositeBackend(BackendProtocol):
         # Sort routes by length (longest first) for correct prefix matching
         self.sorted_routes = sorted(routes.items(), key=lambda x: len(x[0]), reverse=True)
 
+        # Compiled route table used for dispatch, with recent lookups cached
+        self._match_route_prefix = lru_cache(maxsize=_ROUTE_CACHE_SIZE)(_RouteTable(routes).match)
+
+        # With at most one route, a plain prefix check is cheaper than the trie and its
+        # cache. Entries are (route dir with exactly one trailing slash, prefix, backend).
+        self._few_routes: list[tuple[str, str, BackendProtocol]] | None = None
+        if len(routes) <= 1:
+            self._few_routes = [(prefix.rstrip("/") + "/", prefix, backend) for prefix, backend in routes.items()]
+
+    def with_runtime(self, runtime: "ToolRuntime") -> "CompositeBackend":
+        """Return a composite whose backends are bound to `runtime`.
+
+        Returns self when no backend needs rebinding. Otherwise returns a shallow
+        copy that shares the fan-out executor and settings with this instance.
+        """
+        default = self.default.with_runtime(runtime)
+        routes = {prefix: backend.with_runtime(runtime) for prefix, backend in self.routes.items()}
+        if default is self.default and all(routes[prefix] is backend for prefix, backend in self.routes.items()):
+            return self
+        rebound = shallow_copy(self)
+        rebound._set_backends(default, routes)
+        return rebound
+
     def _get_backend_and_key(self, key: str) -> tuple[BackendProtocol, str]:
         """Get backend for path and strip route prefix.
 
@@ -85,16 +240,171 @@ class CompositeBackend(BackendProtocol):
             Tuple of (backend, stripped_path). The stripped path has the route
             prefix removed but keeps the leading slash.
         """
-        # Check routes in order of length (longest first)
-        for prefix, backend in self.sorted_routes:
-            if key.startswith(prefix):
-                # Strip full prefix and ensure a leading slash remains
-                # e.g., "/memories/notes.txt" → "/notes.txt"; "/memories/" → "/"
-                suffix = key[len(prefix) :]
-                stripped_key = f"/{suffix}" if suffix else "/"
-                return backend, stripped_key
+        if (few_routes := self._few_routes) is not None:
+            for route_dir, prefix, backend in few_routes:
+                if key.startswith(route_dir):
+                    suffix = key[len(prefix) :]
+                    return backend, f"/{suffix}" if suffix else "/"
+            return self.default, key
+
+        route = self._match_route_prefix(key, dirs_only=True)
+        if route is None:
+            return self.default, key
+
+        # Strip full prefix and ensure a leading slash remains
+        # e.g., "/memories/notes.txt" → "/notes.txt"; "/memories/" → "/"
+        prefix, backend = route
+        suffix = key[len(prefix) :]
+        stripped_key = f"/{suffix}" if suffix else "/"
+        return backend, stripped_key
+
+    def _match_route(self, path: str | None) -> tuple[str, BackendProtocol, str] | None:
+        """Match a directory path (e.g. for ls/grep/glob) against the routes.
+
+        Unlike `_get_backend_and_key`, the route directory itself matches with or
+        without a trailing slash ("/memories" and "/memories/" both target the route).
+
+        Args:
+            path: Directory path, or None.
+
+        Returns:
+            Tuple of (route_prefix, backend, path_within_backend), or None if the
+            path is None or doesn't fall under any route.
+        """
+        if path is None:
+            return None
+        if (few_routes := self._few_routes) is not None:
+            for route_dir, prefix, backend in few_routes:
+                # The route directory itself, without the trailing slash ("/" for a root route)
+                if path.startswith(route_dir) or path == (route_dir[:-1] or "/"):
+                    suffix = path[len(prefix) :]
+                    return prefix, backend, f"/{suffix}" if suffix else "/"
+            return None
+        route = self._match_route_prefix(path)
+        if route is None:
+            return None
+        prefix, backend = route
+        suffix = path[len(prefix) :]
+        return prefix, backend, f"/{suffix}" if suffix else "/"
+
+    def _fan_out_targets(self, path: str | None) -> list[tuple[str, BackendProtocol, str | None]]:
+        """List (label, backend, search path) for a search over the default backend and every route."""
+        return [("default", self.default, path), *((prefix, backend, "/") for prefix, backend in self.routes.items())]
+
+    def _fan_out(self, calls: Sequence[tuple[str, Callable[[], _T]]]) -> list[_T | BaseException]:
+        """Run backend calls concurrently in the thread pool.
 
-        return self.default, key
+        Args:
+            calls: List of (label, call) pairs. The label identifies the backend in
+                timeout messages (route prefix, or "default").
+
+        Returns:
+            One entry per call, in input order: the call's return value, or the
+            exception it raised (TimeoutError if it exceeded `route_timeout`).
+        """
+        if len(calls) == 1 and self.route_timeout is None:
+            # Nothing to parallelize or time out; skip the thread hop
+            _, call = calls[0]
+            try:
+                return [call()]
+            except Exception as e:
+                return [e]
+
+        # Copy the context per call so contextvars (e.g. langgraph config) are visible in worker threads
+        futures: list[Future[_T]] = [self._executor.submit(contextvars.copy_context().run, call) for _, call in calls]
+        deadline = None if self.route_timeout is None else time.monotonic() + self.route_timeout
+        results: list[_T | BaseException] = []
+        for (label, _), future in zip(calls, futures, strict=True):
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                results.append(future.result(timeout=remaining))
+            except TimeoutError:
+                future.cancel()
+                results.append(TimeoutError(f"Backend for '{label}' timed out after {self.route_timeout}s"))
+            except Exception as e:
+                results.append(e)
+        return results
+
+    async def _afan_out(self, calls: Sequence[tuple[str, Callable[[], Awaitable[_T]]]]) -> list[_T | BaseException]:
+        """Async version of _fan_out using asyncio.gather."""
+
+        async def _run(label: str, call: Callable[[], Awaitable[_T]]) -> _T:
+            try:
+                return await asyncio.wait_for(call(), timeout=self.route_timeout)
+            except TimeoutError:
+                msg = f"Backend for '{label}' timed out after {self.route_timeout}s"
+                raise TimeoutError(msg) from None
+
+        return await asyncio.gather(*(_run(label, call) for label, call in calls), return_exceptions=True)
+
+    def _collect_grep_streams(
+        self,
+        prefixes: list[str | None],
+        results: list[list[GrepMatch] | str | BaseException],
+    ) -> list[list[GrepMatch]] | str:
+        """Restore route prefixes on per-backend grep results, tolerating failures.
+
+        Failed backends (error string, exception or timeout) are logged and skipped
+        so the matches from the remaining backends are still returned. An error is
+        only returned when every backend failed.
+
+        Args:
+            prefixes: Route prefix for each result, or None for the default backend.
+            results: Per-backend results in the same order as `prefixes`.
+
+        Returns:
+            One list of matches per successful backend (input order preserved), or
+            the first error string if no backend succeeded.
+        """
+        streams: list[list[GrepMatch]] = []
+        errors: list[tuple[str | None, str]] = []
+        for prefix, raw in zip(prefixes, results, strict=True):
+            if isinstance(raw, (str, BaseException)):
+                errors.append((prefix, raw if isinstance(raw, str) else f"{type(raw).__name__}: {raw}"))
+            elif prefix is None:
+                streams.append(raw)
+            else:
+                streams.append([{**m, "path": f"{prefix[:-1]}{m['path']}"} for m in raw])
+
+        if errors and len(errors) == len(results):
+            # Nothing succeeded (e.g. invalid regex): surface the error as before
+            return errors[0][1]
+        for prefix, error in errors:
+            logger.warning("Skipping grep results from backend '%s': %s", prefix or "default", error)
+        return streams
+
+    def _collect_glob_streams(
+        self,
+        prefixes: list[str | None],
+        results: list[list[FileInfo] | BaseException],
+    ) -> list[list[FileInfo]]:
+        """Restore route prefixes on per-backend glob results, skipping failed backends."""
+        streams: list[list[FileInfo]] = []
+        for prefix, infos in zip(prefixes, results, strict=True):
+            if isinstance(infos, BaseException):
+                logger.warning("Skipping glob results from backend '%s': %s: %s", prefix or "default", type(infos).__name__, infos)
+            elif prefix is None:
+                streams.append(infos)
+            else:
+                streams.append([{**fi, "path": f"{prefix[:-1]}{fi['path']}"} for fi in infos])
+        return streams
+
+    def _with_route_dirs(self, infos: list[FileInfo]) -> list[FileInfo]:
+        """Add the route directories (e.g. /memories/) to a root listing of the default backend."""
+        results: list[FileInfo] = list(infos)
+        for route_prefix, _ in self.sorted_routes:
+            # Add the route itself as a directory (e.g., /memories/)
+            results.append(
+                {
+                    "path": route_prefix,
+                    "is_dir": True,
+                    "size": 0,
+                    "modified_at": "",
+                }
+            )
+
+        results.sort(key=lambda x: x.get("path", ""))
+        return results
 
     def ls_info(self, path: str) -> list[FileInfo]:
         """List directory contents (non-recursive).
@@ -116,36 +426,20 @@ class CompositeBackend(BackendProtocol):
             ```
         """
         # Check if path matches a specific route
-        for route_prefix, backend in self.sorted_routes:
-            if path.startswith(route_prefix.rstrip("/")):
-                # Query only the matching routed backend
-                suffix = path[len(route_prefix) :]
-                search_path = f"/{suffix}" if suffix else "/"
-                infos = backend.ls_info(search_path)
-                prefixed: list[FileInfo] = []
-                for fi in infos:
-                    fi = dict(fi)
-                    fi["path"] = f"{route_prefix[:-1]}{fi['path']}"
-                    prefixed.append(fi)
-                return prefixed
+        if (route := self._match_route(path)) is not None:
+            # Query only the matching routed backend
+            route_prefix, backend, search_path = route
+            infos = backend.ls_info(search_path)
+            prefixed: list[FileInfo] = []
+            for fi in infos:
+                fi = dict(fi)
+                fi["path"] = f"{route_prefix[:-1]}{fi['path']}"
+                prefixed.append(fi)
+            return prefixed
 
         # At root, aggregate default and all routed backends
         if path == "/":
-            results: list[FileInfo] = []
-            results.extend(self.default.ls_info(path))
-            for route_prefix, backend in self.sorted_routes:
-                # Add the route itself as a directory (e.g., /memories/)
-                results.append(
-                    {
-                        "path": route_prefix,
-                        "is_dir": True,
-                        "size": 0,
-                        "modified_at": "",
-                    }
-                )
-
-            results.sort(key=lambda x: x.get("path", ""))
-            return results
+            return self._with_route_dirs(self.default.ls_info(path))
 
         # Path doesn't match a route: query only default backend
         return self.default.ls_info(path)
@@ -153,36 +447,20 @@ class CompositeBackend(BackendProtocol):
     async def als_info(self, path: str) -> list[FileInfo]:
         """Async version of ls_info."""
         # Check if path matches a specific route
-        for route_prefix, backend in self.sorted_routes:
-            if path.startswith(route_prefix.rstrip("/")):
-                # Query only the matching routed backend
-                suffix = path[len(route_prefix) :]
-                search_path = f"/{suffix}" if suffix else "/"
-                infos = await backend.als_info(search_path)
-                prefixed: list[FileInfo] = []
-                for fi in infos:
-                    fi = dict(fi)
-                    fi["path"] = f"{route_prefix[:-1]}{fi['path']}"
-                    prefixed.append(fi)
-                return prefixed
+        if (route := self._match_route(path)) is not None:
+            # Query only the matching routed backend
+            route_prefix, backend, search_path = route
+            infos = await backend.als_info(search_path)
+            prefixed: list[FileInfo] = []
+            for fi in infos:
+                fi = dict(fi)
+                fi["path"] = f"{route_prefix[:-1]}{fi['path']}"
+                prefixed.append(fi)
+            return prefixed
 
         # At root, aggregate default and all routed backends
         if path == "/":
-            results: list[FileInfo] = []
-            results.extend(await self.default.als_info(path))
-            for route_prefix, backend in self.sorted_routes:
-                # Add the route itself as a directory (e.g., /memories/)
-                results.append(
-                    {
-                        "path": route_prefix,
-                        "is_dir": True,
-                        "size": 0,
-                        "modified_at": "",
-                    }
-                )
-
-            results.sort(key=lambda x: x.get("path", ""))
-            return results
+            return self._with_route_dirs(await self.default.als_info(path))
 
         # Path doesn't match a route: query only default backend
         return await self.default.als_info(path)
@@ -216,6 +494,16 @@ class CompositeBackend(BackendProtocol):
         backend, stripped_key = self._get_backend_and_key(file_path)
         return await backend.aread(stripped_key, offset=offset, limit=limit)
 
+    def outline(self, file_path: str) -> str:
+        """Outline a Python file, routing to appropriate backend."""
+        backend, stripped_key = self._get_backend_and_key(file_path)
+        return backend.outline(stripped_key)
+
+    async def aoutline(self, file_path: str) -> str:
+        """Async version of outline."""
+        backend, stripped_key = self._get_backend_and_key(file_path)
+        return await backend.aoutline(stripped_key)
+
     def grep_raw(
         self,
         pattern: str,
@@ -245,34 +533,23 @@ class CompositeBackend(BackendProtocol):
             ```
         """
         # If path targets a specific route, search only that backend
-        for route_prefix, backend in self.sorted_routes:
-            if path is not None and path.startswith(route_prefix.rstrip("/")):
-                search_path = path[len(route_prefix) - 1 :]
-                raw = backend.grep_raw(pattern, search_path if search_path else "/", glob)
-                if isinstance(raw, str):
-                    return raw
-                return [{**m, "path": f"{route_prefix[:-1]}{m['path']}"} for m in raw]
+        if (route := self._match_route(path)) is not None:
+            route_prefix, backend, search_path = route
+            raw = backend.grep_raw(pattern, search_path, glob)
+            if isinstance(raw, str):
+                return raw
+            return [{**m, "path": f"{route_prefix[:-1]}{m['path']}"} for m in raw]
 
         # If path is None or "/", search default and all routed backends and merge
         # Otherwise, search only the default backend
         if path is None or path == "/":
-            all_matches: list[GrepMatch] = []
-            raw_default = self.default.grep_raw(pattern, path, glob)  # type: ignore[attr-defined]
-            if isinstance(raw_default, str):
-                # This happens if error occurs
-                return raw_default
-            all_matches.extend(raw_default)
-
-            for route_prefix, backend in self.routes.items():
-                raw = backend.grep_raw(pattern, "/", glob)
-                if isinstance(raw, str):
-                    # This happens if error occurs
-                    return raw
-                all_matches.extend({**m, "path": f"{route_prefix[:-1]}{m['path']}"} for m in raw)
-
-            return all_matches
+            # Query all backends concurrently; failed backends don't abort the merge
+            prefixes: list[str | None] = [None, *self.routes]
+            calls = [(label, partial(backend.grep_raw, pattern, search_path, glob)) for label, backend, search_path in self._fan_out_targets(path)]
+            streams = self._collect_grep_streams(prefixes, self._fan_out(calls))
+            return streams if isinstance(streams, str) else list(chain.from_iterable(streams))
         # Path specified but doesn't match a route - search only default
-        return self.default.grep_raw(pattern, path, glob)  # type: ignore[attr-defined]
+        return self.default.grep_raw(pattern, path, glob)
 
     async def agrep_raw(
         self,
@@ -285,51 +562,35 @@ class CompositeBackend(BackendProtocol):
         See grep_raw() for detailed documentation on routing behavior and parameters.
         """
         # If path targets a specific route, search only that backend
-        for route_prefix, backend in self.sorted_routes:
-            if path is not None and path.startswith(route_prefix.rstrip("/")):
-                search_path = path[len(route_prefix) - 1 :]
-                raw = await backend.agrep_raw(pattern, search_path if search_path else "/", glob)
-                if isinstance(raw, str):
-                    return raw
-                return [{**m, "path": f"{route_prefix[:-1]}{m['path']}"} for m in raw]
+        if (route := self._match_route(path)) is not None:
+            route_prefix, backend, search_path = route
+            raw = await backend.agrep_raw(pattern, search_path, glob)
+            if isinstance(raw, str):
+                return raw
+            return [{**m, "path": f"{route_prefix[:-1]}{m['path']}"} for m in raw]
 
         # If path is None or "/", search default and all routed backends and merge
         # Otherwise, search only the default backend
         if path is None or path == "/":
-            all_matches: list[GrepMatch] = []
-            raw_default = await self.default.agrep_raw(pattern, path, glob)  # type: ignore[attr-defined]
-            if isinstance(raw_default, str):
-                # This happens if error occurs
-                return raw_default
-            all_matches.extend(raw_default)
-
-            for route_prefix, backend in self.routes.items():
-                raw = await backend.agrep_raw(pattern, "/", glob)
-                if isinstance(raw, str):
-                    # This happens if error occurs
-                    return raw
-                all_matches.extend({**m, "path": f"{route_prefix[:-1]}{m['path']}"} for m in raw)
-
-            return all_matches
+            # Query all backends concurrently; failed backends don't abort the merge
+            prefixes: list[str | None] = [None, *self.routes]
+            calls = [(label, partial(backend.agrep_raw, pattern, search_path, glob)) for label, backend, search_path in self._fan_out_targets(path)]
+            streams = self._collect_grep_streams(prefixes, await self._afan_out(calls))
+            return streams if isinstance(streams, str) else list(chain.from_iterable(streams))
         # Path specified but doesn't match a route - search only default
-        return await self.default.agrep_raw(pattern, path, glob)  # type: ignore[attr-defined]
+        return await self.default.agrep_raw(pattern, path, glob)
 
     def glob_info(self, pattern: str, path: str = "/") -> list[FileInfo]:
-        results: list[FileInfo] = []
-
         # Route based on path, not pattern
-        for route_prefix, backend in self.sorted_routes:
-            if path.startswith(route_prefix.rstrip("/")):
-                search_path = path[len(route_prefix) - 1 :]
-                infos = backend.glob_info(pattern, search_path if search_path else "/")
-                return [{**fi, "path": f"{route_prefix[:-1]}{fi['path']}"} for fi in infos]
+        if (route := self._match_route(path)) is not None:
+            route_prefix, backend, search_path = route
+            infos = backend.glob_info(pattern, search_path)
+            return [{**fi, "path": f"{route_prefix[:-1]}{fi['path']}"} for fi in infos]
 
         # Path doesn't match any specific route - search default backend AND all routed backends
-        results.extend(self.default.glob_info(pattern, path))
-
-        for route_prefix, backend in self.routes.items():
-            infos = backend.glob_info(pattern, "/")
-            results.extend({**fi, "path": f"{route_prefix[:-1]}{fi['path']}"} for fi in infos)
+        prefixes: list[str | None] = [None, *self.routes]
+        calls = [(label, partial(backend.glob_info, pattern, search_path or "/")) for label, backend, search_path in self._fan_out_targets(path)]
+        results = list(chain.from_iterable(self._collect_glob_streams(prefixes, self._fan_out(calls))))
 
         # Deterministic ordering
         results.sort(key=lambda x: x.get("path", ""))
@@ -337,26 +598,127 @@ class CompositeBackend(BackendProtocol):
 
     async def aglob_info(self, pattern: str, path: str = "/") -> list[FileInfo]:
         """Async version of glob_info."""
-        results: list[FileInfo] = []
-
         # Route based on path, not pattern
-        for route_prefix, backend in self.sorted_routes:
-            if path.startswith(route_prefix.rstrip("/")):
-                search_path = path[len(route_prefix) - 1 :]
-                infos = await backend.aglob_info(pattern, search_path if search_path else "/")
-                return [{**fi, "path": f"{route_prefix[:-1]}{fi['path']}"} for fi in infos]
+        if (route := self._match_route(path)) is not None:
+            route_prefix, backend, search_path = route
+            infos = await backend.aglob_info(pattern, search_path)
+            return [{**fi, "path": f"{route_prefix[:-1]}{fi['path']}"} for fi in infos]
 
         # Path doesn't match any specific route - search default backend AND all routed backends
-        results.extend(await self.default.aglob_info(pattern, path))
-
-        for route_prefix, backend in self.routes.items():
-            infos = await backend.aglob_info(pattern, "/")
-            results.extend({**fi, "path": f"{route_prefix[:-1]}{fi['path']}"} for fi in infos)
+        prefixes: list[str | None] = [None, *self.routes]
+        calls = [(label, partial(backend.aglob_info, pattern, search_path or "/")) for label, backend, search_path in self._fan_out_targets(path)]
+        results = list(chain.from_iterable(self._collect_glob_streams(prefixes, await self._afan_out(calls))))
 
         # Deterministic ordering
         results.sort(key=lambda x: x.get("path", ""))
         return results
 
+    def grep_iter(
+        self,
+        pattern: str,
+        path: str | None = None,
+        glob: str | None = None,
+        limit: int | None = None,
+    ) -> Iterator[GrepMatch] | str:
+        """Search files for a pattern, k-way merging sorted backend streams.
+
+        Routing follows `grep_raw`. When several backends are searched, each one is
+        asked for at most `limit` sorted matches (concurrently, see `route_timeout`),
+        and the streams are merged with `heapq.merge` so only the first `limit`
+        matches of the global order are produced. Nothing is fully sorted or
+        materialized beyond `limit` per backend.
+
+        Args:
+            pattern: Pattern to search for.
+            path: Directory to search. None or "/" searches all backends.
+            glob: Glob pattern to filter files.
+            limit: Maximum number of matches to return across all backends.
+
+        Returns:
+            Iterator of GrepMatch dicts in `path_sort_key` order, or an error string.
+        """
+        # If path targets a specific route, search only that backend
+        if (route := self._match_route(path)) is not None:
+            route_prefix, backend, search_path = route
+            raw = backend.grep_iter(pattern, search_path, glob, limit)
+            if isinstance(raw, str):
+                return raw
+            return ({**m, "path": f"{route_prefix[:-1]}{m['path']}"} for m in raw)
+
+        if path is None or path == "/":
+            prefixes: list[str | None] = [None, *self.routes]
+            calls = [
+                (label, partial(_materialize, backend.grep_iter, pattern, search_path, glob, limit))
+                for label, backend, search_path in self._fan_out_targets(path)
+            ]
+            streams = self._collect_grep_streams(prefixes, self._fan_out(calls))
+            if isinstance(streams, str):
+                return streams
+            return islice(heapq.merge(*streams, key=_grep_match_sort_key), limit)
+        # Path specified but doesn't match a route - search only default
+        return self.default.grep_iter(pattern, path, glob, limit)
+
+    async def agrep_iter(
+        self,
+        pattern: str,
+        path: str | None = None,
+        glob: str | None = None,
+        limit: int | None = None,
+    ) -> AsyncIterator[GrepMatch] | str:
+        """Async version of grep_iter."""
+        if (route := self._match_route(path)) is not None:
+            route_prefix, backend, search_path = route
+            raw = await backend.agrep_iter(pattern, search_path, glob, limit)
+            if isinstance(raw, str):
+                return raw
+            return _aiter_items([{**m, "path": f"{route_prefix[:-1]}{m['path']}"} async for m in raw])
+
+        if path is None or path == "/":
+            prefixes: list[str | None] = [None, *self.routes]
+            calls = [
+                (label, partial(_amaterialize, backend.agrep_iter, pattern, search_path, glob, limit))
+                for label, backend, search_path in self._fan_out_targets(path)
+            ]
+            streams = self._collect_grep_streams(prefixes, await self._afan_out(calls))
+            if isinstance(streams, str):
+                return streams
+            return _aiter_items(islice(heapq.merge(*streams, key=_grep_match_sort_key), limit))
+        # Path specified but doesn't match a route - search only default
+        return await self.default.agrep_iter(pattern, path, glob, limit)
+
+    def glob_iter(self, pattern: str, path: str = "/", limit: int | None = None) -> Iterator[FileInfo]:
+        """Find files matching a glob pattern, k-way merging sorted backend streams.
+
+        See `grep_iter` for how `limit` is applied across backends.
+        """
+        if (route := self._match_route(path)) is not None:
+            route_prefix, backend, search_path = route
+            infos = backend.glob_iter(pattern, search_path, limit)
+            return ({**fi, "path": f"{route_prefix[:-1]}{fi['path']}"} for fi in infos)
+
+        prefixes: list[str | None] = [None, *self.routes]
+        calls = [
+            (label, partial(_drain, backend.glob_iter, pattern, search_path or "/", limit))
+            for label, backend, search_path in self._fan_out_targets(path)
+        ]
+        streams = self._collect_glob_streams(prefixes, self._fan_out(calls))
+        return islice(heapq.merge(*streams, key=lambda fi: path_sort_key(fi.get("path", ""))), limit)
+
+    async def aglob_iter(self, pattern: str, path: str = "/", limit: int | None = None) -> AsyncIterator[FileInfo]:
+        """Async version of glob_iter."""
+        if (route := self._match_route(path)) is not None:
+            route_prefix, backend, search_path = route
+            infos = await backend.aglob_iter(pattern, search_path, limit)
+            return _aiter_items([{**fi, "path": f"{route_prefix[:-1]}{fi['path']}"} async for fi in infos])
+
+        prefixes: list[str | None] = [None, *self.routes]
+        calls = [
+            (label, partial(_adrain, backend.aglob_iter, pattern, search_path or "/", limit))
+            for label, backend, search_path in self._fan_out_targets(path)
+        ]
+        streams = self._collect_glob_streams(prefixes, await self._afan_out(calls))
+        return _aiter_items(islice(heapq.merge(*streams, key=lambda fi: path_sort_key(fi.get("path", ""))), limit))
+
     def write(
         self,
         file_path: str,
@@ -461,6 +823,215 @@ class CompositeBackend(BackendProtocol):
                 pass
         return res
 
+    def multi_edit(self, file_path: str, edits: list[FileEdit]) -> EditResult:
+        """Apply several string replacements to a file, routing to appropriate backend."""
+        backend, stripped_key = self._get_backend_and_key(file_path)
+        res = backend.multi_edit(stripped_key, edits)
+        if res.files_update:
+            try:
+                runtime = getattr(self.default, "runtime", None)
+                if runtime is not None:
+                    state = runtime.state
+                    files = state.get("files", {})
+                    files.update(res.files_update)
+                    state["files"] = files
+            except Exception:
+                pass
+        return res
+
+    async def amulti_edit(self, file_path: str, edits: list[FileEdit]) -> EditResult:
+        """Async version of multi_edit."""
+        backend, stripped_key = self._get_backend_and_key(file_path)
+        res = await backend.amulti_edit(stripped_key, edits)
+        if res.files_update:
+            try:
+                runtime = getattr(self.default, "runtime", None)
+                if runtime is not None:
+                    state = runtime.state
+                    files = state.get("files", {})
+                    files.update(res.files_update)
+                    state["files"] = files
+            except Exception:
+                pass
+        return res
+
+    def _group_batch(self, ops: list[BatchOp]) -> dict[BackendProtocol, list[tuple[int, str | None, BatchOp]]]:
+        """Group batch ops by target backend as (index, route_prefix, op with stripped path)."""
+        groups: dict[BackendProtocol, list[tuple[int, str | None, BatchOp]]] = defaultdict(list)
+        for idx, op in enumerate(ops):
+            # Ls targets a directory, so "/memories" lists the route; other ops target files
+            route = self._match_route_prefix(op.path, dirs_only=not isinstance(op, LsOp))
+            if route is None:
+                groups[self.default].append((idx, None, op))
+                continue
+            prefix, backend = route
+            suffix = op.path[len(prefix) :]
+            groups[backend].append((idx, prefix, replace(op, path=f"/{suffix}" if suffix else "/")))
+        return groups
+
+    def _restore_batch_result(self, op: BatchOp, prefix: str | None, result: BatchResult) -> BatchResult:
+        """Restore route prefixes in a backend batch result for the original op."""
+        if isinstance(op, LsOp):
+            infos = cast("list[FileInfo]", result)
+            if prefix is None:
+                return self._with_route_dirs(infos) if op.path == "/" else infos
+            prefixed: list[FileInfo] = [{**fi, "path": f"{prefix[:-1]}{fi['path']}"} for fi in infos]
+            return prefixed
+        if isinstance(op, StatOp) and result is not None:
+            info: FileInfo = {**cast("FileInfo", result), "path": op.path}
+            return info
+        if isinstance(op, DownloadOp):
+            response = cast("FileDownloadResponse", result)
+            return FileDownloadResponse(path=op.path, content=response.content, error=response.error)
+        if isinstance(op, WriteOp):
+            self._sync_default_state(cast("WriteResult", result).files_update)
+        return result
+
+    def batch(self, ops: list[BatchOp]) -> list[BatchResult]:
+        """Run operations with one `batch` call per backend.
+
+        Ops are grouped by the backend their path routes to (order is kept within
+        each backend), and the per-backend batches run concurrently on the fan-out
+        pool. Results are returned in input order with route prefixes restored.
+
+        Args:
+            ops: Batch operations with absolute paths.
+
+        Returns:
+            One result per op, in input order.
+        """
+        results: list[BatchResult] = [None] * len(ops)
+        groups = list(self._group_batch(ops).items())
+        calls = [(group[0][1] or "default", partial(backend.batch, [op for _, _, op in group])) for backend, group in groups]
+        for (_, group), batch_results in zip(groups, self._fan_out(calls), strict=True):
+            if isinstance(batch_results, BaseException):
+                raise batch_results
+            for (idx, prefix, _), result in zip(group, batch_results, strict=True):
+                results[idx] = self._restore_batch_result(ops[idx], prefix, result)
+        return results
+
+    async def abatch(self, ops: list[BatchOp]) -> list[BatchResult]:
+        """Async version of batch."""
+        results: list[BatchResult] = [None] * len(ops)
+        groups = list(self._group_batch(ops).items())
+        calls = [(group[0][1] or "default", partial(backend.abatch, [op for _, _, op in group])) for backend, group in groups]
+        for (_, group), batch_results in zip(groups, await self._afan_out(calls), strict=True):
+            if isinstance(batch_results, BaseException):
+                raise batch_results
+            for (idx, prefix, _), result in zip(group, batch_results, strict=True):
+                results[idx] = self._restore_batch_result(ops[idx], prefix, result)
+        return results
+
+    def _sync_default_state(self, files_update: dict[str, Any] | None) -> None:
+        """Mirror a state update (including None deletion markers) into the default backend's state."""
+        if not files_update:
+            return
+        try:
+            runtime = getattr(self.default, "runtime", None)
+            if runtime is not None:
+                state = runtime.state
+                files = state.get("files", {})
+                for path, file_data in files_update.items():
+                    if file_data is None:
+                        files.pop(path, None)
+                    else:
+                        files[path] = apply_file_data_update(files.get(path), file_data)
+                state["files"] = files
+        except Exception:
+            pass
+
+    def copy(self, source_path: str, destination_path: str) -> WriteResult:
+        """Copy a file, routing to the appropriate backend(s).
+
+        When both paths resolve to the same backend, its native copy is used.
+        Across routes, the content is downloaded from the source backend and
+        written to the destination backend directly, never through the model.
+
+        Args:
+            source_path: Absolute path of the file to copy.
+            destination_path: Absolute path of the new file. Must not exist.
+
+        Returns:
+            WriteResult for the destination, or error message on failure.
+        """
+        source, source_key = self._get_backend_and_key(source_path)
+        destination, destination_key = self._get_backend_and_key(destination_path)
+        res = source.copy(source_key, destination_key) if source is destination else _copy_between(source, source_key, destination, destination_key)
+        self._sync_default_state(res.files_update)
+        return res
+
+    async def acopy(self, source_path: str, destination_path: str) -> WriteResult:
+        """Async version of copy."""
+        source, source_key = self._get_backend_and_key(source_path)
+        destination, destination_key = self._get_backend_and_key(destination_path)
+        if source is destination:
+            res = await source.acopy(source_key, destination_key)
+        else:
+            res = await _acopy_between(source, source_key, destination, destination_key)
+        self._sync_default_state(res.files_update)
+        return res
+
+    def move(self, source_path: str, destination_path: str) -> WriteResult:
+        """Move a file, routing to the appropriate backend(s).
+
+        Same-backend moves use the backend's native move. Across routes the file
+        is copied as in `copy` and then deleted from the source backend.
+
+        Args:
+            source_path: Absolute path of the file to move.
+            destination_path: Absolute path of the new location. Must not exist.
+
+        Returns:
+            WriteResult for the destination, or error message on failure.
+        """
+        source, source_key = self._get_backend_and_key(source_path)
+        destination, destination_key = self._get_backend_and_key(destination_path)
+        if source is destination:
+            res = source.move(source_key, destination_key)
+        else:
+            res = _finish_move(_copy_between(source, source_key, destination, destination_key), source, source_key)
+        self._sync_default_state(res.files_update)
+        return res
+
+    async def amove(self, source_path: str, destination_path: str) -> WriteResult:
+        """Async version of move."""
+        source, source_key = self._get_backend_and_key(source_path)
+        destination, destination_key = self._get_backend_and_key(destination_path)
+        if source is destination:
+            res = await source.amove(source_key, destination_key)
+        else:
+            res = await _afinish_move(await _acopy_between(source, source_key, destination, destination_key), source, source_key)
+        self._sync_default_state(res.files_update)
+        return res
+
+    def append(self, file_path: str, content: str) -> WriteResult:
+        """Append to a file, routing to appropriate backend."""
+        backend, stripped_key = self._get_backend_and_key(file_path)
+        res = backend.append(stripped_key, content)
+        self._sync_default_state(res.files_update)
+        return res
+
+    async def aappend(self, file_path: str, content: str) -> WriteResult:
+        """Async version of append."""
+        backend, stripped_key = self._get_backend_and_key(file_path)
+        res = await backend.aappend(stripped_key, content)
+        self._sync_default_state(res.files_update)
+        return res
+
+    def delete(self, file_path: str) -> WriteResult:
+        """Delete a file, routing to appropriate backend."""
+        backend, stripped_key = self._get_backend_and_key(file_path)
+        res = backend.delete(stripped_key)
+        self._sync_default_state(res.files_update)
+        return res
+
+    async def adelete(self, file_path: str) -> WriteResult:
+        """Async version of delete."""
+        backend, stripped_key = self._get_backend_and_key(file_path)
+        res = await backend.adelete(stripped_key)
+        self._sync_default_state(res.files_update)
+        return res
+
     def execute(
         self,
         command: str,
@@ -0,0 +1,96 @@
+"""Reuse backend instances across tool calls instead of rebuilding them per call.
+
+Middleware resolves a backend factory on every tool call, model call and agent
+step. A plain factory therefore throws away anything a backend keeps between
+calls (resolved roots, indexes, caches, executors). `CachedBackendFactory`
+builds the backend once per thread and hands out the same instance afterwards.
+
+Examples:
+    ```python
+    from deepagents.backends import CachedBackendFactory, FilesystemBackend
+
+    backend = CachedBackendFactory(lambda rt: FilesystemBackend(root_dir="/repo", virtual_mode=True))
+    agent = create_deep_agent(backend=backend)
+    ```
+"""
+
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+
+from langchain.tools import ToolRuntime
+
+from deepagents.backends.protocol import BackendFactory, BackendProtocol
+
+# Number of threads whose backends are kept alive per factory
+_DEFAULT_MAX_ENTRIES = 128
+
+
+def thread_cache_key(runtime: ToolRuntime) -> Hashable:
+    """Cache key for a runtime: its thread_id, or None when the run has no thread.
+
+    Runs without a checkpointer have no thread_id and share a single entry,
+    i.e. one backend per factory (a factory created per run is cached per run).
+    """
+    config = getattr(runtime, "config", None) or {}
+    return config.get("configurable", {}).get("thread_id")
+
+
+class CachedBackendFactory:
+    """Backend factory wrapper that builds one backend per thread and reuses it.
+
+    The cached instance is handed out via `BackendProtocol.with_runtime`, so
+    runtime-bound backends (`StateBackend`, `StoreBackend`, or a `CompositeBackend`
+    containing them) are re-bound to the live runtime of each call as a cheap
+    copy, while runtime-independent backends (filesystem, sandboxes) are returned
+    as-is with their per-instance state intact.
+
+    Instances are callables taking a `ToolRuntime`, so they can be passed anywhere
+    a backend factory is accepted. Pass the same instance to every middleware that
+    should share the backend.
+
+    Args:
+        factory: Backend factory to wrap.
+        key: Maps a runtime to a cache key. Defaults to `thread_cache_key`.
+        max_entries: Maximum number of cached backends; the least recently used
+            entry is dropped beyond this.
+    """
+
+    def __init__(
+        self,
+        factory: BackendFactory,
+        *,
+        key: Callable[[ToolRuntime], Hashable] = thread_cache_key,
+        max_entries: int = _DEFAULT_MAX_ENTRIES,
+    ) -> None:
+        """Initialize the cached factory."""
+        self.factory = factory
+        self.key = key
+        self.max_entries = max_entries
+        self._backends: OrderedDict[Hashable, BackendProtocol] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __call__(self, runtime: ToolRuntime) -> BackendProtocol:
+        """Return the backend for the runtime's cache key, building it on first use."""
+        cache_key = self.key(runtime)
+        with self._lock:
+            backend = self._backends.get(cache_key)
+            if backend is None:
+                # Built under the lock so concurrent first calls never build twice
+                backend = self.factory(runtime)
+                self._backends[cache_key] = backend
+                if len(self._backends) > self.max_entries:
+                    self._backends.popitem(last=False)
+            else:
+                self._backends.move_to_end(cache_key)
+        return backend.with_runtime(runtime)
+
+    def invalidate(self, cache_key: Hashable) -> None:
+        """Drop the cached backend for `cache_key`; the next call builds a new one."""
+        with self._lock:
+            self._backends.pop(cache_key, None)
+
+    def cache_clear(self) -> None:
+        """Drop all cached backends."""
+        with self._lock:
+            self._backends.clear()
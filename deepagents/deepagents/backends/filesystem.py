@@ -1,29 +1,71 @@
 """`FilesystemBackend`: Read and write files directly from the filesystem."""
 
+import contextlib
+import heapq
 import json
 import os
 import re
+import shutil
+import stat
 import subprocess
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from functools import partial
+from itertools import islice
 from pathlib import Path
 
 import wcmatch.glob as wcglob
 
 from deepagents.backends.protocol import (
     BackendProtocol,
+    BatchOp,
+    BatchResult,
     EditResult,
     FileDownloadResponse,
+    FileEdit,
     FileInfo,
     FileUploadResponse,
     GrepMatch,
+    WriteOp,
     WriteResult,
+    _grep_match_sort_key,
+    _run_op,
+    path_sort_key,
 )
 from deepagents.backends.utils import (
+    FILE_EXISTS_ERROR,
+    OUTLINE_SUFFIXES,
     check_empty_content,
     format_content_with_line_numbers,
+    format_python_outline,
+    perform_multi_string_replacement,
     perform_string_replacement,
 )
 
+# Number of Python file outlines cached per FilesystemBackend
+_OUTLINE_CACHE_SIZE = 512
+
+# ripgrep is stopped after this long (pathological regex or huge tree)
+_RIPGREP_TIMEOUT_SECONDS = 30
+
+# Threads shared by all FilesystemBackends for the reads of a batch
+_BATCH_WORKERS = 8
+
+_batch_executor: ThreadPoolExecutor | None = None
+_batch_executor_lock = threading.Lock()
+
+
+def _get_batch_executor() -> ThreadPoolExecutor:
+    """Return the process-wide executor for batched reads, creating it on first use."""
+    global _batch_executor  # noqa: PLW0603
+    with _batch_executor_lock:
+        if _batch_executor is None:
+            _batch_executor = ThreadPoolExecutor(max_workers=_BATCH_WORKERS, thread_name_prefix="filesystem_batch")
+        return _batch_executor
+
 
 class FilesystemBackend(BackendProtocol):
     """Backend that reads and writes files directly from the filesystem.
@@ -60,6 +102,9 @@ class FilesystemBackend(BackendProtocol):
         self.cwd = Path(root_dir).resolve() if root_dir else Path.cwd()
         self.virtual_mode = virtual_mode
         self.max_file_size_bytes = max_file_size_mb * 1024 * 1024
+        # Python outlines keyed by (resolved path, mtime_ns, size)
+        self._outline_cache: OrderedDict[tuple[str, int, int], str] = OrderedDict()
+        self._outline_lock = threading.Lock()
 
     def _resolve_path(self, key: str) -> Path:
         """Resolve a file path with security checks.
@@ -247,6 +292,47 @@ class FilesystemBackend(BackendProtocol):
         except (OSError, UnicodeDecodeError) as e:
             return f"Error reading file '{file_path}': {e}"
 
+    def outline(self, file_path: str) -> str:
+        """Outline a Python file, cached per (path, mtime).
+
+        Args:
+            file_path: Absolute or relative path of a .py or .pyi file.
+
+        Returns:
+            Outline in cat -n style, or error message.
+        """
+        if not file_path.endswith(OUTLINE_SUFFIXES):
+            return f"Error: Outline mode only supports Python files ({', '.join(OUTLINE_SUFFIXES)}): '{file_path}'"
+        resolved_path = self._resolve_path(file_path)
+
+        try:
+            file_stat = resolved_path.stat()
+        except OSError:
+            return f"Error: File '{file_path}' not found"
+        if not stat.S_ISREG(file_stat.st_mode):
+            return f"Error: File '{file_path}' not found"
+
+        key = (str(resolved_path), file_stat.st_mtime_ns, file_stat.st_size)
+        with self._outline_lock:
+            cached = self._outline_cache.get(key)
+            if cached is not None:
+                self._outline_cache.move_to_end(key)
+                return cached
+
+        try:
+            fd = os.open(resolved_path, os.O_RDONLY | getattr(os, "O_NOFOLLOW", 0))
+            with os.fdopen(fd, "r", encoding="utf-8") as f:
+                source = f.read()
+        except (OSError, UnicodeDecodeError) as e:
+            return f"Error reading file '{file_path}': {e}"
+
+        result = format_python_outline(source, file_path)
+        with self._outline_lock:
+            self._outline_cache[key] = result
+            if len(self._outline_cache) > _OUTLINE_CACHE_SIZE:
+                self._outline_cache.popitem(last=False)
+        return result
+
     def write(
         self,
         file_path: str,
@@ -265,7 +351,7 @@ class FilesystemBackend(BackendProtocol):
         resolved_path = self._resolve_path(file_path)
 
         if resolved_path.exists():
-            return WriteResult(error=f"Cannot write to {file_path} because it already exists. Read and then make an edit, or write to a new path.")
+            return WriteResult(error=FILE_EXISTS_ERROR.format(path=file_path))
 
         try:
             # Create parent directories if needed
@@ -304,6 +390,52 @@ class FilesystemBackend(BackendProtocol):
                 message if file not found or replacement fails. External storage sets
                 `files_update=None`.
         """
+        return self._replace_in_file(file_path, lambda content: perform_string_replacement(content, old_string, new_string, replace_all))
+
+    def multi_edit(self, file_path: str, edits: list[FileEdit]) -> EditResult:
+        """Apply several string replacements to a file, reading and writing it once.
+
+        Args:
+            file_path: Path to the file to edit.
+            edits: Replacements to apply, all matched against the current content.
+
+        Returns:
+            `EditResult` with path and total replacement count on success, or error
+                message if the file is not found or any edit fails (nothing is written).
+        """
+        return self._replace_in_file(file_path, lambda content: perform_multi_string_replacement(content, edits))
+
+    def append(self, file_path: str, content: str) -> WriteResult:
+        """Append content to a file with `O_APPEND`, creating it if needed.
+
+        Args:
+            file_path: Path of the file to append to.
+            content: Text to append.
+
+        Returns:
+            `WriteResult` with the path on success, or error message if the
+                append fails. External storage sets `files_update=None`.
+        """
+        resolved_path = self._resolve_path(file_path)
+
+        try:
+            resolved_path.parent.mkdir(parents=True, exist_ok=True)
+
+            # The kernel positions each write at end of file, so the existing
+            # content is never read and concurrent appends do not interleave
+            flags = os.O_WRONLY | os.O_CREAT | os.O_APPEND
+            if hasattr(os, "O_NOFOLLOW"):
+                flags |= os.O_NOFOLLOW
+            fd = os.open(resolved_path, flags, 0o644)
+            with os.fdopen(fd, "wb") as f:
+                f.write(content.encode("utf-8"))
+
+            return WriteResult(path=file_path, files_update=None)
+        except (OSError, UnicodeEncodeError) as e:
+            return WriteResult(error=f"Error appending to file '{file_path}': {e}")
+
+    def _replace_in_file(self, file_path: str, replace: Callable[[str], tuple[str, int] | str]) -> EditResult:
+        """Read a file, transform its content with `replace`, and write it back."""
         resolved_path = self._resolve_path(file_path)
 
         if not resolved_path.exists() or not resolved_path.is_file():
@@ -315,7 +447,7 @@ class FilesystemBackend(BackendProtocol):
             with os.fdopen(fd, "r", encoding="utf-8") as f:
                 content = f.read()
 
-            result = perform_string_replacement(content, old_string, new_string, replace_all)
+            result = replace(content)
 
             if isinstance(result, str):
                 return EditResult(error=result)
@@ -334,6 +466,79 @@ class FilesystemBackend(BackendProtocol):
         except (OSError, UnicodeDecodeError, UnicodeEncodeError) as e:
             return EditResult(error=f"Error editing file '{file_path}': {e}")
 
+    def copy(self, source_path: str, destination_path: str) -> WriteResult:
+        """Copy a file on disk without reading it into memory as text.
+
+        Args:
+            source_path: Path of the file to copy.
+            destination_path: Path of the new file. Must not exist.
+
+        Returns:
+            `WriteResult` with the destination path on success, or error message if
+                the source is missing or the destination already exists.
+        """
+        resolved_source = self._resolve_path(source_path)
+        resolved_destination = self._resolve_path(destination_path)
+
+        if not resolved_source.is_file():
+            return WriteResult(error=f"Error: File '{source_path}' not found")
+        if resolved_destination.exists():
+            return WriteResult(error=FILE_EXISTS_ERROR.format(path=destination_path))
+
+        try:
+            resolved_destination.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copyfile(resolved_source, resolved_destination)
+            return WriteResult(path=destination_path, files_update=None)
+        except OSError as e:
+            return WriteResult(error=f"Error copying file '{source_path}': {e}")
+
+    def move(self, source_path: str, destination_path: str) -> WriteResult:
+        """Move a file on disk (a rename when both paths are on the same device).
+
+        Args:
+            source_path: Path of the file to move.
+            destination_path: New path. Must not exist.
+
+        Returns:
+            `WriteResult` with the destination path on success, or error message if
+                the source is missing or the destination already exists.
+        """
+        resolved_source = self._resolve_path(source_path)
+        resolved_destination = self._resolve_path(destination_path)
+
+        if not resolved_source.is_file():
+            return WriteResult(error=f"Error: File '{source_path}' not found")
+        if resolved_destination.exists():
+            return WriteResult(error=FILE_EXISTS_ERROR.format(path=destination_path))
+
+        try:
+            resolved_destination.parent.mkdir(parents=True, exist_ok=True)
+            shutil.move(resolved_source, resolved_destination)
+            return WriteResult(path=destination_path, files_update=None)
+        except OSError as e:
+            return WriteResult(error=f"Error moving file '{source_path}': {e}")
+
+    def delete(self, file_path: str) -> WriteResult:
+        """Delete a file from disk.
+
+        Args:
+            file_path: Path of the file to delete.
+
+        Returns:
+            `WriteResult` with the path on success, or error message if the file
+                does not exist or cannot be removed.
+        """
+        resolved_path = self._resolve_path(file_path)
+
+        if not resolved_path.is_file():
+            return WriteResult(error=f"Error: File '{file_path}' not found")
+
+        try:
+            resolved_path.unlink()
+            return WriteResult(path=file_path, files_update=None)
+        except OSError as e:
+            return WriteResult(error=f"Error deleting file '{file_path}': {e}")
+
     def grep_raw(
         self,
         pattern: str,
@@ -379,6 +584,132 @@ class FilesystemBackend(BackendProtocol):
                 matches.append({"path": fpath, "line": int(line_num), "text": line_text})
         return matches
 
+    def grep_iter(
+        self,
+        pattern: str,
+        path: str | None = None,
+        glob: str | None = None,
+        limit: int | None = None,
+    ) -> Iterator[GrepMatch] | str:
+        """Search for a regex pattern, yielding matches in sorted order.
+
+        With a `limit`, ripgrep runs in parallel (unsorted) and its output is consumed
+        incrementally, keeping only the first `limit` matches in `path_sort_key` order,
+        so memory stays bounded however many lines match. Without a limit this falls
+        back to `grep_raw` and sorts the result.
+
+        Args:
+            pattern: Regular expression pattern to search for.
+            path: Directory or file path to search in. Defaults to current directory.
+            glob: Optional glob pattern to filter which files to search.
+            limit: Maximum number of matches to yield.
+
+        Returns:
+            Iterator of GrepMatch dicts, or an error string if the regex is invalid.
+        """
+        if limit is None:
+            return super().grep_iter(pattern, path, glob)
+
+        try:
+            re.compile(pattern)
+        except re.error as e:
+            return f"Invalid regex pattern: {e}"
+
+        try:
+            base_full = self._resolve_path(path or ".")
+        except ValueError:
+            return iter(())
+
+        if not base_full.exists():
+            return iter(())
+
+        return iter(self._limited_search(pattern, base_full, glob, limit))
+
+    def _limited_search(self, pattern: str, base_full: Path, include_glob: str | None, limit: int) -> list[GrepMatch]:
+        """Return the first `limit` matches in `path_sort_key` order, preferring ripgrep."""
+        timed_out = threading.Event()
+        matches = self._ripgrep_stream(pattern, base_full, include_glob, timed_out)
+        if matches is not None:
+            first = heapq.nsmallest(limit, matches, key=_grep_match_sort_key)
+            if not timed_out.is_set():
+                return first
+            # ripgrep was killed at the deadline, so its (unordered) output is an arbitrary subset
+        # Walk files in sorted order with the Python fallback
+        matches = (
+            {"path": fpath, "line": int(line_num), "text": line_text}
+            for fpath, items in self._python_search(pattern, base_full, include_glob, sort=True).items()
+            for line_num, line_text in items
+        )
+        return heapq.nsmallest(limit, matches, key=_grep_match_sort_key)
+
+    def _ripgrep_stream(self, pattern: str, base_full: Path, include_glob: str | None, timed_out: threading.Event) -> Iterator[GrepMatch] | None:
+        """Stream ripgrep matches as they are found (unsorted).
+
+        ripgrep is killed after `_RIPGREP_TIMEOUT_SECONDS`, like `_ripgrep_search`, and
+        `timed_out` is set; the stream then ends early.
+
+        Returns:
+            Iterator of matches, or `None` if ripgrep is unavailable.
+        """
+        cmd = ["rg", "--json"]
+        if include_glob:
+            cmd.extend(["--glob", include_glob])
+        cmd.extend(["--", pattern, str(base_full)])
+
+        try:
+            proc = subprocess.Popen(  # noqa: S603
+                cmd,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                text=True,
+            )
+        except FileNotFoundError:
+            return None
+
+        def expire() -> None:
+            if proc.poll() is None:
+                timed_out.set()
+                proc.kill()
+
+        deadline = threading.Timer(_RIPGREP_TIMEOUT_SECONDS, expire)
+        deadline.daemon = True
+        deadline.start()
+        return self._read_ripgrep_matches(proc, deadline)
+
+    def _read_ripgrep_matches(self, proc: subprocess.Popen[str], deadline: threading.Timer) -> Iterator[GrepMatch]:
+        try:
+            assert proc.stdout is not None  # noqa: S101
+            for line in proc.stdout:
+                try:
+                    data = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if data.get("type") != "match":
+                    continue
+                pdata = data.get("data", {})
+                ftext = pdata.get("path", {}).get("text")
+                ln = pdata.get("line_number")
+                if not ftext or ln is None:
+                    continue
+                virt = self._to_virtual_path(Path(ftext))
+                if virt is None:
+                    continue
+                yield {"path": virt, "line": int(ln), "text": pdata.get("lines", {}).get("text", "").rstrip("\n")}
+        finally:
+            # Consumer may stop early; don't let ripgrep keep scanning
+            deadline.cancel()
+            proc.kill()
+            proc.wait()
+
+    def _to_virtual_path(self, p: Path) -> str | None:
+        """Map a real path to the path reported to callers, or None if outside root."""
+        if not self.virtual_mode:
+            return str(p)
+        try:
+            return "/" + str(p.resolve().relative_to(self.cwd))
+        except Exception:
+            return None
+
     def _ripgrep_search(self, pattern: str, base_full: Path, include_glob: str | None) -> dict[str, list[tuple[int, str]]] | None:
         """Search using ripgrep with JSON output parsing.
 
@@ -401,7 +732,7 @@ class FilesystemBackend(BackendProtocol):
                 cmd,
                 capture_output=True,
                 text=True,
-                timeout=30,
+                timeout=_RIPGREP_TIMEOUT_SECONDS,
                 check=False,
             )
         except (subprocess.TimeoutExpired, FileNotFoundError):
@@ -435,7 +766,13 @@ class FilesystemBackend(BackendProtocol):
 
         return results
 
-    def _python_search(self, pattern: str, base_full: Path, include_glob: str | None) -> dict[str, list[tuple[int, str]]]:
+    def _python_search(
+        self,
+        pattern: str,
+        base_full: Path,
+        include_glob: str | None,
+        sort: bool = False,
+    ) -> dict[str, list[tuple[int, str]]]:
         """Fallback search using Python regex when ripgrep is unavailable.
 
         Recursively searches files, respecting `max_file_size_bytes` limit.
@@ -444,6 +781,7 @@ class FilesystemBackend(BackendProtocol):
             pattern: Regex pattern to search for.
             base_full: Resolved base path to search in.
             include_glob: Optional glob pattern to filter files by name.
+            sort: Visit files in `path_sort_key` order so results come back sorted.
 
         Returns:
             Dict mapping file paths to list of `(line_number, line_text)` tuples.
@@ -456,7 +794,11 @@ class FilesystemBackend(BackendProtocol):
         results: dict[str, list[tuple[int, str]]] = {}
         root = base_full if base_full.is_dir() else base_full.parent
 
-        for fp in root.rglob("*"):
+        candidates = root.rglob("*")
+        if sort:
+            candidates = sorted(candidates, key=lambda fp: path_sort_key(str(fp)))  # type: ignore[assignment]
+
+        for fp in candidates:
             try:
                 if not fp.is_file():
                     continue
@@ -557,6 +899,57 @@ class FilesystemBackend(BackendProtocol):
         results.sort(key=lambda x: x.get("path", ""))
         return results
 
+    def glob_iter(self, pattern: str, path: str = "/", limit: int | None = None) -> Iterator[FileInfo]:
+        """Find files matching a glob pattern, yielding them in sorted order.
+
+        Matching paths are collected and sorted first (cheap), but `stat` calls and
+        FileInfo construction happen lazily, so only the first `limit` files are
+        stat-ed.
+
+        Args:
+            pattern: Glob pattern to match files against (e.g., `'*.py'`, `'**/*.txt'`).
+            path: Base directory to search from. Defaults to root (`/`).
+            limit: Maximum number of results to yield.
+
+        Returns:
+            Iterator of `FileInfo` dicts for matching files.
+        """
+        if pattern.startswith("/"):
+            pattern = pattern.lstrip("/")
+
+        search_path = self.cwd if path == "/" else self._resolve_path(path)
+        if not search_path.exists() or not search_path.is_dir():
+            return iter(())
+
+        try:
+            matched = sorted(search_path.rglob(pattern), key=lambda p: path_sort_key(str(p)))
+        except (OSError, ValueError):
+            return iter(())
+
+        def _infos() -> Iterator[FileInfo]:
+            for matched_path in matched:
+                try:
+                    if not matched_path.is_file():
+                        continue
+                except (PermissionError, OSError):
+                    continue
+                virt = str(matched_path)
+                if self.virtual_mode:
+                    with contextlib.suppress(ValueError):
+                        virt = "/" + str(matched_path.relative_to(self.cwd))
+                try:
+                    st = matched_path.stat()
+                    yield {
+                        "path": virt,
+                        "is_dir": False,
+                        "size": int(st.st_size),
+                        "modified_at": datetime.fromtimestamp(st.st_mtime).isoformat(),
+                    }
+                except OSError:
+                    yield {"path": virt, "is_dir": False}
+
+        return islice(_infos(), limit)
+
     def upload_files(self, files: list[tuple[str, bytes]]) -> list[FileUploadResponse]:
         """Upload multiple files to the filesystem.
 
@@ -626,3 +1019,32 @@ class FilesystemBackend(BackendProtocol):
                 responses.append(FileDownloadResponse(path=path, content=None, error="invalid_path"))
             # Let other errors propagate
         return responses
+
+    def batch(self, ops: list[BatchOp]) -> list[BatchResult]:
+        """Run several operations in one call, reading files concurrently.
+
+        Consecutive ops other than writes run on a shared thread pool, so reads of
+        several files overlap their disk I/O. A `WriteOp` runs after every earlier op
+        and before any later one, so ops still behave as if run sequentially in order.
+
+        Args:
+            ops: ReadOp, LsOp, StatOp, WriteOp and DownloadOp instances.
+
+        Returns:
+            One result per op, in input order.
+        """
+        results: list[BatchResult] = []
+        start = 0
+        for index, op in enumerate(ops):
+            if isinstance(op, WriteOp):
+                results.extend(self._batch_reads(ops[start:index]))
+                results.append(_run_op(self, op))
+                start = index + 1
+        results.extend(self._batch_reads(ops[start:]))
+        return results
+
+    def _batch_reads(self, ops: list[BatchOp]) -> list[BatchResult]:
+        """Run ops that do not write concurrently, returning their results in order."""
+        if len(ops) <= 1:
+            return [_run_op(self, op) for op in ops]
+        return list(_get_batch_executor().map(partial(_run_op, self), ops))
@@ -7,8 +7,9 @@ database, etc.) and provide a uniform interface for file operations.
 
 import abc
 import asyncio
-from collections.abc import Callable
+from collections.abc import AsyncIterator, Callable, Iterable, Iterator
 from dataclasses import dataclass
+from itertools import islice
 from typing import Any, Literal, NotRequired, TypeAlias
 
 from langchain.tools import ToolRuntime
@@ -106,6 +107,27 @@ class GrepMatch(TypedDict):
     text: str
 
 
+def path_sort_key(path: str) -> list[str]:
+    """Sort key that orders paths component by component.
+
+    Unlike plain string ordering, this matches the order of a sorted directory walk:
+    `/src/app/main.py` sorts before `/src/app.py` because the `app` directory name
+    compares before the `app.py` file name. All sorted backend iterators use this
+    ordering so their streams can be k-way merged.
+    """
+    return path.split("/")
+
+
+def _grep_match_sort_key(match: GrepMatch) -> tuple[list[str], int]:
+    return path_sort_key(match["path"]), match["line"]
+
+
+async def _aiter_items(items: Iterable[Any]) -> AsyncIterator[Any]:
+    """Wrap an already materialized iterable as an async iterator."""
+    for item in items:
+        yield item
+
+
 @dataclass
 class WriteResult:
     """Result from backend write operations.
@@ -158,6 +180,57 @@ class EditResult:
     occurrences: int | None = None
 
 
+@dataclass
+class FileEdit:
+    """A single string replacement for `multi_edit` (same semantics as `edit`)."""
+
+    old_string: str
+    new_string: str
+    replace_all: bool = False
+
+
+@dataclass
+class ReadOp:
+    """Batch operation: read a file with line numbers (result: str, as `read`)."""
+
+    path: str
+    offset: int = 0
+    limit: int = 2000
+
+
+@dataclass
+class LsOp:
+    """Batch operation: list a directory (result: list[FileInfo], as `ls_info`)."""
+
+    path: str
+
+
+@dataclass
+class StatOp:
+    """Batch operation: look up a single file (result: FileInfo, or None if it doesn't exist)."""
+
+    path: str
+
+
+@dataclass
+class WriteOp:
+    """Batch operation: create a new file (result: WriteResult, as `write`)."""
+
+    path: str
+    content: str
+
+
+@dataclass
+class DownloadOp:
+    """Batch operation: fetch raw file content (result: FileDownloadResponse)."""
+
+    path: str
+
+
+BatchOp: TypeAlias = ReadOp | LsOp | StatOp | WriteOp | DownloadOp
+BatchResult: TypeAlias = str | list[FileInfo] | FileInfo | None | WriteResult | FileDownloadResponse
+
+
 class BackendProtocol(abc.ABC):
     """Protocol for pluggable memory backends (single, unified).
 
@@ -276,6 +349,54 @@ class BackendProtocol(abc.ABC):
         """Async version of grep_raw."""
         return await asyncio.to_thread(self.grep_raw, pattern, path, glob)
 
+    def grep_iter(
+        self,
+        pattern: str,
+        path: str | None = None,
+        glob: str | None = None,
+        limit: int | None = None,
+    ) -> Iterator["GrepMatch"] | str:
+        """Search for a pattern, yielding matches lazily in sorted order.
+
+        Matches are ordered by path (compared component-wise, see `path_sort_key`)
+        and then by line number. This lets callers merge several backends with a
+        k-way merge and stop as soon as they have enough results.
+
+        The default implementation sorts the output of `grep_raw`. Backends that can
+        produce sorted results incrementally should override it and stop after
+        `limit` matches.
+
+        Args:
+            pattern: Pattern to search for (same semantics as `grep_raw`).
+            path: Optional directory path to search in.
+            glob: Optional glob pattern to filter which files to search.
+            limit: Maximum number of matches to yield. None means no limit.
+
+        Returns:
+            Iterator of GrepMatch dicts on success, or an error string.
+        """
+        raw = self.grep_raw(pattern, path, glob)
+        if isinstance(raw, str):
+            return raw
+        raw.sort(key=_grep_match_sort_key)
+        return islice(raw, limit)
+
+    async def agrep_iter(
+        self,
+        pattern: str,
+        path: str | None = None,
+        glob: str | None = None,
+        limit: int | None = None,
+    ) -> AsyncIterator["GrepMatch"] | str:
+        """Async version of grep_iter."""
+
+        def _collect() -> list[GrepMatch] | str:
+            matches = self.grep_iter(pattern, path, glob, limit)
+            return matches if isinstance(matches, str) else list(matches)
+
+        result = await asyncio.to_thread(_collect)
+        return result if isinstance(result, str) else _aiter_items(result)
+
     def glob_info(self, pattern: str, path: str = "/") -> list["FileInfo"]:
         """Find files matching a glob pattern.
 
@@ -298,6 +419,30 @@ class BackendProtocol(abc.ABC):
         """Async version of glob_info."""
         return await asyncio.to_thread(self.glob_info, pattern, path)
 
+    def glob_iter(self, pattern: str, path: str = "/", limit: int | None = None) -> Iterator["FileInfo"]:
+        """Find files matching a glob pattern, yielding them lazily in sorted order.
+
+        Results are ordered by path (compared component-wise, see `path_sort_key`).
+        The default implementation sorts the output of `glob_info`; backends that can
+        stop early should override it and avoid work beyond `limit` results.
+
+        Args:
+            pattern: Glob pattern (same semantics as `glob_info`).
+            path: Base directory to search from. Default: "/" (root).
+            limit: Maximum number of results to yield. None means no limit.
+
+        Returns:
+            Iterator of FileInfo dicts.
+        """
+        infos = self.glob_info(pattern, path)
+        infos.sort(key=lambda fi: path_sort_key(fi.get("path", "")))
+        return islice(infos, limit)
+
+    async def aglob_iter(self, pattern: str, path: str = "/", limit: int | None = None) -> AsyncIterator["FileInfo"]:
+        """Async version of glob_iter."""
+        infos = await asyncio.to_thread(lambda: list(self.glob_iter(pattern, path, limit)))
+        return _aiter_items(infos)
+
     def write(
         self,
         file_path: str,
@@ -354,6 +499,183 @@ class BackendProtocol(abc.ABC):
         """Async version of edit."""
         return await asyncio.to_thread(self.edit, file_path, old_string, new_string, replace_all)
 
+    def append(self, file_path: str, content: str) -> WriteResult:
+        """Append content to the end of a file, creating it if it does not exist.
+
+        Unlike `edit`, appending does not need the existing content, so backends
+        implement it without reading the file back (e.g. `O_APPEND` on disk).
+        The default implementation downloads the file and uploads the result.
+
+        Args:
+            file_path: Absolute path of the file. Must start with '/'.
+            content: Text to append. Include a trailing newline to end the line.
+
+        Returns:
+            WriteResult. Checkpoint backends return an append delta in `files_update`,
+            which the `files` reducer applies to the existing file.
+        """
+        existing = ""
+        response = self.download_files([file_path])[0]
+        if response.error != "file_not_found":
+            text = _downloaded_text(response, file_path)
+            if isinstance(text, WriteResult):
+                return text
+            existing = text
+        uploaded = self.upload_files([(file_path, (existing + content).encode("utf-8"))])[0]
+        if uploaded.error is not None:
+            return WriteResult(error=f"Error: Could not write '{file_path}': {uploaded.error}")
+        return WriteResult(path=file_path, files_update=None)
+
+    async def aappend(self, file_path: str, content: str) -> WriteResult:
+        """Async version of append."""
+        return await asyncio.to_thread(self.append, file_path, content)
+
+    def multi_edit(self, file_path: str, edits: list[FileEdit]) -> EditResult:
+        """Apply several exact string replacements to one file, writing it once.
+
+        All edits are matched against the file as it is before the call and
+        validated up front (each `old_string` must be found, and be unique unless
+        `replace_all` is set, and matches must not overlap), so either every edit
+        applies or the file is left untouched.
+
+        The default implementation downloads the file and uploads the result;
+        backends override it to edit in place.
+
+        Args:
+            file_path: Absolute path to the file to edit. Must start with '/'.
+            edits: Replacements to apply.
+
+        Returns:
+            EditResult with the total number of replacements made.
+        """
+        # Imported here because backends.utils imports this module
+        from deepagents.backends.utils import perform_multi_string_replacement
+
+        content = _downloaded_text(self.download_files([file_path])[0], file_path)
+        if isinstance(content, WriteResult):
+            return EditResult(error=content.error)
+        result = perform_multi_string_replacement(content, edits)
+        if isinstance(result, str):
+            return EditResult(error=result)
+        new_content, occurrences = result
+        uploaded = self.upload_files([(file_path, new_content.encode("utf-8"))])[0]
+        if uploaded.error is not None:
+            return EditResult(error=f"Error: Could not write '{file_path}': {uploaded.error}")
+        return EditResult(path=file_path, files_update=None, occurrences=occurrences)
+
+    async def amulti_edit(self, file_path: str, edits: list[FileEdit]) -> EditResult:
+        """Async version of multi_edit."""
+        return await asyncio.to_thread(self.multi_edit, file_path, edits)
+
+    def copy(self, source_path: str, destination_path: str) -> WriteResult:
+        """Copy a file without passing its content through the caller.
+
+        The default implementation downloads the source and writes it to the
+        destination; backends override it with a native copy where possible.
+
+        Args:
+            source_path: Absolute path of the file to copy.
+            destination_path: Absolute path of the new file. Must not exist.
+
+        Returns:
+            WriteResult for the destination, or error if the source is missing
+            or the destination already exists.
+        """
+        return _copy_between(self, source_path, self, destination_path)
+
+    async def acopy(self, source_path: str, destination_path: str) -> WriteResult:
+        """Async version of copy."""
+        return await asyncio.to_thread(self.copy, source_path, destination_path)
+
+    def move(self, source_path: str, destination_path: str) -> WriteResult:
+        """Move (rename) a file.
+
+        The default implementation copies and then deletes the source; backends
+        override it with a native rename where possible.
+
+        Args:
+            source_path: Absolute path of the file to move.
+            destination_path: Absolute path of the new location. Must not exist.
+
+        Returns:
+            WriteResult for the destination. For checkpoint backends `files_update`
+            also maps `source_path` to None so the reducer removes it.
+        """
+        return _finish_move(self.copy(source_path, destination_path), self, source_path)
+
+    async def amove(self, source_path: str, destination_path: str) -> WriteResult:
+        """Async version of move."""
+        return await asyncio.to_thread(self.move, source_path, destination_path)
+
+    def delete(self, file_path: str) -> WriteResult:  # noqa: ARG002
+        """Delete a file.
+
+        Args:
+            file_path: Absolute path of the file to delete.
+
+        Returns:
+            WriteResult. Checkpoint backends set `files_update={file_path: None}`.
+            Backends that do not support deletion return an error result.
+        """
+        return WriteResult(error="delete not supported")
+
+    async def adelete(self, file_path: str) -> WriteResult:
+        """Async version of delete."""
+        return await asyncio.to_thread(self.delete, file_path)
+
+    def outline(self, file_path: str) -> str:
+        """Outline a Python file instead of reading its content.
+
+        Lists classes, functions (with signatures), decorators and the first line of
+        each docstring, numbered with their source lines. The default implementation
+        downloads and parses the file on every call; backends with a cheap
+        modification time (e.g. FilesystemBackend) cache the result per (path, mtime).
+
+        Args:
+            file_path: Absolute path of a .py or .pyi file.
+
+        Returns:
+            Outline in cat -n style, or an error message.
+        """
+        # Imported here because backends.utils imports this module
+        from deepagents.backends.utils import OUTLINE_SUFFIXES, format_python_outline
+
+        if not file_path.endswith(OUTLINE_SUFFIXES):
+            return f"Error: Outline mode only supports Python files ({', '.join(OUTLINE_SUFFIXES)}): '{file_path}'"
+        source = _downloaded_text(self.download_files([file_path])[0], file_path)
+        if isinstance(source, WriteResult):
+            return source.error or f"Error: File '{file_path}' not found"
+        return format_python_outline(source, file_path)
+
+    async def aoutline(self, file_path: str) -> str:
+        """Async version of outline."""
+        return await asyncio.to_thread(self.outline, file_path)
+
+    def batch(self, ops: list[BatchOp]) -> list[BatchResult]:
+        """Run several operations in one call.
+
+        Ops behave as if run sequentially in order, so a read after a write to the
+        same path sees the new file. The default implementation does exactly that;
+        backends override it to save round-trips (one store batch, one sandbox
+        command, ...).
+
+        Args:
+            ops: ReadOp, LsOp, StatOp, WriteOp and DownloadOp instances.
+
+        Returns:
+            One result per op, in input order (see each op for its result type).
+
+        Examples:
+            ```python
+            agents_md, skills = backend.batch([DownloadOp("/AGENTS.md"), LsOp("/skills/")])
+            ```
+        """
+        return [_run_op(self, op) for op in ops]
+
+    async def abatch(self, ops: list[BatchOp]) -> list[BatchResult]:
+        """Async version of batch. Runs the whole batch in a single worker thread."""
+        return await asyncio.to_thread(self.batch, ops)
+
     def upload_files(self, files: list[tuple[str, bytes]]) -> list[FileUploadResponse]:
         """Upload multiple files to the sandbox.
 
@@ -402,6 +724,102 @@ class BackendProtocol(abc.ABC):
         """Async version of download_files."""
         return await asyncio.to_thread(self.download_files, paths)
 
+    def with_runtime(self, runtime: ToolRuntime) -> "BackendProtocol":  # noqa: ARG002
+        """Return this backend bound to a (newer) tool runtime.
+
+        Used when a backend instance is reused across tool calls (see
+        `CachedBackendFactory`). Backends that read state, store or config from the
+        runtime must return a copy bound to `runtime` rather than mutate `self`,
+        since the cached instance may be shared by concurrent calls.
+
+        Args:
+            runtime: The runtime of the current tool call.
+
+        Returns:
+            A backend bound to `runtime`. The default returns `self`, which is
+            correct for backends that do not use the runtime.
+        """
+        return self
+
+
+def _stat_via_ls(backend: BackendProtocol, path: str) -> FileInfo | None:
+    """Find a file's FileInfo by listing its parent directory."""
+    parent = path.rsplit("/", 1)[0] or "/"
+    return next((fi for fi in backend.ls_info(parent) if fi.get("path") == path and not fi.get("is_dir")), None)
+
+
+def _run_op(backend: BackendProtocol, op: BatchOp) -> BatchResult:
+    """Run a single batch operation with the backend's regular methods."""
+    if isinstance(op, ReadOp):
+        return backend.read(op.path, offset=op.offset, limit=op.limit)
+    if isinstance(op, LsOp):
+        return backend.ls_info(op.path)
+    if isinstance(op, StatOp):
+        return _stat_via_ls(backend, op.path)
+    if isinstance(op, WriteOp):
+        return backend.write(op.path, op.content)
+    if isinstance(op, DownloadOp):
+        return backend.download_files([op.path])[0]
+    msg = f"Unsupported batch operation: {op!r}"
+    raise TypeError(msg)
+
+
+def _downloaded_text(response: FileDownloadResponse, source_path: str) -> str | WriteResult:
+    """Decode a single download for copying, or return the WriteResult error."""
+    if response.error == "is_directory":
+        return WriteResult(error=f"Error: '{source_path}' is a directory")
+    if response.error is not None or response.content is None:
+        return WriteResult(error=f"Error: File '{source_path}' not found")
+    try:
+        return response.content.decode("utf-8")
+    except UnicodeDecodeError:
+        return WriteResult(error=f"Error: File '{source_path}' is not UTF-8 text")
+
+
+def _copy_between(source: BackendProtocol, source_path: str, destination: BackendProtocol, destination_path: str) -> WriteResult:
+    """Copy a file from one backend to another (or the same one) via download + write."""
+    text = _downloaded_text(source.download_files([source_path])[0], source_path)
+    if isinstance(text, WriteResult):
+        return text
+    return destination.write(destination_path, text)
+
+
+async def _acopy_between(source: BackendProtocol, source_path: str, destination: BackendProtocol, destination_path: str) -> WriteResult:
+    """Async version of _copy_between."""
+    text = _downloaded_text((await source.adownload_files([source_path]))[0], source_path)
+    if isinstance(text, WriteResult):
+        return text
+    return await destination.awrite(destination_path, text)
+
+
+def _merge_files_updates(*updates: dict[str, Any] | None) -> dict[str, Any] | None:
+    """Combine state updates from several writes, None if none of them had one."""
+    merged: dict[str, Any] | None = None
+    for update in updates:
+        if update is not None:
+            merged = {**(merged or {}), **update}
+    return merged
+
+
+def _finish_move(copied: WriteResult, source: BackendProtocol, source_path: str) -> WriteResult:
+    """Delete the source of a successful copy, combining both state updates."""
+    if copied.error:
+        return copied
+    deleted = source.delete(source_path)
+    if deleted.error:
+        return WriteResult(error=f"Copied to {copied.path} but could not remove the source: {deleted.error}")
+    return WriteResult(path=copied.path, files_update=_merge_files_updates(copied.files_update, deleted.files_update))
+
+
+async def _afinish_move(copied: WriteResult, source: BackendProtocol, source_path: str) -> WriteResult:
+    """Async version of _finish_move."""
+    if copied.error:
+        return copied
+    deleted = await source.adelete(source_path)
+    if deleted.error:
+        return WriteResult(error=f"Copied to {copied.path} but could not remove the source: {deleted.error}")
+    return WriteResult(path=copied.path, files_update=_merge_files_updates(copied.files_update, deleted.files_update))
+
 
 @dataclass
 class ExecuteResponse:
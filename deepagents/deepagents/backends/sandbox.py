@@ -11,17 +11,32 @@ import base64
 import json
 import shlex
 from abc import ABC, abstractmethod
+from dataclasses import asdict
+from datetime import datetime
+from itertools import groupby
+from typing import TYPE_CHECKING
 
 from deepagents.backends.protocol import (
+    BatchOp,
+    BatchResult,
+    DownloadOp,
     EditResult,
     ExecuteResponse,
     FileDownloadResponse,
     FileInfo,
     FileUploadResponse,
     GrepMatch,
+    LsOp,
+    ReadOp,
     SandboxBackendProtocol,
+    StatOp,
+    WriteOp,
     WriteResult,
 )
+from deepagents.backends.utils import FILE_EXISTS_ERROR
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
 
 _GLOB_COMMAND_TEMPLATE = """python3 -c "
 import glob
@@ -68,6 +83,21 @@ with open(file_path, 'w') as f:
     f.write(content)
 " 2>&1"""
 
+_APPEND_COMMAND_TEMPLATE = """python3 -c "
+import os
+import base64
+
+file_path = base64.b64decode('{path_b64}').decode('utf-8')
+
+# Create parent directory if needed
+parent_dir = os.path.dirname(file_path) or '.'
+os.makedirs(parent_dir, exist_ok=True)
+
+# Append without reading the existing content
+with open(file_path, 'ab') as f:
+    f.write(base64.b64decode('{content_b64}'))
+" 2>&1"""
+
 _EDIT_COMMAND_TEMPLATE = """python3 -c "
 import sys
 import base64
@@ -102,6 +132,100 @@ with open('{file_path}', 'w') as f:
 print(count)
 " 2>&1"""
 
+_TRANSFER_COMMAND_TEMPLATE = """python3 -c "
+import os
+import sys
+import shutil
+import base64
+
+# Decode base64-encoded paths
+src = base64.b64decode('{src_b64}').decode('utf-8')
+dst = base64.b64decode('{dst_b64}').decode('utf-8')
+
+# Exit with error codes if issues found
+if not os.path.isfile(src):
+    sys.exit(1)  # Source not found
+if os.path.exists(dst):
+    sys.exit(2)  # Destination exists
+
+# Create parent directory if needed
+os.makedirs(os.path.dirname(dst) or '.', exist_ok=True)
+
+if {move}:
+    shutil.move(src, dst)
+else:
+    shutil.copyfile(src, dst)
+" 2>&1"""
+
+_DELETE_COMMAND_TEMPLATE = """python3 -c "
+import os
+import sys
+import base64
+
+file_path = base64.b64decode('{path_b64}').decode('utf-8')
+
+if not os.path.isfile(file_path):
+    sys.exit(1)  # File not found
+
+os.remove(file_path)
+" 2>&1"""
+
+_BATCH_COMMAND_TEMPLATE = """python3 -c "
+import os
+import json
+import base64
+
+# Decode base64-encoded operations
+ops = json.loads(base64.b64decode('{ops_b64}').decode('utf-8'))
+
+def run(op):
+    kind = op['op']
+    path = op['path']
+    if kind == 'read':
+        if not os.path.isfile(path):
+            return None
+        if os.path.getsize(path) == 0:
+            return 'System reminder: File exists but has empty contents'
+        offset = op['offset']
+        with open(path, 'r') as f:
+            lines = f.readlines()[offset:offset + op['limit']]
+        return '\\n'.join(f'{{offset + i + 1:6d}}\\t{{line.rstrip(chr(10))}}' for i, line in enumerate(lines))
+    if kind == 'ls':
+        try:
+            with os.scandir(path) as it:
+                return [{{'path': os.path.join(path, e.name), 'is_dir': e.is_dir(follow_symlinks=False)}} for e in it]
+        except (FileNotFoundError, PermissionError):
+            return []
+    if kind == 'stat':
+        if not os.path.isfile(path):
+            return None
+        st = os.stat(path)
+        return {{'path': path, 'is_dir': False, 'size': st.st_size, 'mtime': st.st_mtime}}
+    if kind == 'write':
+        if os.path.exists(path):
+            return False
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'w') as f:
+            f.write(op['content'])
+        return True
+
+# One JSON line per operation, in order
+for op in ops:
+    try:
+        print(json.dumps({{'ok': run(op)}}))
+    except Exception as e:
+        print(json.dumps({{'error': str(e)}}))
+" 2>&1"""
+
+_BATCH_OP_NAMES = {ReadOp: "read", LsOp: "ls", StatOp: "stat", WriteOp: "write"}
+
+
+def _split_on_downloads(ops: list[BatchOp]) -> Iterator[list[BatchOp]]:
+    """Split batch ops into runs of consecutive shell ops and runs of consecutive downloads."""
+    for _, run in groupby(ops, key=lambda op: isinstance(op, DownloadOp)):
+        yield list(run)
+
+
 _READ_COMMAND_TEMPLATE = """python3 -c "
 import os
 import sys
@@ -236,6 +360,18 @@ except PermissionError:
         # External storage - no files_update needed
         return WriteResult(path=file_path, files_update=None)
 
+    def append(self, file_path: str, content: str) -> WriteResult:
+        """Append to a file inside the sandbox, creating it if needed. Returns WriteResult; error populated on failure."""
+        path_b64 = base64.b64encode(file_path.encode("utf-8")).decode("ascii")
+        content_b64 = base64.b64encode(content.encode("utf-8")).decode("ascii")
+        result = self.execute(_APPEND_COMMAND_TEMPLATE.format(path_b64=path_b64, content_b64=content_b64))
+
+        if result.exit_code != 0:
+            return WriteResult(error=result.output.strip() or f"Failed to append to file '{file_path}'")
+
+        # External storage - no files_update needed
+        return WriteResult(path=file_path, files_update=None)
+
     def edit(
         self,
         file_path: str,
@@ -266,6 +402,44 @@ except PermissionError:
         # External storage - no files_update needed
         return EditResult(path=file_path, files_update=None, occurrences=count)
 
+    def _transfer(self, source_path: str, destination_path: str, *, move: bool) -> WriteResult:
+        """Copy or move a file inside the sandbox with a single command."""
+        src_b64 = base64.b64encode(source_path.encode("utf-8")).decode("ascii")
+        dst_b64 = base64.b64encode(destination_path.encode("utf-8")).decode("ascii")
+        cmd = _TRANSFER_COMMAND_TEMPLATE.format(src_b64=src_b64, dst_b64=dst_b64, move=move)
+        result = self.execute(cmd)
+
+        if result.exit_code == 1:
+            return WriteResult(error=f"Error: File '{source_path}' not found")
+        if result.exit_code == 2:
+            return WriteResult(error=FILE_EXISTS_ERROR.format(path=destination_path))
+        if result.exit_code != 0:
+            return WriteResult(error=result.output.strip() or f"Failed to {'move' if move else 'copy'} file '{source_path}'")
+
+        # External storage - no files_update needed
+        return WriteResult(path=destination_path, files_update=None)
+
+    def copy(self, source_path: str, destination_path: str) -> WriteResult:
+        """Copy a file inside the sandbox. Returns WriteResult; error populated on failure."""
+        return self._transfer(source_path, destination_path, move=False)
+
+    def move(self, source_path: str, destination_path: str) -> WriteResult:
+        """Move a file inside the sandbox. Returns WriteResult; error populated on failure."""
+        return self._transfer(source_path, destination_path, move=True)
+
+    def delete(self, file_path: str) -> WriteResult:
+        """Delete a file inside the sandbox. Returns WriteResult; error populated on failure."""
+        path_b64 = base64.b64encode(file_path.encode("utf-8")).decode("ascii")
+        result = self.execute(_DELETE_COMMAND_TEMPLATE.format(path_b64=path_b64))
+
+        if result.exit_code == 1:
+            return WriteResult(error=f"Error: File '{file_path}' not found")
+        if result.exit_code != 0:
+            return WriteResult(error=result.output.strip() or f"Failed to delete file '{file_path}'")
+
+        # External storage - no files_update needed
+        return WriteResult(path=file_path, files_update=None)
+
     def grep_raw(
         self,
         pattern: str,
@@ -338,6 +512,63 @@ except PermissionError:
 
         return file_infos
 
+    def batch(self, ops: list[BatchOp]) -> list[BatchResult]:
+        """Run read/ls/stat/write ops in a single command per run of consecutive ops.
+
+        DownloadOps are fetched with one `download_files` call per run of consecutive
+        downloads, since providers implement downloads natively and command output may
+        be truncated. Runs execute in order, so every op sees the effects of earlier ops.
+        """
+        results: list[BatchResult] = []
+        for run in _split_on_downloads(ops):
+            if isinstance(run[0], DownloadOp):
+                results.extend(self.download_files([op.path for op in run]))
+            else:
+                results.extend(self._batch_run(run))
+        return results
+
+    def _batch_run(self, ops: list[BatchOp]) -> list[BatchResult]:
+        """Run read/ls/stat/write ops in a single command."""
+        payload = [{"op": _BATCH_OP_NAMES[type(op)], **asdict(op)} for op in ops]
+        ops_b64 = base64.b64encode(json.dumps(payload).encode("utf-8")).decode("ascii")
+        result = self.execute(_BATCH_COMMAND_TEMPLATE.format(ops_b64=ops_b64))
+
+        lines = [line for line in result.output.strip().split("\n") if line]
+        results: list[BatchResult] = []
+        for n, op in enumerate(ops):
+            try:
+                data = json.loads(lines[n])
+            except (IndexError, json.JSONDecodeError):
+                # The command failed before reaching this op
+                data = {"error": result.output.strip() or "Batch command failed"}
+            results.append(self._batch_result(op, data))
+        return results
+
+    def _batch_result(self, op: BatchOp, data: dict) -> BatchResult:
+        """Convert one line of batch command output to the op's result type."""
+        error = data.get("error")
+        value = data.get("ok")
+        if isinstance(op, ReadOp):
+            if error is not None or value is None:
+                return f"Error: File '{op.path}' not found"
+            return value
+        if isinstance(op, LsOp):
+            return [{"path": fi["path"], "is_dir": fi["is_dir"]} for fi in value or []]
+        if isinstance(op, StatOp):
+            if value is None:
+                return None
+            modified_at = datetime.fromtimestamp(value["mtime"]).isoformat()  # noqa: DTZ006
+            return {"path": value["path"], "is_dir": False, "size": value["size"], "modified_at": modified_at}
+        return self._batch_write_result(op.path, error, value)
+
+    def _batch_write_result(self, path: str, error: str | None, created: bool | None) -> WriteResult:
+        """Convert one line of batch command output for a write op."""
+        if error is not None:
+            return WriteResult(error=error)
+        if not created:
+            return WriteResult(error=FILE_EXISTS_ERROR.format(path=path))
+        return WriteResult(path=path, files_update=None)
+
     @property
     @abstractmethod
     def id(self) -> str:
@@ -1,22 +1,31 @@
 """StateBackend: Store files in LangGraph agent state (ephemeral)."""
 
+from collections.abc import Iterator
+from copy import copy as shallow_copy
+from itertools import islice
 from typing import TYPE_CHECKING
 
 from deepagents.backends.protocol import (
     BackendProtocol,
     EditResult,
     FileDownloadResponse,
+    FileEdit,
     FileInfo,
     FileUploadResponse,
     GrepMatch,
     WriteResult,
 )
 from deepagents.backends.utils import (
+    FILE_EXISTS_ERROR,
     _glob_search_files,
+    create_append_delta,
     create_file_data,
     file_data_to_string,
     format_read_response,
     grep_matches_from_files,
+    iter_glob_infos_from_files,
+    iter_grep_matches_from_files,
+    perform_multi_string_replacement,
     perform_string_replacement,
     update_file_data,
 )
@@ -41,6 +50,14 @@ class StateBackend(BackendProtocol):
         """Initialize StateBackend with runtime."""
         self.runtime = runtime
 
+    def with_runtime(self, runtime: "ToolRuntime") -> "StateBackend":
+        """Return a shallow copy bound to `runtime` (self if already bound to it)."""
+        if runtime is self.runtime:
+            return self
+        rebound = shallow_copy(self)
+        rebound.runtime = runtime
+        return rebound
+
     def ls_info(self, path: str) -> list[FileInfo]:
         """List files and directories in the specified directory (non-recursive).
 
@@ -133,7 +150,7 @@ class StateBackend(BackendProtocol):
         files = self.runtime.state.get("files", {})
 
         if file_path in files:
-            return WriteResult(error=f"Cannot write to {file_path} because it already exists. Read and then make an edit, or write to a new path.")
+            return WriteResult(error=FILE_EXISTS_ERROR.format(path=file_path))
 
         new_file_data = create_file_data(content)
         return WriteResult(path=file_path, files_update={file_path: new_file_data})
@@ -164,6 +181,77 @@ class StateBackend(BackendProtocol):
         new_file_data = update_file_data(file_data, new_content)
         return EditResult(path=file_path, files_update={file_path: new_file_data}, occurrences=int(occurrences))
 
+    def multi_edit(self, file_path: str, edits: list[FileEdit]) -> EditResult:
+        """Apply several string replacements to a file in one pass.
+        Returns EditResult with a single files_update for all edits.
+        """
+        files = self.runtime.state.get("files", {})
+        file_data = files.get(file_path)
+
+        if file_data is None:
+            return EditResult(error=f"Error: File '{file_path}' not found")
+
+        result = perform_multi_string_replacement(file_data_to_string(file_data), edits)
+
+        if isinstance(result, str):
+            return EditResult(error=result)
+
+        new_content, occurrences = result
+        new_file_data = update_file_data(file_data, new_content)
+        return EditResult(path=file_path, files_update={file_path: new_file_data}, occurrences=occurrences)
+
+    def append(self, file_path: str, content: str) -> WriteResult:
+        """Append content to a file in state, creating it if needed.
+        Returns WriteResult whose files_update holds only the appended lines (an append
+        delta applied by the files reducer), so the update does not grow with the file.
+        """
+        files = self.runtime.state.get("files", {})
+
+        if file_path not in files:
+            return WriteResult(path=file_path, files_update={file_path: create_file_data(content)})
+
+        return WriteResult(path=file_path, files_update={file_path: create_append_delta(content)})
+
+    def copy(self, source_path: str, destination_path: str) -> WriteResult:
+        """Copy a file within state without re-parsing its content.
+        Returns WriteResult with files_update for the new file.
+        """
+        files = self.runtime.state.get("files", {})
+        file_data = files.get(source_path)
+
+        if file_data is None:
+            return WriteResult(error=f"Error: File '{source_path}' not found")
+        if destination_path in files:
+            return WriteResult(error=FILE_EXISTS_ERROR.format(path=destination_path))
+
+        new_file_data = create_file_data(list(file_data["content"]))
+        return WriteResult(path=destination_path, files_update={destination_path: new_file_data})
+
+    def move(self, source_path: str, destination_path: str) -> WriteResult:
+        """Move a file within state, keeping its FileData (and timestamps) as-is.
+        Returns WriteResult with files_update adding the destination and removing the source.
+        """
+        files = self.runtime.state.get("files", {})
+        file_data = files.get(source_path)
+
+        if file_data is None:
+            return WriteResult(error=f"Error: File '{source_path}' not found")
+        if destination_path in files:
+            return WriteResult(error=FILE_EXISTS_ERROR.format(path=destination_path))
+
+        return WriteResult(path=destination_path, files_update={destination_path: file_data, source_path: None})
+
+    def delete(self, file_path: str) -> WriteResult:
+        """Delete a file from state.
+        Returns WriteResult with a None files_update entry (deletion marker for the reducer).
+        """
+        files = self.runtime.state.get("files", {})
+
+        if file_path not in files:
+            return WriteResult(error=f"Error: File '{file_path}' not found")
+
+        return WriteResult(path=file_path, files_update={file_path: None})
+
     def grep_raw(
         self,
         pattern: str,
@@ -173,6 +261,23 @@ class StateBackend(BackendProtocol):
         files = self.runtime.state.get("files", {})
         return grep_matches_from_files(files, pattern, path, glob)
 
+    def grep_iter(
+        self,
+        pattern: str,
+        path: str | None = None,
+        glob: str | None = None,
+        limit: int | None = None,
+    ) -> Iterator[GrepMatch] | str:
+        """Lazily search state files in sorted order, stopping after `limit` matches."""
+        files = self.runtime.state.get("files", {})
+        matches = iter_grep_matches_from_files(files, pattern, path, glob)
+        return matches if isinstance(matches, str) else islice(matches, limit)
+
+    def glob_iter(self, pattern: str, path: str = "/", limit: int | None = None) -> Iterator[FileInfo]:
+        """Lazily yield FileInfo for matching state files in sorted order."""
+        files = self.runtime.state.get("files", {})
+        return islice(iter_glob_infos_from_files(files, pattern, path), limit)
+
     def glob_info(self, pattern: str, path: str = "/") -> list[FileInfo]:
         """Get FileInfo for files matching glob pattern."""
         files = self.runtime.state.get("files", {})
@@ -1,29 +1,64 @@
 """StoreBackend: Adapter for LangGraph's BaseStore (persistent, cross-thread)."""
 
-from typing import Any
+from collections.abc import Iterator
+from copy import copy as shallow_copy
+from itertools import islice
+from typing import TYPE_CHECKING, Any, cast
 
 from langgraph.config import get_config
-from langgraph.store.base import BaseStore, Item
+from langgraph.store.base import BaseStore, GetOp, Item, PutOp
 
 from deepagents.backends.protocol import (
     BackendProtocol,
+    BatchOp,
+    BatchResult,
+    DownloadOp,
     EditResult,
     FileDownloadResponse,
+    FileEdit,
     FileInfo,
     FileUploadResponse,
     GrepMatch,
+    LsOp,
+    ReadOp,
+    StatOp,
+    WriteOp,
     WriteResult,
 )
 from deepagents.backends.utils import (
+    FILE_EXISTS_ERROR,
     _glob_search_files,
+    apply_file_data_update,
+    create_append_delta,
     create_file_data,
     file_data_to_string,
     format_read_response,
     grep_matches_from_files,
+    iter_glob_infos_from_files,
+    iter_grep_matches_from_files,
+    perform_multi_string_replacement,
     perform_string_replacement,
     update_file_data,
 )
 
+if TYPE_CHECKING:
+    from langchain.tools import ToolRuntime
+
+
+def _split_on_ls(ops: list[BatchOp]) -> Iterator[LsOp | list[BatchOp]]:
+    """Split batch ops into runs answerable from one round of gets, separated by ls ops."""
+    run: list[BatchOp] = []
+    for op in ops:
+        if isinstance(op, LsOp):
+            if run:
+                yield run
+                run = []
+            yield op
+        else:
+            run.append(op)
+    if run:
+        yield run
+
 
 class StoreBackend(BackendProtocol):
     """Backend that stores files in LangGraph's BaseStore (persistent).
@@ -42,6 +77,14 @@ class StoreBackend(BackendProtocol):
         """
         self.runtime = runtime
 
+    def with_runtime(self, runtime: "ToolRuntime") -> "StoreBackend":
+        """Return a shallow copy bound to `runtime` (self if already bound to it)."""
+        if runtime is self.runtime:
+            return self
+        rebound = shallow_copy(self)
+        rebound.runtime = runtime
+        return rebound
+
     def _get_store(self) -> BaseStore:
         """Get the store instance.
 
@@ -317,7 +360,7 @@ class StoreBackend(BackendProtocol):
         # Check if file exists
         existing = store.get(namespace, file_path)
         if existing is not None:
-            return WriteResult(error=f"Cannot write to {file_path} because it already exists. Read and then make an edit, or write to a new path.")
+            return WriteResult(error=FILE_EXISTS_ERROR.format(path=file_path))
 
         # Create new file
         file_data = create_file_data(content)
@@ -340,7 +383,7 @@ class StoreBackend(BackendProtocol):
         # Check if file exists using async method
         existing = await store.aget(namespace, file_path)
         if existing is not None:
-            return WriteResult(error=f"Cannot write to {file_path} because it already exists. Read and then make an edit, or write to a new path.")
+            return WriteResult(error=FILE_EXISTS_ERROR.format(path=file_path))
 
         # Create new file using async method
         file_data = create_file_data(content)
@@ -423,6 +466,185 @@ class StoreBackend(BackendProtocol):
         await store.aput(namespace, file_path, store_value)
         return EditResult(path=file_path, files_update=None, occurrences=int(occurrences))
 
+    def multi_edit(self, file_path: str, edits: list[FileEdit]) -> EditResult:
+        """Apply several string replacements to a file with one store get and one put.
+        Returns EditResult. External storage sets files_update=None.
+        """
+        store = self._get_store()
+        namespace = self._get_namespace()
+
+        item = store.get(namespace, file_path)
+        if item is None:
+            return EditResult(error=f"Error: File '{file_path}' not found")
+
+        try:
+            file_data = self._convert_store_item_to_file_data(item)
+        except ValueError as e:
+            return EditResult(error=f"Error: {e}")
+
+        result = perform_multi_string_replacement(file_data_to_string(file_data), edits)
+
+        if isinstance(result, str):
+            return EditResult(error=result)
+
+        new_content, occurrences = result
+        store_value = self._convert_file_data_to_store_value(update_file_data(file_data, new_content))
+        store.put(namespace, file_path, store_value)
+        return EditResult(path=file_path, files_update=None, occurrences=occurrences)
+
+    async def amulti_edit(self, file_path: str, edits: list[FileEdit]) -> EditResult:
+        """Async version of multi_edit using native store async methods."""
+        store = self._get_store()
+        namespace = self._get_namespace()
+
+        item = await store.aget(namespace, file_path)
+        if item is None:
+            return EditResult(error=f"Error: File '{file_path}' not found")
+
+        try:
+            file_data = self._convert_store_item_to_file_data(item)
+        except ValueError as e:
+            return EditResult(error=f"Error: {e}")
+
+        result = perform_multi_string_replacement(file_data_to_string(file_data), edits)
+
+        if isinstance(result, str):
+            return EditResult(error=result)
+
+        new_content, occurrences = result
+        store_value = self._convert_file_data_to_store_value(update_file_data(file_data, new_content))
+        await store.aput(namespace, file_path, store_value)
+        return EditResult(path=file_path, files_update=None, occurrences=occurrences)
+
+    def _appended_store_value(self, item: Item | None, content: str) -> dict[str, Any]:
+        """Store value for `item` with `content` appended, extending its line list in place of a string rewrite."""
+        existing = self._convert_store_item_to_file_data(item) if item is not None else None
+        return self._convert_file_data_to_store_value(apply_file_data_update(existing, create_append_delta(content)))
+
+    def append(self, file_path: str, content: str) -> WriteResult:
+        """Append content to a file with one store get and one put, creating it if needed.
+        Returns WriteResult. External storage sets files_update=None.
+        """
+        store = self._get_store()
+        namespace = self._get_namespace()
+
+        try:
+            store_value = self._appended_store_value(store.get(namespace, file_path), content)
+        except ValueError as e:
+            return WriteResult(error=f"Error: {e}")
+
+        store.put(namespace, file_path, store_value)
+        return WriteResult(path=file_path, files_update=None)
+
+    async def aappend(self, file_path: str, content: str) -> WriteResult:
+        """Async version of append using native store async methods."""
+        store = self._get_store()
+        namespace = self._get_namespace()
+
+        try:
+            store_value = self._appended_store_value(await store.aget(namespace, file_path), content)
+        except ValueError as e:
+            return WriteResult(error=f"Error: {e}")
+
+        await store.aput(namespace, file_path, store_value)
+        return WriteResult(path=file_path, files_update=None)
+
+    def copy(self, source_path: str, destination_path: str) -> WriteResult:
+        """Copy a file within the store namespace without decoding its content.
+        Returns WriteResult. External storage sets files_update=None.
+        """
+        store = self._get_store()
+        namespace = self._get_namespace()
+
+        item = store.get(namespace, source_path)
+        if item is None:
+            return WriteResult(error=f"Error: File '{source_path}' not found")
+        if store.get(namespace, destination_path) is not None:
+            return WriteResult(error=FILE_EXISTS_ERROR.format(path=destination_path))
+
+        try:
+            file_data = self._convert_store_item_to_file_data(item)
+        except ValueError as e:
+            return WriteResult(error=f"Error: {e}")
+
+        store.put(namespace, destination_path, self._convert_file_data_to_store_value(create_file_data(list(file_data["content"]))))
+        return WriteResult(path=destination_path, files_update=None)
+
+    async def acopy(self, source_path: str, destination_path: str) -> WriteResult:
+        """Async version of copy using native store async methods."""
+        store = self._get_store()
+        namespace = self._get_namespace()
+
+        item = await store.aget(namespace, source_path)
+        if item is None:
+            return WriteResult(error=f"Error: File '{source_path}' not found")
+        if await store.aget(namespace, destination_path) is not None:
+            return WriteResult(error=FILE_EXISTS_ERROR.format(path=destination_path))
+
+        try:
+            file_data = self._convert_store_item_to_file_data(item)
+        except ValueError as e:
+            return WriteResult(error=f"Error: {e}")
+
+        await store.aput(namespace, destination_path, self._convert_file_data_to_store_value(create_file_data(list(file_data["content"]))))
+        return WriteResult(path=destination_path, files_update=None)
+
+    def move(self, source_path: str, destination_path: str) -> WriteResult:
+        """Move a file within the store namespace, keeping its stored value as-is.
+        Returns WriteResult. External storage sets files_update=None.
+        """
+        store = self._get_store()
+        namespace = self._get_namespace()
+
+        item = store.get(namespace, source_path)
+        if item is None:
+            return WriteResult(error=f"Error: File '{source_path}' not found")
+        if store.get(namespace, destination_path) is not None:
+            return WriteResult(error=FILE_EXISTS_ERROR.format(path=destination_path))
+
+        store.put(namespace, destination_path, item.value)
+        store.delete(namespace, source_path)
+        return WriteResult(path=destination_path, files_update=None)
+
+    async def amove(self, source_path: str, destination_path: str) -> WriteResult:
+        """Async version of move using native store async methods."""
+        store = self._get_store()
+        namespace = self._get_namespace()
+
+        item = await store.aget(namespace, source_path)
+        if item is None:
+            return WriteResult(error=f"Error: File '{source_path}' not found")
+        if await store.aget(namespace, destination_path) is not None:
+            return WriteResult(error=FILE_EXISTS_ERROR.format(path=destination_path))
+
+        await store.aput(namespace, destination_path, item.value)
+        await store.adelete(namespace, source_path)
+        return WriteResult(path=destination_path, files_update=None)
+
+    def delete(self, file_path: str) -> WriteResult:
+        """Delete a file from the store.
+        Returns WriteResult. External storage sets files_update=None.
+        """
+        store = self._get_store()
+        namespace = self._get_namespace()
+
+        if store.get(namespace, file_path) is None:
+            return WriteResult(error=f"Error: File '{file_path}' not found")
+
+        store.delete(namespace, file_path)
+        return WriteResult(path=file_path, files_update=None)
+
+    async def adelete(self, file_path: str) -> WriteResult:
+        """Async version of delete using native store async methods."""
+        store = self._get_store()
+        namespace = self._get_namespace()
+
+        if await store.aget(namespace, file_path) is None:
+            return WriteResult(error=f"Error: File '{file_path}' not found")
+
+        await store.adelete(namespace, file_path)
+        return WriteResult(path=file_path, files_update=None)
+
     # Removed legacy grep() convenience to keep lean surface
 
     def grep_raw(
@@ -442,6 +664,34 @@ class StoreBackend(BackendProtocol):
                 continue
         return grep_matches_from_files(files, pattern, path, glob)
 
+    def _load_all_files(self) -> dict[str, Any]:
+        """Load every file in the namespace as a {path: FileData} mapping, skipping invalid items."""
+        store = self._get_store()
+        namespace = self._get_namespace()
+        items = self._search_store_paginated(store, namespace)
+        files: dict[str, Any] = {}
+        for item in items:
+            try:
+                files[item.key] = self._convert_store_item_to_file_data(item)
+            except ValueError:
+                continue
+        return files
+
+    def grep_iter(
+        self,
+        pattern: str,
+        path: str | None = None,
+        glob: str | None = None,
+        limit: int | None = None,
+    ) -> Iterator[GrepMatch] | str:
+        """Search stored files in sorted order, stopping after `limit` matches."""
+        matches = iter_grep_matches_from_files(self._load_all_files(), pattern, path, glob)
+        return matches if isinstance(matches, str) else islice(matches, limit)
+
+    def glob_iter(self, pattern: str, path: str = "/", limit: int | None = None) -> Iterator[FileInfo]:
+        """Yield FileInfo for matching stored files in sorted order."""
+        return islice(iter_glob_infos_from_files(self._load_all_files(), pattern, path), limit)
+
     def glob_info(self, pattern: str, path: str = "/") -> list[FileInfo]:
         store = self._get_store()
         namespace = self._get_namespace()
@@ -470,6 +720,101 @@ class StoreBackend(BackendProtocol):
             )
         return infos
 
+    def _resolve_batch_run(self, ops: list[BatchOp], items: dict[str, Item | None]) -> tuple[list[BatchResult], dict[str, dict[str, Any]]]:
+        """Answer a run of non-ls batch ops from prefetched items.
+
+        Writes are applied to a local overlay so later ops in the run see them,
+        matching sequential semantics.
+
+        Returns:
+            Tuple of (results in op order, store values to put keyed by path).
+        """
+        current: dict[str, dict[str, Any] | None] = {}
+        invalid: dict[str, str] = {}
+        for key, item in items.items():
+            current[key] = None
+            if item is not None:
+                try:
+                    current[key] = self._convert_store_item_to_file_data(item)
+                except ValueError as e:
+                    invalid[key] = str(e)
+
+        results: list[BatchResult] = []
+        puts: dict[str, dict[str, Any]] = {}
+        for op in ops:
+            if not isinstance(op, WriteOp):
+                results.append(self._resolve_batch_lookup(op, current[op.path], invalid.get(op.path)))
+            elif current[op.path] is not None or op.path in invalid:
+                results.append(WriteResult(error=FILE_EXISTS_ERROR.format(path=op.path)))
+            else:
+                new_file_data = create_file_data(op.content)
+                current[op.path] = new_file_data
+                puts[op.path] = self._convert_file_data_to_store_value(new_file_data)
+                results.append(WriteResult(path=op.path, files_update=None))
+        return results, puts
+
+    def _resolve_batch_lookup(self, op: BatchOp, file_data: dict[str, Any] | None, invalid: str | None) -> BatchResult:
+        """Answer a read, stat or download op from the file's data (None if missing)."""
+        if isinstance(op, ReadOp):
+            if invalid is not None:
+                return f"Error: {invalid}"
+            if file_data is None:
+                return f"Error: File '{op.path}' not found"
+            return format_read_response(file_data, op.offset, op.limit)
+        if isinstance(op, StatOp):
+            if file_data is None:
+                return None
+            size = len("\n".join(file_data.get("content", [])))
+            return {"path": op.path, "is_dir": False, "size": int(size), "modified_at": file_data.get("modified_at", "")}
+        if isinstance(op, DownloadOp):
+            content = file_data_to_string(file_data).encode("utf-8") if file_data is not None else None
+            return FileDownloadResponse(path=op.path, content=content, error=None if content is not None else "file_not_found")
+        msg = f"Unsupported batch operation: {op!r}"
+        raise TypeError(msg)
+
+    def batch(self, ops: list[BatchOp]) -> list[BatchResult]:
+        """Run several operations with as few store round-trips as possible.
+
+        Each run of read/stat/download/write ops costs one `store.batch` of GetOps
+        plus, if it contains writes, one `store.batch` of PutOps. Ls ops need a
+        paginated search and are run individually between runs.
+        """
+        store = self._get_store()
+        namespace = self._get_namespace()
+        results: list[BatchResult] = []
+
+        for run in _split_on_ls(ops):
+            if isinstance(run, LsOp):
+                results.append(self.ls_info(run.path))
+                continue
+            keys = list(dict.fromkeys(op.path for op in run))
+            items = cast("list[Item | None]", store.batch([GetOp(namespace, key) for key in keys]))
+            run_results, puts = self._resolve_batch_run(run, dict(zip(keys, items, strict=True)))
+            if puts:
+                store.batch([PutOp(namespace, key, value) for key, value in puts.items()])
+            results.extend(run_results)
+
+        return results
+
+    async def abatch(self, ops: list[BatchOp]) -> list[BatchResult]:
+        """Async version of batch using native store async methods."""
+        store = self._get_store()
+        namespace = self._get_namespace()
+        results: list[BatchResult] = []
+
+        for run in _split_on_ls(ops):
+            if isinstance(run, LsOp):
+                results.append(await self.als_info(run.path))
+                continue
+            keys = list(dict.fromkeys(op.path for op in run))
+            items = cast("list[Item | None]", await store.abatch([GetOp(namespace, key) for key in keys]))
+            run_results, puts = self._resolve_batch_run(run, dict(zip(keys, items, strict=True)))
+            if puts:
+                await store.abatch([PutOp(namespace, key, value) for key, value in puts.items()])
+            results.extend(run_results)
+
+        return results
+
     def upload_files(self, files: list[tuple[str, bytes]]) -> list[FileUploadResponse]:
         """Upload multiple files to the store.
 
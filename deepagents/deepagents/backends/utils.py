@@ -5,20 +5,26 @@ helpers used by backends and the composite router. Structured helpers
 enable composition without fragile string parsing.
 """
 
+import ast
+import itertools
 import re
+from collections.abc import Iterator
 from datetime import UTC, datetime
 from pathlib import Path
 from typing import Any, Literal
 
 import wcmatch.glob as wcglob
 
-from deepagents.backends.protocol import FileInfo as _FileInfo, GrepMatch as _GrepMatch
+from deepagents.backends.protocol import FileEdit, FileInfo as _FileInfo, GrepMatch as _GrepMatch, path_sort_key
+from deepagents.tokens import count_tokens, truncate_to_tokens
 
 EMPTY_CONTENT_WARNING = "System reminder: File exists but has empty contents"
 MAX_LINE_LENGTH = 5000
 LINE_NUMBER_WIDTH = 6
 TOOL_RESULT_TOKEN_LIMIT = 20000  # Same threshold as eviction
 TRUNCATION_GUIDANCE = "... [results truncated, try being more specific with your parameters]"
+OUTLINE_SUFFIXES = (".py", ".pyi")
+FILE_EXISTS_ERROR = "Cannot write to {path} because it already exists. Read and then make an edit, or write to a new path."
 
 # Re-export protocol types for backwards compatibility
 FileInfo = _FileInfo
@@ -106,11 +112,11 @@ def file_data_to_string(file_data: dict[str, Any]) -> str:
     return "\n".join(file_data["content"])
 
 
-def create_file_data(content: str, created_at: str | None = None) -> dict[str, Any]:
+def create_file_data(content: str | list[str], created_at: str | None = None) -> dict[str, Any]:
     """Create a FileData object with timestamps.
 
     Args:
-        content: File content as string
+        content: File content as string, or as a list of lines
         created_at: Optional creation timestamp (ISO format)
 
     Returns:
@@ -146,6 +152,46 @@ def update_file_data(file_data: dict[str, Any], content: str) -> dict[str, Any]:
     }
 
 
+def create_append_delta(content: str) -> dict[str, Any]:
+    """Create a FileData delta that appends content to a file in state.
+
+    The `files` reducer applies the delta to the existing file (see
+    `apply_file_data_update`), so appending never copies the file into the update.
+
+    Args:
+        content: Text to append.
+
+    Returns:
+        FileData dict with the appended lines and `append=True`.
+    """
+    return {**create_file_data(content), "append": True}
+
+
+def apply_file_data_update(existing: dict[str, Any] | None, update: dict[str, Any]) -> dict[str, Any]:
+    """Apply one `files_update` entry to the current FileData of a path.
+
+    Args:
+        existing: Current FileData, or None if the file does not exist.
+        update: New FileData (replaces the file) or an append delta from
+            `create_append_delta` (extends it).
+
+    Returns:
+        The resulting FileData.
+    """
+    if not update.get("append"):
+        return update
+    if existing is None or not existing["content"]:
+        return {"content": update["content"], "created_at": update["created_at"], "modified_at": update["modified_at"]}
+    lines = existing["content"]
+    appended = update["content"]
+    return {
+        # The first appended line continues the last (possibly partial) line
+        "content": [*lines[:-1], lines[-1] + appended[0], *appended[1:]],
+        "created_at": existing["created_at"],
+        "modified_at": update["modified_at"],
+    }
+
+
 def format_read_response(
     file_data: dict[str, Any],
     offset: int,
@@ -206,16 +252,138 @@ def perform_string_replacement(
     return new_content, occurrences
 
 
+def perform_multi_string_replacement(
+    content: str,
+    edits: list[FileEdit],
+) -> tuple[str, int] | str:
+    """Apply several string replacements to content in a single pass.
+
+    Every edit is matched against the original content and validated before
+    anything is replaced, so either all edits apply or none do. Matches of
+    different edits must not overlap.
+
+    Args:
+        content: Original content
+        edits: Replacements to apply
+
+    Returns:
+        Tuple of (new_content, total_occurrences) on success, or error message string
+    """
+    if not edits:
+        return "Error: No edits provided"
+
+    spans: list[tuple[int, int, int]] = []
+    for number, edit in enumerate(edits, start=1):
+        old_string = edit.old_string
+        if not old_string:
+            return f"Error: Edit {number}: old_string must not be empty"
+        starts = []
+        start = content.find(old_string)
+        while start != -1:
+            starts.append(start)
+            if not edit.replace_all and len(starts) > 1:
+                break
+            start = content.find(old_string, start + len(old_string))
+        if not starts:
+            return f"Error: Edit {number}: String not found in file: '{old_string}'"
+        if len(starts) > 1 and not edit.replace_all:
+            return f"Error: Edit {number}: String '{old_string}' appears {content.count(old_string)} times in file. Use replace_all=True to replace all instances, or provide a more specific string with surrounding context."
+        spans.extend((start, start + len(old_string), number) for start in starts)
+
+    spans.sort()
+    for (_, previous_end, previous_number), (start, _, number) in itertools.pairwise(spans):
+        if start < previous_end:
+            first, second = sorted((previous_number, number))
+            return f"Error: Edits {first} and {second} overlap in the file. Combine them into a single edit."
+
+    pieces: list[str] = []
+    position = 0
+    for start, end, number in spans:
+        pieces.append(content[position:start])
+        pieces.append(edits[number - 1].new_string)
+        position = end
+    pieces.append(content[position:])
+    return "".join(pieces), len(spans)
+
+
+def _outline_signature(node: ast.ClassDef | ast.FunctionDef | ast.AsyncFunctionDef) -> str:
+    """Render the header line of a class or function definition."""
+    if isinstance(node, ast.ClassDef):
+        bases = [ast.unparse(base) for base in node.bases] + [ast.unparse(keyword) for keyword in node.keywords]
+        return f"class {node.name}({', '.join(bases)}):" if bases else f"class {node.name}:"
+    keyword = "async def" if isinstance(node, ast.AsyncFunctionDef) else "def"
+    returns = f" -> {ast.unparse(node.returns)}" if node.returns is not None else ""
+    return f"{keyword} {node.name}({ast.unparse(node.args)}){returns}:"
+
+
+def _collect_outline(body: list[ast.stmt], depth: int, entries: list[tuple[int, str]]) -> None:
+    """Collect (line number, text) outline entries for definitions in `body`.
+
+    Descends into class bodies (one indent level deeper) and into if/try blocks
+    (same level), but not into function bodies.
+    """
+    for node in body:
+        if isinstance(node, ast.ClassDef | ast.FunctionDef | ast.AsyncFunctionDef):
+            indent = "    " * depth
+            entries.extend((decorator.lineno, f"{indent}@{ast.unparse(decorator)}") for decorator in node.decorator_list)
+            header = indent + _outline_signature(node)
+            docstring = ast.get_docstring(node)
+            if docstring:
+                header += f"  # {docstring.splitlines()[0]}"
+            entries.append((node.lineno, header))
+            if isinstance(node, ast.ClassDef):
+                _collect_outline(node.body, depth + 1, entries)
+        elif isinstance(node, ast.If):
+            _collect_outline(node.body, depth, entries)
+            _collect_outline(node.orelse, depth, entries)
+        elif isinstance(node, ast.Try | ast.TryStar):
+            for block in (node.body, *(handler.body for handler in node.handlers), node.orelse, node.finalbody):
+                _collect_outline(block, depth, entries)
+
+
+def format_python_outline(source: str, file_path: str) -> str:
+    """Outline Python source: classes, functions, signatures, decorators and docstring first lines.
+
+    Each definition is one line in cat -n style, numbered with its line in the
+    source, so the model can follow up with read_file(offset=line - 1).
+
+    Args:
+        source: Python source code.
+        file_path: Path of the source, used in messages.
+
+    Returns:
+        The outline, a note if the file defines nothing, or an error message if
+        the source does not parse.
+    """
+    try:
+        module = ast.parse(source, filename=file_path)
+    except (SyntaxError, ValueError) as e:
+        lineno = getattr(e, "lineno", None)
+        line = f" at line {lineno}" if lineno else ""
+        return f"Error: Cannot outline '{file_path}': invalid Python syntax{line}"
+
+    entries: list[tuple[int, str]] = []
+    docstring = ast.get_docstring(module)
+    if docstring:
+        entries.append((module.body[0].lineno, f"# {docstring.splitlines()[0]}"))
+    _collect_outline(module.body, 0, entries)
+    if not docstring and not entries:
+        return f"No classes or functions found in '{file_path}'"
+    entries.sort(key=lambda entry: entry[0])
+    return "\n".join(f"{line:{LINE_NUMBER_WIDTH}d}\t{text}" for line, text in entries)
+
+
 def truncate_if_too_long(result: list[str] | str) -> list[str] | str:
-    """Truncate list or string result if it exceeds token limit (rough estimate: 4 chars/token)."""
+    """Truncate list or string result if it exceeds the token limit (see `deepagents.tokens`)."""
     if isinstance(result, list):
-        total_chars = sum(len(item) for item in result)
-        if total_chars > TOOL_RESULT_TOKEN_LIMIT * 4:
-            return result[: len(result) * TOOL_RESULT_TOKEN_LIMIT * 4 // total_chars] + [TRUNCATION_GUIDANCE]
+        total_tokens = count_tokens("\n".join(result))
+        if total_tokens > TOOL_RESULT_TOKEN_LIMIT:
+            return result[: len(result) * TOOL_RESULT_TOKEN_LIMIT // total_tokens] + [TRUNCATION_GUIDANCE]
         return result
     # string
-    if len(result) > TOOL_RESULT_TOKEN_LIMIT * 4:
-        return result[: TOOL_RESULT_TOKEN_LIMIT * 4] + "\n" + TRUNCATION_GUIDANCE
+    truncated = truncate_to_tokens(result, TOOL_RESULT_TOKEN_LIMIT)
+    if len(truncated) < len(result):
+        return truncated + "\n" + TRUNCATION_GUIDANCE
     return result
 
 
@@ -417,6 +585,77 @@ def grep_matches_from_files(
     return matches
 
 
+def iter_grep_matches_from_files(
+    files: dict[str, Any],
+    pattern: str,
+    path: str | None = None,
+    glob: str | None = None,
+) -> Iterator[GrepMatch] | str:
+    """Lazy, sorted counterpart of `grep_matches_from_files`.
+
+    Files are scanned in `path_sort_key` order and matches are yielded as they are
+    found, so a consumer that stops early never scans the remaining files.
+    """
+    try:
+        regex = re.compile(pattern)
+    except re.error as e:
+        return f"Invalid regex pattern: {e}"
+
+    try:
+        normalized_path = _validate_path(path)
+    except ValueError:
+        return iter(())
+
+    candidates = [fp for fp in files if fp.startswith(normalized_path)]
+    if glob:
+        candidates = [fp for fp in candidates if wcglob.globmatch(Path(fp).name, glob, flags=wcglob.BRACE)]
+    candidates.sort(key=path_sort_key)
+
+    def _scan() -> Iterator[GrepMatch]:
+        for file_path in candidates:
+            for line_num, line in enumerate(files[file_path]["content"], 1):
+                if regex.search(line):
+                    yield {"path": file_path, "line": int(line_num), "text": line}
+
+    return _scan()
+
+
+def iter_glob_infos_from_files(
+    files: dict[str, Any],
+    pattern: str,
+    path: str = "/",
+) -> Iterator[FileInfo]:
+    """Yield FileInfo for files matching a glob pattern, in `path_sort_key` order.
+
+    Uses the same matching rules as `_glob_search_files`. FileInfo dicts (which
+    require joining the file content to compute its size) are built lazily.
+    """
+    try:
+        normalized_path = _validate_path(path)
+    except ValueError:
+        return
+
+    matches = []
+    for file_path in files:
+        if not file_path.startswith(normalized_path):
+            continue
+        relative = file_path[len(normalized_path) :].lstrip("/")
+        if not relative:
+            relative = file_path.split("/")[-1]
+        if wcglob.globmatch(relative, pattern, flags=wcglob.BRACE | wcglob.GLOBSTAR):
+            matches.append(file_path)
+    matches.sort(key=path_sort_key)
+
+    for file_path in matches:
+        fd = files[file_path]
+        yield {
+            "path": file_path,
+            "is_dir": False,
+            "size": len("\n".join(fd.get("content", []))),
+            "modified_at": fd.get("modified_at", ""),
+        }
+
+
 def build_grep_results_dict(matches: list[GrepMatch]) -> dict[str, list[tuple[int, str]]]:
     """Group structured matches into the legacy dict form used by formatters."""
     grouped: dict[str, list[tuple[int, str]]] = {}
@@ -1,7 +1,7 @@
 """Deepagents come with planning, filesystem, and subagents."""
 
 from collections.abc import Callable, Sequence
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 from langchain.agents import create_agent
 from langchain.agents.middleware import HumanInTheLoopMiddleware, InterruptOnConfig, TodoListMiddleware
@@ -26,6 +26,10 @@ from deepagents.middleware.patch_tool_calls import PatchToolCallsMiddleware
 from deepagents.middleware.skills import SkillsMiddleware
 from deepagents.middleware.subagents import CompiledSubAgent, SubAgent, SubAgentMiddleware
 from deepagents.middleware.summarization import SummarizationMiddleware
+from deepagents.middleware.tool_concurrency import ToolConcurrencyMiddleware
+
+if TYPE_CHECKING:
+    from langchain.agents.middleware.summarization import ContextSize
 
 BASE_AGENT_PROMPT = "In order to complete the objective that the user asks of you, you have access to a number of standard tools."
 
@@ -56,6 +60,7 @@ def create_deep_agent(
     checkpointer: Checkpointer | None = None,
     store: BaseStore | None = None,
     backend: BackendProtocol | BackendFactory | None = None,
+    subagent_result_cache: BackendProtocol | BackendFactory | None = None,
     interrupt_on: dict[str, bool | InterruptOnConfig] | None = None,
     debug: bool = False,
     name: str | None = None,
@@ -68,13 +73,19 @@ def create_deep_agent(
     By default, this agent has access to the following tools:
 
     - `write_todos`: manage a todo list
-    - `ls`, `read_file`, `write_file`, `edit_file`, `glob`, `grep`: file operations
+    - `ls`, `read_file`, `read_files`, `write_file`, `edit_file`, `multi_edit`, `copy_file`, `move_file`, `glob`, `grep`: file operations
     - `execute`: run shell commands
     - `task`: call subagents
 
     The `execute` tool allows running shell commands if the backend implements `SandboxBackendProtocol`.
     For non-sandbox backends, the `execute` tool will return an error message.
 
+    Read-only file tool calls issued in the same turn run concurrently, while writes, edits and
+    `execute` run one at a time in the order the model issued them (see `ToolConcurrencyMiddleware`).
+    This ordering is only visible to later calls of the turn with a backend that stores files
+    outside the agent state; with the default `StateBackend`, every call of a turn sees the files
+    as they were at the start of the turn.
+
     Args:
         model: The model to use.
 
@@ -123,7 +134,13 @@ def create_deep_agent(
         backend: Optional backend for file storage and execution.
 
             Pass either a `Backend` instance or a callable factory like `lambda rt: StateBackend(rt)`.
+            Wrap a factory in `CachedBackendFactory` to reuse one backend per thread across tool calls.
             For execution support, use a backend that implements `SandboxBackendProtocol`.
+        subagent_result_cache: Optional backend to cache `task` results in, so repeated
+            tasks that only read files (e.g. "explain what src/config.py does") reuse an
+            earlier answer while the files it read are unchanged.
+
+            Use a `StoreBackend` to share results across threads. Disabled by default.
         interrupt_on: Mapping of tool names to interrupt configs.
 
             Pass to pause agent execution at specified tool calls for human approval or modification.
@@ -147,14 +164,17 @@ def create_deep_agent(
         and "max_input_tokens" in model.profile
         and isinstance(model.profile["max_input_tokens"], int)
     ):
-        trigger = ("fraction", 0.85)
-        keep = ("fraction", 0.10)
+        trigger: ContextSize = ("fraction", 0.85)
+        keep: ContextSize = ("fraction", 0.10)
+        presummarize_at: ContextSize = ("fraction", 0.70)
     else:
         trigger = ("tokens", 170000)
         keep = ("messages", 6)
+        presummarize_at = ("tokens", 140000)
 
     # Build middleware stack for subagents (includes skills if provided)
     subagent_middleware: list[AgentMiddleware] = [
+        ToolConcurrencyMiddleware(),
         TodoListMiddleware(),
     ]
 
@@ -171,6 +191,8 @@ def create_deep_agent(
                 trigger=trigger,
                 keep=keep,
                 trim_tokens_to_summarize=None,
+                presummarize_at=presummarize_at,
+                prune_tool_results_after=10,
             ),
             AnthropicPromptCachingMiddleware(unsupported_model_behavior="ignore"),
             PatchToolCallsMiddleware(),
@@ -179,6 +201,7 @@ def create_deep_agent(
 
     # Build main agent middleware stack
     deepagent_middleware: list[AgentMiddleware] = [
+        ToolConcurrencyMiddleware(),
         TodoListMiddleware(),
     ]
     if memory is not None:
@@ -195,6 +218,8 @@ def create_deep_agent(
                 default_middleware=subagent_middleware,
                 default_interrupt_on=interrupt_on,
                 general_purpose_agent=True,
+                backend=backend,
+                result_cache_backend=subagent_result_cache,
             ),
             SummarizationMiddleware(
                 model=model,
@@ -202,6 +227,8 @@ def create_deep_agent(
                 trigger=trigger,
                 keep=keep,
                 trim_tokens_to_summarize=None,
+                presummarize_at=presummarize_at,
+                prune_tool_results_after=10,
             ),
             AnthropicPromptCachingMiddleware(unsupported_model_behavior="ignore"),
             PatchToolCallsMiddleware(),
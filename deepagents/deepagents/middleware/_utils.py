@@ -1,6 +1,30 @@
 """Utility functions for middleware."""
 
+import threading
+from collections import OrderedDict
+from collections.abc import Callable
+from typing import Any
+
 from langchain_core.messages import SystemMessage
+from langchain_core.tools import create_schema_from_function
+from langchain_core.utils.pydantic import TypeBaseModel
+
+# Number of assembled system messages remembered by append_to_system_message
+_SYSTEM_MESSAGE_CACHE_SIZE = 256
+
+# (id(input message), appended text) -> (input message, assembled message).
+# The input message is kept alive by the entry, so its id cannot be reused while cached.
+_system_message_cache: OrderedDict[tuple[int, str], tuple[SystemMessage | None, SystemMessage]] = OrderedDict()
+_system_message_cache_lock = threading.Lock()
+
+
+def _build_system_message(system_message: SystemMessage | None, text: str) -> SystemMessage:
+    """Copy the content blocks of `system_message` and append `text` as a new block."""
+    new_content: list[str | dict[str, str]] = list(system_message.content_blocks) if system_message else []
+    if new_content:
+        text = f"\n\n{text}"
+    new_content.append({"type": "text", "text": text})
+    return SystemMessage(content=new_content)
 
 
 def append_to_system_message(
@@ -9,6 +33,12 @@ def append_to_system_message(
 ) -> SystemMessage:
     """Append text to a system message.
 
+    Results are memoized by the identity of `system_message` and the appended text.
+    The agent passes the same base system message on every model call, so each
+    middleware in the chain gets back the exact message object it produced on the
+    previous step: no content blocks are copied and the assembled prompt stays
+    byte-stable for provider prompt caching. Messages are treated as immutable.
+
     Args:
         system_message: Existing system message or None.
         text: Text to add to the system message.
@@ -16,8 +46,52 @@ def append_to_system_message(
     Returns:
         New SystemMessage with the text appended.
     """
-    new_content: list[str | dict[str, str]] = list(system_message.content_blocks) if system_message else []
-    if new_content:
-        text = f"\n\n{text}"
-    new_content.append({"type": "text", "text": text})
-    return SystemMessage(content=new_content)
+    key = (id(system_message), text)
+    with _system_message_cache_lock:
+        cached = _system_message_cache.get(key)
+        if cached is not None and cached[0] is system_message:
+            _system_message_cache.move_to_end(key)
+            return cached[1]
+
+    new_system_message = _build_system_message(system_message, text)
+    with _system_message_cache_lock:
+        _system_message_cache[key] = (system_message, new_system_message)
+        if len(_system_message_cache) > _SYSTEM_MESSAGE_CACHE_SIZE:
+            _system_message_cache.popitem(last=False)
+    return new_system_message
+
+
+# (tool name, code object, defaults and annotations) -> inferred argument schema
+_tool_args_schema_cache: dict[tuple[Any, ...], TypeBaseModel] = {}
+_tool_args_schema_lock = threading.Lock()
+
+
+def tool_args_schema(name: str, func: Callable[..., Any]) -> TypeBaseModel:
+    """Return the argument schema for a tool function, memoized process-wide.
+
+    Inferring a schema builds a pydantic model, which costs ~15 ms per tool; tool
+    builders define their functions as closures on every call, so a deep agent would
+    pay this for every tool each time it is created. Schemas are memoized by the
+    function's code, defaults and annotations, which are what the schema is built from.
+
+    Unlike the schema `StructuredTool.from_function` infers, this one leaves out
+    injected arguments such as `runtime: ToolRuntime`. The tool still receives them
+    (they are found from the function signature), but they are no longer validated
+    and dumped with the model arguments, which copied the whole agent state (every
+    file included) on each tool call.
+
+    Args:
+        name: Tool name (the schema is named after it).
+        func: Tool function.
+
+    Returns:
+        The schema, to pass as `args_schema`.
+    """
+    key = (name, func.__code__, repr(func.__defaults__), repr(func.__kwdefaults__), repr(func.__annotations__))
+    with _tool_args_schema_lock:
+        schema = _tool_args_schema_cache.get(key)
+    if schema is None:
+        new_schema = create_schema_from_function(name, func, include_injected=False)
+        with _tool_args_schema_lock:
+            schema = _tool_args_schema_cache.setdefault(key, new_schema)
+    return schema
@@ -1,21 +1,28 @@
 """Middleware for providing filesystem tools to an agent."""
 # ruff: noqa: E501
 
+import hashlib
+import logging
 import os
 import re
+import threading
 from collections.abc import Awaitable, Callable, Sequence
-from typing import Annotated, Literal, NotRequired
+from dataclasses import dataclass
+from typing import Annotated, Any, Literal, NotRequired, cast
 
 from langchain.agents.middleware.types import (
     AgentMiddleware,
     AgentState,
     ModelRequest,
     ModelResponse,
+    PrivateStateAttr,
 )
 from langchain.tools import ToolRuntime
 from langchain.tools.tool_node import ToolCallRequest
-from langchain_core.messages import ToolMessage
+from langchain_core.messages import HumanMessage, ToolMessage
+from langchain_core.runnables import RunnableConfig
 from langchain_core.tools import BaseTool, StructuredTool
+from langgraph.runtime import Runtime
 from langgraph.types import Command
 from typing_extensions import TypedDict
 
@@ -23,22 +30,34 @@ from deepagents.backends import StateBackend
 from deepagents.backends.protocol import (
     BACKEND_TYPES as BACKEND_TYPES,  # Re-export for backwards compatibility
     BackendProtocol,
+    BatchOp,
+    BatchResult,
     EditResult,
+    FileEdit,
+    GrepMatch,
+    ReadOp,
     SandboxBackendProtocol,
+    StatOp,
     WriteResult,
 )
 from deepagents.backends.utils import (
+    TRUNCATION_GUIDANCE,
+    apply_file_data_update,
     format_content_with_line_numbers,
     format_grep_matches,
-    sanitize_tool_call_id,
     truncate_if_too_long,
 )
-from deepagents.middleware._utils import append_to_system_message
+from deepagents.middleware._utils import append_to_system_message, tool_args_schema
+from deepagents.tokens import count_tokens, truncate_to_tokens
+
+logger = logging.getLogger(__name__)
 
 EMPTY_CONTENT_WARNING = "System reminder: File exists but has empty contents"
 LINE_NUMBER_WIDTH = 6
 DEFAULT_READ_OFFSET = 0
 DEFAULT_READ_LIMIT = 100
+MAX_SEARCH_RESULTS = 1000
+READ_FILES_TOKEN_BUDGET = 20000  # Same threshold as eviction
 
 
 class FileData(TypedDict):
@@ -68,7 +87,8 @@ def _file_data_reducer(left: dict[str, FileData] | None, right: dict[str, FileDa
 
     Returns:
         Merged dictionary where right overwrites left for matching keys,
-        and `None` values in right trigger deletions.
+        `None` values in right trigger deletions, and append deltas (see
+        `BackendProtocol.append`) extend the existing file.
 
     Example:
         ```python
@@ -78,15 +98,12 @@ def _file_data_reducer(left: dict[str, FileData] | None, right: dict[str, FileDa
         # Result: {"/file1.txt": FileData(...), "/file3.txt": FileData(...)}
         ```
     """
-    if left is None:
-        return {k: v for k, v in right.items() if v is not None}
-
-    result = {**left}
+    result: dict[str, Any] = {**(left or {})}
     for key, value in right.items():
         if value is None:
             result.pop(key, None)
         else:
-            result[key] = value
+            result[key] = apply_file_data_update(result.get(key), cast("dict[str, Any]", value))
     return result
 
 
@@ -147,12 +164,67 @@ def _validate_path(path: str, *, allowed_prefixes: Sequence[str] | None = None)
     return normalized
 
 
+class ReadRecord(TypedDict):
+    """Ledger entry for a read_file result that was returned in full."""
+
+    content_hash: str
+    """SHA-256 hex digest of the returned content."""
+
+    tool_call_id: str
+    """ID of the tool call whose ToolMessage holds the content."""
+
+
+def _read_ledger_reducer(left: dict[str, ReadRecord] | None, right: dict[str, ReadRecord | None]) -> dict[str, ReadRecord]:
+    """Merge read ledger updates; parallel read_file calls may each add an entry, and `None` removes one."""
+    result = dict(left or {})
+    for key, record in right.items():
+        if record is None:
+            result.pop(key, None)
+        else:
+            result[key] = record
+    return result
+
+
+class EvictedResult(TypedDict):
+    """Ledger entry for a tool result evicted to the filesystem, keyed by content hash."""
+
+    path: str
+    """Path the content was written to."""
+
+    size: int
+    """Size of the content in bytes (UTF-8)."""
+
+    tool_call_ids: list[str]
+    """IDs of the tool calls whose results had this content."""
+
+
+def _evicted_results_reducer(left: dict[str, EvictedResult] | None, right: dict[str, EvictedResult | None]) -> dict[str, EvictedResult]:
+    """Merge eviction ledger updates: tool call IDs are combined per hash, and `None` removes an entry."""
+    result = dict(left or {})
+    for content_hash, record in right.items():
+        if record is None:
+            result.pop(content_hash, None)
+            continue
+        existing = result.get(content_hash)
+        if existing is not None:
+            result[content_hash] = {**record, "tool_call_ids": list(dict.fromkeys([*existing["tool_call_ids"], *record["tool_call_ids"]]))}
+        else:
+            result[content_hash] = record
+    return result
+
+
 class FilesystemState(AgentState):
     """State for the filesystem middleware."""
 
     files: Annotated[NotRequired[dict[str, FileData]], _file_data_reducer]
     """Files in the filesystem."""
 
+    file_reads: Annotated[NotRequired[dict[str, ReadRecord]], PrivateStateAttr, _read_ledger_reducer]
+    """Ledger of full read_file results, keyed by path and line range."""
+
+    evicted_results: Annotated[NotRequired[dict[str, EvictedResult]], PrivateStateAttr, _evicted_results_reducer]
+    """Ledger of tool results evicted to the filesystem, keyed by content hash."""
+
 
 LIST_FILES_TOOL_DESCRIPTION = """Lists all files in the filesystem, filtering by directory.
 
@@ -175,10 +247,22 @@ Usage:
 - Specify offset and limit: read_file(path, offset=0, limit=100) reads first 100 lines
 - Results are returned using cat -n format, with line numbers starting at 1
 - Lines longer than 5,000 characters will be split into multiple lines with continuation markers (e.g., 5.1, 5.2, etc.). When you specify a limit, these continuation lines count towards the limit.
+- **Outline mode for Python files**: read_file(path, outline=True) returns only the classes, functions (with signatures), decorators and the first docstring line of each, with their line numbers (offset and limit are ignored). Use it to map a codebase cheaply, then read the sections you need with offset/limit
 - You have the capability to call multiple tools in a single response. It is always better to speculatively read multiple files as a batch that are potentially useful.
 - If you read a file that exists but has empty contents you will receive a system reminder warning in place of file contents.
+- If you re-read a range that has not changed since an earlier read that is still in your context, you will receive a short note pointing to that earlier result instead of the content. Set force=True only if you really need the content repeated.
 - You should ALWAYS make sure a file has been read before editing it."""
 
+READ_FILES_TOOL_DESCRIPTION = """Reads several files (or file ranges) from the filesystem in a single call.
+
+Usage:
+- The files parameter is a list of entries, each with an absolute `path` and optional `offset` and `limit` (same meaning as in read_file; limit defaults to 100 lines)
+- All entries are read together, which is much faster than calling read_file once per file
+- Each file is returned in its own section, headed by `==> /path/to/file <==`, with line numbers in cat -n format
+- The combined result is capped by a total token budget. Files are included in the order given; once the budget runs out, the last file is truncated and any remaining files are listed so you can read them in another call
+- An error for one entry (e.g., a missing file) is reported in its section and does not affect the others
+- Use this tool whenever you already know several files you want to look at"""
+
 EDIT_FILE_TOOL_DESCRIPTION = """Performs exact string replacements in files.
 
 Usage:
@@ -190,6 +274,15 @@ Usage:
 - Use `replace_all` for replacing and renaming strings across the file. This parameter is useful if you want to rename a variable for instance."""
 
 
+MULTI_EDIT_TOOL_DESCRIPTION = """Performs several exact string replacements in one file in a single call.
+
+Usage:
+- Prefer this tool over several edit_file calls when making more than one change to the same file
+- Each edit has the same fields as edit_file: `old_string`, `new_string` and optional `replace_all`
+- All edits are matched against the file as it is BEFORE this call, not against the result of earlier edits in the list. Their matches must not overlap; combine overlapping changes into one edit
+- The edits are validated together: if any edit fails (string not found, not unique without replace_all, or overlapping), none are applied and the file is unchanged
+- The same rules as edit_file apply: read the file first, preserve the exact indentation after the line number prefix, and never include the line number prefix in old_string or new_string"""
+
 WRITE_FILE_TOOL_DESCRIPTION = """Writes to a new file in the filesystem.
 
 Usage:
@@ -199,6 +292,23 @@ Usage:
 - Prefer to edit existing files over creating new ones when possible."""
 
 
+COPY_FILE_TOOL_DESCRIPTION = """Copies a file to a new path in the filesystem.
+
+Usage:
+- The source_path and destination_path parameters must be absolute paths, not relative paths
+- The file content is copied directly by the filesystem; it is never returned to you, so this is the preferred way to duplicate large files or save a file under another directory (e.g., into /memories/)
+- The copy will FAIL if destination_path already exists
+- Do NOT use read_file followed by write_file to copy a file; use this tool instead"""
+
+MOVE_FILE_TOOL_DESCRIPTION = """Moves (renames) a file in the filesystem.
+
+Usage:
+- The source_path and destination_path parameters must be absolute paths, not relative paths
+- The file content is moved directly by the filesystem; it is never returned to you, so this is the preferred way to promote a generated file to another directory (e.g., into /memories/)
+- The move will FAIL if destination_path already exists
+- After the move, source_path no longer exists"""
+
+
 GLOB_TOOL_DESCRIPTION = """Find files matching a glob pattern.
 
 Usage:
@@ -273,15 +383,19 @@ Examples:
 Note: This tool is only available if the backend supports execution (SandboxBackendProtocol).
 If execution is not supported, the tool will return an error message."""
 
-FILESYSTEM_SYSTEM_PROMPT = """## Filesystem Tools `ls`, `read_file`, `write_file`, `edit_file`, `glob`, `grep`
+FILESYSTEM_SYSTEM_PROMPT = """## Filesystem Tools `ls`, `read_file`, `read_files`, `write_file`, `edit_file`, `multi_edit`, `copy_file`, `move_file`, `glob`, `grep`
 
 You have access to a filesystem which you can interact with using these tools.
 All file paths must start with a /.
 
 - ls: list files in a directory (requires absolute path)
 - read_file: read a file from the filesystem
+- read_files: read several files (or file ranges) in one call
 - write_file: write to a file in the filesystem
 - edit_file: edit a file in the filesystem
+- multi_edit: make several edits to one file in a single call
+- copy_file: copy a file to a new path without reading it
+- move_file: move or rename a file without reading it
 - glob: find files matching a pattern (e.g., "**/*.py")
 - grep: search for text within files"""
 
@@ -292,6 +406,9 @@ Use this tool to run commands, scripts, tests, builds, and other shell operation
 
 - execute: run a shell command in the sandbox (returns output and exit code)"""
 
+# Built once so the same string object is appended on every model call
+_FILESYSTEM_AND_EXECUTION_SYSTEM_PROMPT = f"{FILESYSTEM_SYSTEM_PROMPT}\n\n{EXECUTION_SYSTEM_PROMPT}"
+
 
 def _get_backend(backend: BACKEND_TYPES, runtime: ToolRuntime) -> BackendProtocol:
     """Get the resolved backend instance from backend or factory.
@@ -345,6 +462,7 @@ def _ls_tool_generator(
         name="ls",
         description=tool_description,
         func=sync_ls,
+        args_schema=tool_args_schema("ls", sync_ls),
         coroutine=async_ls,
     )
 
@@ -369,10 +487,15 @@ def _read_file_tool_generator(
         runtime: ToolRuntime[None, FilesystemState],
         offset: int = DEFAULT_READ_OFFSET,
         limit: int = DEFAULT_READ_LIMIT,
+        *,
+        force: bool = False,  # noqa: ARG001  # Consumed by FilesystemMiddleware read deduplication
+        outline: bool = False,
     ) -> str:
         """Synchronous wrapper for read_file tool."""
         resolved_backend = _get_backend(backend, runtime)
         file_path = _validate_path(file_path)
+        if outline:
+            return truncate_if_too_long(resolved_backend.outline(file_path))
         result = resolved_backend.read(file_path, offset=offset, limit=limit)
 
         lines = result.splitlines(keepends=True)
@@ -387,10 +510,15 @@ def _read_file_tool_generator(
         runtime: ToolRuntime[None, FilesystemState],
         offset: int = DEFAULT_READ_OFFSET,
         limit: int = DEFAULT_READ_LIMIT,
+        *,
+        force: bool = False,  # noqa: ARG001  # Consumed by FilesystemMiddleware read deduplication
+        outline: bool = False,
     ) -> str:
         """Asynchronous wrapper for read_file tool."""
         resolved_backend = _get_backend(backend, runtime)
         file_path = _validate_path(file_path)
+        if outline:
+            return truncate_if_too_long(await resolved_backend.aoutline(file_path))
         result = await resolved_backend.aread(file_path, offset=offset, limit=limit)
 
         lines = result.splitlines(keepends=True)
@@ -404,10 +532,156 @@ def _read_file_tool_generator(
         name="read_file",
         description=tool_description,
         func=sync_read_file,
+        args_schema=tool_args_schema("read_file", sync_read_file),
         coroutine=async_read_file,
     )
 
 
+class ReadFilesEntry(TypedDict):
+    """A single file (or file range) to read with the read_files tool."""
+
+    path: str
+    """Absolute path of the file to read."""
+
+    offset: NotRequired[int]
+    """Line offset to start reading from (0-indexed)."""
+
+    limit: NotRequired[int]
+    """Maximum number of lines to read."""
+
+
+class MultiEditEntry(TypedDict):
+    """A single string replacement for the multi_edit tool."""
+
+    old_string: str
+    """Exact text to replace."""
+
+    new_string: str
+    """Replacement text."""
+
+    replace_all: NotRequired[bool]
+    """Replace every occurrence instead of requiring old_string to be unique."""
+
+
+def _next_read_offset(line: str, fallback: int) -> int:
+    """Return the offset at which a formatted (cat -n) line starts in its file."""
+    number = line.split("\t", 1)[0].strip().split(".", 1)[0]
+    return int(number) - 1 if number.isdigit() else fallback
+
+
+def _combine_read_results(
+    reads: list[tuple[str, int, int]],
+    results: list[str],
+    token_budget: int = READ_FILES_TOKEN_BUDGET,
+) -> str:
+    """Combine per-file read results into one delimited string within a token budget.
+
+    Args:
+        reads: (path, offset, limit) for each requested file, in request order.
+        results: Read result (or error message) for each requested file.
+        token_budget: Total token budget for the combined result.
+
+    Returns:
+        One section per file, headed by `==> path <==`. Once the budget is exhausted
+        the current file is cut at a line boundary with a continuation hint, and the
+        remaining files are listed as not read.
+    """
+    remaining = token_budget
+    sections: list[str] = []
+    for index, ((path, offset, limit), result) in enumerate(zip(reads, results, strict=True)):
+        header = f"==> {path} <=="
+        remaining -= count_tokens(header) + 1
+        if remaining <= 0:
+            skipped = ", ".join(read_path for read_path, _, _ in reads[index:])
+            sections.append(f"[Token budget exhausted; not read: {skipped}. Read them in another call.]")
+            break
+
+        lines = result.splitlines(keepends=True)[:limit]
+        text = "".join(lines)
+        tokens = count_tokens(text)
+        if tokens <= remaining:
+            kept = lines
+            remaining -= tokens
+        else:
+            # Keep only the complete lines of the prefix that fits
+            kept = truncate_to_tokens(text, remaining).splitlines(keepends=True)
+            if kept and not kept[-1].endswith("\n"):
+                kept.pop()
+
+        body = "".join(kept).rstrip("\n")
+        if len(kept) < len(lines):
+            next_offset = _next_read_offset(lines[len(kept)], offset + len(kept))
+            body += f"\n[Truncated to fit the token budget; continue with read_file('{path}', offset={next_offset})]"
+            remaining = 0
+        sections.append(f"{header}\n{body}")
+
+    return "\n\n".join(sections)
+
+
+def _read_files_tool_generator(
+    backend: BackendProtocol | Callable[[ToolRuntime], BackendProtocol],
+    custom_description: str | None = None,
+) -> BaseTool:
+    """Generate the read_files tool.
+
+    Args:
+        backend: Backend to use for file storage, or a factory function that takes runtime and returns a backend.
+        custom_description: Optional custom description for the tool.
+
+    Returns:
+        Configured read_files tool that reads several files with one backend batch.
+    """
+    tool_description = custom_description or READ_FILES_TOOL_DESCRIPTION
+
+    def _plan_reads(files: list[ReadFilesEntry]) -> tuple[list[tuple[str, int, int]], dict[int, str]]:
+        """Normalize entries and collect per-entry validation errors."""
+        reads: list[tuple[str, int, int]] = []
+        errors: dict[int, str] = {}
+        for index, entry in enumerate(files):
+            path = entry["path"]
+            try:
+                path = _validate_path(path)
+            except ValueError as e:
+                errors[index] = f"Error: {e}"
+            reads.append((path, entry.get("offset", DEFAULT_READ_OFFSET), entry.get("limit", DEFAULT_READ_LIMIT)))
+        return reads, errors
+
+    def _merge_results(reads: list[tuple[str, int, int]], errors: dict[int, str], batch_results: list[BatchResult]) -> list[str]:
+        """Interleave validation errors with the batch results, in request order."""
+        batch_iter = iter(batch_results)
+        return [errors[index] if index in errors else str(next(batch_iter)) for index in range(len(reads))]
+
+    def sync_read_files(
+        files: list[ReadFilesEntry],
+        runtime: ToolRuntime[None, FilesystemState],
+    ) -> str:
+        """Synchronous wrapper for read_files tool."""
+        resolved_backend = _get_backend(backend, runtime)
+        reads, errors = _plan_reads(files)
+        ops: list[BatchOp] = [ReadOp(path, offset, limit) for index, (path, offset, limit) in enumerate(reads) if index not in errors]
+        batch_results = resolved_backend.batch(ops) if ops else []
+        return _combine_read_results(reads, _merge_results(reads, errors, batch_results))
+
+    async def async_read_files(
+        files: list[ReadFilesEntry],
+        runtime: ToolRuntime[None, FilesystemState],
+    ) -> str:
+        """Asynchronous wrapper for read_files tool."""
+        resolved_backend = _get_backend(backend, runtime)
+        reads, errors = _plan_reads(files)
+        ops: list[BatchOp] = [ReadOp(path, offset, limit) for index, (path, offset, limit) in enumerate(reads) if index not in errors]
+        batch_results = await resolved_backend.abatch(ops) if ops else []
+        return _combine_read_results(reads, _merge_results(reads, errors, batch_results))
+
+    return StructuredTool.from_function(
+        name="read_files",
+        description=tool_description,
+        func=sync_read_files,
+        args_schema=tool_args_schema("read_files", sync_read_files),
+        coroutine=async_read_files,
+    )
+
+
 def _write_file_tool_generator(
     backend: BackendProtocol | Callable[[ToolRuntime], BackendProtocol],
     custom_description: str | None = None,
@@ -479,6 +753,7 @@ def _write_file_tool_generator(
         name="write_file",
         description=tool_description,
         func=sync_write_file,
+        args_schema=tool_args_schema("write_file", sync_write_file),
         coroutine=async_write_file,
     )
 
@@ -558,10 +833,237 @@ def _edit_file_tool_generator(
         name="edit_file",
         description=tool_description,
         func=sync_edit_file,
+        args_schema=tool_args_schema("edit_file", sync_edit_file),
         coroutine=async_edit_file,
     )
 
 
+def _multi_edit_tool_generator(
+    backend: BackendProtocol | Callable[[ToolRuntime], BackendProtocol],
+    custom_description: str | None = None,
+) -> BaseTool:
+    """Generate the multi_edit tool.
+
+    Args:
+        backend: Backend to use for file storage, or a factory function that takes runtime and returns a backend.
+        custom_description: Optional custom description for the tool.
+
+    Returns:
+        Configured multi_edit tool that applies several string replacements to one file with a single write.
+    """
+    tool_description = custom_description or MULTI_EDIT_TOOL_DESCRIPTION
+
+    def _to_result(res: EditResult, count: int, runtime: ToolRuntime[None, FilesystemState]) -> Command | str:
+        if res.error:
+            return res.error
+        message = f"Successfully applied {count} edit(s) ({res.occurrences} replacement(s)) to '{res.path}'"
+        if res.files_update is not None:
+            return Command(
+                update={
+                    "files": res.files_update,
+                    "messages": [ToolMessage(content=message, tool_call_id=runtime.tool_call_id)],
+                }
+            )
+        return message
+
+    def sync_multi_edit(
+        file_path: str,
+        edits: list[MultiEditEntry],
+        runtime: ToolRuntime[None, FilesystemState],
+    ) -> Command | str:
+        """Synchronous wrapper for multi_edit tool."""
+        resolved_backend = _get_backend(backend, runtime)
+        file_path = _validate_path(file_path)
+        file_edits = [FileEdit(edit["old_string"], edit["new_string"], edit.get("replace_all", False)) for edit in edits]
+        return _to_result(resolved_backend.multi_edit(file_path, file_edits), len(file_edits), runtime)
+
+    async def async_multi_edit(
+        file_path: str,
+        edits: list[MultiEditEntry],
+        runtime: ToolRuntime[None, FilesystemState],
+    ) -> Command | str:
+        """Asynchronous wrapper for multi_edit tool."""
+        resolved_backend = _get_backend(backend, runtime)
+        file_path = _validate_path(file_path)
+        file_edits = [FileEdit(edit["old_string"], edit["new_string"], edit.get("replace_all", False)) for edit in edits]
+        return _to_result(await resolved_backend.amulti_edit(file_path, file_edits), len(file_edits), runtime)
+
+    return StructuredTool.from_function(
+        name="multi_edit",
+        description=tool_description,
+        func=sync_multi_edit,
+        args_schema=tool_args_schema("multi_edit", sync_multi_edit),
+        coroutine=async_multi_edit,
+    )
+
+
+def _copy_file_tool_generator(
+    backend: BackendProtocol | Callable[[ToolRuntime], BackendProtocol],
+    custom_description: str | None = None,
+) -> BaseTool:
+    """Generate the copy_file tool.
+
+    Args:
+        backend: Backend to use for file storage, or a factory function that takes runtime and returns a backend.
+        custom_description: Optional custom description for the tool.
+
+    Returns:
+        Configured copy_file tool that copies files using the backend.
+    """
+    tool_description = custom_description or COPY_FILE_TOOL_DESCRIPTION
+
+    def sync_copy_file(
+        source_path: str,
+        destination_path: str,
+        runtime: ToolRuntime[None, FilesystemState],
+    ) -> Command | str:
+        """Synchronous wrapper for copy_file tool."""
+        resolved_backend = _get_backend(backend, runtime)
+        source_path = _validate_path(source_path)
+        destination_path = _validate_path(destination_path)
+        res: WriteResult = resolved_backend.copy(source_path, destination_path)
+        if res.error:
+            return res.error
+        if res.files_update is not None:
+            return Command(
+                update={
+                    "files": res.files_update,
+                    "messages": [
+                        ToolMessage(
+                            content=f"Copied {source_path} to {destination_path}",
+                            tool_call_id=runtime.tool_call_id,
+                        )
+                    ],
+                }
+            )
+        return f"Copied {source_path} to {destination_path}"
+
+    async def async_copy_file(
+        source_path: str,
+        destination_path: str,
+        runtime: ToolRuntime[None, FilesystemState],
+    ) -> Command | str:
+        """Asynchronous wrapper for copy_file tool."""
+        resolved_backend = _get_backend(backend, runtime)
+        source_path = _validate_path(source_path)
+        destination_path = _validate_path(destination_path)
+        res: WriteResult = await resolved_backend.acopy(source_path, destination_path)
+        if res.error:
+            return res.error
+        if res.files_update is not None:
+            return Command(
+                update={
+                    "files": res.files_update,
+                    "messages": [
+                        ToolMessage(
+                            content=f"Copied {source_path} to {destination_path}",
+                            tool_call_id=runtime.tool_call_id,
+                        )
+                    ],
+                }
+            )
+        return f"Copied {source_path} to {destination_path}"
+
+    return StructuredTool.from_function(
+        name="copy_file",
+        description=tool_description,
+        func=sync_copy_file,
+        args_schema=tool_args_schema("copy_file", sync_copy_file),
+        coroutine=async_copy_file,
+    )
+
+
+def _move_file_tool_generator(
+    backend: BackendProtocol | Callable[[ToolRuntime], BackendProtocol],
+    custom_description: str | None = None,
+) -> BaseTool:
+    """Generate the move_file tool.
+
+    Args:
+        backend: Backend to use for file storage, or a factory function that takes runtime and returns a backend.
+        custom_description: Optional custom description for the tool.
+
+    Returns:
+        Configured move_file tool that moves files using the backend.
+    """
+    tool_description = custom_description or MOVE_FILE_TOOL_DESCRIPTION
+
+    def sync_move_file(
+        source_path: str,
+        destination_path: str,
+        runtime: ToolRuntime[None, FilesystemState],
+    ) -> Command | str:
+        """Synchronous wrapper for move_file tool."""
+        resolved_backend = _get_backend(backend, runtime)
+        source_path = _validate_path(source_path)
+        destination_path = _validate_path(destination_path)
+        res: WriteResult = resolved_backend.move(source_path, destination_path)
+        if res.error:
+            return res.error
+        if res.files_update is not None:
+            return Command(
+                update={
+                    "files": res.files_update,
+                    "messages": [
+                        ToolMessage(
+                            content=f"Moved {source_path} to {destination_path}",
+                            tool_call_id=runtime.tool_call_id,
+                        )
+                    ],
+                }
+            )
+        return f"Moved {source_path} to {destination_path}"
+
+    async def async_move_file(
+        source_path: str,
+        destination_path: str,
+        runtime: ToolRuntime[None, FilesystemState],
+    ) -> Command | str:
+        """Asynchronous wrapper for move_file tool."""
+        resolved_backend = _get_backend(backend, runtime)
+        source_path = _validate_path(source_path)
+        destination_path = _validate_path(destination_path)
+        res: WriteResult = await resolved_backend.amove(source_path, destination_path)
+        if res.error:
+            return res.error
+        if res.files_update is not None:
+            return Command(
+                update={
+                    "files": res.files_update,
+                    "messages": [
+                        ToolMessage(
+                            content=f"Moved {source_path} to {destination_path}",
+                            tool_call_id=runtime.tool_call_id,
+                        )
+                    ],
+                }
+            )
+        return f"Moved {source_path} to {destination_path}"
+
+    return StructuredTool.from_function(
+        name="move_file",
+        description=tool_description,
+        func=sync_move_file,
+        args_schema=tool_args_schema("move_file", sync_move_file),
+        coroutine=async_move_file,
+    )
+
+
+def _limit_results(items: list[str]) -> list[str]:
+    """Cap search results fetched with `limit=MAX_SEARCH_RESULTS + 1`, flagging the overflow."""
+    if len(items) > MAX_SEARCH_RESULTS:
+        return [*items[:MAX_SEARCH_RESULTS], TRUNCATION_GUIDANCE]
+    return items
+
+
+def _format_limited_grep(matches: list[GrepMatch]) -> str:
+    """Format content-mode grep matches fetched with `limit=MAX_SEARCH_RESULTS + 1`."""
+    formatted = format_grep_matches(matches[:MAX_SEARCH_RESULTS], "content")
+    if len(matches) > MAX_SEARCH_RESULTS:
+        formatted = f"{formatted}\n{TRUNCATION_GUIDANCE}"
+    return truncate_if_too_long(formatted)  # type: ignore[return-value]
+
+
 def _glob_tool_generator(
     backend: BackendProtocol | Callable[[ToolRuntime], BackendProtocol],
     custom_description: str | None = None,
@@ -580,16 +1082,16 @@ def _glob_tool_generator(
     def sync_glob(pattern: str, runtime: ToolRuntime[None, FilesystemState], path: str = "/") -> str:
         """Synchronous wrapper for glob tool."""
         resolved_backend = _get_backend(backend, runtime)
-        infos = resolved_backend.glob_info(pattern, path=path)
-        paths = [fi.get("path", "") for fi in infos]
+        infos = resolved_backend.glob_iter(pattern, path=path, limit=MAX_SEARCH_RESULTS + 1)
+        paths = _limit_results([fi.get("path", "") for fi in infos])
         result = truncate_if_too_long(paths)
         return str(result)
 
     async def async_glob(pattern: str, runtime: ToolRuntime[None, FilesystemState], path: str = "/") -> str:
         """Asynchronous wrapper for glob tool."""
         resolved_backend = _get_backend(backend, runtime)
-        infos = await resolved_backend.aglob_info(pattern, path=path)
-        paths = [fi.get("path", "") for fi in infos]
+        infos = await resolved_backend.aglob_iter(pattern, path=path, limit=MAX_SEARCH_RESULTS + 1)
+        paths = _limit_results([fi.get("path", "") async for fi in infos])
         result = truncate_if_too_long(paths)
         return str(result)
 
@@ -597,6 +1099,7 @@ def _glob_tool_generator(
         name="glob",
         description=tool_description,
         func=sync_glob,
+        args_schema=tool_args_schema("glob", sync_glob),
         coroutine=async_glob,
     )
 
@@ -625,11 +1128,16 @@ def _grep_tool_generator(
     ) -> str:
         """Synchronous wrapper for grep tool."""
         resolved_backend = _get_backend(backend, runtime)
-        raw = resolved_backend.grep_raw(pattern, path=path, glob=glob)
-        if isinstance(raw, str):
-            return raw
-        formatted = format_grep_matches(raw, output_mode)
-        return truncate_if_too_long(formatted)  # type: ignore[arg-type]
+        # Only content mode can be capped: a match limit would skew file lists and counts
+        if output_mode != "content":
+            raw = resolved_backend.grep_raw(pattern, path=path, glob=glob)
+            if isinstance(raw, str):
+                return raw
+            return truncate_if_too_long(format_grep_matches(raw, output_mode))  # type: ignore[return-value]
+        matches = resolved_backend.grep_iter(pattern, path=path, glob=glob, limit=MAX_SEARCH_RESULTS + 1)
+        if isinstance(matches, str):
+            return matches
+        return _format_limited_grep(list(matches))
 
     async def async_grep(
         pattern: str,
@@ -640,16 +1148,21 @@ def _grep_tool_generator(
     ) -> str:
         """Asynchronous wrapper for grep tool."""
         resolved_backend = _get_backend(backend, runtime)
-        raw = await resolved_backend.agrep_raw(pattern, path=path, glob=glob)
-        if isinstance(raw, str):
-            return raw
-        formatted = format_grep_matches(raw, output_mode)
-        return truncate_if_too_long(formatted)  # type: ignore[arg-type]
+        if output_mode != "content":
+            raw = await resolved_backend.agrep_raw(pattern, path=path, glob=glob)
+            if isinstance(raw, str):
+                return raw
+            return truncate_if_too_long(format_grep_matches(raw, output_mode))  # type: ignore[return-value]
+        matches = await resolved_backend.agrep_iter(pattern, path=path, glob=glob, limit=MAX_SEARCH_RESULTS + 1)
+        if isinstance(matches, str):
+            return matches
+        return _format_limited_grep([m async for m in matches])
 
     return StructuredTool.from_function(
         name="grep",
         description=tool_description,
         func=sync_grep,
+        args_schema=tool_args_schema("grep", sync_grep),
         coroutine=async_grep,
     )
 
@@ -762,6 +1275,7 @@ def _execute_tool_generator(
         name="execute",
         description=tool_description,
         func=sync_execute,
+        args_schema=tool_args_schema("execute", sync_execute),
         coroutine=async_execute,
     )
 
@@ -769,8 +1283,12 @@ def _execute_tool_generator(
 TOOL_GENERATORS = {
     "ls": _ls_tool_generator,
     "read_file": _read_file_tool_generator,
+    "read_files": _read_files_tool_generator,
     "write_file": _write_file_tool_generator,
     "edit_file": _edit_file_tool_generator,
+    "multi_edit": _multi_edit_tool_generator,
+    "copy_file": _copy_file_tool_generator,
+    "move_file": _move_file_tool_generator,
     "glob": _glob_tool_generator,
     "grep": _grep_tool_generator,
     "execute": _execute_tool_generator,
@@ -788,7 +1306,7 @@ def _get_filesystem_tools(
         custom_tool_descriptions: Optional custom descriptions for tools.
 
     Returns:
-        List of configured tools: ls, read_file, write_file, edit_file, glob, grep, execute.
+        List of configured tools: ls, read_file, read_files, write_file, edit_file, multi_edit, copy_file, move_file, glob, grep, execute.
     """
     if custom_tool_descriptions is None:
         custom_tool_descriptions = {}
@@ -810,11 +1328,114 @@ Here are the first 10 lines of the result:
 """
 
 
+LARGE_TOOL_RESULTS_PATH = "/large_tool_results/"
+"""Directory that oversize tool results are evicted to, one file per distinct content."""
+
+DEFAULT_STORAGE_GC_PATHS = (LARGE_TOOL_RESULTS_PATH,)
+"""Directories whose files are garbage collected under `storage_budget_bytes`.
+
+`/conversation_history/` is deliberately not included: its index and segments are
+what `search_history` reads, and they are not tracked by the eviction ledger."""
+
+
+@dataclass
+class EvictionMetrics:
+    """Counters for tool result eviction and storage garbage collection."""
+
+    results_evicted: int = 0
+    """Tool results written to the filesystem."""
+
+    bytes_evicted: int = 0
+    """Bytes written for evicted tool results."""
+
+    results_deduplicated: int = 0
+    """Evicted tool results whose content was already stored, so nothing was written."""
+
+    bytes_deduplicated: int = 0
+    """Bytes not written thanks to deduplication."""
+
+    files_collected: int = 0
+    """Files deleted by the garbage collector."""
+
+    bytes_collected: int = 0
+    """Bytes freed by the garbage collector."""
+
+
+def _tool_message_text(message: ToolMessage) -> str:
+    """Stringify ToolMessage content; a single text block is unwrapped for readability."""
+    if (
+        isinstance(message.content, list)
+        and len(message.content) == 1
+        and isinstance(message.content[0], dict)
+        and message.content[0].get("type") == "text"
+        and "text" in message.content[0]
+    ):
+        return str(message.content[0]["text"])
+    if isinstance(message.content, str):
+        return message.content
+    # Multiple blocks or non-text content - stringify entire structure
+    return str(message.content)
+
+
+def _evicted_result(content: str, tool_call_id: str) -> tuple[str, EvictedResult]:
+    """Return (content hash, ledger record) for tool result content saved under `LARGE_TOOL_RESULTS_PATH`."""
+    encoded = content.encode("utf-8", errors="replace")
+    content_hash = hashlib.sha256(encoded).hexdigest()
+    record = EvictedResult(
+        path=f"{LARGE_TOOL_RESULTS_PATH}{content_hash[:32]}",
+        size=len(encoded),
+        tool_call_ids=[tool_call_id],
+    )
+    return content_hash, record
+
+
+def _referenced_paths(state: dict, candidates: Sequence[str]) -> set[str]:
+    """Paths among `candidates` still referenced by the message history.
+
+    A path is referenced if the ledger maps it to a tool call whose ToolMessage is
+    still in the history, or if a summary message mentions it.
+    """
+    messages = state.get("messages", [])
+    live_tool_calls = {message.tool_call_id for message in messages if isinstance(message, ToolMessage)}
+    referenced = {record["path"] for record in state.get("evicted_results", {}).values() if live_tool_calls.intersection(record["tool_call_ids"])}
+    summaries = [
+        message.text for message in messages if isinstance(message, HumanMessage) and message.additional_kwargs.get("lc_source") == "summarization"
+    ]
+    referenced.update(path for path in candidates if any(path in summary for summary in summaries))
+    return referenced
+
+
+def _gc_victims(records: list[EvictedResult], referenced: set[str], budget: int) -> list[EvictedResult]:
+    """Oldest unreferenced ledger records whose files to delete to bring the total size within `budget`.
+
+    Records are in ledger order, i.e. by when their content was first evicted.
+    """
+    excess = sum(record["size"] for record in records) - budget
+    victims: list[EvictedResult] = []
+    for record in records:
+        if excess <= 0:
+            break
+        if record["path"] in referenced:
+            continue
+        victims.append(record)
+        excess -= record["size"]
+    return victims
+
+
+READ_UNCHANGED_MSG = """File unchanged: the earlier read_file call {tool_call_id} already returned {section} of {file_path} with identical content, and that result is still in your context.
+Refer to that earlier result instead. Only if you really need the content repeated, call read_file again with force=True."""
+
+
+def _has_tool_message(messages: Sequence[object], tool_call_id: str) -> bool:
+    """Check whether a ToolMessage for the given tool call is still in the message history."""
+    return any(isinstance(message, ToolMessage) and message.tool_call_id == tool_call_id for message in reversed(messages))
+
+
 class FilesystemMiddleware(AgentMiddleware):
     """Middleware for providing filesystem and optional execution tools to an agent.
 
-    This middleware adds filesystem tools to the agent: `ls`, `read_file`, `write_file`,
-    `edit_file`, `glob`, and `grep`.
+    This middleware adds filesystem tools to the agent: `ls`, `read_file`, `read_files`,
+    `write_file`, `edit_file`, `multi_edit`, `copy_file`, `move_file`, `glob`, and `grep`.
 
     Files can be stored using any backend that implements the `BackendProtocol`.
 
@@ -839,6 +1460,23 @@ class FilesystemMiddleware(AgentMiddleware):
 
             When exceeded, writes the result using the configured backend and replaces it
             with a truncated preview and file reference.
+        dedupe_reads: Whether to replace re-reads of an unchanged file range with a short
+            stub pointing at the earlier `read_file` result.
+
+            Reads are tracked per thread as (path, range, content hash). A stub is only
+            returned while the earlier result is still in the message history, and the
+            model can bypass it with `force=True`. Hits and approximate tokens saved are
+            counted in `read_dedup_hits` and `read_dedup_tokens_saved`.
+        storage_budget_bytes: Size budget for the files under `storage_gc_paths`.
+
+            Evicted tool results are stored once per distinct content at
+            `/large_tool_results/{content_hash}`, with a per-thread ledger mapping each
+            hash to the tool calls that produced it. When the files in the thread's
+            ledger exceed the budget (checked before each agent run and after
+            evictions), the oldest of them no longer referenced by the message history
+            are deleted. Files the thread did not evict itself are never collected.
+            None disables garbage collection. Counters are kept in `eviction_metrics`.
+        storage_gc_paths: Directories the garbage collector may delete ledger files from.
 
     Example:
         ```python
@@ -870,6 +1508,9 @@ class FilesystemMiddleware(AgentMiddleware):
         system_prompt: str | None = None,
         custom_tool_descriptions: dict[str, str] | None = None,
         tool_token_limit_before_evict: int | None = 20000,
+        dedupe_reads: bool = True,
+        storage_budget_bytes: int | None = 32 * 1024 * 1024,
+        storage_gc_paths: Sequence[str] = DEFAULT_STORAGE_GC_PATHS,
     ) -> None:
         """Initialize the filesystem middleware.
 
@@ -879,8 +1520,19 @@ class FilesystemMiddleware(AgentMiddleware):
             system_prompt: Optional custom system prompt override.
             custom_tool_descriptions: Optional custom tool descriptions override.
             tool_token_limit_before_evict: Optional token limit before evicting a tool result to the filesystem.
+            dedupe_reads: Whether to replace unchanged re-reads with a stub referencing the earlier result.
+            storage_budget_bytes: Size budget for this thread's evicted tool results, or None.
+            storage_gc_paths: Directories the garbage collector may delete ledger files from.
         """
         self.tool_token_limit_before_evict = tool_token_limit_before_evict
+        self.dedupe_reads = dedupe_reads
+        self.read_dedup_hits = 0
+        self.read_dedup_tokens_saved = 0
+        self._read_dedup_lock = threading.Lock()
+        self.storage_budget_bytes = storage_budget_bytes
+        self.storage_gc_paths = tuple(storage_gc_paths)
+        self.eviction_metrics = EvictionMetrics()
+        self._metrics_lock = threading.Lock()
 
         # Use provided backend or default to StateBackend factory
         self.backend = backend if backend is not None else (lambda rt: StateBackend(rt))
@@ -903,6 +1555,55 @@ class FilesystemMiddleware(AgentMiddleware):
             return self.backend(runtime)
         return self.backend
 
+    def _get_agent_backend(self, state: FilesystemState, runtime: Runtime, config: RunnableConfig) -> BackendProtocol:
+        """Resolve the backend outside of a tool call (e.g., in before_agent)."""
+        if callable(self.backend):
+            # Construct an artificial tool runtime to resolve backend factory
+            tool_runtime = ToolRuntime(
+                state=state,
+                context=runtime.context,
+                stream_writer=runtime.stream_writer,
+                store=runtime.store,
+                config=config,
+                tool_call_id=None,
+            )
+            return self.backend(tool_runtime)
+        return self.backend
+
+    def before_agent(self, state: FilesystemState, runtime: Runtime, config: RunnableConfig) -> dict | None:
+        """Garbage collect offloaded files that exceed the storage budget.
+
+        Args:
+            state: Current agent state.
+            runtime: Runtime context.
+            config: Runnable config.
+
+        Returns:
+            State update deleting collected files and their ledger entries, if any.
+        """
+        if self.storage_budget_bytes is None:
+            return None
+        files_update, ledger_update = self._collect_garbage(self._get_agent_backend(state, runtime, config), cast("dict", state))
+        update = self._eviction_command_update({}, files_update, ledger_update)
+        return update or None
+
+    async def abefore_agent(self, state: FilesystemState, runtime: Runtime, config: RunnableConfig) -> dict | None:
+        """(async) Garbage collect offloaded files that exceed the storage budget.
+
+        Args:
+            state: Current agent state.
+            runtime: Runtime context.
+            config: Runnable config.
+
+        Returns:
+            State update deleting collected files and their ledger entries, if any.
+        """
+        if self.storage_budget_bytes is None:
+            return None
+        files_update, ledger_update = await self._acollect_garbage(self._get_agent_backend(state, runtime, config), cast("dict", state))
+        update = self._eviction_command_update({}, files_update, ledger_update)
+        return update or None
+
     def wrap_model_call(
         self,
         request: ModelRequest,
@@ -932,18 +1633,14 @@ class FilesystemMiddleware(AgentMiddleware):
                 request = request.override(tools=filtered_tools)
                 has_execute_tool = False
 
-        # Use custom system prompt if provided, otherwise generate dynamically
+        # Use custom system prompt if provided, otherwise the prebuilt prompt for the available tools
         if self._custom_system_prompt is not None:
             system_prompt = self._custom_system_prompt
-        else:
-            # Build dynamic system prompt based on available tools
-            prompt_parts = [FILESYSTEM_SYSTEM_PROMPT]
-
+        elif has_execute_tool and backend_supports_execution:
             # Add execution instructions if execute tool is available
-            if has_execute_tool and backend_supports_execution:
-                prompt_parts.append(EXECUTION_SYSTEM_PROMPT)
-
-            system_prompt = "\n\n".join(prompt_parts)
+            system_prompt = _FILESYSTEM_AND_EXECUTION_SYSTEM_PROMPT
+        else:
+            system_prompt = FILESYSTEM_SYSTEM_PROMPT
 
         if system_prompt:
             new_system_message = append_to_system_message(request.system_message, system_prompt)
@@ -980,18 +1677,14 @@ class FilesystemMiddleware(AgentMiddleware):
                 request = request.override(tools=filtered_tools)
                 has_execute_tool = False
 
-        # Use custom system prompt if provided, otherwise generate dynamically
+        # Use custom system prompt if provided, otherwise the prebuilt prompt for the available tools
         if self._custom_system_prompt is not None:
             system_prompt = self._custom_system_prompt
-        else:
-            # Build dynamic system prompt based on available tools
-            prompt_parts = [FILESYSTEM_SYSTEM_PROMPT]
-
+        elif has_execute_tool and backend_supports_execution:
             # Add execution instructions if execute tool is available
-            if has_execute_tool and backend_supports_execution:
-                prompt_parts.append(EXECUTION_SYSTEM_PROMPT)
-
-            system_prompt = "\n\n".join(prompt_parts)
+            system_prompt = _FILESYSTEM_AND_EXECUTION_SYSTEM_PROMPT
+        else:
+            system_prompt = FILESYSTEM_SYSTEM_PROMPT
 
         if system_prompt:
             new_system_message = append_to_system_message(request.system_message, system_prompt)
@@ -999,138 +1692,216 @@ class FilesystemMiddleware(AgentMiddleware):
 
         return await handler(request)
 
+    def _record_metrics(self, **increments: int) -> None:
+        with self._metrics_lock:
+            for name, value in increments.items():
+                setattr(self.eviction_metrics, name, getattr(self.eviction_metrics, name) + value)
+
+    def _prepare_eviction(self, message: ToolMessage) -> tuple[str, str, EvictedResult] | None:
+        """Return (content, content hash, ledger record) if the message is over the eviction threshold."""
+        if not self.tool_token_limit_before_evict:
+            return None
+        content_str = _tool_message_text(message)
+        if count_tokens(content_str) <= self.tool_token_limit_before_evict:
+            return None
+        content_hash, record = _evicted_result(content_str, message.tool_call_id)
+        return content_str, content_hash, record
+
+    def _eviction_stub(self, message: ToolMessage, content_str: str, file_path: str) -> ToolMessage:
+        """Build the replacement message: a file reference plus a short preview."""
+        content_sample = format_content_with_line_numbers([line[:1000] for line in content_str.splitlines()[:10]], start_line=1)
+        replacement_text = TOO_LARGE_TOOL_MSG.format(
+            tool_call_id=message.tool_call_id,
+            file_path=file_path,
+            content_sample=content_sample,
+        )
+        # Always return as plain string after eviction
+        return ToolMessage(content=replacement_text, tool_call_id=message.tool_call_id, name=message.name)
+
     def _process_large_message(
         self,
         message: ToolMessage,
         resolved_backend: BackendProtocol,
-    ) -> tuple[ToolMessage, dict[str, FileData] | None]:
+        ledger: dict[str, EvictedResult],
+    ) -> tuple[ToolMessage, dict[str, FileData] | None, dict[str, EvictedResult] | None]:
         """Process a large ToolMessage by evicting its content to filesystem.
 
         Args:
             message: The ToolMessage with large content to evict.
             resolved_backend: The filesystem backend to write the content to.
+            ledger: Eviction ledger from state, keyed by content hash.
 
         Returns:
-            A tuple of (processed_message, files_update):
+            A tuple of (processed_message, files_update, ledger_update):
             - processed_message: New ToolMessage with truncated content and file reference
-            - files_update: Dict of file updates to apply to state, or None if eviction failed
+            - files_update: Dict of file updates to apply to state, or None if nothing was written
+            - ledger_update: Ledger entry to record, or None if the message was not evicted
 
         Note:
-            The entire content is converted to string, written to /large_tool_results/{tool_call_id},
-            and replaced with a truncated preview plus file reference. The replacement is always
-            returned as a plain string for consistency, regardless of original content type.
+            The entire content is converted to string, written to /large_tool_results/{content_hash},
+            and replaced with a truncated preview plus file reference. Content that is already
+            stored (per the ledger and a stat of the file, or an existing file with that hash) is not
+            written again.
+            The replacement is always returned as a plain string for consistency, regardless of
+            original content type.
 
             ToolMessage supports multimodal content blocks (images, audio, etc.), but these are
             uncommon in tool results. For simplicity, all content is stringified and evicted.
             The model can recover by reading the offloaded file from the backend.
         """
-        # Early exit if eviction not configured
-        if not self.tool_token_limit_before_evict:
-            return message, None
-
-        # Convert content to string once for both size check and eviction
-        # Special case: single text block - extract text directly for readability
-        if (
-            isinstance(message.content, list)
-            and len(message.content) == 1
-            and isinstance(message.content[0], dict)
-            and message.content[0].get("type") == "text"
-            and "text" in message.content[0]
-        ):
-            content_str = str(message.content[0]["text"])
-        elif isinstance(message.content, str):
-            content_str = message.content
+        prepared = self._prepare_eviction(message)
+        if prepared is None:
+            return message, None, None
+        content_str, content_hash, record = prepared
+
+        files_update = None
+        # A ledger hit is only trusted while the file exists; another thread sharing the backend may have collected it
+        if content_hash in ledger and resolved_backend.batch([StatOp(record["path"])])[0] is not None:
+            self._record_metrics(results_deduplicated=1, bytes_deduplicated=record["size"])
         else:
-            # Multiple blocks or non-text content - stringify entire structure
-            content_str = str(message.content)
-
-        # Check if content exceeds eviction threshold
-        # Using 4 chars per token as a conservative approximation (actual ratio varies by content)
-        # This errs on the high side to avoid premature eviction of content that might fit
-        if len(content_str) <= 4 * self.tool_token_limit_before_evict:
-            return message, None
-
-        # Write content to filesystem
-        sanitized_id = sanitize_tool_call_id(message.tool_call_id)
-        file_path = f"/large_tool_results/{sanitized_id}"
-        result = resolved_backend.write(file_path, content_str)
-        if result.error:
-            return message, None
-
-        # Create truncated preview for the replacement message
-        content_sample = format_content_with_line_numbers([line[:1000] for line in content_str.splitlines()[:10]], start_line=1)
-        replacement_text = TOO_LARGE_TOOL_MSG.format(
-            tool_call_id=message.tool_call_id,
-            file_path=file_path,
-            content_sample=content_sample,
-        )
-
-        # Always return as plain string after eviction
-        processed_message = ToolMessage(
-            content=replacement_text,
-            tool_call_id=message.tool_call_id,
-            name=message.name,
-        )
-        return processed_message, result.files_update
+            result = resolved_backend.write(record["path"], content_str)
+            if not result.error:
+                files_update = result.files_update
+                self._record_metrics(results_evicted=1, bytes_evicted=record["size"])
+            elif resolved_backend.batch([StatOp(record["path"])])[0] is not None:
+                # Stored earlier (e.g., by another thread sharing the backend)
+                self._record_metrics(results_deduplicated=1, bytes_deduplicated=record["size"])
+            else:
+                return message, None, None
+
+        return self._eviction_stub(message, content_str, record["path"]), files_update, {content_hash: record}
 
     async def _aprocess_large_message(
         self,
         message: ToolMessage,
         resolved_backend: BackendProtocol,
-    ) -> tuple[ToolMessage, dict[str, FileData] | None]:
+        ledger: dict[str, EvictedResult],
+    ) -> tuple[ToolMessage, dict[str, FileData] | None, dict[str, EvictedResult] | None]:
         """Async version of _process_large_message.
 
         Uses async backend methods to avoid sync calls in async context.
         See _process_large_message for full documentation.
         """
-        # Early exit if eviction not configured
-        if not self.tool_token_limit_before_evict:
-            return message, None
-
-        # Convert content to string once for both size check and eviction
-        # Special case: single text block - extract text directly for readability
-        if (
-            isinstance(message.content, list)
-            and len(message.content) == 1
-            and isinstance(message.content[0], dict)
-            and message.content[0].get("type") == "text"
-            and "text" in message.content[0]
-        ):
-            content_str = str(message.content[0]["text"])
-        elif isinstance(message.content, str):
-            content_str = message.content
+        prepared = self._prepare_eviction(message)
+        if prepared is None:
+            return message, None, None
+        content_str, content_hash, record = prepared
+
+        files_update = None
+        # A ledger hit is only trusted while the file exists; another thread sharing the backend may have collected it
+        if content_hash in ledger and (await resolved_backend.abatch([StatOp(record["path"])]))[0] is not None:
+            self._record_metrics(results_deduplicated=1, bytes_deduplicated=record["size"])
         else:
-            # Multiple blocks or non-text content - stringify entire structure
-            content_str = str(message.content)
-
-        # Check if content exceeds eviction threshold
-        # Using 4 chars per token as a conservative approximation (actual ratio varies by content)
-        # This errs on the high side to avoid premature eviction of content that might fit
-        if len(content_str) <= 4 * self.tool_token_limit_before_evict:
-            return message, None
-
-        # Write content to filesystem using async method
-        sanitized_id = sanitize_tool_call_id(message.tool_call_id)
-        file_path = f"/large_tool_results/{sanitized_id}"
-        result = await resolved_backend.awrite(file_path, content_str)
-        if result.error:
-            return message, None
-
-        # Create truncated preview for the replacement message
-        content_sample = format_content_with_line_numbers([line[:1000] for line in content_str.splitlines()[:10]], start_line=1)
-        replacement_text = TOO_LARGE_TOOL_MSG.format(
-            tool_call_id=message.tool_call_id,
-            file_path=file_path,
-            content_sample=content_sample,
-        )
+            result = await resolved_backend.awrite(record["path"], content_str)
+            if not result.error:
+                files_update = result.files_update
+                self._record_metrics(results_evicted=1, bytes_evicted=record["size"])
+            elif (await resolved_backend.abatch([StatOp(record["path"])]))[0] is not None:
+                # Stored earlier (e.g., by another thread sharing the backend)
+                self._record_metrics(results_deduplicated=1, bytes_deduplicated=record["size"])
+            else:
+                return message, None, None
+
+        return self._eviction_stub(message, content_str, record["path"]), files_update, {content_hash: record}
+
+    def _needs_gc(self, state: dict, ledger_update: dict[str, EvictedResult]) -> bool:
+        """Whether the tracked evicted results (including new ones) exceed the storage budget."""
+        if self.storage_budget_bytes is None or not ledger_update:
+            return False
+        ledger = {**state.get("evicted_results", {}), **ledger_update}
+        return sum(record["size"] for record in ledger.values()) > self.storage_budget_bytes
+
+    def _gc_candidates(self, state: dict, ledger_update: dict[str, EvictedResult]) -> tuple[list[EvictedResult], set[str]]:
+        """This thread's ledger records under `storage_gc_paths`, and the paths that must be kept.
+
+        Returns no candidates while the records fit the budget.
+        """
+        ledger = {**state.get("evicted_results", {}), **ledger_update}
+        records = [record for record in ledger.values() if record["path"].startswith(self.storage_gc_paths)]
+        if self.storage_budget_bytes is None or sum(record["size"] for record in records) <= self.storage_budget_bytes:
+            return [], set()
+        referenced = _referenced_paths(state, [record["path"] for record in records])
+        referenced.update(record["path"] for record in ledger_update.values())
+        return records, referenced
+
+    def _gc_ledger_update(self, state: dict, ledger_update: dict[str, EvictedResult], deleted: set[str]) -> dict[str, EvictedResult | None]:
+        """Ledger deletions for collected paths."""
+        ledger = {**state.get("evicted_results", {}), **ledger_update}
+        return {content_hash: None for content_hash, record in ledger.items() if record["path"] in deleted}
+
+    def _collect_garbage(
+        self,
+        backend: BackendProtocol,
+        state: dict,
+        ledger_update: dict[str, EvictedResult] | None = None,
+    ) -> tuple[dict[str, FileData | None], dict[str, EvictedResult | None]]:
+        """Delete the oldest unreferenced files of this thread's ledger until they fit the budget.
 
-        # Always return as plain string after eviction
-        processed_message = ToolMessage(
-            content=replacement_text,
-            tool_call_id=message.tool_call_id,
-            name=message.name,
-        )
-        return processed_message, result.files_update
+        Args:
+            backend: Backend holding the files.
+            state: Current agent state (messages and eviction ledger).
+            ledger_update: Ledger entries being added by the current tool call, which are
+                always kept.
+
+        Returns:
+            (files_update, ledger_update) with deletion markers for checkpoint backends
+            and for the ledger.
+        """
+        if self.storage_budget_bytes is None:
+            return {}, {}
+        ledger_update = ledger_update or {}
+        records, referenced = self._gc_candidates(state, ledger_update)
+
+        files_update: dict[str, FileData | None] = {}
+        deleted: set[str] = set()
+        for record in _gc_victims(records, referenced, self.storage_budget_bytes):
+            result = backend.delete(record["path"])
+            if result.error:
+                continue
+            deleted.add(record["path"])
+            files_update.update(result.files_update or {})
+            self._record_metrics(files_collected=1, bytes_collected=record["size"])
+        if deleted:
+            logger.debug("Collected %d files from %s", len(deleted), ", ".join(self.storage_gc_paths))
+        return files_update, self._gc_ledger_update(state, ledger_update, deleted)
+
+    async def _acollect_garbage(
+        self,
+        backend: BackendProtocol,
+        state: dict,
+        ledger_update: dict[str, EvictedResult] | None = None,
+    ) -> tuple[dict[str, FileData | None], dict[str, EvictedResult | None]]:
+        """Async version of _collect_garbage."""
+        if self.storage_budget_bytes is None:
+            return {}, {}
+        ledger_update = ledger_update or {}
+        records, referenced = self._gc_candidates(state, ledger_update)
+
+        files_update: dict[str, FileData | None] = {}
+        deleted: set[str] = set()
+        for record in _gc_victims(records, referenced, self.storage_budget_bytes):
+            result = await backend.adelete(record["path"])
+            if result.error:
+                continue
+            deleted.add(record["path"])
+            files_update.update(result.files_update or {})
+            self._record_metrics(files_collected=1, bytes_collected=record["size"])
+        if deleted:
+            logger.debug("Collected %d files from %s", len(deleted), ", ".join(self.storage_gc_paths))
+        return files_update, self._gc_ledger_update(state, ledger_update, deleted)
+
+    @staticmethod
+    def _eviction_command_update(
+        update: dict,
+        files_update: dict[str, FileData | None],
+        ledger_update: dict[str, EvictedResult | None],
+    ) -> dict:
+        """Add file and ledger updates to a Command update."""
+        if files_update:
+            update["files"] = {**update.get("files", {}), **files_update}
+        if ledger_update:
+            update["evicted_results"] = ledger_update
+        return update
 
     def _intercept_large_tool_result(self, tool_result: ToolMessage | Command, runtime: ToolRuntime) -> ToolMessage | Command:
         """Intercept and process large tool results before they're added to state.
@@ -1148,45 +1919,40 @@ class FilesystemMiddleware(AgentMiddleware):
             multiple messages. Large content is automatically offloaded to filesystem
             to prevent context window overflow.
         """
-        if isinstance(tool_result, ToolMessage):
-            resolved_backend = self._get_backend(runtime)
-            processed_message, files_update = self._process_large_message(
-                tool_result,
-                resolved_backend,
-            )
-            return (
-                Command(
-                    update={
-                        "files": files_update,
-                        "messages": [processed_message],
-                    }
-                )
-                if files_update is not None
-                else processed_message
-            )
+        if isinstance(tool_result, Command) and tool_result.update is None:
+            return tool_result
+        if not isinstance(tool_result, ToolMessage | Command):
+            raise AssertionError(f"Unreachable code reached in _intercept_large_tool_result: for tool_result of type {type(tool_result)}")  # noqa: TRY004
+
+        state = runtime.state or {}
+        ledger = state.get("evicted_results", {})
+        resolved_backend = self._get_backend(runtime)
+        command_update: dict = {} if isinstance(tool_result, ToolMessage) else tool_result.update or {}
+        messages = [tool_result] if isinstance(tool_result, ToolMessage) else command_update.get("messages", [])
+        files_update: dict[str, FileData | None] = {}
+        ledger_additions: dict[str, EvictedResult] = {}
+        processed_messages = []
+        for message in messages:
+            if not isinstance(message, ToolMessage):
+                processed_messages.append(message)
+                continue
+            processed_message, message_files, message_ledger = self._process_large_message(message, resolved_backend, ledger)
+            processed_messages.append(processed_message)
+            files_update.update(message_files or {})
+            ledger_additions.update(message_ledger or {})
+
+        ledger_update: dict[str, EvictedResult | None] = {**ledger_additions}
+        if self._needs_gc(state, ledger_additions):
+            gc_files, gc_ledger = self._collect_garbage(resolved_backend, state, ledger_additions)
+            files_update.update(gc_files)
+            ledger_update.update(gc_ledger)
 
         if isinstance(tool_result, Command):
-            update = tool_result.update
-            if update is None:
-                return tool_result
-            command_messages = update.get("messages", [])
-            accumulated_file_updates = dict(update.get("files", {}))
-            resolved_backend = self._get_backend(runtime)
-            processed_messages = []
-            for message in command_messages:
-                if not isinstance(message, ToolMessage):
-                    processed_messages.append(message)
-                    continue
-
-                processed_message, files_update = self._process_large_message(
-                    message,
-                    resolved_backend,
-                )
-                processed_messages.append(processed_message)
-                if files_update is not None:
-                    accumulated_file_updates.update(files_update)
-            return Command(update={**update, "messages": processed_messages, "files": accumulated_file_updates})
-        raise AssertionError(f"Unreachable code reached in _intercept_large_tool_result: for tool_result of type {type(tool_result)}")
+            update = {**command_update, "messages": processed_messages, "files": dict(command_update.get("files", {}))}
+            return Command(update=self._eviction_command_update(update, files_update, ledger_update))
+        if not files_update and not ledger_update:
+            return processed_messages[0]
+        return Command(update=self._eviction_command_update({"messages": processed_messages}, files_update, ledger_update))
 
     async def _aintercept_large_tool_result(self, tool_result: ToolMessage | Command, runtime: ToolRuntime) -> ToolMessage | Command:
         """Async version of _intercept_large_tool_result.
@@ -1194,52 +1960,103 @@ class FilesystemMiddleware(AgentMiddleware):
         Uses async backend methods to avoid sync calls in async context.
         See _intercept_large_tool_result for full documentation.
         """
-        if isinstance(tool_result, ToolMessage):
-            resolved_backend = self._get_backend(runtime)
-            processed_message, files_update = await self._aprocess_large_message(
-                tool_result,
-                resolved_backend,
-            )
-            return (
-                Command(
-                    update={
-                        "files": files_update,
-                        "messages": [processed_message],
-                    }
-                )
-                if files_update is not None
-                else processed_message
-            )
+        if isinstance(tool_result, Command) and tool_result.update is None:
+            return tool_result
+        if not isinstance(tool_result, ToolMessage | Command):
+            raise AssertionError(f"Unreachable code reached in _aintercept_large_tool_result: for tool_result of type {type(tool_result)}")  # noqa: TRY004
+
+        state = runtime.state or {}
+        ledger = state.get("evicted_results", {})
+        resolved_backend = self._get_backend(runtime)
+        command_update: dict = {} if isinstance(tool_result, ToolMessage) else tool_result.update or {}
+        messages = [tool_result] if isinstance(tool_result, ToolMessage) else command_update.get("messages", [])
+        files_update: dict[str, FileData | None] = {}
+        ledger_additions: dict[str, EvictedResult] = {}
+        processed_messages = []
+        for message in messages:
+            if not isinstance(message, ToolMessage):
+                processed_messages.append(message)
+                continue
+            processed_message, message_files, message_ledger = await self._aprocess_large_message(message, resolved_backend, ledger)
+            processed_messages.append(processed_message)
+            files_update.update(message_files or {})
+            ledger_additions.update(message_ledger or {})
+
+        ledger_update: dict[str, EvictedResult | None] = {**ledger_additions}
+        if self._needs_gc(state, ledger_additions):
+            gc_files, gc_ledger = await self._acollect_garbage(resolved_backend, state, ledger_additions)
+            files_update.update(gc_files)
+            ledger_update.update(gc_ledger)
 
         if isinstance(tool_result, Command):
-            update = tool_result.update
-            if update is None:
-                return tool_result
-            command_messages = update.get("messages", [])
-            accumulated_file_updates = dict(update.get("files", {}))
-            resolved_backend = self._get_backend(runtime)
-            processed_messages = []
-            for message in command_messages:
-                if not isinstance(message, ToolMessage):
-                    processed_messages.append(message)
-                    continue
-
-                processed_message, files_update = await self._aprocess_large_message(
-                    message,
-                    resolved_backend,
-                )
-                processed_messages.append(processed_message)
-                if files_update is not None:
-                    accumulated_file_updates.update(files_update)
-            return Command(update={**update, "messages": processed_messages, "files": accumulated_file_updates})
-        raise AssertionError(f"Unreachable code reached in _aintercept_large_tool_result: for tool_result of type {type(tool_result)}")
+            update = {**command_update, "messages": processed_messages, "files": dict(command_update.get("files", {}))}
+            return Command(update=self._eviction_command_update(update, files_update, ledger_update))
+        if not files_update and not ledger_update:
+            return processed_messages[0]
+        return Command(update=self._eviction_command_update({"messages": processed_messages}, files_update, ledger_update))
+
+    def _dedupe_read_result(self, request: ToolCallRequest, tool_result: ToolMessage | Command) -> ToolMessage | Command:
+        """Replace an unchanged re-read with a stub, or record a full read in the ledger.
+
+        Args:
+            request: The read_file tool call request.
+            tool_result: The result returned by the read_file tool.
+
+        Returns:
+            A stub ToolMessage referencing the earlier read if the same range was already
+            returned with identical content and that result is still in the message history;
+            otherwise a Command that returns the result and records it in `file_reads`.
+        """
+        if not isinstance(tool_result, ToolMessage) or tool_result.status == "error" or not isinstance(tool_result.content, str):
+            return tool_result
+        content = tool_result.content
+        if content.startswith("Error:"):
+            return tool_result
+
+        args = request.tool_call["args"]
+        try:
+            file_path = _validate_path(args["file_path"])
+        except (KeyError, ValueError):
+            return tool_result
+        offset = args.get("offset", DEFAULT_READ_OFFSET)
+        limit = args.get("limit", DEFAULT_READ_LIMIT)
+        key = f"{file_path}:outline" if args.get("outline", False) else f"{file_path}:{offset}:{limit}"
+        content_hash = hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+        state = request.state or {}
+        record = state.get("file_reads", {}).get(key)
+        if (
+            not args.get("force", False)
+            and record is not None
+            and record["content_hash"] == content_hash
+            and _has_tool_message(state.get("messages", []), record["tool_call_id"])
+        ):
+            stub = READ_UNCHANGED_MSG.format(
+                section="the outline" if args.get("outline", False) else f"lines {offset + 1}-{offset + limit}",
+                file_path=file_path,
+                tool_call_id=record["tool_call_id"],
+            )
+            tokens_saved = count_tokens(content) - count_tokens(stub)
+            if tokens_saved > 0:
+                with self._read_dedup_lock:
+                    self.read_dedup_hits += 1
+                    self.read_dedup_tokens_saved += tokens_saved
+                logger.debug("Deduplicated read_file %s against %s, ~%d tokens saved", key, record["tool_call_id"], tokens_saved)
+                return ToolMessage(content=stub, tool_call_id=tool_result.tool_call_id, name=tool_result.name)
+
+        return Command(
+            update={
+                "messages": [tool_result],
+                "file_reads": {key: ReadRecord(content_hash=content_hash, tool_call_id=tool_result.tool_call_id)},
+            }
+        )
 
     def wrap_tool_call(
         self,
         request: ToolCallRequest,
         handler: Callable[[ToolCallRequest], ToolMessage | Command],
     ) -> ToolMessage | Command:
-        """Check the size of the tool call result and evict to filesystem if too large.
+        """Deduplicate unchanged read_file results, and evict other tool results to filesystem if too large.
 
         Args:
             request: The tool call request being processed.
@@ -1248,6 +2065,9 @@ class FilesystemMiddleware(AgentMiddleware):
         Returns:
             The raw ToolMessage, or a pseudo tool message with the ToolResult in state.
         """
+        if self.dedupe_reads and request.tool_call["name"] == "read_file":
+            return self._dedupe_read_result(request, handler(request))
+
         if self.tool_token_limit_before_evict is None or request.tool_call["name"] in TOOL_GENERATORS:
             return handler(request)
 
@@ -1259,7 +2079,7 @@ class FilesystemMiddleware(AgentMiddleware):
         request: ToolCallRequest,
         handler: Callable[[ToolCallRequest], Awaitable[ToolMessage | Command]],
     ) -> ToolMessage | Command:
-        """(async)Check the size of the tool call result and evict to filesystem if too large.
+        """(async)Deduplicate unchanged read_file results, and evict other tool results to filesystem if too large.
 
         Args:
             request: The tool call request being processed.
@@ -1268,6 +2088,9 @@ class FilesystemMiddleware(AgentMiddleware):
         Returns:
             The raw ToolMessage, or a pseudo tool message with the ToolResult in state.
         """
+        if self.dedupe_reads and request.tool_call["name"] == "read_file":
+            return self._dedupe_read_result(request, await handler(request))
+
         if self.tool_token_limit_before_evict is None or request.tool_call["name"] in TOOL_GENERATORS:
             return await handler(request)
 
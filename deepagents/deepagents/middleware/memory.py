@@ -51,12 +51,12 @@ from __future__ import annotations
 
 import logging
 from collections.abc import Awaitable, Callable
-from typing import TYPE_CHECKING, Annotated, NotRequired, TypedDict
+from typing import TYPE_CHECKING, Annotated, NotRequired, TypedDict, cast
 
 from langchain_core.runnables import RunnableConfig
 
 if TYPE_CHECKING:
-    from deepagents.backends.protocol import BACKEND_TYPES, BackendProtocol
+    from deepagents.backends.protocol import BACKEND_TYPES, BackendProtocol, FileDownloadResponse
 
 from langchain.agents.middleware.types import (
     AgentMiddleware,
@@ -68,6 +68,7 @@ from langchain.agents.middleware.types import (
 from langchain.tools import ToolRuntime
 from langgraph.runtime import Runtime
 
+from deepagents.backends.protocol import DownloadOp
 from deepagents.middleware._utils import append_to_system_message
 
 logger = logging.getLogger(__name__)
@@ -186,6 +187,8 @@ class MemoryMiddleware(AgentMiddleware):
         """
         self._backend = backend
         self.sources = sources
+        # Last formatted memory prompt, keyed by its inputs; reused while memory is unchanged
+        self._formatted_memory: tuple[tuple, str] | None = None
 
     def _get_backend(self, state: MemoryState, runtime: Runtime, config: RunnableConfig) -> BackendProtocol:
         """Resolve backend from instance or factory.
@@ -234,71 +237,63 @@ class MemoryMiddleware(AgentMiddleware):
         memory_body = "\n\n".join(sections)
         return MEMORY_SYSTEM_PROMPT.format(agent_memory=memory_body)
 
-    async def _load_memory_from_backend(
-        self,
-        backend: BackendProtocol,
-        path: str,
-    ) -> str | None:
-        """Load memory content from a backend path.
+    def _memory_from_response(self, response: FileDownloadResponse) -> str | None:
+        """Extract memory content from a download response.
 
         Args:
-            backend: Backend to load from.
-            path: Path to the AGENTS.md file.
+            response: Download response for an AGENTS.md path.
 
         Returns:
             File content if found, None otherwise.
         """
-        results = await backend.adownload_files([path])
-        # Should get exactly one response for one path
-        if len(results) != 1:
-            raise AssertionError(f"Expected 1 response for path {path}, got {len(results)}")
-        response = results[0]
-
         if response.error is not None:
             # For now, memory files are treated as optional. file_not_found is expected
             # and we skip silently to allow graceful degradation.
             if response.error == "file_not_found":
                 return None
             # Other errors should be raised
-            raise ValueError(f"Failed to download {path}: {response.error}")
+            raise ValueError(f"Failed to download {response.path}: {response.error}")
 
         if response.content is not None:
             return response.content.decode("utf-8")
 
         return None
 
-    def _load_memory_from_backend_sync(
-        self,
-        backend: BackendProtocol,
-        path: str,
-    ) -> str | None:
-        """Load memory content from a backend path synchronously.
+    def _collect_memory(self, responses: list[FileDownloadResponse]) -> dict[str, str]:
+        """Map each configured source to its non-empty content, in source order."""
+        # Should get exactly one response per source
+        if len(responses) != len(self.sources):
+            raise AssertionError(f"Expected {len(self.sources)} responses, got {len(responses)}")
+
+        contents: dict[str, str] = {}
+        for path, response in zip(self.sources, responses, strict=True):
+            content = self._memory_from_response(response)
+            if content:
+                contents[path] = content
+                logger.debug(f"Loaded memory from: {path}")
+        return contents
+
+    async def _load_memory_from_backend(self, backend: BackendProtocol) -> dict[str, str]:
+        """Load all memory sources from a backend in one batch.
 
         Args:
             backend: Backend to load from.
-            path: Path to the AGENTS.md file.
 
         Returns:
-            File content if found, None otherwise.
+            Mapping of source path to content for sources that exist.
         """
-        results = backend.download_files([path])
-        # Should get exactly one response for one path
-        if len(results) != 1:
-            raise AssertionError(f"Expected 1 response for path {path}, got {len(results)}")
-        response = results[0]
+        return self._collect_memory(cast("list[FileDownloadResponse]", await backend.abatch([DownloadOp(path) for path in self.sources])))
 
-        if response.error is not None:
-            # For now, memory files are treated as optional. file_not_found is expected
-            # and we skip silently to allow graceful degradation.
-            if response.error == "file_not_found":
-                return None
-            # Other errors should be raised
-            raise ValueError(f"Failed to download {path}: {response.error}")
+    def _load_memory_from_backend_sync(self, backend: BackendProtocol) -> dict[str, str]:
+        """Load all memory sources from a backend in one batch (synchronous).
 
-        if response.content is not None:
-            return response.content.decode("utf-8")
+        Args:
+            backend: Backend to load from.
 
-        return None
+        Returns:
+            Mapping of source path to content for sources that exist.
+        """
+        return self._collect_memory(cast("list[FileDownloadResponse]", backend.batch([DownloadOp(path) for path in self.sources])))
 
     def before_agent(self, state: MemoryState, runtime: Runtime, config: RunnableConfig) -> MemoryStateUpdate | None:
         """Load memory content before agent execution (synchronous).
@@ -319,13 +314,7 @@ class MemoryMiddleware(AgentMiddleware):
             return None
 
         backend = self._get_backend(state, runtime, config)
-        contents: dict[str, str] = {}
-
-        for path in self.sources:
-            content = self._load_memory_from_backend_sync(backend, path)
-            if content:
-                contents[path] = content
-                logger.debug(f"Loaded memory from: {path}")
+        contents = self._load_memory_from_backend_sync(backend)
 
         return MemoryStateUpdate(memory_contents=contents)
 
@@ -348,13 +337,7 @@ class MemoryMiddleware(AgentMiddleware):
             return None
 
         backend = self._get_backend(state, runtime, config)
-        contents: dict[str, str] = {}
-
-        for path in self.sources:
-            content = await self._load_memory_from_backend(backend, path)
-            if content:
-                contents[path] = content
-                logger.debug(f"Loaded memory from: {path}")
+        contents = await self._load_memory_from_backend(backend)
 
         return MemoryStateUpdate(memory_contents=contents)
 
@@ -367,8 +350,14 @@ class MemoryMiddleware(AgentMiddleware):
         Returns:
             Modified request with memory injected into system message.
         """
-        contents = request.state.get("memory_contents", {})
-        agent_memory = self._format_agent_memory(contents)
+        contents = cast("dict[str, str]", request.state.get("memory_contents", {}))
+        key = (tuple(self.sources), tuple(contents.items()))
+        cached = self._formatted_memory
+        if cached is not None and cached[0] == key:
+            agent_memory = cached[1]
+        else:
+            agent_memory = self._format_agent_memory(contents)
+            self._formatted_memory = (key, agent_memory)
 
         new_system_message = append_to_system_message(request.system_message, agent_memory)
 
@@ -0,0 +1,488 @@
+"""Middleware for injecting a precomputed repository map into the system prompt.
+
+Agents working on a local codebase usually spend their first steps calling `ls` and
+`glob` just to learn its layout. `RepoMapMiddleware` walks the directory once before
+the first model call and gives the agent a compact map instead:
+
+- a directory tree with recursive file counts and sizes,
+- likely entry points (by file name, plus Python files with a `__main__` guard),
+- a language breakdown by file count and size.
+
+The rendered map is cached on disk, keyed by a fingerprint of the tree (every file's
+path, size and mtime), so later runs over an unchanged tree only pay for the walk.
+It is trimmed to a token budget, dropping the deepest tree levels first.
+
+## Usage
+
+```python
+from deepagents import create_deep_agent
+from deepagents.middleware.repo_map import RepoMapMiddleware
+
+agent = create_deep_agent(middleware=[RepoMapMiddleware(root_dir="/path/to/repo")])
+```
+
+Paths in the map are shown relative to `root_dir` with a leading `/`, matching a
+`FilesystemBackend(root_dir=..., virtual_mode=True)`.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import os
+import re
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import TYPE_CHECKING, Annotated, NotRequired, TypedDict, cast
+
+from langchain.agents.middleware.types import (
+    AgentMiddleware,
+    AgentState,
+    ModelRequest,
+    ModelResponse,
+    PrivateStateAttr,
+)
+
+from deepagents.middleware._utils import append_to_system_message
+from deepagents.tokens import count_tokens, truncate_to_tokens
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable, Collection
+
+    from langchain_core.runnables import RunnableConfig
+    from langgraph.runtime import Runtime
+
+logger = logging.getLogger(__name__)
+
+# Bump when the rendered format changes, so stale cache entries are not reused
+_REPO_MAP_VERSION = 2
+# Number of cached maps kept on disk (oldest removed first)
+_MAX_CACHED_MAPS = 64
+# Bytes read from the end of each Python file when looking for a __main__ guard
+_MAIN_GUARD_SCAN_BYTES = 16 * 1024
+_MAIN_GUARD_RE = re.compile(r"""^if\s+__name__\s*==\s*['"]__main__['"]\s*:""", re.MULTILINE)
+# Items listed in the map header before the rest are elided
+_MAX_LANGUAGES = 10
+_MAX_ENTRY_POINTS = 30
+_MAX_ROOT_FILES = 40
+
+DEFAULT_IGNORED_DIRS = frozenset(
+    {
+        ".git",
+        ".hg",
+        ".svn",
+        ".venv",
+        "venv",
+        "env",
+        "node_modules",
+        "__pycache__",
+        ".mypy_cache",
+        ".pytest_cache",
+        ".ruff_cache",
+        ".tox",
+        ".nox",
+        ".eggs",
+        ".idea",
+        ".vscode",
+        ".next",
+        ".cache",
+        "dist",
+        "build",
+        "target",
+        "site-packages",
+    }
+)
+"""Directory names skipped by the walk (in addition to hidden directories other than `.github`)."""
+
+LANGUAGES_BY_SUFFIX = {
+    ".py": "Python",
+    ".pyi": "Python",
+    ".ipynb": "Jupyter Notebook",
+    ".js": "JavaScript",
+    ".jsx": "JavaScript",
+    ".mjs": "JavaScript",
+    ".ts": "TypeScript",
+    ".tsx": "TypeScript",
+    ".go": "Go",
+    ".rs": "Rust",
+    ".java": "Java",
+    ".kt": "Kotlin",
+    ".scala": "Scala",
+    ".rb": "Ruby",
+    ".php": "PHP",
+    ".cs": "C#",
+    ".c": "C",
+    ".h": "C",
+    ".cc": "C++",
+    ".cpp": "C++",
+    ".hpp": "C++",
+    ".swift": "Swift",
+    ".sh": "Shell",
+    ".sql": "SQL",
+    ".html": "HTML",
+    ".css": "CSS",
+    ".scss": "CSS",
+    ".md": "Markdown",
+    ".rst": "reStructuredText",
+    ".json": "JSON",
+    ".yaml": "YAML",
+    ".yml": "YAML",
+    ".toml": "TOML",
+    ".tf": "Terraform",
+}
+
+ENTRY_POINT_NAMES = frozenset(
+    {
+        "__main__.py",
+        "main.py",
+        "app.py",
+        "cli.py",
+        "server.py",
+        "manage.py",
+        "wsgi.py",
+        "asgi.py",
+        "setup.py",
+        "pyproject.toml",
+        "package.json",
+        "Cargo.toml",
+        "go.mod",
+        "pom.xml",
+        "build.gradle",
+        "main.go",
+        "main.rs",
+        "index.js",
+        "index.ts",
+        "server.js",
+        "server.ts",
+        "Makefile",
+        "Dockerfile",
+        "docker-compose.yml",
+        "docker-compose.yaml",
+        "Procfile",
+    }
+)
+"""File names treated as entry points or build/run manifests."""
+
+REPO_MAP_SYSTEM_PROMPT = """<repository_map>
+{repo_map}
+</repository_map>
+
+The repository map above was computed from the working directory when this run started.
+Use it to navigate instead of exploring the layout with `ls` or `glob`: go straight to the directories and files relevant to the task."""
+
+
+class RepoMapState(AgentState):
+    """State schema for `RepoMapMiddleware`.
+
+    Attributes:
+        repo_map: Rendered repository map, computed once per thread.
+            Marked as private so it's not included in the final agent state.
+    """
+
+    repo_map: NotRequired[Annotated[str, PrivateStateAttr]]
+
+
+class RepoMapStateUpdate(TypedDict):
+    """State update for `RepoMapMiddleware`."""
+
+    repo_map: str
+
+
+def _format_size(size: int) -> str:
+    """Human-readable byte size (e.g. 1.2 MB)."""
+    kib = 1024
+    value = float(size)
+    for unit in ("B", "KB", "MB", "GB"):
+        if value < kib or unit == "GB":
+            return f"{value:.0f} {unit}" if unit == "B" else f"{value:.1f} {unit}"
+        value /= kib
+    return f"{value:.1f} GB"
+
+
+def _count(count: int, noun: str) -> str:
+    return f"{count} {noun}" if count == 1 else f"{count} {noun}s"
+
+
+def _language(name: str) -> str | None:
+    if name == "Dockerfile":
+        return "Dockerfile"
+    return LANGUAGES_BY_SUFFIX.get(Path(name).suffix.lower())
+
+
+def _has_main_guard(path: Path, size: int) -> bool:
+    """Whether a Python file ends with an `if __name__ == "__main__":` block.
+
+    Only the last `_MAIN_GUARD_SCAN_BYTES` are read, where the guard conventionally lives.
+    """
+    try:
+        with path.open("rb") as f:
+            if size > _MAIN_GUARD_SCAN_BYTES:
+                f.seek(size - _MAIN_GUARD_SCAN_BYTES)
+            tail = f.read(_MAIN_GUARD_SCAN_BYTES).decode("utf-8", errors="ignore")
+    except OSError:
+        return False
+    return _MAIN_GUARD_RE.search(tail) is not None
+
+
+class RepoMapMiddleware(AgentMiddleware):
+    """Middleware that injects a precomputed repository map into the system prompt.
+
+    The map is built in `before_agent` (once per thread) with a single `os.scandir`
+    walk of `root_dir`, cached on disk by tree fingerprint, and appended to the
+    system message on every model call.
+
+    Args:
+        root_dir: Local directory to map.
+        token_budget: Maximum size of the rendered map, in tokens.
+        cache_dir: Directory for cached maps. Defaults to `$XDG_CACHE_HOME/deepagents/repo_map`
+            (`~/.cache/deepagents/repo_map`). Pass an empty string to disable the disk cache.
+        ignored_dirs: Directory names to skip.
+    """
+
+    state_schema = RepoMapState
+
+    def __init__(
+        self,
+        *,
+        root_dir: str | Path,
+        token_budget: int = 1500,
+        cache_dir: str | Path | None = None,
+        ignored_dirs: Collection[str] = DEFAULT_IGNORED_DIRS,
+    ) -> None:
+        """Initialize the repository map middleware."""
+        self.root_dir = Path(root_dir).resolve()
+        self.token_budget = token_budget
+        if cache_dir is None:
+            cache_home = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+            cache_dir = Path(cache_home) / "deepagents" / "repo_map"
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.ignored_dirs = frozenset(ignored_dirs)
+        # Last formatted prompt section, keyed by the map it was built from
+        self._formatted_section: tuple[str, str] | None = None
+
+    def _walk(self) -> list[tuple[str, int, int]]:
+        """List (relative path, size, mtime_ns) for every regular file, sorted by path."""
+        files: list[tuple[str, int, int]] = []
+        pending = [""]
+        while pending:
+            relative_dir = pending.pop()
+            try:
+                with os.scandir(self.root_dir / relative_dir) as entries:
+                    for entry in entries:
+                        relative = f"{relative_dir}/{entry.name}" if relative_dir else entry.name
+                        if entry.is_dir(follow_symlinks=False):
+                            if entry.name in self.ignored_dirs or (entry.name.startswith(".") and entry.name != ".github"):
+                                continue
+                            pending.append(relative)
+                        elif entry.is_file(follow_symlinks=False):
+                            stat = entry.stat(follow_symlinks=False)
+                            files.append((relative, stat.st_size, stat.st_mtime_ns))
+            except OSError as e:
+                logger.debug("Skipping %s in repository map: %s", relative_dir or "/", e)
+        files.sort()
+        return files
+
+    def _fingerprint(self, files: list[tuple[str, int, int]]) -> str:
+        digest = hashlib.sha256(f"{_REPO_MAP_VERSION}\0{self.token_budget}\n".encode())
+        for relative, size, mtime_ns in files:
+            digest.update(f"{relative}\0{size}\0{mtime_ns}\n".encode())
+        return digest.hexdigest()
+
+    def _header(self, files: list[tuple[str, int, int]], total_size: int) -> list[str]:
+        """Summary lines above the tree: totals, languages, entry points and top-level files."""
+        languages: Counter[str] = Counter()
+        language_sizes: Counter[str] = Counter()
+        entry_points: list[str] = []
+        root_files: list[str] = []
+        for relative, size, _ in files:
+            name = relative.rsplit("/", 1)[-1]
+            if name == relative:
+                root_files.append(relative)
+            language = _language(name)
+            if language is not None:
+                languages[language] += 1
+                language_sizes[language] += size
+            if name in ENTRY_POINT_NAMES:
+                entry_points.append(f"/{relative}")
+            elif name.endswith(".py") and _has_main_guard(self.root_dir / relative, size):
+                entry_points.append(f"/{relative} (__main__)")
+
+        header = [f"Repository map of {self.root_dir.name or '/'} (shown as /): {_count(len(files), 'file')}, {_format_size(total_size)}"]
+        if languages:
+            breakdown = ", ".join(
+                f"{name} {_count(count, 'file')} ({_format_size(language_sizes[name])})" for name, count in languages.most_common(_MAX_LANGUAGES)
+            )
+            header.append(f"Languages: {breakdown}")
+        if entry_points:
+            shown = entry_points[:_MAX_ENTRY_POINTS]
+            more = f", ... ({len(entry_points) - len(shown)} more)" if len(entry_points) > len(shown) else ""
+            header.append(f"Entry points: {', '.join(shown)}{more}")
+        if root_files:
+            more = ", ..." if len(root_files) > _MAX_ROOT_FILES else ""
+            header.append(f"Top-level files: {', '.join(root_files[:_MAX_ROOT_FILES])}{more}")
+        header.append("Directory tree (files, size):")
+        return header
+
+    def _render(self, files: list[tuple[str, int, int]]) -> str:
+        """Render the map for the walked files within the token budget."""
+        dir_counts: Counter[str] = Counter()
+        dir_sizes: Counter[str] = Counter()
+        children: defaultdict[str, set[str]] = defaultdict(set)
+        for relative, size, _ in files:
+            parts = relative.split("/")
+            for depth in range(len(parts)):
+                directory = "/".join(parts[:depth])
+                dir_counts[directory] += 1
+                dir_sizes[directory] += size
+                if depth + 1 < len(parts):
+                    children[directory].add("/".join(parts[: depth + 1]))
+        header = self._header(files, dir_sizes[""])
+
+        def tree(max_depth: int) -> list[str]:
+            lines: list[str] = []
+            stack = [(directory, 1) for directory in sorted(children[""], reverse=True)]
+            while stack:
+                directory, depth = stack.pop()
+                name = directory.rsplit("/", 1)[-1]
+                lines.append(f"{'  ' * depth}{name}/ ({dir_counts[directory]}, {_format_size(dir_sizes[directory])})")
+                if depth < max_depth:
+                    stack.extend((child, depth + 1) for child in sorted(children[directory], reverse=True))
+            return ["/", *lines]
+
+        budget = self.token_budget - count_tokens("\n".join(header) + "\n")
+        max_depth = max((relative.count("/") for relative, _, _ in files), default=0)
+        lines = tree(max_depth)
+        while max_depth > 1 and count_tokens("\n".join(lines)) > budget:
+            max_depth -= 1
+            lines = tree(max_depth)
+        text = "\n".join(lines)
+        if count_tokens(text) > budget:
+            # Keep whole lines only, leaving room for the marker that replaces the rest
+            marker_tokens = count_tokens(f"\n  ... ({len(lines)} more directories)")
+            prefix = truncate_to_tokens(text, max(budget - marker_tokens, 0))
+            kept = prefix[: prefix.rfind("\n") + 1].splitlines()
+            dropped = sum(line != "/" for line in lines[len(kept) :])
+            lines = [*kept, f"  ... ({dropped} more directories)"]
+        return "\n".join(header + lines)
+
+    def _read_cached(self, fingerprint: str) -> str | None:
+        if self.cache_dir is None:
+            return None
+        try:
+            return (self.cache_dir / f"{fingerprint}.txt").read_text(encoding="utf-8")
+        except OSError:
+            return None
+
+    def _write_cached(self, fingerprint: str, repo_map: str) -> None:
+        if self.cache_dir is None:
+            return
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            path = self.cache_dir / f"{fingerprint}.txt"
+            temp_path = path.with_suffix(f".{os.getpid()}.tmp")
+            temp_path.write_text(repo_map, encoding="utf-8")
+            temp_path.replace(path)
+            cached = sorted(self.cache_dir.glob("*.txt"), key=lambda p: p.stat().st_mtime)
+            for stale in cached[:-_MAX_CACHED_MAPS]:
+                stale.unlink(missing_ok=True)
+        except OSError as e:
+            logger.warning("Could not cache repository map in %s: %s", self.cache_dir, e)
+
+    def build_map(self) -> str:
+        """Walk `root_dir` and return its map, from the disk cache when the tree is unchanged."""
+        if not self.root_dir.is_dir():
+            logger.warning("Repository map root %s is not a directory", self.root_dir)
+            return ""
+        files = self._walk()
+        fingerprint = self._fingerprint(files)
+        repo_map = self._read_cached(fingerprint)
+        if repo_map is None:
+            repo_map = self._render(files)
+            self._write_cached(fingerprint, repo_map)
+        else:
+            logger.debug("Loaded repository map for %s from cache", self.root_dir)
+        return repo_map
+
+    def before_agent(self, state: RepoMapState, runtime: Runtime, config: RunnableConfig) -> RepoMapStateUpdate | None:  # noqa: ARG002
+        """Build the repository map before the first model call of a thread.
+
+        Args:
+            state: Current agent state.
+            runtime: Runtime context.
+            config: Runnable config.
+
+        Returns:
+            State update with repo_map populated, or None if already built.
+        """
+        if "repo_map" in state:
+            return None
+        return RepoMapStateUpdate(repo_map=self.build_map())
+
+    async def abefore_agent(self, state: RepoMapState, runtime: Runtime, config: RunnableConfig) -> RepoMapStateUpdate | None:  # noqa: ARG002
+        """(async) Build the repository map before the first model call of a thread.
+
+        Args:
+            state: Current agent state.
+            runtime: Runtime context.
+            config: Runnable config.
+
+        Returns:
+            State update with repo_map populated, or None if already built.
+        """
+        if "repo_map" in state:
+            return None
+        return RepoMapStateUpdate(repo_map=await asyncio.to_thread(self.build_map))
+
+    def modify_request(self, request: ModelRequest) -> ModelRequest:
+        """Inject the repository map into the system message.
+
+        Args:
+            request: Model request to modify.
+
+        Returns:
+            Modified request with the map appended to the system message, or the
+            original request if no map is available.
+        """
+        repo_map = cast("str | None", request.state.get("repo_map"))
+        if not repo_map:
+            return request
+        cached = self._formatted_section
+        if cached is not None and cached[0] == repo_map:
+            section = cached[1]
+        else:
+            section = REPO_MAP_SYSTEM_PROMPT.format(repo_map=repo_map)
+            self._formatted_section = (repo_map, section)
+        return request.override(system_message=append_to_system_message(request.system_message, section))
+
+    def wrap_model_call(
+        self,
+        request: ModelRequest,
+        handler: Callable[[ModelRequest], ModelResponse],
+    ) -> ModelResponse:
+        """Wrap model call to inject the repository map into the system prompt.
+
+        Args:
+            request: Model request being processed.
+            handler: Handler function to call with modified request.
+
+        Returns:
+            Model response from handler.
+        """
+        return handler(self.modify_request(request))
+
+    async def awrap_model_call(
+        self,
+        request: ModelRequest,
+        handler: Callable[[ModelRequest], Awaitable[ModelResponse]],
+    ) -> ModelResponse:
+        """Async wrap model call to inject the repository map into the system prompt.
+
+        Args:
+            request: Model request being processed.
+            handler: Async handler function to call with modified request.
+
+        Returns:
+            Model response from handler.
+        """
+        return await handler(self.modify_request(request))
@@ -93,13 +93,13 @@ from __future__ import annotations
 import logging
 import re
 from pathlib import PurePosixPath
-from typing import TYPE_CHECKING, Annotated
+from typing import TYPE_CHECKING, Annotated, cast
 
 import yaml
 from langchain.agents.middleware.types import PrivateStateAttr
 
 if TYPE_CHECKING:
-    from deepagents.backends.protocol import BACKEND_TYPES, BackendProtocol
+    from deepagents.backends.protocol import BACKEND_TYPES, BackendProtocol, FileDownloadResponse, FileInfo
 
 from collections.abc import Awaitable, Callable
 from typing import NotRequired, TypedDict
@@ -114,6 +114,7 @@ from langchain_core.runnables import RunnableConfig
 from langgraph.prebuilt import ToolRuntime
 from langgraph.runtime import Runtime
 
+from deepagents.backends.protocol import DownloadOp, LsOp
 from deepagents.middleware._utils import append_to_system_message
 
 logger = logging.getLogger(__name__)
@@ -281,51 +282,21 @@ def _parse_skill_metadata(
     )
 
 
-def _list_skills(backend: BackendProtocol, source_path: str) -> list[SkillMetadata]:
-    """List all skills from a backend source.
-
-    Scans backend for subdirectories containing SKILL.md files, downloads their content,
-    parses YAML frontmatter, and returns skill metadata.
-
-    Expected structure:
-        source_path/
-        ├── skill-name/
-        │   ├── SKILL.md        # Required
-        │   └── helper.py       # Optional
-
-    Args:
-        backend: Backend instance to use for file operations
-        source_path: Path to the skills directory in the backend
-
-    Returns:
-        List of skill metadata from successfully parsed SKILL.md files
-    """
-    base_path = source_path
-
-    skills: list[SkillMetadata] = []
-    items = backend.ls_info(base_path)
-    # Find all skill directories (directories containing SKILL.md)
-    skill_dirs = []
+def _skill_md_paths(items: list[FileInfo]) -> list[tuple[str, str]]:
+    """Return (skill_dir, SKILL.md path) for each directory in a source listing."""
+    skill_md_paths = []
     for item in items:
         if not item.get("is_dir"):
             continue
-        skill_dirs.append(item["path"])
-
-    if not skill_dirs:
-        return []
-
-    # For each skill directory, check if SKILL.md exists and download it
-    skill_md_paths = []
-    for skill_dir_path in skill_dirs:
         # Construct SKILL.md path using PurePosixPath for safe, standardized path operations
-        skill_dir = PurePosixPath(skill_dir_path)
-        skill_md_path = str(skill_dir / "SKILL.md")
-        skill_md_paths.append((skill_dir_path, skill_md_path))
+        skill_dir_path = item["path"]
+        skill_md_paths.append((skill_dir_path, str(PurePosixPath(skill_dir_path) / "SKILL.md")))
+    return skill_md_paths
 
-    paths_to_download = [skill_md_path for _, skill_md_path in skill_md_paths]
-    responses = backend.download_files(paths_to_download)
 
-    # Parse each downloaded SKILL.md
+def _parse_skill_downloads(skill_md_paths: list[tuple[str, str]], responses: list[FileDownloadResponse]) -> list[SkillMetadata]:
+    """Parse downloaded SKILL.md files, skipping directories without a valid one."""
+    skills: list[SkillMetadata] = []
     for (skill_dir_path, skill_md_path), response in zip(skill_md_paths, responses, strict=True):
         if response.error:
             # Skill doesn't have a SKILL.md, skip it
@@ -356,11 +327,12 @@ def _list_skills(backend: BackendProtocol, source_path: str) -> list[SkillMetada
     return skills
 
 
-async def _alist_skills(backend: BackendProtocol, source_path: str) -> list[SkillMetadata]:
-    """List all skills from a backend source (async version).
+def _list_skills(backend: BackendProtocol, sources: list[str]) -> list[SkillMetadata]:
+    """List all skills from the given backend sources.
 
-    Scans backend for subdirectories containing SKILL.md files, downloads their content,
-    parses YAML frontmatter, and returns skill metadata.
+    Scans each source for subdirectories containing SKILL.md files, downloads their
+    content, parses YAML frontmatter, and returns skill metadata. All sources are
+    listed in one backend batch and all SKILL.md files downloaded in a second one.
 
     Expected structure:
         source_path/
@@ -370,65 +342,39 @@ async def _alist_skills(backend: BackendProtocol, source_path: str) -> list[Skil
 
     Args:
         backend: Backend instance to use for file operations
-        source_path: Path to the skills directory in the backend
+        sources: Paths to the skills directories in the backend
 
     Returns:
-        List of skill metadata from successfully parsed SKILL.md files
+        List of skill metadata from successfully parsed SKILL.md files, in source order
     """
-    base_path = source_path
-
-    skills: list[SkillMetadata] = []
-    items = await backend.als_info(base_path)
-    # Find all skill directories (directories containing SKILL.md)
-    skill_dirs = []
-    for item in items:
-        if not item.get("is_dir"):
-            continue
-        skill_dirs.append(item["path"])
-
-    if not skill_dirs:
+    listings = cast("list[list[FileInfo]]", backend.batch([LsOp(source_path) for source_path in sources]))
+    skill_md_paths = [md for items in listings for md in _skill_md_paths(items)]
+    if not skill_md_paths:
         return []
 
-    # For each skill directory, check if SKILL.md exists and download it
-    skill_md_paths = []
-    for skill_dir_path in skill_dirs:
-        # Construct SKILL.md path using PurePosixPath for safe, standardized path operations
-        skill_dir = PurePosixPath(skill_dir_path)
-        skill_md_path = str(skill_dir / "SKILL.md")
-        skill_md_paths.append((skill_dir_path, skill_md_path))
-
-    paths_to_download = [skill_md_path for _, skill_md_path in skill_md_paths]
-    responses = await backend.adownload_files(paths_to_download)
+    responses = cast("list[FileDownloadResponse]", backend.batch([DownloadOp(skill_md_path) for _, skill_md_path in skill_md_paths]))
+    return _parse_skill_downloads(skill_md_paths, responses)
 
-    # Parse each downloaded SKILL.md
-    for (skill_dir_path, skill_md_path), response in zip(skill_md_paths, responses, strict=True):
-        if response.error:
-            # Skill doesn't have a SKILL.md, skip it
-            continue
 
-        if response.content is None:
-            logger.warning("Downloaded skill file %s has no content", skill_md_path)
-            continue
+async def _alist_skills(backend: BackendProtocol, sources: list[str]) -> list[SkillMetadata]:
+    """List all skills from the given backend sources (async version).
 
-        try:
-            content = response.content.decode("utf-8")
-        except UnicodeDecodeError as e:
-            logger.warning("Error decoding %s: %s", skill_md_path, e)
-            continue
+    See `_list_skills` for details.
 
-        # Extract directory name from path using PurePosixPath
-        directory_name = PurePosixPath(skill_dir_path).name
+    Args:
+        backend: Backend instance to use for file operations
+        sources: Paths to the skills directories in the backend
 
-        # Parse metadata
-        skill_metadata = _parse_skill_metadata(
-            content=content,
-            skill_path=skill_md_path,
-            directory_name=directory_name,
-        )
-        if skill_metadata:
-            skills.append(skill_metadata)
+    Returns:
+        List of skill metadata from successfully parsed SKILL.md files, in source order
+    """
+    listings = cast("list[list[FileInfo]]", await backend.abatch([LsOp(source_path) for source_path in sources]))
+    skill_md_paths = [md for items in listings for md in _skill_md_paths(items)]
+    if not skill_md_paths:
+        return []
 
-    return skills
+    responses = cast("list[FileDownloadResponse]", await backend.abatch([DownloadOp(skill_md_path) for _, skill_md_path in skill_md_paths]))
+    return _parse_skill_downloads(skill_md_paths, responses)
 
 
 SKILLS_SYSTEM_PROMPT = """
@@ -513,6 +459,8 @@ class SkillsMiddleware(AgentMiddleware):
         self._backend = backend
         self.sources = sources
         self.system_prompt_template = SKILLS_SYSTEM_PROMPT
+        # Last formatted skills section, keyed by its inputs; reused while skills are unchanged
+        self._formatted_section: tuple[tuple, str] | None = None
 
     def _get_backend(self, state: SkillsState, runtime: Runtime, config: RunnableConfig) -> BackendProtocol:
         """Resolve backend from instance or factory.
@@ -573,14 +521,21 @@ class SkillsMiddleware(AgentMiddleware):
         Returns:
             New model request with skills documentation injected into system message
         """
-        skills_metadata = request.state.get("skills_metadata", [])
-        skills_locations = self._format_skills_locations()
-        skills_list = self._format_skills_list(skills_metadata)
-
-        skills_section = self.system_prompt_template.format(
-            skills_locations=skills_locations,
-            skills_list=skills_list,
+        skills_metadata = cast("list[SkillMetadata]", request.state.get("skills_metadata", []))
+        key = (
+            self.system_prompt_template,
+            tuple(self.sources),
+            tuple((skill["name"], skill["description"], skill["path"]) for skill in skills_metadata),
         )
+        cached = self._formatted_section
+        if cached is not None and cached[0] == key:
+            skills_section = cached[1]
+        else:
+            skills_section = self.system_prompt_template.format(
+                skills_locations=self._format_skills_locations(),
+                skills_list=self._format_skills_list(skills_metadata),
+            )
+            self._formatted_section = (key, skills_section)
 
         new_system_message = append_to_system_message(request.system_message, skills_section)
 
@@ -611,12 +566,10 @@ class SkillsMiddleware(AgentMiddleware):
         backend = self._get_backend(state, runtime, config)
         all_skills: dict[str, SkillMetadata] = {}
 
-        # Load skills from each source in order
+        # Skills come back in source order
         # Later sources override earlier ones (last one wins)
-        for source_path in self.sources:
-            source_skills = _list_skills(backend, source_path)
-            for skill in source_skills:
-                all_skills[skill["name"]] = skill
+        for skill in _list_skills(backend, self.sources):
+            all_skills[skill["name"]] = skill
 
         skills = list(all_skills.values())
         return SkillsStateUpdate(skills_metadata=skills)
@@ -646,12 +599,10 @@ class SkillsMiddleware(AgentMiddleware):
         backend = self._get_backend(state, runtime, config)
         all_skills: dict[str, SkillMetadata] = {}
 
-        # Load skills from each source in order
+        # Skills come back in source order
         # Later sources override earlier ones (last one wins)
-        for source_path in self.sources:
-            source_skills = await _alist_skills(backend, source_path)
-            for skill in source_skills:
-                all_skills[skill["name"]] = skill
+        for skill in await _alist_skills(backend, self.sources):
+            all_skills[skill["name"]] = skill
 
         skills = list(all_skills.values())
         return SkillsStateUpdate(skills_metadata=skills)
@@ -1,19 +1,41 @@
-"""Middleware for providing subagents to an agent via a `task` tool."""
-
-from collections.abc import Awaitable, Callable, Sequence
-from typing import Any, NotRequired, TypedDict, cast
+"""Middleware for providing subagents to an agent via `task` and `task_batch` tools."""
+
+import asyncio
+import contextlib
+import contextvars
+import enum
+import functools
+import hashlib
+import json
+import logging
+import threading
+import time
+import types
+from collections import OrderedDict, deque
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterator, Sequence
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Literal, NotRequired, cast
 
 from langchain.agents import create_agent
 from langchain.agents.middleware import HumanInTheLoopMiddleware, InterruptOnConfig
 from langchain.agents.middleware.types import AgentMiddleware, ModelRequest, ModelResponse
 from langchain.tools import BaseTool, ToolRuntime
 from langchain_core.language_models import BaseChatModel
-from langchain_core.messages import HumanMessage, ToolMessage
+from langchain_core.messages import AIMessage, AIMessageChunk, HumanMessage, ToolMessage
 from langchain_core.runnables import Runnable
 from langchain_core.tools import StructuredTool
-from langgraph.types import Command
+from langgraph.pregel import Pregel
+from langgraph.types import Command, StreamMode
+from pydantic import BaseModel, SecretBytes, SecretStr
+from typing_extensions import TypedDict
+
+from deepagents.backends import StateBackend
+from deepagents.backends.protocol import BACKEND_TYPES, StatOp
+from deepagents.middleware._utils import append_to_system_message, tool_args_schema
+from deepagents.middleware.filesystem import _get_backend, _validate_path
 
-from deepagents.middleware._utils import append_to_system_message
+logger = logging.getLogger(__name__)
 
 
 class SubAgent(TypedDict):
@@ -112,6 +134,12 @@ DEFAULT_SUBAGENT_PROMPT = "In order to complete the objective that the user asks
 #    and no clear meaning for returning them from a subagent to the main agent.
 _EXCLUDED_STATE_KEYS = {"messages", "todos", "structured_response"}
 
+# Progress events: subagent tokens are sent in chunks of about this many characters
+# (or after this many seconds), and tool arguments and results are cut to a preview
+_PROGRESS_TOKEN_CHARS = 256
+_PROGRESS_FLUSH_SECONDS = 0.25
+_PROGRESS_PREVIEW_CHARS = 500
+
 TASK_TOOL_DESCRIPTION = """Launch an ephemeral subagent to handle complex, multi-step independent tasks with isolated context windows.
 
 Available agent types and the tools they have access to:
@@ -251,9 +279,701 @@ When NOT to use the task tool:
 - You should use the `task` tool whenever you have a complex task that will take multiple steps, and is independent from other tasks that the agent needs to complete. These agents are highly competent and efficient."""  # noqa: E501
 
 
+TASK_BATCH_TOOL_DESCRIPTION = """Launch several ephemeral subagents at once and wait for all of them.
+
+Each item in `tasks` is one independent task, with the same `description` and `subagent_type` fields as the `task` tool. Up to {max_concurrency} tasks run at the same time; the rest start as earlier ones finish. Each task is stopped after {timeout}.
+
+Returns one section per task, in the order given, with its final report, status, latency and token usage. A failed or timed-out task does not affect the others.
+
+Use this instead of several `task` calls when you have many independent subtasks (e.g. analyzing each of 8 modules separately). Tasks cannot see each other's results, so do not batch tasks that depend on one another."""  # noqa: E501
+
+TASK_BATCH_SYSTEM_PROMPT = """## `task_batch`
+
+To run several independent subagent tasks concurrently, pass them all to one `task_batch` call instead of making separate `task` calls. Each task still gets a detailed, self-contained description."""  # noqa: E501
+
 DEFAULT_GENERAL_PURPOSE_DESCRIPTION = "General-purpose agent for researching complex questions, searching for files and content, and executing multi-step tasks. When you are searching for a keyword or file and are not confident that you will find the right match in the first few tries use this agent to perform the search for you. This agent has access to all tools as the main agent."  # noqa: E501
 
 
+SUBAGENT_RESULTS_PATH = "/subagent_results/"
+"""Directory of the subagent result cache in `result_cache_backend`."""
+
+# Tools whose results the cache can validate, by fingerprinting the files they read
+_CACHEABLE_TOOLS = frozenset({"read_file", "read_files"})
+
+
+def _normalize_description(description: str) -> str:
+    """Normalize a task description for result caching (case, whitespace, trailing punctuation)."""
+    return " ".join(description.casefold().split()).rstrip(".!?;:")
+
+
+def _read_paths(messages: Sequence[Any]) -> set[str] | None:
+    """Collect the files a subagent read with `read_file` / `read_files`.
+
+    Returns:
+        The paths read, or None if the subagent called any other tool. Besides tools
+        with side effects, this excludes searches (`grep`, `glob`, `ls`, ...), whose
+        results depend on files the cache cannot fingerprint.
+    """
+    paths: set[str] = set()
+    for message in messages:
+        if not isinstance(message, AIMessage):
+            continue
+        for call in message.tool_calls:
+            if call["name"] not in _CACHEABLE_TOOLS:
+                return None
+            args = call.get("args") or {}
+            if call["name"] == "read_file":
+                candidates = [args.get("file_path")]
+            elif call["name"] == "read_files":
+                candidates = [entry.get("path") for entry in args.get("files") or [] if isinstance(entry, dict)]
+            else:
+                continue
+            for path in candidates:
+                if isinstance(path, str):
+                    with contextlib.suppress(ValueError):
+                        paths.add(_validate_path(path))
+    return paths
+
+
+def _file_fingerprints(results: list[Any], paths: list[str]) -> dict[str, list[Any] | None]:
+    """Map each path to its (size, modification time), or None if missing, from `StatOp` results."""
+    return {path: [info.get("size"), info.get("modified_at")] if info else None for path, info in zip(paths, results, strict=True)}
+
+
+@dataclass
+class _SubagentResultCache:
+    """Cache of `task` results for subagent runs that only read files.
+
+    Entries are JSON files under `/subagent_results/` in the `store` backend, keyed by
+    subagent type and normalized description. An entry is used while it is younger
+    than `ttl` seconds and every file the subagent read still has the same size and
+    modification time in the `files` backend. Runs that called any tool other than
+    `read_file` and `read_files` (including `grep`, `glob` and `ls`) are not cached.
+    """
+
+    store: BACKEND_TYPES
+    files: BACKEND_TYPES
+    ttl: float | None
+    hits: int = 0
+    misses: int = 0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    @staticmethod
+    def _path(subagent_type: str, description: str) -> str:
+        digest = hashlib.sha256(f"{subagent_type}\0{description}".encode()).hexdigest()[:32]
+        return f"{SUBAGENT_RESULTS_PATH}{digest}.json"
+
+    def _parse(self, content: bytes | None, subagent_type: str, description: str) -> dict[str, Any] | None:
+        """Decode an entry, or None if missing, expired or for another task."""
+        if content is None:
+            return None
+        entry = json.loads(content)
+        if entry.get("subagent_type") != subagent_type or entry.get("description") != description:
+            return None
+        if self.ttl is not None and time.time() - entry["created_at"] > self.ttl:
+            return None
+        return entry
+
+    def _count(self, *, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def lookup(self, runtime: ToolRuntime, subagent_type: str, description: str) -> str | None:
+        """Return the cached result of a task, or None on a miss."""
+        description = _normalize_description(description)
+        entry = None
+        try:
+            response = _get_backend(self.store, runtime).download_files([self._path(subagent_type, description)])[0]
+            entry = self._parse(response.content, subagent_type, description)
+            if entry is not None and entry["files"]:
+                paths = list(entry["files"])
+                results = _get_backend(self.files, runtime).batch([StatOp(path) for path in paths])
+                if _file_fingerprints(results, paths) != entry["files"]:
+                    entry = None
+        except Exception as e:  # noqa: BLE001
+            logger.warning("Subagent result cache lookup failed: %s", e)
+            entry = None
+        self._count(hit=entry is not None)
+        return entry["result"] if entry is not None else None
+
+    async def alookup(self, runtime: ToolRuntime, subagent_type: str, description: str) -> str | None:
+        """Async version of lookup."""
+        description = _normalize_description(description)
+        entry = None
+        try:
+            response = (await _get_backend(self.store, runtime).adownload_files([self._path(subagent_type, description)]))[0]
+            entry = self._parse(response.content, subagent_type, description)
+            if entry is not None and entry["files"]:
+                paths = list(entry["files"])
+                results = await _get_backend(self.files, runtime).abatch([StatOp(path) for path in paths])
+                if _file_fingerprints(results, paths) != entry["files"]:
+                    entry = None
+        except Exception as e:  # noqa: BLE001
+            logger.warning("Subagent result cache lookup failed: %s", e)
+            entry = None
+        self._count(hit=entry is not None)
+        return entry["result"] if entry is not None else None
+
+    def _cacheable_paths(self, result: dict[str, Any], state_update: dict[str, Any]) -> list[str] | None:
+        """Files a run depends on, or None if its result must not be cached.
+
+        Runs that changed state or called other tools than `read_file` and `read_files`
+        are not cached, since replaying them would skip their side effects or repeat a
+        search whose results may have changed.
+        """
+        if state_update:
+            return None
+        paths = _read_paths(result["messages"])
+        return sorted(paths) if paths is not None else None
+
+    def _entry(self, subagent_type: str, description: str, text: str, files: dict[str, Any]) -> tuple[str, bytes]:
+        description = _normalize_description(description)
+        entry = {"subagent_type": subagent_type, "description": description, "result": text, "created_at": time.time(), "files": files}
+        return self._path(subagent_type, description), json.dumps(entry).encode("utf-8")
+
+    def save(
+        self,
+        runtime: ToolRuntime,
+        *,
+        subagent_type: str,
+        description: str,
+        result: dict[str, Any],
+        state_update: dict[str, Any],
+        text: str,
+    ) -> None:
+        """Cache the result of a finished run, if it only read files."""
+        if (paths := self._cacheable_paths(result, state_update)) is None:
+            return
+        try:
+            files = _file_fingerprints(_get_backend(self.files, runtime).batch([StatOp(path) for path in paths]), paths) if paths else {}
+            response = _get_backend(self.store, runtime).upload_files([self._entry(subagent_type, description, text, files)])[0]
+            if response.error:
+                logger.warning("Could not cache subagent result: %s", response.error)
+        except Exception as e:  # noqa: BLE001
+            logger.warning("Could not cache subagent result: %s", e)
+
+    async def asave(
+        self,
+        runtime: ToolRuntime,
+        *,
+        subagent_type: str,
+        description: str,
+        result: dict[str, Any],
+        state_update: dict[str, Any],
+        text: str,
+    ) -> None:
+        """Async version of save."""
+        if (paths := self._cacheable_paths(result, state_update)) is None:
+            return
+        try:
+            files = _file_fingerprints(await _get_backend(self.files, runtime).abatch([StatOp(path) for path in paths]), paths) if paths else {}
+            response = (await _get_backend(self.store, runtime).aupload_files([self._entry(subagent_type, description, text, files)]))[0]
+            if response.error:
+                logger.warning("Could not cache subagent result: %s", response.error)
+        except Exception as e:  # noqa: BLE001
+            logger.warning("Could not cache subagent result: %s", e)
+
+
+class TaskBatchItem(TypedDict):
+    """One task in a `task_batch` call."""
+
+    description: str
+    """Detailed, self-contained instructions for the subagent."""
+
+    subagent_type: str
+    """Name of the subagent to run the task."""
+
+
+class SubagentProgressEvent(TypedDict):
+    """Progress of a running subagent, written to the parent's `custom` stream."""
+
+    type: Literal["subagent_progress"]
+
+    namespace: tuple[str, ...]
+    """`("<subagent type>:<tool call id>",)`, with `/<index>` appended for `task_batch` subtasks."""
+
+    subagent_type: str
+
+    event: Literal["start", "tool_call", "tool_result", "todos", "token", "end"]
+
+    data: Any
+    """`tool_call`: `{"name", "args"}`. `tool_result`: `{"name", "content", "status"}`.
+    `todos`: the todo list. `token`: text. `end`: the task status."""
+
+
+@dataclass
+class _SubtaskResult:
+    """Outcome of one task in a `task_batch` call."""
+
+    subagent_type: str
+    status: str
+    """`completed`, `failed` or `timed out`."""
+
+    seconds: float
+    text: str
+    """Final report of the subagent, or the error."""
+
+    state_update: dict[str, Any]
+    input_tokens: int = 0
+    output_tokens: int = 0
+
+
+@dataclass
+class _StateWrites:
+    """State keys and file paths written while a subagent ran."""
+
+    keys: set[str] = field(default_factory=set)
+    paths: set[str] = field(default_factory=set)
+
+    def record(self, chunk: dict[str, Any]) -> None:
+        """Record one chunk of the `updates` stream (`{node name: node update}`)."""
+        for node, update in chunk.items():
+            if node.startswith("__"):
+                continue
+            for node_update in update if isinstance(update, (list, tuple)) else [update]:
+                if isinstance(node_update, dict):
+                    self.keys.update(node_update)
+                    if isinstance(files := node_update.get("files"), dict):
+                        self.paths.update(files)
+
+    def state_update(self, result: dict[str, Any]) -> dict[str, Any]:
+        """Build the parent's state update: written keys, and only the written files.
+
+        Files deleted by the subagent are returned as `None`, i.e. deleted in the parent.
+        """
+        update = {k: result[k] for k in self.keys if k in result and k not in _EXCLUDED_STATE_KEYS and k != "files"}
+        if self.paths:
+            files = result.get("files") or {}
+            update["files"] = {path: files.get(path) for path in self.paths}
+        return update
+
+
+def _preview(value: object) -> object:
+    """Shorten long strings in a tool call argument or result for progress events."""
+    if isinstance(value, str):
+        return value if len(value) <= _PROGRESS_PREVIEW_CHARS else f"{value[:_PROGRESS_PREVIEW_CHARS]}... ({len(value)} chars)"
+    if isinstance(value, dict):
+        return {k: _preview(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_preview(v) for v in value]
+    return value
+
+
+@dataclass
+class _SubagentProgress:
+    """Forwards a running subagent's tool calls, todos and tokens to the parent stream.
+
+    Token deltas are buffered and flushed every `_PROGRESS_TOKEN_CHARS` characters or
+    `_PROGRESS_FLUSH_SECONDS`, and tool arguments and results are truncated, so the
+    parent stream gets a bounded number of small events however chatty the subagent is.
+    """
+
+    writer: Callable[[Any], None]
+    subagent_type: str
+    task_id: str
+    tokens: list[str] = field(default_factory=list)
+    token_chars: int = 0
+    flushed_at: float = field(default_factory=time.monotonic)
+    closed: bool = False
+
+    def emit(self, event: str, data: object) -> None:
+        if self.closed:
+            return
+        if event != "token":
+            self.flush()
+        self.writer(
+            SubagentProgressEvent(
+                type="subagent_progress",
+                namespace=(f"{self.subagent_type}:{self.task_id}",),
+                subagent_type=self.subagent_type,
+                event=event,  # type: ignore[typeddict-item]
+                data=data,
+            )
+        )
+
+    def flush(self) -> None:
+        if self.tokens:
+            text = "".join(self.tokens)
+            self.tokens.clear()
+            self.token_chars = 0
+            self.flushed_at = time.monotonic()
+            self.emit("token", text)
+
+    def token(self, chunk: object) -> None:
+        """Record one chunk of the `messages` stream (`(message chunk, metadata)`)."""
+        message = chunk[0] if isinstance(chunk, tuple) else chunk
+        if not isinstance(message, AIMessageChunk) or not (text := message.text):
+            return
+        self.tokens.append(text)
+        self.token_chars += len(text)
+        if self.token_chars >= _PROGRESS_TOKEN_CHARS or time.monotonic() - self.flushed_at >= _PROGRESS_FLUSH_SECONDS:
+            self.flush()
+
+    def update(self, chunk: dict[str, Any]) -> None:
+        """Record one chunk of the `updates` stream (`{node name: node update}`)."""
+        for node, update in chunk.items():
+            if node.startswith("__"):
+                continue
+            for node_update in update if isinstance(update, (list, tuple)) else [update]:
+                if not isinstance(node_update, dict):
+                    continue
+                messages = node_update.get("messages")
+                for message in messages if isinstance(messages, list) else []:
+                    if isinstance(message, AIMessage):
+                        for tool_call in message.tool_calls:
+                            self.emit("tool_call", {"name": tool_call["name"], "args": _preview(tool_call["args"])})
+                    elif isinstance(message, ToolMessage):
+                        self.emit("tool_result", {"name": message.name, "content": _preview(message.text), "status": message.status})
+                if isinstance(todos := node_update.get("todos"), list):
+                    self.emit("todos", todos)
+
+    def close(self, status: str) -> None:
+        """Send the final `end` event; later events (e.g. from a timed-out run) are dropped."""
+        self.emit("end", status)
+        self.closed = True
+
+
+def _start_progress(runtime: ToolRuntime, subagent_type: str, index: int | None = None) -> _SubagentProgress | None:
+    """Start forwarding progress of a subagent run to the parent stream, if there is one."""
+    if runtime.stream_writer is None:
+        return None
+    task_id = runtime.tool_call_id or "task"
+    if index is not None:
+        task_id = f"{task_id}/{index}"
+    progress = _SubagentProgress(runtime.stream_writer, subagent_type, task_id)
+    progress.emit("start", None)
+    return progress
+
+
+@contextlib.contextmanager
+def _reporting_end(progress: _SubagentProgress | None) -> Iterator[None]:
+    """Send the `end` progress event when the wrapped subagent run finishes or fails.
+
+    Cancellation (e.g. a `task_batch` timeout) is left to the caller to report.
+    """
+    if progress is None:
+        yield
+        return
+    try:
+        yield
+    except asyncio.CancelledError:
+        raise
+    except BaseException:
+        progress.close("failed")
+        raise
+    progress.close("completed")
+
+
+def _changed_state(subagent_state: dict[str, Any], result: dict[str, Any]) -> dict[str, Any]:
+    """Build the parent's state update from what a subagent returned, keeping only changed values.
+
+    Used for subagents that are not LangGraph graphs, whose writes cannot be tracked.
+    Values the subagent passed through unchanged are the same objects it was given.
+    """
+    update = {k: v for k, v in result.items() if k not in _EXCLUDED_STATE_KEYS and k != "files" and v is not subagent_state.get(k)}
+    files = result.get("files")
+    if isinstance(files, dict):
+        sent_files = subagent_state.get("files") or {}
+        if changed_files := {path: data for path, data in files.items() if sent_files.get(path) is not data}:
+            update["files"] = changed_files
+    return update
+
+
+def _subagent_input(state: dict[str, Any], description: str) -> dict[str, Any]:
+    """Build a subagent's input state from the parent state.
+
+    Values, the files included, are passed by reference rather than copied.
+    """
+    subagent_state = {k: v for k, v in state.items() if k not in _EXCLUDED_STATE_KEYS}
+    subagent_state["messages"] = [HumanMessage(content=description)]
+    return subagent_state
+
+
+def _output_state(subagent: Pregel, values: dict[str, Any]) -> dict[str, Any]:
+    """Restrict a `values` chunk to the graph's output channels, as `invoke` does.
+
+    Drops private state (e.g. the read ledger) that must not reach the parent.
+    """
+    output_keys = subagent.output_channels
+    if isinstance(output_keys, str):
+        return values
+    return {k: v for k, v in values.items() if k in output_keys}
+
+
+def _run_subagent(
+    subagent: Runnable,
+    subagent_state: dict[str, Any],
+    progress: _SubagentProgress | None = None,
+    cancel: threading.Event | None = None,
+) -> tuple[dict[str, Any], dict[str, Any]]:
+    """Run a subagent to completion.
+
+    Args:
+        subagent: The subagent graph or runnable.
+        subagent_state: Its input state.
+        progress: Where to forward the subagent's progress, or `None`. Only graphs
+            report progress; other runnables only get `start` and `end` events.
+        cancel: When set, a graph stops before its next step and the partial result
+            is returned. Other runnables cannot be stopped.
+
+    Returns:
+        The subagent's final state, and the parent state update for what it modified.
+    """
+    with _reporting_end(progress):
+        result: dict[str, Any]
+        if not isinstance(subagent, Pregel):
+            result = subagent.invoke(subagent_state)
+            return result, _changed_state(subagent_state, result)
+        result = subagent_state
+        writes = _StateWrites()
+        stream_mode: list[StreamMode] = ["updates", "values", "messages"] if progress is not None else ["updates", "values"]
+        # With a list of modes, the stream yields (mode, chunk) pairs
+        stream = cast("Iterator[tuple[StreamMode, Any]]", subagent.stream(subagent_state, stream_mode=stream_mode))
+        for mode, chunk in stream:
+            if cancel is not None and cancel.is_set():
+                # Dropping the stream closes it, which stops the graph
+                break
+            if mode == "values":
+                result = chunk
+            elif mode == "updates":
+                writes.record(chunk)
+                if progress is not None:
+                    progress.update(chunk)
+            elif progress is not None:
+                progress.token(chunk)
+        result = _output_state(subagent, result)
+        return result, writes.state_update(result)
+
+
+async def _arun_subagent(
+    subagent: Runnable, subagent_state: dict[str, Any], progress: _SubagentProgress | None = None
+) -> tuple[dict[str, Any], dict[str, Any]]:
+    """Async version of `_run_subagent`."""
+    with _reporting_end(progress):
+        result: dict[str, Any]
+        if not isinstance(subagent, Pregel):
+            result = await subagent.ainvoke(subagent_state)
+            return result, _changed_state(subagent_state, result)
+        result = subagent_state
+        writes = _StateWrites()
+        stream_mode: list[StreamMode] = ["updates", "values", "messages"] if progress is not None else ["updates", "values"]
+        stream = cast("AsyncIterator[tuple[StreamMode, Any]]", subagent.astream(subagent_state, stream_mode=stream_mode))
+        async for mode, chunk in stream:
+            if mode == "values":
+                result = chunk
+            elif mode == "updates":
+                writes.record(chunk)
+                if progress is not None:
+                    progress.update(chunk)
+            elif progress is not None:
+                progress.token(chunk)
+        result = _output_state(subagent, result)
+        return result, writes.state_update(result)
+
+
+def _subagent_token_usage(messages: Sequence[Any]) -> tuple[int, int]:
+    """Sum the input and output tokens reported by a subagent's model calls."""
+    input_tokens = output_tokens = 0
+    for message in messages:
+        if isinstance(message, AIMessage) and message.usage_metadata:
+            input_tokens += message.usage_metadata.get("input_tokens", 0)
+            output_tokens += message.usage_metadata.get("output_tokens", 0)
+    return input_tokens, output_tokens
+
+
+def _format_batch_results(results: list[_SubtaskResult]) -> str:
+    """Format the results of a `task_batch` call, one section per task."""
+    sections = []
+    for number, result in enumerate(results, 1):
+        header = f"## Task {number}/{len(results)} ({result.subagent_type}): {result.status} in {result.seconds:.1f}s"
+        if result.input_tokens or result.output_tokens:
+            header += f", {result.input_tokens} input / {result.output_tokens} output tokens"
+        sections.append(f"{header}\n\n{result.text}")
+    return "\n\n".join(sections)
+
+
+# Compiled subagent graphs shared by all SubAgentMiddleware instances in the process
+_SUBAGENT_GRAPH_CACHE_SIZE = 32
+_subagent_graph_cache: OrderedDict[str, Runnable] = OrderedDict()
+_subagent_graph_cache_lock = threading.Lock()
+
+_FINGERPRINT_MAX_DEPTH = 16
+# Synchronization primitives and pools carry no configuration
+_STATELESS_TYPES: tuple[type, ...] = (
+    type(threading.Lock()),
+    type(threading.RLock()),
+    threading.Condition,
+    threading.Event,
+    threading.Semaphore,
+    Executor,
+)
+
+
+class _NotFingerprintableError(Exception):
+    """Raised for values whose configuration cannot be captured by `_fingerprint`."""
+
+
+def _fingerprint(value: Any, depth: int = 0, path: frozenset[int] = frozenset()) -> Any:  # noqa: ANN401, PLR0911, PLR0912
+    """Build a hashable, comparable description of a configuration value.
+
+    Two values with equal fingerprints build equivalent subagents: models compare by
+    class and fields (secrets by hash), functions by code, defaults and closure
+    contents (so two `lambda rt: FilesystemBackend(root_dir=d)` with different `d`
+    differ), and other objects by class and attributes.
+
+    Raises:
+        _NotFingerprintableError: If the value (or anything it refers to) cannot be described.
+    """
+    if value is None or isinstance(value, (bool, int, float, complex, str, bytes)):
+        return value
+    if isinstance(value, (SecretStr, SecretBytes)):
+        secret = value.get_secret_value()
+        return ("secret", hashlib.sha256(secret.encode() if isinstance(secret, str) else secret).hexdigest())
+    if isinstance(value, enum.Enum):
+        return (_qualified_name(type(value)), value.name)
+    if isinstance(value, type):
+        return ("type", _qualified_name(value))
+    if isinstance(value, _STATELESS_TYPES):
+        return ("stateless", _qualified_name(type(value)))
+    if depth >= _FINGERPRINT_MAX_DEPTH:
+        msg = f"configuration nested too deeply at {type(value).__name__}"
+        raise _NotFingerprintableError(msg)
+    if id(value) in path:
+        # Reference back to an enclosing object, e.g. a middleware's own bound method
+        return ("cycle", _qualified_name(type(value)))
+    path |= {id(value)}
+
+    def fp(item: Any) -> Any:  # noqa: ANN401
+        return _fingerprint(item, depth + 1, path)
+
+    if isinstance(value, (list, tuple, deque)):
+        return (type(value).__name__, tuple(fp(item) for item in value))
+    if isinstance(value, (set, frozenset)):
+        return ("set", tuple(sorted((fp(item) for item in value), key=repr)))
+    if isinstance(value, dict):
+        return ("dict", tuple(sorted(((fp(k), fp(v)) for k, v in value.items()), key=repr)))
+    if isinstance(value, types.CodeType):
+        return ("code", value.co_code, tuple(fp(const) for const in value.co_consts), value.co_names)
+    if isinstance(value, types.FunctionType):
+        closure = tuple(fp(cell.cell_contents) if cell.cell_contents is not value else "self" for cell in value.__closure__ or ())
+        return ("function", value.__module__, value.__qualname__, fp(value.__code__), fp(value.__defaults__), fp(value.__kwdefaults__), closure)
+    if isinstance(value, types.MethodType):
+        return ("method", fp(value.__func__), fp(value.__self__))
+    if isinstance(value, functools.partial):
+        return ("partial", fp(value.func), fp(value.args), fp(value.keywords))
+    if isinstance(value, (types.BuiltinFunctionType, types.ModuleType)):
+        return ("builtin", getattr(value, "__module__", None), value.__name__)
+    if isinstance(value, BaseModel):
+        fields = type(value).model_fields
+        return (
+            _qualified_name(type(value)),
+            tuple((name, fp(getattr(value, name, None))) for name, info in fields.items() if not info.exclude),
+        )
+    if hasattr(value, "__dict__"):
+        return (_qualified_name(type(value)), fp(vars(value)))
+    msg = f"cannot describe the configuration of {type(value).__name__}"
+    raise _NotFingerprintableError(msg)
+
+
+def _qualified_name(cls: type) -> str:
+    return f"{cls.__module__}.{cls.__qualname__}"
+
+
+def _subagent_graph_cache_key(
+    name: str,
+    model: str | BaseChatModel,
+    system_prompt: str,
+    tools: Sequence[BaseTool | Callable | dict[str, Any]],
+    middleware: Sequence[AgentMiddleware],
+) -> str | None:
+    """Key a subagent's compiled graph by its configuration.
+
+    Must be called before the middleware is used, since it describes the middleware
+    instances by their current attributes (counters and caches included).
+
+    Returns:
+        The key, or None if some part of the configuration cannot be described, in
+        which case the graph is not shared.
+    """
+    try:
+        description = _fingerprint((name, model, system_prompt, list(tools), list(middleware)))
+    except _NotFingerprintableError as e:
+        logger.debug("Not caching the compiled graph of subagent %s: %s", name, e)
+        return None
+    return hashlib.sha256(repr(description).encode("utf-8", errors="replace")).hexdigest()
+
+
+@dataclass
+class _LazySubAgentGraph:
+    """A subagent whose graph is compiled on first use.
+
+    Graphs are shared process-wide between subagents with the same cache key, so
+    repeated `create_deep_agent` calls with the same configuration compile each
+    subagent at most once.
+    """
+
+    name: str
+    model: str | BaseChatModel
+    system_prompt: str
+    tools: Sequence[BaseTool | Callable | dict[str, Any]]
+    middleware: list[AgentMiddleware]
+    cache_key: str | None
+    _graph: Runnable | None = field(default=None, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def get(self) -> Runnable:
+        """Return the compiled graph, compiling it (or taking it from the cache) on first use."""
+        if self._graph is not None:
+            return self._graph
+        with self._lock:
+            if self._graph is None:
+                self._graph = self._cached_or_compiled()
+        return self._graph
+
+    def _cached_or_compiled(self) -> Runnable:
+        if self.cache_key is not None:
+            with _subagent_graph_cache_lock:
+                graph = _subagent_graph_cache.get(self.cache_key)
+                if graph is not None:
+                    _subagent_graph_cache.move_to_end(self.cache_key)
+                    return graph
+        graph = create_agent(
+            self.model,
+            system_prompt=self.system_prompt,
+            tools=self.tools,
+            middleware=self.middleware,
+            name=self.name,
+        )
+        if self.cache_key is not None:
+            with _subagent_graph_cache_lock:
+                # Keep the graph compiled first if another thread raced us
+                graph = _subagent_graph_cache.setdefault(self.cache_key, graph)
+                _subagent_graph_cache.move_to_end(self.cache_key)
+                while len(_subagent_graph_cache) > _SUBAGENT_GRAPH_CACHE_SIZE:
+                    _subagent_graph_cache.popitem(last=False)
+        return graph
+
+
+def _lazy_subagent_graph(
+    name: str,
+    model: str | BaseChatModel,
+    system_prompt: str,
+    tools: Sequence[BaseTool | Callable | dict[str, Any]],
+    middleware: list[AgentMiddleware],
+) -> _LazySubAgentGraph:
+    return _LazySubAgentGraph(
+        name=name,
+        model=model,
+        system_prompt=system_prompt,
+        tools=tools,
+        middleware=middleware,
+        cache_key=_subagent_graph_cache_key(name, model, system_prompt, tools, middleware),
+    )
+
+
 def _get_subagents(
     *,
     default_model: str | BaseChatModel,
@@ -277,12 +997,13 @@ def _get_subagents(
 
     Returns:
         Tuple of (agent_dict, description_list) where agent_dict maps agent names
-        to runnable instances and description_list contains formatted descriptions.
+        to runnable instances (or, for agent specifications, `_LazySubAgentGraph`s
+        compiled on first use) and description_list contains formatted descriptions.
     """
     # Use empty list if None (no default middleware)
     default_subagent_middleware = default_middleware or []
 
-    agents: dict[str, Any] = {}
+    agents: dict[str, Runnable | _LazySubAgentGraph] = {}
     subagent_descriptions = []
 
     # Create general-purpose agent if enabled
@@ -290,14 +1011,13 @@ def _get_subagents(
         general_purpose_middleware = [*default_subagent_middleware]
         if default_interrupt_on:
             general_purpose_middleware.append(HumanInTheLoopMiddleware(interrupt_on=default_interrupt_on))
-        general_purpose_subagent = create_agent(
+        agents["general-purpose"] = _lazy_subagent_graph(
+            "general-purpose",
             default_model,
-            system_prompt=DEFAULT_SUBAGENT_PROMPT,
-            tools=default_tools,
-            middleware=general_purpose_middleware,
-            name="general-purpose",
+            DEFAULT_SUBAGENT_PROMPT,
+            default_tools,
+            general_purpose_middleware,
         )
-        agents["general-purpose"] = general_purpose_subagent
         subagent_descriptions.append(f"- general-purpose: {DEFAULT_GENERAL_PURPOSE_DESCRIPTION}")
 
     # Process custom subagents
@@ -317,17 +1037,42 @@ def _get_subagents(
         if interrupt_on:
             _middleware.append(HumanInTheLoopMiddleware(interrupt_on=interrupt_on))
 
-        agents[agent_["name"]] = create_agent(
+        agents[agent_["name"]] = _lazy_subagent_graph(
+            agent_["name"],
             subagent_model,
-            system_prompt=agent_["system_prompt"],
-            tools=_tools,
-            middleware=_middleware,
-            name=agent_["name"],
+            agent_["system_prompt"],
+            _tools,
+            _middleware,
         )
     return agents, subagent_descriptions
 
 
-def _create_task_tool(
+def _final_text(result: dict) -> str:
+    """Extract the final message text from a subagent's final state."""
+    # Validate that the result contains a 'messages' key
+    if "messages" not in result:
+        error_msg = (
+            "CompiledSubAgent must return a state containing a 'messages' key. "
+            "Custom StateGraphs used with CompiledSubAgent should include 'messages' "
+            "in their state schema to communicate results back to the main agent."
+        )
+        raise ValueError(error_msg)
+
+    # Strip trailing whitespace to prevent API errors with Anthropic
+    return result["messages"][-1].text.rstrip() if result["messages"][-1].text else ""
+
+
+def _validate_and_prepare_state(
+    subagent_graphs: dict[str, Runnable], subagent_type: str, description: str, runtime: ToolRuntime
+) -> tuple[Runnable, dict]:
+    """Prepare state for invocation."""
+    subagent = subagent_graphs[subagent_type]
+    if isinstance(subagent, _LazySubAgentGraph):
+        subagent = subagent.get()
+    return subagent, _subagent_input(runtime.state, description)
+
+
+def _create_task_tools(
     *,
     default_model: str | BaseChatModel,
     default_tools: Sequence[BaseTool | Callable | dict[str, Any]],
@@ -336,8 +1081,12 @@ def _create_task_tool(
     subagents: list[SubAgent | CompiledSubAgent],
     general_purpose_agent: bool,
     task_description: str | None = None,
-) -> BaseTool:
-    """Create a task tool for invoking subagents.
+    max_concurrent_tasks: int | None = None,
+    task_timeout: float | None = None,
+    result_cache: _SubagentResultCache | None = None,
+    stream_progress: bool = False,
+) -> list[BaseTool]:
+    """Create the task tools for invoking subagents.
 
     Args:
         default_model: Default model for subagents.
@@ -349,9 +1098,17 @@ def _create_task_tool(
         general_purpose_agent: Whether to include general-purpose agent.
         task_description: Custom description for the task tool. If `None`,
             uses default template. Supports `{available_agents}` placeholder.
+        max_concurrent_tasks: Maximum number of subagents a `task_batch` call runs
+            at the same time. If `None`, no `task_batch` tool is created.
+        task_timeout: Seconds after which a `task_batch` subtask is stopped, or `None`
+            for no limit. A sync subtask stops before its next step.
+        result_cache: Cache of results of subagent runs that only read files, or `None`
+            to always run the subagent.
+        stream_progress: Whether to forward subagent progress to the parent's `custom`
+            stream as `SubagentProgressEvent`s.
 
     Returns:
-        A StructuredTool that can invoke subagents by type.
+        The `task` tool, followed by the `task_batch` tool if enabled.
     """
     subagent_graphs, subagent_descriptions = _get_subagents(
         default_model=default_model,
@@ -363,19 +1120,7 @@ def _create_task_tool(
     )
     subagent_description_str = "\n".join(subagent_descriptions)
 
-    def _return_command_with_state_update(result: dict, tool_call_id: str) -> Command:
-        # Validate that the result contains a 'messages' key
-        if "messages" not in result:
-            error_msg = (
-                "CompiledSubAgent must return a state containing a 'messages' key. "
-                "Custom StateGraphs used with CompiledSubAgent should include 'messages' "
-                "in their state schema to communicate results back to the main agent."
-            )
-            raise ValueError(error_msg)
-
-        state_update = {k: v for k, v in result.items() if k not in _EXCLUDED_STATE_KEYS}
-        # Strip trailing whitespace to prevent API errors with Anthropic
-        message_text = result["messages"][-1].text.rstrip() if result["messages"][-1].text else ""
+    def _return_command_with_state_update(message_text: str, state_update: dict[str, Any], tool_call_id: str) -> Command:
         return Command(
             update={
                 **state_update,
@@ -383,14 +1128,6 @@ def _create_task_tool(
             }
         )
 
-    def _validate_and_prepare_state(subagent_type: str, description: str, runtime: ToolRuntime) -> tuple[Runnable, dict]:
-        """Prepare state for invocation."""
-        subagent = subagent_graphs[subagent_type]
-        # Create a new state dict to avoid mutating the original
-        subagent_state = {k: v for k, v in runtime.state.items() if k not in _EXCLUDED_STATE_KEYS}
-        subagent_state["messages"] = [HumanMessage(content=description)]
-        return subagent, subagent_state
-
     # Use custom description if provided, otherwise use default template
     if task_description is None:
         task_description = TASK_TOOL_DESCRIPTION.format(available_agents=subagent_description_str)
@@ -406,12 +1143,22 @@ def _create_task_tool(
         if subagent_type not in subagent_graphs:
             allowed_types = ", ".join([f"`{k}`" for k in subagent_graphs])
             return f"We cannot invoke subagent {subagent_type} because it does not exist, the only allowed types are {allowed_types}"
-        subagent, subagent_state = _validate_and_prepare_state(subagent_type, description, runtime)
-        result = subagent.invoke(subagent_state)
+        state_update: dict[str, Any] = {}
+        if result_cache is not None and (cached := result_cache.lookup(runtime, subagent_type, description)) is not None:
+            message_text = cached
+        else:
+            subagent, subagent_state = _validate_and_prepare_state(subagent_graphs, subagent_type, description, runtime)
+            progress = _start_progress(runtime, subagent_type) if stream_progress else None
+            result, state_update = _run_subagent(subagent, subagent_state, progress)
+            message_text = _final_text(result)
+            if result_cache is not None:
+                result_cache.save(
+                    runtime, subagent_type=subagent_type, description=description, result=result, state_update=state_update, text=message_text
+                )
         if not runtime.tool_call_id:
             value_error_msg = "Tool call ID is required for subagent invocation"
             raise ValueError(value_error_msg)
-        return _return_command_with_state_update(result, runtime.tool_call_id)
+        return _return_command_with_state_update(message_text, state_update, runtime.tool_call_id)
 
     async def atask(
         description: str,
@@ -421,25 +1168,266 @@ def _create_task_tool(
         if subagent_type not in subagent_graphs:
             allowed_types = ", ".join([f"`{k}`" for k in subagent_graphs])
             return f"We cannot invoke subagent {subagent_type} because it does not exist, the only allowed types are {allowed_types}"
-        subagent, subagent_state = _validate_and_prepare_state(subagent_type, description, runtime)
-        result = await subagent.ainvoke(subagent_state)
+        state_update: dict[str, Any] = {}
+        if result_cache is not None and (cached := await result_cache.alookup(runtime, subagent_type, description)) is not None:
+            message_text = cached
+        else:
+            subagent, subagent_state = _validate_and_prepare_state(subagent_graphs, subagent_type, description, runtime)
+            progress = _start_progress(runtime, subagent_type) if stream_progress else None
+            result, state_update = await _arun_subagent(subagent, subagent_state, progress)
+            message_text = _final_text(result)
+            if result_cache is not None:
+                await result_cache.asave(
+                    runtime, subagent_type=subagent_type, description=description, result=result, state_update=state_update, text=message_text
+                )
         if not runtime.tool_call_id:
             value_error_msg = "Tool call ID is required for subagent invocation"
             raise ValueError(value_error_msg)
-        return _return_command_with_state_update(result, runtime.tool_call_id)
+        return _return_command_with_state_update(message_text, state_update, runtime.tool_call_id)
 
-    return StructuredTool.from_function(
+    task_tool = StructuredTool.from_function(
         name="task",
         func=task,
+        args_schema=tool_args_schema("task", task),
         coroutine=atask,
         description=task_description,
     )
+    if max_concurrent_tasks is None:
+        return [task_tool]
+
+    return [
+        task_tool,
+        _create_task_batch_tool(_TaskBatch(subagent_graphs, max_concurrent_tasks, task_timeout, result_cache, stream_progress)),
+    ]
+
+
+@dataclass
+class _RunningSubtask:
+    """A `task_batch` subtask running in a worker thread."""
+
+    index: int
+    started: float
+    cancel: threading.Event
+    """Set to stop the subagent before its next step."""
+
+    progress: _SubagentProgress | None
+
+
+@dataclass(frozen=True)
+class _TaskBatch:
+    """Runs the tasks of `task_batch` calls concurrently.
+
+    Sync calls run each subtask in its own thread, with a cancel event that stops the
+    subagent before its next step once the subtask times out; async calls cancel the
+    subtask's coroutine. Subagents that are not LangGraph graphs cannot be stopped
+    early in sync calls, but their late results are discarded.
+    """
+
+    subagent_graphs: dict[str, Runnable]
+    max_concurrent_tasks: int
+    task_timeout: float | None
+    result_cache: _SubagentResultCache | None
+    stream_progress: bool
+
+    @property
+    def timeout_text(self) -> str:
+        return f"{self.task_timeout:g} seconds" if self.task_timeout is not None else "no time limit"
+
+    def _unknown_subagent(self, item: TaskBatchItem) -> _SubtaskResult | None:
+        if item["subagent_type"] in self.subagent_graphs:
+            return None
+        allowed_types = ", ".join([f"`{k}`" for k in self.subagent_graphs])
+        text = f"Subagent {item['subagent_type']} does not exist, the only allowed types are {allowed_types}"
+        return _SubtaskResult(item["subagent_type"], "failed", 0.0, text, {})
+
+    @staticmethod
+    def _cached(item: TaskBatchItem, text: str) -> _SubtaskResult:
+        return _SubtaskResult(item["subagent_type"], "completed (cached)", 0.0, text, {})
+
+    @staticmethod
+    def _finished(item: TaskBatchItem, outcome: tuple[dict, dict[str, Any]], started: float) -> _SubtaskResult:
+        result, state_update = outcome
+        input_tokens, output_tokens = _subagent_token_usage(result["messages"])
+        seconds = time.perf_counter() - started
+        return _SubtaskResult(item["subagent_type"], "completed", seconds, _final_text(result), state_update, input_tokens, output_tokens)
+
+    @staticmethod
+    def _failed(item: TaskBatchItem, error: BaseException, started: float) -> _SubtaskResult:
+        logger.warning("task_batch subtask (%s) failed: %s", item["subagent_type"], error)
+        return _SubtaskResult(item["subagent_type"], "failed", time.perf_counter() - started, f"Error: {type(error).__name__}: {error}", {})
+
+    def _timed_out(self, item: TaskBatchItem, seconds: float) -> _SubtaskResult:
+        return _SubtaskResult(item["subagent_type"], "timed out", seconds, f"The subagent did not finish within {self.timeout_text}.", {})
+
+    def _progress(self, runtime: ToolRuntime, item: TaskBatchItem, index: int) -> _SubagentProgress | None:
+        return _start_progress(runtime, item["subagent_type"], index) if self.stream_progress else None
+
+    @staticmethod
+    def _command(results: list[_SubtaskResult], runtime: ToolRuntime) -> Command:
+        if not runtime.tool_call_id:
+            value_error_msg = "Tool call ID is required for subagent invocation"
+            raise ValueError(value_error_msg)
+        # Later tasks win on conflicting keys; files are merged per path
+        state_update: dict[str, Any] = {}
+        for result in results:
+            for key, value in result.state_update.items():
+                if key == "files" and isinstance(value, dict) and isinstance(state_update.get(key), dict):
+                    state_update[key] = {**state_update[key], **value}
+                else:
+                    state_update[key] = value
+        return Command(
+            update={
+                **state_update,
+                "messages": [ToolMessage(_format_batch_results(results), tool_call_id=runtime.tool_call_id)],
+            }
+        )
+
+    def _collect(self, item: TaskBatchItem, future: Future, started: float, runtime: ToolRuntime) -> _SubtaskResult:
+        """Turn a finished subtask into its result, caching it if possible."""
+        try:
+            outcome = future.result()
+            finished = self._finished(item, outcome, started)
+        except Exception as e:  # noqa: BLE001
+            return self._failed(item, e, started)
+        if self.result_cache is not None:
+            result, state_update = outcome
+            self.result_cache.save(
+                runtime,
+                subagent_type=item["subagent_type"],
+                description=item["description"],
+                result=result,
+                state_update=state_update,
+                text=finished.text,
+            )
+        return finished
+
+    def _expire(self, tasks: list[TaskBatchItem], running: dict[Future, _RunningSubtask], results: list[_SubtaskResult | None]) -> None:
+        """Stop the running subtasks that are past the timeout and report them as timed out."""
+        if self.task_timeout is None:
+            return
+        now = time.perf_counter()
+        for future, subtask in list(running.items()):
+            if now - subtask.started >= self.task_timeout:
+                del running[future]
+                subtask.cancel.set()
+                results[subtask.index] = self._timed_out(tasks[subtask.index], now - subtask.started)
+                if subtask.progress is not None:
+                    subtask.progress.close("timed out")
+
+    def run(self, tasks: list[TaskBatchItem], runtime: ToolRuntime) -> Command:
+        """Run the tasks in worker threads, at most `max_concurrent_tasks` at a time."""
+        results: list[_SubtaskResult | None] = [self._unknown_subagent(item) for item in tasks]
+        queued = deque(index for index, result in enumerate(results) if result is None)
+        running: dict[Future, _RunningSubtask] = {}
+        # One thread per task, so a timed-out subagent that is still finishing its
+        # current step does not hold up the queued tasks
+        executor = ThreadPoolExecutor(max_workers=max(1, len(queued)), thread_name_prefix="task_batch")
+        try:
+            while queued or running:
+                while queued and len(running) < self.max_concurrent_tasks:
+                    index = queued.popleft()
+                    item = tasks[index]
+                    if (
+                        self.result_cache is not None
+                        and (cached := self.result_cache.lookup(runtime, item["subagent_type"], item["description"])) is not None
+                    ):
+                        results[index] = self._cached(item, cached)
+                        continue
+                    subagent, subagent_state = _validate_and_prepare_state(self.subagent_graphs, item["subagent_type"], item["description"], runtime)
+                    subtask = _RunningSubtask(index, time.perf_counter(), threading.Event(), self._progress(runtime, item, index))
+                    context = contextvars.copy_context()
+                    running[executor.submit(context.run, _run_subagent, subagent, subagent_state, subtask.progress, subtask.cancel)] = subtask
+                if not running:
+                    # Every remaining task was a cache hit
+                    break
+                timeout = None
+                if self.task_timeout is not None:
+                    timeout = max(0.0, min(subtask.started for subtask in running.values()) + self.task_timeout - time.perf_counter())
+                done, _ = wait(running, timeout=timeout, return_when=FIRST_COMPLETED)
+                for future in done:
+                    subtask = running.pop(future)
+                    results[subtask.index] = self._collect(tasks[subtask.index], future, subtask.started, runtime)
+                self._expire(tasks, running, results)
+        finally:
+            for subtask in running.values():
+                subtask.cancel.set()
+            executor.shutdown(wait=False)
+        return self._command(cast("list[_SubtaskResult]", results), runtime)
+
+    async def _arun_one(self, index: int, item: TaskBatchItem, runtime: ToolRuntime, semaphore: asyncio.Semaphore) -> _SubtaskResult:
+        if (unknown := self._unknown_subagent(item)) is not None:
+            return unknown
+        if (
+            self.result_cache is not None
+            and (cached := await self.result_cache.alookup(runtime, item["subagent_type"], item["description"])) is not None
+        ):
+            return self._cached(item, cached)
+        subagent, subagent_state = _validate_and_prepare_state(self.subagent_graphs, item["subagent_type"], item["description"], runtime)
+        async with semaphore:
+            started = time.perf_counter()
+            progress = self._progress(runtime, item, index)
+            try:
+                outcome = await asyncio.wait_for(_arun_subagent(subagent, subagent_state, progress), timeout=self.task_timeout)
+                finished = self._finished(item, outcome, started)
+            except TimeoutError:
+                if progress is not None:
+                    progress.close("timed out")
+                return self._timed_out(item, time.perf_counter() - started)
+            except Exception as e:  # noqa: BLE001
+                return self._failed(item, e, started)
+        if self.result_cache is not None:
+            result, state_update = outcome
+            await self.result_cache.asave(
+                runtime,
+                subagent_type=item["subagent_type"],
+                description=item["description"],
+                result=result,
+                state_update=state_update,
+                text=finished.text,
+            )
+        return finished
+
+    async def arun(self, tasks: list[TaskBatchItem], runtime: ToolRuntime) -> Command:
+        """Async version of `run`: the tasks run as coroutines under a semaphore."""
+        semaphore = asyncio.Semaphore(self.max_concurrent_tasks)
+        results = await asyncio.gather(*(self._arun_one(index, item, runtime, semaphore) for index, item in enumerate(tasks)))
+        return self._command(list(results), runtime)
+
+
+def _create_task_batch_tool(batch: _TaskBatch) -> BaseTool:
+    """Create the `task_batch` tool, which runs several subagents concurrently."""
+
+    def task_batch(
+        tasks: list[TaskBatchItem],
+        runtime: ToolRuntime,
+    ) -> str | Command:
+        if not tasks:
+            return "No tasks given."
+        return batch.run(tasks, runtime)
+
+    async def atask_batch(
+        tasks: list[TaskBatchItem],
+        runtime: ToolRuntime,
+    ) -> str | Command:
+        if not tasks:
+            return "No tasks given."
+        return await batch.arun(tasks, runtime)
+
+    return StructuredTool.from_function(
+        name="task_batch",
+        func=task_batch,
+        args_schema=tool_args_schema("task_batch", task_batch),
+        coroutine=atask_batch,
+        description=TASK_BATCH_TOOL_DESCRIPTION.format(max_concurrency=batch.max_concurrent_tasks, timeout=batch.timeout_text),
+    )
 
 
 class SubAgentMiddleware(AgentMiddleware):
     """Middleware for providing subagents to an agent via a `task` tool.
 
-    This  middleware adds a `task` tool to the agent that can be used to invoke subagents.
+    This  middleware adds a `task` tool to the agent that can be used to invoke subagents,
+    and, if `max_concurrent_tasks` is set, a `task_batch` tool that runs several
+    subagents concurrently.
     Subagents are useful for handling complex tasks that require multiple steps, or tasks
     that require a lot of context to resolve.
 
@@ -472,6 +1460,35 @@ class SubAgentMiddleware(AgentMiddleware):
         task_description: Custom description for the task tool.
 
             If `None`, uses the default description template.
+        max_concurrent_tasks: Maximum number of subagents a single `task_batch` call
+            runs at the same time.
+
+            If `None` (default), the `task_batch` tool is not added.
+        task_timeout: Seconds after which a `task_batch` subtask is stopped and reported
+            as timed out. Only used with `max_concurrent_tasks`; `task` calls have no
+            time limit.
+
+            If `None`, subtasks have no time limit.
+        backend: Backend the subagents read files from, used to check whether files a
+            cached result depends on have changed. Defaults to `StateBackend`.
+        result_cache_backend: Backend (or factory) to cache `task` results in, under
+            `/subagent_results/`. Use a `StoreBackend` to reuse results across threads.
+
+            Only runs that called no tools other than `read_file` and `read_files` and
+            changed no state are cached, keyed by subagent type and normalized description.
+            A cached result is reused until it expires or a file the subagent read changes.
+
+            If `None` (default), results are not cached.
+        result_cache_ttl: Seconds a cached result stays valid, or `None` for no expiry.
+        stream_progress: Whether to forward each running subagent's tool calls, todo
+            updates and tokens to the parent's stream while it runs.
+
+            Events are `SubagentProgressEvent` dicts written to the `custom` stream mode
+            (e.g. `agent.astream(..., stream_mode=["updates", "custom"])`), tagged with a
+            namespace per task. Tokens are sent in small batches and tool arguments and
+            results are truncated, so a chatty subagent cannot flood the stream.
+
+            Defaults to `False`: subagents then run without the `messages` stream mode.
 
     Example:
         ```python
@@ -514,11 +1531,31 @@ class SubAgentMiddleware(AgentMiddleware):
         system_prompt: str | None = TASK_SYSTEM_PROMPT,
         general_purpose_agent: bool = True,
         task_description: str | None = None,
+        max_concurrent_tasks: int | None = None,
+        task_timeout: float | None = 600,
+        backend: BACKEND_TYPES | None = None,
+        result_cache_backend: BACKEND_TYPES | None = None,
+        result_cache_ttl: float | None = 3600,
+        stream_progress: bool = False,
     ) -> None:
         """Initialize the `SubAgentMiddleware`."""
         super().__init__()
+        if max_concurrent_tasks is not None and max_concurrent_tasks < 1:
+            msg = f"max_concurrent_tasks must be at least 1, got {max_concurrent_tasks}"
+            raise ValueError(msg)
+        if system_prompt is not None and max_concurrent_tasks is not None:
+            system_prompt = f"{system_prompt}\n\n{TASK_BATCH_SYSTEM_PROMPT}"
         self.system_prompt = system_prompt
-        task_tool = _create_task_tool(
+        self.result_cache = (
+            _SubagentResultCache(
+                store=result_cache_backend,
+                files=backend if backend is not None else (lambda rt: StateBackend(rt)),
+                ttl=result_cache_ttl,
+            )
+            if result_cache_backend is not None
+            else None
+        )
+        self.tools = _create_task_tools(
             default_model=default_model,
             default_tools=default_tools or [],
             default_middleware=default_middleware,
@@ -526,8 +1563,11 @@ class SubAgentMiddleware(AgentMiddleware):
             subagents=subagents or [],
             general_purpose_agent=general_purpose_agent,
             task_description=task_description,
+            max_concurrent_tasks=max_concurrent_tasks,
+            task_timeout=task_timeout,
+            result_cache=self.result_cache,
+            stream_progress=stream_progress,
         )
-        self.tools = [task_tool]
 
     def wrap_model_call(
         self,
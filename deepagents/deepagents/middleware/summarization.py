@@ -22,21 +22,53 @@ middleware = SummarizationMiddleware(
 agent = create_deep_agent(middleware=[middleware])
 ```
 
+## Background pre-summarization
+
+With `presummarize_at` set below the trigger (e.g. `("fraction", 0.7)` with a trigger
+of `("fraction", 0.85)`), the older prefix of the conversation is summarized in a
+background thread once the context passes that watermark. When the trigger fires,
+the precomputed summary is spliced in instead of calling the model on the critical
+path, provided the prefix it covers is unchanged and the result falls back below the
+watermark; otherwise summarization runs synchronously as usual.
+
+## Pruning stale tool results
+
+With `prune_tool_results_after` set, the trigger first prunes old `ToolMessage`
+bodies the model has already acted on: results older than that many turns (model
+calls), and `read_file` results superseded by a later read of the same file and range.
+Their content is saved under `/large_tool_results/` and replaced in place by a short
+stub pointing to it. The LLM summarizer only runs if the context is still over the
+trigger after pruning.
+
 ## Storage
 
-Offloaded messages are stored as markdown at `/conversation_history/{thread_id}.md`.
+Offloaded messages are archived per thread under `/conversation_history/`:
+
+- `{thread_id}.{timestamp}.jsonl`: one segment per summarization event, one message
+  per line (`message_to_dict` format, so tool calls and IDs are preserved).
+- `{thread_id}.index.jsonl`: one line per segment with an inverted index from terms
+  (keywords, `path:` file paths, `name:` file names, `tool:` tool names and tool call
+  IDs) to message positions in the segment.
 
-Each summarization event appends a new section to this file, creating a running log
-of all evicted messages.
+The `search_history` tool looks terms up in the index and loads only the segments
+with matching messages, so recalling a detail costs one small tool call.
 """
 
 from __future__ import annotations
 
+import asyncio
+import contextvars
+import json
 import logging
+import re
+import threading
 import uuid
+from collections import Counter, OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, replace
 from datetime import UTC, datetime
 from textwrap import dedent
-from typing import TYPE_CHECKING, Any, cast
+from typing import TYPE_CHECKING, Annotated, Any, NotRequired, cast
 
 from langchain.agents.middleware.summarization import (
     _DEFAULT_MESSAGES_TO_KEEP,
@@ -46,27 +78,340 @@ from langchain.agents.middleware.summarization import (
     SummarizationMiddleware as BaseSummarizationMiddleware,
     TokenCounter,
 )
+from langchain.agents.middleware.types import AgentState, PrivateStateAttr
 from langchain.tools import ToolRuntime
-from langchain_core.messages import AnyMessage, HumanMessage, RemoveMessage, get_buffer_string
+from langchain_core.messages import (
+    AIMessage,
+    AnyMessage,
+    BaseMessage,
+    HumanMessage,
+    RemoveMessage,
+    ToolMessage,
+    message_to_dict,
+    messages_from_dict,
+)
 from langchain_core.messages.utils import count_tokens_approximately
+from langchain_core.tools import BaseTool, StructuredTool
 from langgraph.config import get_config
 from langgraph.graph.message import REMOVE_ALL_MESSAGES
 from typing_extensions import override
 
+from deepagents.backends.protocol import StatOp
+from deepagents.backends.utils import truncate_if_too_long
+from deepagents.middleware._utils import tool_args_schema
+from deepagents.middleware.filesystem import (
+    READ_UNCHANGED_MSG,
+    EvictedResult,
+    FileData,
+    ReadRecord,
+    _evicted_result,
+    _evicted_results_reducer,
+    _file_data_reducer,
+    _read_ledger_reducer,
+    _tool_message_text,
+)
+from deepagents.tokens import count_message_tokens
+
 if TYPE_CHECKING:
-    from langchain.agents.middleware.types import AgentState
+    from collections.abc import Mapping, Sequence
+
     from langchain.chat_models import BaseChatModel
     from langchain_core.runnables.config import RunnableConfig
     from langgraph.runtime import Runtime
 
-    from deepagents.backends.protocol import BACKEND_TYPES, BackendProtocol
+    from deepagents.backends.protocol import BACKEND_TYPES, BackendProtocol, WriteResult
 
 logger = logging.getLogger(__name__)
 
+# Per-message token counts kept by message ID; enough for several long threads
+_MESSAGE_TOKEN_CACHE_SIZE = 16384
+
+# Precomputed summaries kept per conversation (keyed by the ID of its first message)
+_PENDING_SUMMARY_LIMIT = 64
+_PRESUMMARIZE_WORKERS = 4
+
+_presummarize_executor: ThreadPoolExecutor | None = None
+_presummarize_executor_lock = threading.Lock()
+
+
+def _get_presummarize_executor() -> ThreadPoolExecutor:
+    """Return the process-wide executor for background summaries, creating it on first use."""
+    global _presummarize_executor  # noqa: PLW0603
+    with _presummarize_executor_lock:
+        if _presummarize_executor is None:
+            _presummarize_executor = ThreadPoolExecutor(max_workers=_PRESUMMARIZE_WORKERS, thread_name_prefix="presummarize")
+        return _presummarize_executor
+
+
+SEARCH_HISTORY_TOOL_DESCRIPTION = """Searches the archived conversation history for messages that were summarized away.
+
+Usage:
+- Use this when you need a detail the conversation summary left out: an exact tool output, file contents you read earlier, an error message, an earlier decision
+- The query is matched against keywords and identifiers, file paths (e.g. /src/app.py), file names (e.g. app.py) and tool call IDs in the archived messages
+- Pass tool_name to only return calls to, and results of, that tool (e.g. "grep", "read_file")
+- Returns only the matching messages, best matches first, each labelled with its archive segment and position"""  # noqa: E501
+
+# Terms indexed per message, beyond tool names, tool call IDs and paths
+_MAX_KEYWORDS_PER_MESSAGE = 512
+_SEARCH_EXCERPT_CHARS = 2000
+_KEYWORD_RE = re.compile(r"[A-Za-z_][A-Za-z0-9_]{2,}")
+_PATH_RE = re.compile(r"(?<![\w./:])/(?:[\w.\-]+/)*[\w.\-]*\w")
+_STOPWORDS = frozenset(
+    "the and for that this with from are was were have has had not but you your all can will into its "  # noqa: SIM905
+    "there their then than them they what when where which who how also use used using any each more "
+    "some such only other our out over new may should would could been being does did".split()
+)
+
+
+def _archive_text(message: BaseMessage) -> str:
+    """Text of a message for indexing: content plus tool call names and arguments."""
+    text: str = message.text
+    if isinstance(message, AIMessage) and message.tool_calls:
+        calls = " ".join(f"{call['name']} {json.dumps(call['args'], default=str)}" for call in message.tool_calls)
+        text = f"{text}\n{calls}" if text else calls
+    return text
+
+
+def _index_terms(message: BaseMessage) -> set[str]:
+    """Terms a message is indexed under: tool names, tool call IDs, paths, file names and keywords."""
+    terms: set[str] = set()
+    if isinstance(message, ToolMessage):
+        if message.name:
+            terms.add(f"tool:{message.name}")
+        terms.add(message.tool_call_id.lower())
+    elif isinstance(message, AIMessage):
+        for call in message.tool_calls:
+            terms.add(f"tool:{call['name']}")
+            if call_id := call.get("id"):
+                terms.add(call_id.lower())
+    text = _archive_text(message)
+    for path in set(_PATH_RE.findall(text)):
+        terms.add(f"path:{path}")
+        terms.add(f"name:{path.rsplit('/', 1)[-1].lower()}")
+    keywords = Counter(word for word in (match.lower() for match in _KEYWORD_RE.findall(text)) if word not in _STOPWORDS)
+    terms.update(word for word, _ in keywords.most_common(_MAX_KEYWORDS_PER_MESSAGE))
+    return terms
+
+
+def _query_terms(query: str) -> set[str]:
+    """Index terms for a search query; see `_index_terms`."""
+    terms: set[str] = set()
+    for token in query.split():
+        if token.startswith("/"):
+            terms.add(f"path:{token.rstrip('/')}")
+        if "." in token or "/" in token:
+            terms.add(f"name:{token.rstrip('/').rsplit('/', 1)[-1].lower()}")
+    terms.update(word.lower() for word in _KEYWORD_RE.findall(query) if word.lower() not in _STOPWORDS)
+    return terms
+
+
+def _build_segment(messages: Sequence[BaseMessage], segment_path: str) -> tuple[str, str]:
+    """Serialize messages as a JSONL segment and build its index line.
+
+    Returns:
+        (segment content, index line), both newline-terminated.
+    """
+    postings: dict[str, list[int]] = {}
+    lines = []
+    for position, message in enumerate(messages):
+        lines.append(json.dumps(message_to_dict(message), default=str, ensure_ascii=False))
+        for term in _index_terms(message):
+            postings.setdefault(term, []).append(position)
+    index_entry = {
+        "segment": segment_path,
+        "created_at": datetime.now(UTC).isoformat(),
+        "messages": len(messages),
+        "terms": postings,
+    }
+    return "\n".join(lines) + "\n", json.dumps(index_entry, ensure_ascii=False) + "\n"
+
+
+def _rank_archive_hits(index_content: str, query: str, tool_name: str | None, limit: int) -> list[tuple[str, int, int]]:
+    """Find the best matching archived messages.
+
+    Args:
+        index_content: Content of the thread's index file.
+        query: Search query.
+        tool_name: Only match messages calling, or returned by, this tool.
+        limit: Maximum number of hits.
+
+    Returns:
+        (segment path, position, matched term count) tuples, best first; ties go to
+        the most recent message.
+    """
+    terms = _query_terms(query)
+    hits: list[tuple[int, int, int, str]] = []
+    for order, line in enumerate(index_content.splitlines()):
+        if not line.strip():
+            continue
+        try:
+            entry = json.loads(line)
+        except json.JSONDecodeError:
+            continue
+        postings = entry.get("terms", {})
+        scores = Counter(position for term in terms for position in postings.get(term, ()))
+        if tool_name is not None:
+            allowed = set(postings.get(f"tool:{tool_name}", ()))
+            if not terms:
+                scores = Counter(dict.fromkeys(allowed, 0))
+            scores = Counter({position: score for position, score in scores.items() if position in allowed})
+        hits.extend((score, order, position, entry["segment"]) for position, score in scores.items())
+    hits.sort(reverse=True)
+    return [(segment, position, score) for score, _, position, segment in hits[:limit]]
+
+
+def _format_archive_hit(message: BaseMessage, segment: str, position: int, query: str) -> str:
+    """Render an archived message as a search result, excerpted around the first query keyword."""
+    header = f"[{segment} #{position}] {message.type}"
+    if isinstance(message, ToolMessage):
+        header += f" from {message.name or 'tool'} (tool_call_id={message.tool_call_id})"
+    text = _archive_text(message)
+    start = 0
+    lowered = text.lower()
+    positions = [lowered.find(word) for word in _query_terms(query) if ":" not in word]
+    positions = [p for p in positions if p >= 0]
+    if positions and len(text) > _SEARCH_EXCERPT_CHARS:
+        start = max(0, min(positions) - _SEARCH_EXCERPT_CHARS // 4)
+    excerpt = text[start : start + _SEARCH_EXCERPT_CHARS]
+    if start > 0:
+        excerpt = "..." + excerpt
+    if start + _SEARCH_EXCERPT_CHARS < len(text):
+        excerpt += f"... ({len(text) - start - _SEARCH_EXCERPT_CHARS} more characters)"
+    return f"{header}\n{excerpt}"
+
+
+PRUNED_TOOL_RESULT_MSG = """Tool result pruned from context: this {tool_name} call ({tool_call_id}) returned {size} characters, {reason}.
+The full result was saved to {file_path}; read it with read_file if you still need it."""
+
+# Tool results shorter than this are kept, since a stub would save little
+_PRUNE_MIN_CHARS = 2000
+# Stubs that stand in for content returned elsewhere, so they do not supersede earlier reads
+_STUB_PREFIXES = (READ_UNCHANGED_MSG.split("{", 1)[0], PRUNED_TOOL_RESULT_MSG.split("{", 1)[0])
+
+
+def _stale_tool_results(messages: Sequence[BaseMessage], after_turns: int) -> dict[int, str]:
+    """Find ToolMessages the model has already acted on.
+
+    Args:
+        messages: Conversation messages.
+        after_turns: Results followed by at least this many model turns are stale.
+
+    Returns:
+        Mapping of message index to the reason it is stale.
+    """
+    call_args = {call["id"]: call["args"] for message in messages if isinstance(message, AIMessage) for call in message.tool_calls if call.get("id")}
+    stale: dict[int, str] = {}
+    later_reads: set[tuple[Any, ...]] = set()
+    turns_after = 0
+    for index in range(len(messages) - 1, -1, -1):
+        message = messages[index]
+        if isinstance(message, AIMessage):
+            turns_after += 1
+            continue
+        if not isinstance(message, ToolMessage) or message.status == "error":
+            continue
+        read_key = None
+        if message.name == "read_file" and isinstance(args := call_args.get(message.tool_call_id), dict):
+            read_key = (args.get("file_path"), args.get("offset"), args.get("limit"))
+        if read_key is not None and read_key in later_reads:
+            stale[index] = "superseded by a later read of the same file"
+        elif turns_after >= after_turns:
+            stale[index] = f"which you acted on {turns_after} turns ago"
+        if read_key is not None and not _tool_message_text(message).startswith(_STUB_PREFIXES):
+            later_reads.add(read_key)
+    return stale
+
+
+@dataclass
+class _PruneCandidate:
+    """A stale tool result selected for pruning."""
+
+    index: int
+    """Position of the message in the conversation."""
+
+    message: ToolMessage
+    """The tool result to replace with a stub."""
+
+    reason: str
+    """Why the result is stale, as shown in the stub."""
+
+    content: str
+    """Text of the result, saved to the backend."""
+
+    content_hash: str
+    """SHA-256 of the content, the key of its eviction ledger entry."""
+
+    record: EvictedResult
+    """Eviction ledger entry for the saved content."""
+
+
+@dataclass
+class _PruneResult:
+    """Outcome of pruning stale tool results."""
+
+    messages: list[AnyMessage]
+    """The conversation with pruned messages replaced by stubs."""
+
+    replacements: list[ToolMessage]
+    """The stubs, with the IDs of the messages they replace."""
+
+    files_update: dict[str, Any]
+    """Updates for checkpoint backends from saving the pruned content."""
+
+    ledger_update: dict[str, EvictedResult]
+    """Eviction ledger entries for the saved content."""
+
+    reads_update: dict[str, ReadRecord | None]
+    """Removals from the read_file dedup ledger for reads whose result was pruned."""
+
+    def state_update(self) -> dict[str, Any]:
+        """State update replacing the pruned messages (by ID) and recording the saved files."""
+        update: dict[str, Any] = {"messages": list(self.replacements)}
+        return self.ledger_updates(update)
+
+    def ledger_updates(self, update: dict[str, Any]) -> dict[str, Any]:
+        """Add the file and ledger updates of the pruning to a state update."""
+        if self.files_update:
+            update["files"] = {**update.get("files", {}), **self.files_update}
+        if self.ledger_update:
+            update["evicted_results"] = self.ledger_update
+        if self.reads_update:
+            update["file_reads"] = self.reads_update
+        return update
+
+
+@dataclass
+class _PendingSummary:
+    """A background summary of a conversation prefix."""
+
+    prefix_ids: tuple[str | None, ...]
+    """IDs of the summarized messages, used to detect that the prefix changed."""
+
+    future: Future[str]
+    """Resolves to the summary text."""
+
+
+class SummarizationState(AgentState):
+    """State for the summarization middleware."""
+
+    files: Annotated[NotRequired[dict[str, FileData]], _file_data_reducer]
+    """Files in the filesystem; checkpoint backends receive history appends here."""
+
+    evicted_results: Annotated[NotRequired[dict[str, EvictedResult]], PrivateStateAttr, _evicted_results_reducer]
+    """Ledger of tool results evicted to the filesystem, shared with `FilesystemMiddleware`."""
+
+    file_reads: Annotated[NotRequired[dict[str, ReadRecord]], PrivateStateAttr, _read_ledger_reducer]
+    """Ledger of full read_file results, shared with `FilesystemMiddleware`; pruned reads are removed from it."""
+
+    history_archive_id: Annotated[NotRequired[str], PrivateStateAttr]
+    """ID the history archive is stored under, recorded at the first offload."""
+
 
 class SummarizationMiddleware(BaseSummarizationMiddleware):
     """Summarization middleware with backend for conversation history offloading."""
 
+    state_schema = SummarizationState
+
     def __init__(
         self,
         model: str | BaseChatModel,
@@ -74,10 +419,12 @@ class SummarizationMiddleware(BaseSummarizationMiddleware):
         backend: BACKEND_TYPES,
         trigger: ContextSize | list[ContextSize] | None = None,
         keep: ContextSize = ("messages", _DEFAULT_MESSAGES_TO_KEEP),
-        token_counter: TokenCounter = count_tokens_approximately,
+        token_counter: TokenCounter = count_message_tokens,
         summary_prompt: str = DEFAULT_SUMMARY_PROMPT,
         trim_tokens_to_summarize: int | None = _DEFAULT_TRIM_TOKEN_LIMIT,
         history_path_prefix: str = "/conversation_history",
+        presummarize_at: ContextSize | None = None,
+        prune_tool_results_after: int | None = None,
         **deprecated_kwargs: Any,
     ) -> None:
         """Initialize summarization middleware with backend support.
@@ -90,11 +437,24 @@ class SummarizationMiddleware(BaseSummarizationMiddleware):
 
                 Defaults to keeping last 20 messages.
             token_counter: Function to count tokens in messages.
+
+                Defaults to `count_message_tokens`, which uses the same token counter
+                as tool result eviction and truncation (see `deepagents.tokens`).
             summary_prompt: Prompt template for generating summaries.
             trim_tokens_to_summarize: Max tokens to include when generating summary.
 
                 Defaults to 4000.
             history_path_prefix: Path prefix for storing conversation history.
+            presummarize_at: Watermark, below `trigger`, at which the older prefix of
+                the conversation starts being summarized in the background.
+
+                The precomputed summary is used when the trigger fires if the prefix is
+                unchanged; `None` (default) disables background pre-summarization.
+            prune_tool_results_after: When the trigger fires, first replace tool results
+                older than this many turns (and re-read files) with stubs pointing to a
+                saved copy, and only summarize if still over the trigger.
+
+                `None` (default) disables pruning.
 
         Example:
             ```python
@@ -120,6 +480,281 @@ class SummarizationMiddleware(BaseSummarizationMiddleware):
         )
         self._backend = backend
         self._history_path_prefix = history_path_prefix
+        self._presummarize_at = self._validate_context_size(presummarize_at, "presummarize_at") if presummarize_at is not None else None
+        self._pending_summaries: OrderedDict[str, _PendingSummary] = OrderedDict()
+        self._pending_summaries_lock = threading.Lock()
+        self.tools = [self._build_search_history_tool()]
+        self._prune_tool_results_after = prune_tool_results_after
+        self.tool_results_pruned = 0
+        self.chars_pruned = 0
+        self._prune_metrics_lock = threading.Lock()
+
+        # Messages are immutable once added to state, so their token counts are cached
+        # by ID and each step only counts the new ones. The approximate counter is
+        # left alone since it rescales totals with the last reported usage.
+        self._message_token_cache: OrderedDict[str, int] = OrderedDict()
+        self._message_token_cache_lock = threading.Lock()
+        if token_counter is not count_tokens_approximately:
+            self._message_token_counter = self.token_counter
+            # Agent state messages are always BaseMessages
+            self.token_counter = self._partial_token_counter = cast("TokenCounter", self._count_tokens_incremental)
+
+    def _count_tokens_incremental(self, messages: Sequence[BaseMessage]) -> int:
+        """Count tokens as the sum of per-message counts, cached by message ID.
+
+        Only messages not seen before (or without an ID) are passed to the configured
+        token counter, which is assumed to be additive across messages (true for
+        `count_message_tokens`).
+
+        Args:
+            messages: Messages to count.
+
+        Returns:
+            Total number of tokens.
+        """
+        cache = self._message_token_cache
+        total = 0
+        misses: dict[str, int] = {}
+        for message in messages:
+            tokens = cache.get(message.id) if message.id is not None else None
+            if tokens is None:
+                tokens = self._message_token_counter([message])
+                if message.id is not None:
+                    misses[message.id] = tokens
+            total += tokens
+        if misses:
+            with self._message_token_cache_lock:
+                cache.update(misses)
+                while len(cache) > _MESSAGE_TOKEN_CACHE_SIZE:
+                    cache.popitem(last=False)
+        return total
+
+    def _over_trigger_by_count(self, messages: list[AnyMessage], total_tokens: int) -> bool:
+        """Like `_should_summarize`, but on counted tokens only.
+
+        Used after pruning, when the usage reported by the last model call still
+        reflects the unpruned context.
+        """
+        for clause in self._trigger_clauses:
+            clause_met = True
+            for kind, value in clause.items():
+                if kind == "messages":
+                    clause_met = len(messages) >= cast("int", value)
+                elif kind == "tokens":
+                    clause_met = total_tokens >= cast("int", value)
+                elif kind == "fraction":
+                    max_input_tokens = self._get_profile_limits()
+                    clause_met = max_input_tokens is not None and total_tokens >= max(1, int(max_input_tokens * cast("float", value)))
+                if not clause_met:
+                    break
+            if clause_met:
+                return True
+        return False
+
+    def _plan_pruning(self, messages: list[AnyMessage]) -> list[_PruneCandidate]:
+        """Pick the stale tool results worth pruning."""
+        if self._prune_tool_results_after is None:
+            return []
+        plan = []
+        for index, reason in sorted(_stale_tool_results(messages, self._prune_tool_results_after).items()):
+            message = messages[index]
+            if not isinstance(message, ToolMessage):
+                continue
+            content = _tool_message_text(message)
+            if len(content) < _PRUNE_MIN_CHARS:
+                continue
+            content_hash, record = _evicted_result(content, message.tool_call_id)
+            plan.append(_PruneCandidate(index=index, message=message, reason=reason, content=content, content_hash=content_hash, record=record))
+        return plan
+
+    def _apply_pruning(
+        self,
+        messages: list[AnyMessage],
+        saved: list[_PruneCandidate],
+        files_update: dict[str, Any],
+        file_reads: dict[str, ReadRecord],
+    ) -> _PruneResult | None:
+        """Replace saved tool results with stubs and record them."""
+        if not saved:
+            return None
+        pruned_messages = list(messages)
+        replacements = []
+        ledger_update: dict[str, EvictedResult] = {}
+        for candidate in saved:
+            message = candidate.message
+            stub = ToolMessage(
+                content=PRUNED_TOOL_RESULT_MSG.format(
+                    tool_name=message.name or "tool",
+                    tool_call_id=message.tool_call_id,
+                    size=len(candidate.content),
+                    reason=candidate.reason,
+                    file_path=candidate.record["path"],
+                ),
+                tool_call_id=message.tool_call_id,
+                name=message.name,
+                id=message.id,
+            )
+            pruned_messages[candidate.index] = stub
+            replacements.append(stub)
+            ledger_update[candidate.content_hash] = candidate.record
+        # The stubs keep the pruned tool call IDs, so read deduplication must stop pointing at them
+        pruned_ids = {stub.tool_call_id for stub in replacements}
+        reads_update: dict[str, ReadRecord | None] = {key: None for key, record in file_reads.items() if record["tool_call_id"] in pruned_ids}
+        # The stubs reuse the pruned messages' IDs, so their cached token counts are stale
+        with self._message_token_cache_lock:
+            for stub in replacements:
+                if stub.id is not None:
+                    self._message_token_cache.pop(stub.id, None)
+        with self._prune_metrics_lock:
+            self.tool_results_pruned += len(saved)
+            self.chars_pruned += sum(len(candidate.content) for candidate in saved)
+        logger.debug("Pruned %d stale tool results", len(saved))
+        return _PruneResult(
+            messages=pruned_messages,
+            replacements=replacements,
+            files_update=files_update,
+            ledger_update=ledger_update,
+            reads_update=reads_update,
+        )
+
+    def _prune_tool_results(self, backend: BackendProtocol, messages: list[AnyMessage], file_reads: dict[str, ReadRecord]) -> _PruneResult | None:
+        """Save stale tool results to the backend and replace them with stubs.
+
+        Results whose content cannot be saved are kept as they are.
+
+        Args:
+            backend: Backend to save the pruned content to.
+            messages: Conversation messages.
+            file_reads: Read deduplication ledger from state, to drop entries for pruned reads.
+
+        Returns:
+            The pruned conversation and state updates, or None if nothing was pruned.
+        """
+        saved = []
+        files_update: dict[str, Any] = {}
+        for candidate in self._plan_pruning(messages):
+            path = candidate.record["path"]
+            result = backend.write(path, candidate.content)
+            if result.error and backend.batch([StatOp(path)])[0] is None:
+                continue
+            files_update.update(result.files_update or {})
+            saved.append(candidate)
+        return self._apply_pruning(messages, saved, files_update, file_reads)
+
+    async def _aprune_tool_results(
+        self, backend: BackendProtocol, messages: list[AnyMessage], file_reads: dict[str, ReadRecord]
+    ) -> _PruneResult | None:
+        """Async version of _prune_tool_results."""
+        saved = []
+        files_update: dict[str, Any] = {}
+        for candidate in self._plan_pruning(messages):
+            path = candidate.record["path"]
+            result = await backend.awrite(path, candidate.content)
+            if result.error and (await backend.abatch([StatOp(path)]))[0] is None:
+                continue
+            files_update.update(result.files_update or {})
+            saved.append(candidate)
+        return self._apply_pruning(messages, saved, files_update, file_reads)
+
+    def _watermark_reached(self, messages: list[AnyMessage], total_tokens: int) -> bool:
+        """Whether the conversation is past the `presummarize_at` watermark."""
+        if self._presummarize_at is None:
+            return False
+        kind, value = self._presummarize_at
+        if kind == "messages":
+            return len(messages) >= value
+        if kind == "tokens":
+            return total_tokens >= value
+        max_input_tokens = self._get_profile_limits()
+        return max_input_tokens is not None and total_tokens >= max_input_tokens * value
+
+    def _maybe_start_presummary(self, messages: list[AnyMessage], total_tokens: int) -> None:
+        """Start summarizing the older prefix in the background once past the watermark.
+
+        Does nothing if a summary of a still-valid prefix is already pending.
+
+        Args:
+            messages: Current conversation messages.
+            total_tokens: Token count of `messages`.
+        """
+        # Conversations are keyed by their first message's ID
+        key = messages[0].id if messages else None
+        if key is None or not self._watermark_reached(messages, total_tokens):
+            return
+        with self._pending_summaries_lock:
+            pending = self._pending_summaries.get(key)
+        if pending is not None:
+            if self._prefix_matches(pending, messages):
+                return
+            logger.debug("Discarding background summary: the summarized prefix changed")
+            pending.future.cancel()
+
+        cutoff_index = self._determine_cutoff_index(messages)
+        if cutoff_index <= 0:
+            return
+        prefix = list(messages[:cutoff_index])
+        context = contextvars.copy_context()
+        future = _get_presummarize_executor().submit(context.run, self._create_summary, prefix)
+        with self._pending_summaries_lock:
+            self._pending_summaries[key] = _PendingSummary(prefix_ids=tuple(m.id for m in prefix), future=future)
+            self._pending_summaries.move_to_end(key)
+            while len(self._pending_summaries) > _PENDING_SUMMARY_LIMIT:
+                self._pending_summaries.popitem(last=False)
+        logger.debug("Started background summary of %d messages", cutoff_index)
+
+    @staticmethod
+    def _prefix_matches(pending: _PendingSummary, messages: list[AnyMessage]) -> bool:
+        """Whether `messages` still starts with the prefix the pending summary covers."""
+        prefix_ids = pending.prefix_ids
+        return len(prefix_ids) < len(messages) and all(m.id == i for m, i in zip(messages, prefix_ids, strict=False))
+
+    def _take_presummary(self, messages: list[AnyMessage]) -> _PendingSummary | None:
+        """Remove and return the pending summary for this conversation if its prefix is unchanged."""
+        if self._presummarize_at is None or not messages or messages[0].id is None:
+            return None
+        with self._pending_summaries_lock:
+            pending = self._pending_summaries.pop(messages[0].id, None)
+        if pending is None:
+            return None
+        if not self._prefix_matches(pending, messages):
+            logger.debug("Discarding background summary: the summarized prefix changed")
+            pending.future.cancel()
+            return None
+        return pending
+
+    def _accept_presummary(self, messages: list[AnyMessage], cutoff_index: int, summary: str) -> bool:
+        """Whether splicing `summary` in for `messages[:cutoff_index]` brings the context back below the watermark."""
+        spliced = [*self._build_new_messages_with_path(summary, self._history_path_prefix), *messages[cutoff_index:]]
+        if self._watermark_reached(spliced, self.token_counter(spliced)):
+            logger.debug("Discarding background summary: the remaining messages are still over the watermark")
+            return False
+        return True
+
+    def _resolve_presummary(self, messages: list[AnyMessage]) -> tuple[int, str] | None:
+        """Wait for the pending summary of this conversation and return (cutoff index, summary) if usable."""
+        pending = self._take_presummary(messages)
+        if pending is None:
+            return None
+        try:
+            summary = pending.future.result()
+        except Exception as e:  # noqa: BLE001
+            logger.warning("Background summary failed, summarizing synchronously: %s: %s", type(e).__name__, e)
+            return None
+        cutoff_index = len(pending.prefix_ids)
+        return (cutoff_index, summary) if self._accept_presummary(messages, cutoff_index, summary) else None
+
+    async def _aresolve_presummary(self, messages: list[AnyMessage]) -> tuple[int, str] | None:
+        """Async version of _resolve_presummary."""
+        pending = self._take_presummary(messages)
+        if pending is None:
+            return None
+        try:
+            summary = await asyncio.wrap_future(pending.future)
+        except Exception as e:  # noqa: BLE001
+            logger.warning("Background summary failed, summarizing synchronously: %s: %s", type(e).__name__, e)
+            return None
+        cutoff_index = len(pending.prefix_ids)
+        return (cutoff_index, summary) if self._accept_presummary(messages, cutoff_index, summary) else None
 
     def _get_backend(
         self,
@@ -177,16 +812,39 @@ class SummarizationMiddleware(BaseSummarizationMiddleware):
         logger.debug("No thread_id found, using generated session ID: %s", generated_id)
         return generated_id
 
-    def _get_history_path(self) -> str:
-        """Generate path for storing conversation history.
+    def _get_archive_id(self, state: Mapping[str, Any]) -> str:
+        """Return the ID this conversation's history is archived under.
+
+        The ID recorded in state at the first offload is reused, so a conversation
+        without a `thread_id` keeps one archive instead of a new session ID per call.
+
+        Args:
+            state: Current agent state.
+
+        Returns:
+            The recorded archive ID, or else the thread ID (or a generated session ID).
+        """
+        return state.get("history_archive_id") or self._get_thread_id()
+
+    def _get_history_paths(self, archive_id: str) -> tuple[str, str]:
+        """Generate paths for archiving conversation history.
 
-        Returns a single file per thread that gets appended to over time.
+        Each summarization event writes a new segment; the index is appended to
+        over time.
+
+        Args:
+            archive_id: ID of the conversation's archive, from `_get_archive_id`.
 
         Returns:
-            Path string like `'/conversation_history/{thread_id}.md'`
+            (segment path, index path), like
+            `'/conversation_history/{archive_id}.{timestamp}.jsonl'` and
+            `'/conversation_history/{archive_id}.index.jsonl'`.
         """
-        thread_id = self._get_thread_id()
-        return f"{self._history_path_prefix}/{thread_id}.md"
+        timestamp = datetime.now(UTC).strftime("%Y%m%dT%H%M%S%fZ")
+        return (
+            f"{self._history_path_prefix}/{archive_id}.{timestamp}.jsonl",
+            f"{self._history_path_prefix}/{archive_id}.index.jsonl",
+        )
 
     def _is_summary_message(self, msg: AnyMessage) -> bool:
         """Check if a message is a previous summarization message.
@@ -236,13 +894,13 @@ class SummarizationMiddleware(BaseSummarizationMiddleware):
             content = dedent(f"""\
                 You are in the middle of a conversation that has been summarized.
 
-                The full conversation history has been saved to {file_path} should you need to refer back to it for details.
+                The messages covered by this summary have been saved to {file_path}. To recover details the summary leaves out (exact tool outputs, file contents, errors), use the search_history tool to find earlier messages by keyword, file path or tool name.
 
                 A condensed summary follows:
 
                 <summary>
                 {summary}
-                </summary>""")
+                </summary>""")  # noqa: E501
         else:
             content = f"Here is a summary of the conversation to date:\n\n{summary}"
 
@@ -257,11 +915,13 @@ class SummarizationMiddleware(BaseSummarizationMiddleware):
         self,
         backend: BackendProtocol,
         messages: list[AnyMessage],
-    ) -> str | None:
+        archive_id: str,
+    ) -> WriteResult | None:
         """Persist messages to backend before summarization.
 
-        Appends evicted messages to a single markdown file per thread. Each
-        summarization event adds a new section with a timestamp header.
+        Writes the evicted messages as a new JSONL segment and appends its inverted
+        index to the thread's index file with `backend.append`, so the cost does not
+        grow with the size of the history.
 
         Previous summary messages are filtered out to avoid redundant storage during
         chained summarization events.
@@ -269,70 +929,55 @@ class SummarizationMiddleware(BaseSummarizationMiddleware):
         Args:
             backend: Backend to write to.
             messages: Messages being summarized.
+            archive_id: ID of the conversation's archive.
 
         Returns:
-            The file path where history was stored, or `None` if write failed.
+            WriteResult whose `path` is the new segment (checkpoint backends include the
+            segment and the index append delta in `files_update`), or `None` if the
+            write failed.
         """
-        path = self._get_history_path()
+        segment_path, index_path = self._get_history_paths(archive_id)
 
         # Filter out previous summary messages to avoid redundant storage
         filtered_messages = self._filter_summary_messages(messages)
-
-        timestamp = datetime.now(UTC).isoformat()
-        new_section = f"## Summarized at {timestamp}\n\n{get_buffer_string(filtered_messages)}\n\n"
-
-        # Read existing content (if any) and append
-        # Note: We use download_files() instead of read() because read() returns
-        # line-numbered content (for LLM consumption), but edit() expects raw content.
-        existing_content = ""
-        try:
-            responses = backend.download_files([path])
-            if responses and responses[0].content is not None and responses[0].error is None:
-                existing_content = responses[0].content.decode("utf-8")
-        except Exception as e:  # noqa: BLE001
-            # File likely doesn't exist yet, but log for observability
-            logger.debug(
-                "Exception reading existing history from %s (treating as new file): %s: %s",
-                path,
-                type(e).__name__,
-                e,
-            )
-
-        combined_content = existing_content + new_section
+        segment, index_line = _build_segment(filtered_messages, segment_path)
 
         try:
-            result = backend.edit(path, existing_content, combined_content) if existing_content else backend.write(path, combined_content)
+            result = backend.write(segment_path, segment)
             if result is None or result.error:
                 error_msg = result.error if result else "backend returned None"
                 logger.warning(
                     "Failed to offload conversation history to %s (%d messages): %s",
-                    path,
+                    segment_path,
                     len(filtered_messages),
                     error_msg,
                 )
                 return None
+            index_result = backend.append(index_path, index_line)
         except Exception as e:  # noqa: BLE001
             logger.warning(
                 "Exception offloading conversation history to %s (%d messages): %s: %s",
-                path,
+                segment_path,
                 len(filtered_messages),
                 type(e).__name__,
                 e,
             )
             return None
         else:
-            logger.debug("Offloaded %d messages to %s", len(filtered_messages), path)
-            return path
+            logger.debug("Offloaded %d messages to %s", len(filtered_messages), segment_path)
+            return self._merge_offload_results(result, index_result, index_path)
 
     async def _aoffload_to_backend(
         self,
         backend: BackendProtocol,
         messages: list[AnyMessage],
-    ) -> str | None:
+        archive_id: str,
+    ) -> WriteResult | None:
         """Persist messages to backend before summarization (async).
 
-        Appends evicted messages to a single markdown file per thread. Each
-        summarization event adds a new section with a timestamp header.
+        Writes the evicted messages as a new JSONL segment and appends its inverted
+        index to the thread's index file with `backend.aappend`, so the cost does not
+        grow with the size of the history.
 
         Previous summary messages are filtered out to avoid redundant storage during
         chained summarization events.
@@ -340,62 +985,127 @@ class SummarizationMiddleware(BaseSummarizationMiddleware):
         Args:
             backend: Backend to write to.
             messages: Messages being summarized.
+            archive_id: ID of the conversation's archive.
 
         Returns:
-            The file path where history was stored, or `None` if write failed.
+            WriteResult whose `path` is the new segment (checkpoint backends include the
+            segment and the index append delta in `files_update`), or `None` if the
+            write failed.
         """
-        path = self._get_history_path()
+        segment_path, index_path = self._get_history_paths(archive_id)
 
         # Filter out previous summary messages to avoid redundant storage
         filtered_messages = self._filter_summary_messages(messages)
-
-        timestamp = datetime.now(UTC).isoformat()
-        new_section = f"## Summarized at {timestamp}\n\n{get_buffer_string(filtered_messages)}\n\n"
-
-        # Read existing content (if any) and append
-        # Note: We use adownload_files() instead of aread() because read() returns
-        # line-numbered content (for LLM consumption), but edit() expects raw content.
-        existing_content = ""
-        try:
-            responses = await backend.adownload_files([path])
-            if responses and responses[0].content is not None and responses[0].error is None:
-                existing_content = responses[0].content.decode("utf-8")
-        except Exception as e:  # noqa: BLE001
-            # File likely doesn't exist yet, but log for observability
-            logger.debug(
-                "Exception reading existing history from %s (treating as new file): %s: %s",
-                path,
-                type(e).__name__,
-                e,
-            )
-
-        combined_content = existing_content + new_section
+        segment, index_line = _build_segment(filtered_messages, segment_path)
 
         try:
-            result = (
-                await backend.aedit(path, existing_content, combined_content) if existing_content else await backend.awrite(path, combined_content)
-            )
+            result = await backend.awrite(segment_path, segment)
             if result is None or result.error:
                 error_msg = result.error if result else "backend returned None"
                 logger.warning(
                     "Failed to offload conversation history to %s (%d messages): %s",
-                    path,
+                    segment_path,
                     len(filtered_messages),
                     error_msg,
                 )
                 return None
+            index_result = await backend.aappend(index_path, index_line)
         except Exception as e:  # noqa: BLE001
             logger.warning(
                 "Exception offloading conversation history to %s (%d messages): %s: %s",
-                path,
+                segment_path,
                 len(filtered_messages),
                 type(e).__name__,
                 e,
             )
             return None
         else:
-            logger.debug("Offloaded %d messages to %s", len(filtered_messages), path)
-            return path
+            logger.debug("Offloaded %d messages to %s", len(filtered_messages), segment_path)
+            return self._merge_offload_results(result, index_result, index_path)
+
+    @staticmethod
+    def _merge_offload_results(segment_result: WriteResult, index_result: WriteResult | None, index_path: str) -> WriteResult:
+        """Combine the segment write and index append into one result.
+
+        A failed index append keeps the segment (the messages are still archived and
+        readable), but `search_history` will not find them.
+        """
+        if index_result is None or index_result.error:
+            logger.warning(
+                "Failed to index archived history in %s: %s",
+                index_path,
+                index_result.error if index_result else "backend returned None",
+            )
+            return segment_result
+        files_update = {**(segment_result.files_update or {}), **(index_result.files_update or {})}
+        return replace(segment_result, files_update=files_update or None)
+
+    def _search_history(self, backend: BackendProtocol, archive_id: str, query: str, tool_name: str | None, limit: int) -> str:
+        """Search this thread's history archive; see `SEARCH_HISTORY_TOOL_DESCRIPTION`."""
+        _, index_path = self._get_history_paths(archive_id)
+        index_response = backend.download_files([index_path])[0]
+        if index_response.error is not None or index_response.content is None:
+            return "No archived conversation history for this thread yet."
+        hits = _rank_archive_hits(index_response.content.decode("utf-8"), query, tool_name, limit)
+        if not hits:
+            return f"No archived messages match '{query}'" + (f" for tool '{tool_name}'" if tool_name else "") + "."
+        segments = list(dict.fromkeys(segment for segment, _, _ in hits))
+        responses = dict(zip(segments, backend.download_files(segments), strict=True))
+        return self._format_search_results(hits, responses, query)
+
+    async def _asearch_history(self, backend: BackendProtocol, archive_id: str, query: str, tool_name: str | None, limit: int) -> str:
+        """Async version of _search_history."""
+        _, index_path = self._get_history_paths(archive_id)
+        index_response = (await backend.adownload_files([index_path]))[0]
+        if index_response.error is not None or index_response.content is None:
+            return "No archived conversation history for this thread yet."
+        hits = _rank_archive_hits(index_response.content.decode("utf-8"), query, tool_name, limit)
+        if not hits:
+            return f"No archived messages match '{query}'" + (f" for tool '{tool_name}'" if tool_name else "") + "."
+        segments = list(dict.fromkeys(segment for segment, _, _ in hits))
+        responses = dict(zip(segments, await backend.adownload_files(segments), strict=True))
+        return self._format_search_results(hits, responses, query)
+
+    @staticmethod
+    def _format_search_results(hits: list[tuple[str, int, int]], responses: dict[str, Any], query: str) -> str:
+        """Render matching archived messages, loading each segment once."""
+        segment_lines: dict[str, list[str]] = {}
+        results = []
+        for segment, position, _ in hits:
+            if segment not in segment_lines:
+                response = responses[segment]
+                content = response.content.decode("utf-8") if response.error is None and response.content is not None else ""
+                segment_lines[segment] = content.splitlines()
+            lines = segment_lines[segment]
+            if position >= len(lines):
+                # Segment was edited or removed outside the middleware
+                continue
+            message = messages_from_dict([json.loads(lines[position])])[0]
+            results.append(_format_archive_hit(message, segment, position, query))
+        if not results:
+            return "The matching archived messages are no longer available."
+        return str(truncate_if_too_long("\n\n".join(results)))
+
+    def _build_search_history_tool(self) -> BaseTool:
+        """Build the search_history tool over this middleware's backend."""
+
+        def sync_search_history(runtime: ToolRuntime, query: str, tool_name: str | None = None, limit: int = 10) -> str:
+            """Synchronous wrapper for search_history tool."""
+            backend = self._backend(runtime) if callable(self._backend) else self._backend
+            return self._search_history(backend, self._get_archive_id(runtime.state), query, tool_name, max(1, limit))
+
+        async def async_search_history(runtime: ToolRuntime, query: str, tool_name: str | None = None, limit: int = 10) -> str:
+            """Asynchronous wrapper for search_history tool."""
+            backend = self._backend(runtime) if callable(self._backend) else self._backend
+            return await self._asearch_history(backend, self._get_archive_id(runtime.state), query, tool_name, max(1, limit))
+
+        return StructuredTool.from_function(
+            name="search_history",
+            description=SEARCH_HISTORY_TOOL_DESCRIPTION,
+            func=sync_search_history,
+            args_schema=tool_args_schema("search_history", sync_search_history),
+            coroutine=async_search_history,
+        )
 
     @override
     def before_model(
@@ -408,7 +1118,10 @@ class SummarizationMiddleware(BaseSummarizationMiddleware):
         Overrides parent to offload messages to backend before summarization.
 
         The summary message includes a reference to the file path where the full
-        conversation history was stored.
+        conversation history was stored. Below the trigger, starts a background summary
+        once past the `presummarize_at` watermark; at the trigger, stale tool results
+        are pruned first, and a still-valid background summary is used instead of
+        calling the model.
 
         Args:
             state: The agent state.
@@ -422,34 +1135,58 @@ class SummarizationMiddleware(BaseSummarizationMiddleware):
 
         total_tokens = self.token_counter(messages)
         if not self._should_summarize(messages, total_tokens):
+            self._maybe_start_presummary(messages, total_tokens)
             return None
 
-        cutoff_index = self._determine_cutoff_index(messages)
+        # Prune stale tool results first; summarize only if still over the trigger
+        backend = self._get_backend(state, runtime)
+        archived_messages = messages
+        pruned = self._prune_tool_results(backend, messages, cast("dict[str, ReadRecord]", state.get("file_reads", {})))
+        if pruned is not None:
+            if not self._over_trigger_by_count(pruned.messages, self.token_counter(pruned.messages)):
+                return pruned.state_update()
+            messages = pruned.messages
+
+        # Splice in a summary precomputed in the background if it is still valid
+        precomputed = self._resolve_presummary(messages)
+        if precomputed is not None:
+            cutoff_index, summary = precomputed
+        else:
+            cutoff_index, summary = self._determine_cutoff_index(messages), None
         if cutoff_index <= 0:
-            return None
+            return pruned.state_update() if pruned is not None else None
 
         messages_to_summarize, preserved_messages = self._partition_messages(messages, cutoff_index)
 
-        # Offload to backend first - abort summarization if this fails to prevent data loss
-        backend = self._get_backend(state, runtime)
-        file_path = self._offload_to_backend(backend, messages_to_summarize)
-        if file_path is None:
+        # Offload to backend first - abort summarization if this fails to prevent data loss.
+        # The archive keeps the unpruned messages.
+        archive_id = self._get_archive_id(state)
+        offload_result = self._offload_to_backend(backend, archived_messages[:cutoff_index], archive_id)
+        if offload_result is None:
             # Offloading failed - don't proceed with summarization to preserve messages
-            return None
+            return pruned.state_update() if pruned is not None else None
+        file_path = offload_result.path
 
         # Generate summary
-        summary = self._create_summary(messages_to_summarize)
+        if summary is None:
+            summary = self._create_summary(messages_to_summarize)
 
         # Build summary message with file path reference
         new_messages = self._build_new_messages_with_path(summary, file_path)
 
-        return {
+        update: dict[str, Any] = {
             "messages": [
                 RemoveMessage(id=REMOVE_ALL_MESSAGES),
                 *new_messages,
                 *preserved_messages,
-            ]
+            ],
+            "history_archive_id": archive_id,
         }
+        if pruned is not None:
+            pruned.ledger_updates(update)
+        if offload_result.files_update:
+            update["files"] = {**update.get("files", {}), **offload_result.files_update}
+        return update
 
     @override
     async def abefore_model(
@@ -462,7 +1199,10 @@ class SummarizationMiddleware(BaseSummarizationMiddleware):
         Overrides parent to offload messages to backend before summarization.
 
         The summary message includes a reference to the file path where the full
-        conversation history was stored.
+        conversation history was stored. Below the trigger, starts a background summary
+        once past the `presummarize_at` watermark; at the trigger, stale tool results
+        are pruned first, and a still-valid background summary is used instead of
+        calling the model.
 
         Args:
             state: The agent state.
@@ -476,31 +1216,55 @@ class SummarizationMiddleware(BaseSummarizationMiddleware):
 
         total_tokens = self.token_counter(messages)
         if not self._should_summarize(messages, total_tokens):
+            self._maybe_start_presummary(messages, total_tokens)
             return None
 
-        cutoff_index = self._determine_cutoff_index(messages)
+        # Prune stale tool results first; summarize only if still over the trigger
+        backend = self._get_backend(state, runtime)
+        archived_messages = messages
+        pruned = await self._aprune_tool_results(backend, messages, cast("dict[str, ReadRecord]", state.get("file_reads", {})))
+        if pruned is not None:
+            if not self._over_trigger_by_count(pruned.messages, self.token_counter(pruned.messages)):
+                return pruned.state_update()
+            messages = pruned.messages
+
+        # Splice in a summary precomputed in the background if it is still valid
+        precomputed = await self._aresolve_presummary(messages)
+        if precomputed is not None:
+            cutoff_index, summary = precomputed
+        else:
+            cutoff_index, summary = self._determine_cutoff_index(messages), None
         if cutoff_index <= 0:
-            return None
+            return pruned.state_update() if pruned is not None else None
 
         messages_to_summarize, preserved_messages = self._partition_messages(messages, cutoff_index)
 
-        # Offload to backend first - abort summarization if this fails to prevent data loss
-        backend = self._get_backend(state, runtime)
-        file_path = await self._aoffload_to_backend(backend, messages_to_summarize)
-        if file_path is None:
+        # Offload to backend first - abort summarization if this fails to prevent data loss.
+        # The archive keeps the unpruned messages.
+        archive_id = self._get_archive_id(state)
+        offload_result = await self._aoffload_to_backend(backend, archived_messages[:cutoff_index], archive_id)
+        if offload_result is None:
             # Offloading failed - don't proceed with summarization to preserve messages
-            return None
+            return pruned.state_update() if pruned is not None else None
+        file_path = offload_result.path
 
         # Generate summary
-        summary = await self._acreate_summary(messages_to_summarize)
+        if summary is None:
+            summary = await self._acreate_summary(messages_to_summarize)
 
         # Build summary message with file path reference
         new_messages = self._build_new_messages_with_path(summary, file_path)
 
-        return {
+        update: dict[str, Any] = {
             "messages": [
                 RemoveMessage(id=REMOVE_ALL_MESSAGES),
                 *new_messages,
                 *preserved_messages,
-            ]
+            ],
+            "history_archive_id": archive_id,
         }
+        if pruned is not None:
+            pruned.ledger_updates(update)
+        if offload_result.files_update:
+            update["files"] = {**update.get("files", {}), **offload_result.files_update}
+        return update
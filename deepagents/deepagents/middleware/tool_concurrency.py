@@ -0,0 +1,262 @@
+"""Middleware that runs read-only tool calls concurrently and keeps writes in order."""
+
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable, Collection
+from contextlib import nullcontext
+from dataclasses import dataclass
+from typing import Any
+
+from langchain.agents.middleware.types import AgentMiddleware
+from langchain.tools.tool_node import ToolCallRequest
+from langchain_core.messages import AIMessage, ToolCall, ToolMessage
+from langgraph.types import Command
+
+logger = logging.getLogger(__name__)
+
+READ_ONLY_TOOLS = frozenset({"ls", "read_file", "read_files", "glob", "grep", "search_history"})
+"""Tools that only read, and may run concurrently with each other."""
+
+SERIALIZED_TOOLS = frozenset({"write_file", "edit_file", "multi_edit", "copy_file", "move_file", "execute"})
+"""Tools that may change files, and run one at a time in tool call order."""
+
+_READ = "read"
+_WRITE = "write"
+_FREE = "free"
+
+
+@dataclass(frozen=True)
+class ToolStepReport:
+    """Timing of the scheduled tool calls issued by one AIMessage."""
+
+    tool_calls: int
+    """Number of read-only and serialized tool calls in the step."""
+
+    serial_seconds: float
+    """Sum of the individual tool call durations (the cost of running them one by one)."""
+
+    wall_seconds: float
+    """Time from the first tool call starting to the last one finishing."""
+
+    @property
+    def saved_seconds(self) -> float:
+        """Wall-clock time saved by running the step's tool calls concurrently."""
+        return self.serial_seconds - self.wall_seconds
+
+
+class _ToolStep:
+    """Scheduling state shared by the tool calls of one AIMessage."""
+
+    def __init__(self, kinds: list[str], condition: Any, limiter: Any) -> None:  # noqa: ANN401  # threading or asyncio primitives
+        self.kinds = kinds
+        self.expected = sum(kind != _FREE for kind in kinds)
+        self.done: set[int] = set()
+        self.condition = condition
+        self.limiter = limiter
+        self.serial_seconds = 0.0
+        self.first_start: float | None = None
+        self.last_end: float | None = None
+
+    def ready(self, position: int) -> bool:
+        """Reads wait for earlier writes; writes wait for every earlier read and write."""
+        blocking = (_WRITE,) if self.kinds[position] == _READ else (_READ, _WRITE)
+        return all(index in self.done for index in range(position) if self.kinds[index] in blocking)
+
+
+def _pending_tool_calls(state: Any) -> list[ToolCall]:  # noqa: ANN401  # Agent state of any schema
+    """Tool calls of the last AIMessage that do not have a ToolMessage yet."""
+    messages = (state or {}).get("messages", [])
+    for index in range(len(messages) - 1, -1, -1):
+        message = messages[index]
+        if isinstance(message, AIMessage):
+            answered = {m.tool_call_id for m in messages[index + 1 :] if isinstance(m, ToolMessage)}
+            return [call for call in message.tool_calls if call["id"] not in answered]
+    return []
+
+
+class ToolConcurrencyMiddleware(AgentMiddleware):
+    """Schedule the tool calls of one model turn: reads in parallel, writes in order.
+
+    The agent dispatches every tool call of an AIMessage at once. This middleware
+    orders their execution, while letting independent reads overlap:
+
+    - Read-only tools (`ls`, `read_file`, `read_files`, `glob`, `grep`) run concurrently,
+      at most `max_concurrency` at a time, once every earlier write has finished.
+    - Serialized tools (`write_file`, `edit_file`, `multi_edit`, `copy_file`, `move_file`,
+      `execute`) wait for every earlier read and write, so they run one at a time, in order.
+    - Any other tool (e.g. `task`) is not scheduled and runs as soon as it is dispatched.
+
+    With a backend that stores files outside the agent state (e.g. `FilesystemBackend`),
+    the results then match running the calls one by one in the order the model issued
+    them. With `StateBackend` they do not: every call of a step sees the files as they
+    were at the start of the step, since state updates are applied after the step, so a
+    read issued after an edit in the same turn returns the content before the edit.
+
+    In async runs the tools use the async backend methods, so reads overlap on the
+    event loop; in sync runs they overlap on the graph's worker threads.
+
+    For each step with scheduled calls, a `ToolStepReport` with the summed tool
+    durations and the actual wall-clock time is appended to `reports`, and the
+    difference is added to `total_saved_seconds`.
+
+    Args:
+        max_concurrency: Maximum number of read-only tool calls running at once per step.
+        read_only_tools: Names of tools that may run concurrently.
+        serialized_tools: Names of tools that must run one at a time, in order.
+        order_timeout: Seconds a tool call waits for earlier calls before running
+            anyway (with a warning). None waits indefinitely.
+        max_reports: Number of recent step reports to keep.
+
+    Example:
+        ```python
+        from deepagents.middleware.tool_concurrency import ToolConcurrencyMiddleware
+
+        concurrency = ToolConcurrencyMiddleware(max_concurrency=4)
+        agent = create_agent(model, tools=tools, middleware=[concurrency, FilesystemMiddleware()])
+        agent.invoke(...)
+        print(concurrency.total_saved_seconds)
+        ```
+    """
+
+    def __init__(
+        self,
+        *,
+        max_concurrency: int = 8,
+        read_only_tools: Collection[str] = READ_ONLY_TOOLS,
+        serialized_tools: Collection[str] = SERIALIZED_TOOLS,
+        order_timeout: float | None = 300.0,
+        max_reports: int = 100,
+    ) -> None:
+        """Initialize the tool concurrency middleware."""
+        self.max_concurrency = max_concurrency
+        self.read_only_tools = frozenset(read_only_tools)
+        self.serialized_tools = frozenset(serialized_tools)
+        self.order_timeout = order_timeout
+        self.reports: deque[ToolStepReport] = deque(maxlen=max_reports)
+        self.total_saved_seconds = 0.0
+        self._steps: dict[tuple[str, ...], _ToolStep] = {}
+        self._lock = threading.Lock()
+
+    def _classify(self, tool_name: str) -> str:
+        if tool_name in self.read_only_tools:
+            return _READ
+        if tool_name in self.serialized_tools:
+            return _WRITE
+        return _FREE
+
+    def _join_step(self, request: ToolCallRequest, *, is_async: bool) -> tuple[tuple[str, ...], _ToolStep, int] | None:
+        """Find (or create) the step of this tool call, and the call's position in it."""
+        if self._classify(request.tool_call["name"]) == _FREE:
+            return None
+        pending = _pending_tool_calls(request.state)
+        step_key = tuple(call["id"] or "" for call in pending)
+        if request.tool_call["id"] not in step_key:
+            return None
+
+        with self._lock:
+            step = self._steps.get(step_key)
+            if step is None:
+                kinds = [self._classify(call["name"]) for call in pending]
+                if is_async:
+                    step = _ToolStep(kinds, asyncio.Condition(), asyncio.Semaphore(self.max_concurrency))
+                else:
+                    step = _ToolStep(kinds, threading.Condition(), threading.Semaphore(self.max_concurrency))
+                self._steps[step_key] = step
+        return step_key, step, step_key.index(request.tool_call["id"])
+
+    def _finish(self, step_key: tuple[str, ...], step: _ToolStep, position: int, start: float, end: float) -> None:
+        """Record a finished call (caller holds the step condition) and report completed steps."""
+        step.done.add(position)
+        step.serial_seconds += end - start
+        step.first_start = start if step.first_start is None else min(step.first_start, start)
+        step.last_end = end if step.last_end is None else max(step.last_end, end)
+        if len(step.done) < step.expected:
+            return
+
+        with self._lock:
+            self._steps.pop(step_key, None)
+            report = ToolStepReport(
+                tool_calls=step.expected,
+                serial_seconds=step.serial_seconds,
+                wall_seconds=step.last_end - step.first_start,
+            )
+            self.reports.append(report)
+            self.total_saved_seconds += report.saved_seconds
+        logger.debug(
+            "Ran %d tool calls in %.3fs (%.3fs serially), saved %.3fs",
+            report.tool_calls,
+            report.wall_seconds,
+            report.serial_seconds,
+            report.saved_seconds,
+        )
+
+    def wrap_tool_call(
+        self,
+        request: ToolCallRequest,
+        handler: Callable[[ToolCallRequest], ToolMessage | Command],
+    ) -> ToolMessage | Command:
+        """Run the tool call once every earlier conflicting call of its step has finished.
+
+        Args:
+            request: The tool call request being processed.
+            handler: The handler function to call with the request.
+
+        Returns:
+            The tool result from the handler.
+        """
+        joined = self._join_step(request, is_async=False)
+        if joined is None:
+            return handler(request)
+        step_key, step, position = joined
+
+        with step.condition:
+            if not step.condition.wait_for(lambda: step.ready(position), timeout=self.order_timeout):
+                logger.warning("Tool call %s waited %ss for earlier tool calls; running it anyway", request.tool_call["id"], self.order_timeout)
+
+        with step.limiter if step.kinds[position] == _READ else nullcontext():
+            start = time.perf_counter()
+            try:
+                return handler(request)
+            finally:
+                end = time.perf_counter()
+                with step.condition:
+                    self._finish(step_key, step, position, start, end)
+                    step.condition.notify_all()
+
+    async def awrap_tool_call(
+        self,
+        request: ToolCallRequest,
+        handler: Callable[[ToolCallRequest], Awaitable[ToolMessage | Command]],
+    ) -> ToolMessage | Command:
+        """(async) Run the tool call once every earlier conflicting call of its step has finished.
+
+        Args:
+            request: The tool call request being processed.
+            handler: The handler function to call with the request.
+
+        Returns:
+            The tool result from the handler.
+        """
+        joined = self._join_step(request, is_async=True)
+        if joined is None:
+            return await handler(request)
+        step_key, step, position = joined
+
+        async with step.condition:
+            try:
+                await asyncio.wait_for(step.condition.wait_for(lambda: step.ready(position)), self.order_timeout)
+            except TimeoutError:
+                logger.warning("Tool call %s waited %ss for earlier tool calls; running it anyway", request.tool_call["id"], self.order_timeout)
+
+        async with step.limiter if step.kinds[position] == _READ else nullcontext():
+            start = time.perf_counter()
+            try:
+                return await handler(request)
+            finally:
+                end = time.perf_counter()
+                async with step.condition:
+                    self._finish(step_key, step, position, start, end)
+                    step.condition.notify_all()
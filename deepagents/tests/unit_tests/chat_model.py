@@ -0,0 +1,15 @@
+from typing import Any
+
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+
+
+class FakeToolCallingModel(GenericFakeChatModel):
+    """Fake chat model that replays its messages and ignores the tools it is bound to.
+
+    Streaming is disabled because the generic fake model cannot stream tool calls.
+    """
+
+    disable_streaming: bool = True
+
+    def bind_tools(self, tools: Any, **kwargs: Any) -> "FakeToolCallingModel":  # noqa: ANN401
+        return self
@@ -0,0 +1,91 @@
+from pathlib import Path
+from unittest import mock
+
+import pytest
+
+from deepagents.backends import CompositeBackend, FilesystemBackend
+from deepagents.backends.protocol import _grep_match_sort_key, path_sort_key
+
+DEFAULT_FILES = ["/b/handler.py", "/a.py", "/zz/handler.py", "/n.py"]
+ROUTED_FILES = ["/notes.md", "/handlers/one.py", "/handlers/two.py"]
+
+
+def _write(root: Path, paths: list[str]) -> FilesystemBackend:
+    for path in paths:
+        file = root / path.lstrip("/")
+        file.parent.mkdir(parents=True, exist_ok=True)
+        file.write_text("import os\ndef handler():\n    return 'handler'\n")
+    return FilesystemBackend(root_dir=root, virtual_mode=True)
+
+
+@pytest.fixture
+def backend(tmp_path: Path) -> CompositeBackend:
+    """Default files sort both before and after the `/memories/` route."""
+    default = _write(tmp_path / "default", DEFAULT_FILES)
+    routed = _write(tmp_path / "memories", ROUTED_FILES)
+    return CompositeBackend(default=default, routes={"/memories/": routed})
+
+
+def test_grep_iter_merges_backends_in_path_order(backend: CompositeBackend) -> None:
+    raw = backend.grep_raw("handler")
+    assert isinstance(raw, list)
+    expected = sorted(raw, key=_grep_match_sort_key)
+    assert [m["path"] for m in expected][:4] == ["/a.py", "/a.py", "/b/handler.py", "/b/handler.py"]
+    assert "/memories/handlers/one.py" in {m["path"] for m in expected}
+
+    matches = backend.grep_iter("handler")
+    assert not isinstance(matches, str)
+    assert list(matches) == expected
+
+
+@pytest.mark.parametrize("limit", [1, 5, 9, 100])
+def test_grep_iter_limit_returns_first_matches(backend: CompositeBackend, limit: int) -> None:
+    raw = backend.grep_raw("handler")
+    assert isinstance(raw, list)
+    matches = backend.grep_iter("handler", limit=limit)
+    assert not isinstance(matches, str)
+    assert list(matches) == sorted(raw, key=_grep_match_sort_key)[:limit]
+
+
+def test_grep_iter_asks_each_backend_for_at_most_limit(backend: CompositeBackend) -> None:
+    routed = backend.routes["/memories/"]
+    with mock.patch.object(routed, "grep_iter", wraps=routed.grep_iter) as grep_iter:
+        matches = backend.grep_iter("handler", limit=3)
+        assert not isinstance(matches, str)
+        list(matches)
+    grep_iter.assert_called_once_with("handler", "/", None, 3)
+
+
+def test_grep_iter_on_route_searches_only_that_backend(backend: CompositeBackend) -> None:
+    matches = backend.grep_iter("handler", path="/memories/handlers", limit=2)
+    assert not isinstance(matches, str)
+    assert [m["path"] for m in matches] == ["/memories/handlers/one.py", "/memories/handlers/one.py"]
+
+
+def test_grep_iter_invalid_regex(backend: CompositeBackend) -> None:
+    assert isinstance(backend.grep_iter("(", limit=5), str)
+
+
+async def test_agrep_iter_matches_grep_iter(backend: CompositeBackend) -> None:
+    expected = backend.grep_iter("handler", limit=7)
+    assert not isinstance(expected, str)
+    matches = await backend.agrep_iter("handler", limit=7)
+    assert not isinstance(matches, str)
+    assert [m async for m in matches] == list(expected)
+
+
+def test_glob_iter_merges_backends_in_path_order(backend: CompositeBackend) -> None:
+    paths = [fi["path"] for fi in backend.glob_iter("**/*.py")]
+    assert paths == sorted(paths, key=path_sort_key)
+    assert paths == ["/a.py", "/b/handler.py", "/memories/handlers/one.py", "/memories/handlers/two.py", "/n.py", "/zz/handler.py"]
+
+
+@pytest.mark.parametrize("limit", [1, 3, 4, 100])
+def test_glob_iter_limit_returns_first_files(backend: CompositeBackend, limit: int) -> None:
+    paths = [fi["path"] for fi in backend.glob_iter("**/*.py")]
+    assert [fi["path"] for fi in backend.glob_iter("**/*.py", limit=limit)] == paths[:limit]
+
+
+async def test_aglob_iter_matches_glob_iter(backend: CompositeBackend) -> None:
+    expected = list(backend.glob_iter("**/*.py", limit=4))
+    assert [fi async for fi in await backend.aglob_iter("**/*.py", limit=4)] == expected
@@ -0,0 +1,127 @@
+import os
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+from deepagents.backends import FilesystemBackend, filesystem as filesystem_module
+from deepagents.backends.protocol import DownloadOp, FileDownloadResponse, ReadOp, StatOp, WriteOp, WriteResult
+
+# Stands in for ripgrep: prints `--json` matches in reverse path order, like the
+# unordered output of a parallel search. With FAKE_RG_HANG set it prints one match
+# and hangs until killed.
+FAKE_RG = """\
+import json, os, pathlib, re, sys, time
+
+pattern, base = re.compile(sys.argv[-2]), pathlib.Path(sys.argv[-1])
+for file in sorted((p for p in base.rglob("*") if p.is_file()), reverse=True):
+    for number, line in enumerate(file.read_text().splitlines(keepends=True), 1):
+        if pattern.search(line):
+            data = {"path": {"text": str(file)}, "line_number": number, "lines": {"text": line}}
+            print(json.dumps({"type": "match", "data": data}), flush=True)
+            if os.environ.get("FAKE_RG_HANG"):
+                time.sleep(60)
+"""
+
+
+@pytest.fixture
+def backend(tmp_path: Path) -> FilesystemBackend:
+    root = tmp_path / "root"
+    for i in range(12):
+        file = root / f"pkg{i % 3}" / f"mod{i}.py"
+        file.parent.mkdir(parents=True, exist_ok=True)
+        file.write_text(f"import os\ndef target_{i}():\n    return 'target'\n")
+    return FilesystemBackend(root_dir=root, virtual_mode=True)
+
+
+@pytest.fixture
+def fake_ripgrep(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    rg = bin_dir / "rg"
+    rg.write_text(f"#!{sys.executable}\n{FAKE_RG}")
+    rg.chmod(0o755)
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+
+
+def _first_matches(backend: FilesystemBackend, limit: int) -> list[tuple[str, int]]:
+    raw = backend.grep_raw("target")
+    assert isinstance(raw, list)
+    return sorted((m["path"], m["line"]) for m in raw)[:limit]
+
+
+def _grep_iter(backend: FilesystemBackend, limit: int) -> list[tuple[str, int]]:
+    matches = backend.grep_iter("target", limit=limit)
+    assert not isinstance(matches, str)
+    return [(m["path"], m["line"]) for m in matches]
+
+
+@pytest.mark.parametrize("limit", [1, 5, 24, 100])
+def test_grep_iter_limit_without_ripgrep(backend: FilesystemBackend, monkeypatch: pytest.MonkeyPatch, limit: int) -> None:
+    monkeypatch.setenv("PATH", "")
+    assert _grep_iter(backend, limit) == _first_matches(backend, limit)
+
+
+@pytest.mark.usefixtures("fake_ripgrep")
+@pytest.mark.parametrize("limit", [1, 5, 24, 100])
+def test_grep_iter_limit_sorts_ripgrep_output(backend: FilesystemBackend, limit: int) -> None:
+    assert _grep_iter(backend, limit) == _first_matches(backend, limit)
+
+
+@pytest.mark.usefixtures("fake_ripgrep")
+def test_grep_iter_falls_back_when_ripgrep_times_out(backend: FilesystemBackend, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Matches read before ripgrep is killed are an arbitrary subset, so they are not returned."""
+    monkeypatch.setenv("FAKE_RG_HANG", "1")
+    monkeypatch.setattr(filesystem_module, "_RIPGREP_TIMEOUT_SECONDS", 0.5)
+    assert _grep_iter(backend, 3) == [("/pkg0/mod0.py", 2), ("/pkg0/mod0.py", 3), ("/pkg0/mod3.py", 2)]
+
+
+def _reads_wait_for_each_other(backend: FilesystemBackend, monkeypatch: pytest.MonkeyPatch, count: int) -> None:
+    """Make each read wait until `count` reads are running, so sequential reads break the barrier."""
+    barrier = threading.Barrier(count, timeout=5)
+    read = backend.read
+
+    def waiting_read(file_path: str, offset: int = 0, limit: int = 2000) -> str:
+        barrier.wait()
+        return read(file_path, offset, limit)
+
+    monkeypatch.setattr(backend, "read", waiting_read)
+
+
+def test_batch_reads_concurrently(backend: FilesystemBackend, monkeypatch: pytest.MonkeyPatch) -> None:
+    modules = (0, 3, 6, 9)
+    _reads_wait_for_each_other(backend, monkeypatch, len(modules))
+    results = backend.batch([ReadOp(f"/pkg0/mod{i}.py") for i in modules])
+    assert [str(result).splitlines()[1] for result in results] == [f"     2\tdef target_{i}():" for i in modules]
+
+
+async def test_abatch_reads_concurrently(backend: FilesystemBackend, monkeypatch: pytest.MonkeyPatch) -> None:
+    modules = (1, 4, 7)
+    _reads_wait_for_each_other(backend, monkeypatch, len(modules))
+    results = await backend.abatch([ReadOp(f"/pkg1/mod{i}.py") for i in modules])
+    assert [str(result).splitlines()[1] for result in results] == [f"     2\tdef target_{i}():" for i in modules]
+
+
+def test_batch_keeps_sequential_order_around_writes(backend: FilesystemBackend) -> None:
+    results = backend.batch(
+        [
+            ReadOp("/new.py"),
+            StatOp("/new.py"),
+            ReadOp("/pkg0/mod0.py"),
+            WriteOp("/new.py", "print('new')\n"),
+            ReadOp("/new.py"),
+            StatOp("/new.py"),
+            DownloadOp("/new.py"),
+        ]
+    )
+    assert "not found" in str(results[0])
+    assert results[1] is None
+    assert "target_0" in str(results[2])
+    assert isinstance(results[3], WriteResult)
+    assert results[3].error is None
+    assert str(results[4]) == "     1\tprint('new')"
+    assert isinstance(results[5], dict)
+    assert results[5]["path"] == "/new.py"
+    assert isinstance(results[6], FileDownloadResponse)
+    assert results[6].content == b"print('new')\n"
@@ -0,0 +1,78 @@
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from deepagents.backends.protocol import DownloadOp, ExecuteResponse, FileDownloadResponse, FileUploadResponse, ReadOp, WriteOp, WriteResult
+from deepagents.backends.sandbox import BaseSandbox
+from deepagents.backends.utils import FILE_EXISTS_ERROR
+
+
+class LocalSandbox(BaseSandbox):
+    """Sandbox that runs commands with the local shell and records them."""
+
+    def __init__(self) -> None:
+        self.commands: list[str] = []
+
+    def execute(self, command: str) -> ExecuteResponse:
+        self.commands.append(command)
+        result = subprocess.run(command, shell=True, capture_output=True, text=True, check=False)  # noqa: S602
+        return ExecuteResponse(output=result.stdout + result.stderr, exit_code=result.returncode)
+
+    @property
+    def id(self) -> str:
+        return "local"
+
+    def upload_files(self, files: list[tuple[str, bytes]]) -> list[FileUploadResponse]:
+        for path, content in files:
+            Path(path).write_bytes(content)
+        return [FileUploadResponse(path=path) for path, _ in files]
+
+    def download_files(self, paths: list[str]) -> list[FileDownloadResponse]:
+        responses = []
+        for path in paths:
+            try:
+                responses.append(FileDownloadResponse(path=path, content=Path(path).read_bytes()))
+            except FileNotFoundError:
+                responses.append(FileDownloadResponse(path=path, error="file_not_found"))
+        return responses
+
+
+@pytest.fixture
+def sandbox() -> LocalSandbox:
+    return LocalSandbox()
+
+
+def test_batch_runs_downloads_in_order(sandbox: LocalSandbox, tmp_path: Path) -> None:
+    first, second = str(tmp_path / "first.txt"), str(tmp_path / "second.txt")
+    results = sandbox.batch(
+        [
+            WriteOp(first, "one\n"),
+            DownloadOp(first),
+            DownloadOp(second),
+            WriteOp(second, "two\n"),
+            ReadOp(second),
+            DownloadOp(second),
+        ]
+    )
+    assert isinstance(results[0], WriteResult)
+    assert results[0].error is None
+    assert results[1] == FileDownloadResponse(path=first, content=b"one\n")
+    assert results[2] == FileDownloadResponse(path=second, error="file_not_found")
+    assert isinstance(results[3], WriteResult)
+    assert results[3].error is None
+    assert str(results[4]) == "     1\ttwo"
+    assert results[5] == FileDownloadResponse(path=second, content=b"two\n")
+    # One command for each of the two runs of shell ops
+    shell_runs = 2
+    assert len(sandbox.commands) == shell_runs
+
+
+def test_batch_write_existing_file(sandbox: LocalSandbox, tmp_path: Path) -> None:
+    path = str(tmp_path / "a.txt")
+    created, existing = sandbox.batch([WriteOp(path, "a\n"), WriteOp(path, "b\n")])
+    assert isinstance(created, WriteResult)
+    assert created.path == path
+    assert isinstance(existing, WriteResult)
+    assert existing.error == FILE_EXISTS_ERROR.format(path=path)
+    assert Path(path).read_text() == "a\n"
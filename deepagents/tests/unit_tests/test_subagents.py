@@ -0,0 +1,337 @@
+import time
+from collections.abc import Iterator
+from itertools import cycle
+from pathlib import Path
+from typing import Annotated, Any, NotRequired, TypedDict
+
+import pytest
+from langchain.agents import create_agent
+from langchain.tools import ToolRuntime
+from langchain_core.messages import AIMessage, AnyMessage, ToolCall, ToolMessage
+from langchain_core.runnables import Runnable, RunnableConfig, RunnableLambda
+from langchain_core.tools import BaseTool
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.graph import START, StateGraph
+from langgraph.graph.message import add_messages
+
+from deepagents import create_deep_agent
+from deepagents.backends import FilesystemBackend
+from deepagents.backends.utils import create_file_data
+from deepagents.middleware.filesystem import FilesystemMiddleware
+from deepagents.middleware.subagents import SubAgentMiddleware
+from tests.unit_tests.chat_model import FakeToolCallingModel
+
+
+def _task_after_write_file() -> Iterator[AIMessage]:
+    """Parent writes a file and hands a task to the general-purpose subagent, which reads it."""
+    return iter(
+        [
+            AIMessage("", tool_calls=[{"name": "write_file", "args": {"file_path": "/notes.md", "content": "hello"}, "id": "write"}]),
+            AIMessage(
+                "", tool_calls=[{"name": "task", "args": {"description": "Summarize /notes.md", "subagent_type": "general-purpose"}, "id": "task"}]
+            ),
+            AIMessage("", tool_calls=[{"name": "read_file", "args": {"file_path": "/notes.md"}, "id": "read"}]),
+            AIMessage("The notes say hello."),
+            AIMessage("Done."),
+        ]
+    )
+
+
+def _check_result(agent: Any, result: dict[str, Any], config: RunnableConfig) -> None:  # noqa: ANN401
+    task_message = next(m for m in result["messages"] if isinstance(m, ToolMessage) and m.tool_call_id == "task")
+    assert task_message.content == "The notes say hello."
+    assert result["messages"][-1].content == "Done."
+    assert "/notes.md" in result["files"]
+    assert "/notes.md" in agent.get_state(config).values["files"]
+
+
+def test_task_with_checkpointer_after_write_file() -> None:
+    """The subagent's input state, files included, must survive checkpointing."""
+    agent = create_deep_agent(model=FakeToolCallingModel(messages=_task_after_write_file()), checkpointer=InMemorySaver())
+    config: RunnableConfig = {"configurable": {"thread_id": "1"}}
+    result = agent.invoke({"messages": [("user", "Summarize my notes")]}, config)
+    _check_result(agent, result, config)
+
+
+async def test_atask_with_checkpointer_after_write_file() -> None:
+    agent = create_deep_agent(model=FakeToolCallingModel(messages=_task_after_write_file()), checkpointer=InMemorySaver())
+    config: RunnableConfig = {"configurable": {"thread_id": "1"}}
+    result = await agent.ainvoke({"messages": [("user", "Summarize my notes")]}, config)
+    _check_result(agent, result, config)
+
+
+def _task_runtime() -> ToolRuntime:
+    return ToolRuntime(state={"messages": []}, context=None, stream_writer=lambda _: None, store=None, config={}, tool_call_id="call")
+
+
+def _call_tool(tool: BaseTool, args: dict[str, Any]) -> str:
+    command = tool.invoke({"type": "tool_call", "name": tool.name, "id": "call", "args": {**args, "runtime": _task_runtime()}})
+    return command.update["messages"][0].content
+
+
+async def _acall_tool(tool: BaseTool, args: dict[str, Any]) -> str:
+    command = await tool.ainvoke({"type": "tool_call", "name": tool.name, "id": "call", "args": {**args, "runtime": _task_runtime()}})
+    return command.update["messages"][0].content
+
+
+def _cached_middleware(tmp_path: Path, tool_calls: list[ToolCall], answer: str) -> SubAgentMiddleware:
+    """Middleware with one `reader` subagent that makes `tool_calls`, then answers."""
+    files = FilesystemBackend(root_dir=tmp_path / "repo", virtual_mode=True)
+    steps = [AIMessage("", tool_calls=tool_calls), AIMessage(answer)] if tool_calls else [AIMessage(answer)]
+    reader = create_agent(FakeToolCallingModel(messages=cycle(steps)), middleware=[FilesystemMiddleware(backend=files)])
+    return SubAgentMiddleware(
+        default_model=FakeToolCallingModel(messages=iter([])),
+        general_purpose_agent=False,
+        subagents=[{"name": "reader", "description": "Reads files.", "runnable": reader}],
+        backend=files,
+        result_cache_backend=FilesystemBackend(root_dir=tmp_path / "cache", virtual_mode=True),
+        max_concurrent_tasks=2,
+    )
+
+
+@pytest.fixture
+def repo(tmp_path: Path) -> Path:
+    (tmp_path / "repo").mkdir()
+    (tmp_path / "repo" / "app.toml").write_text("port = 1\n")
+    return tmp_path / "repo"
+
+
+def test_result_cache_reuses_runs_that_only_read_files(tmp_path: Path, repo: Path) -> None:
+    middleware = _cached_middleware(tmp_path, [{"name": "read_file", "args": {"file_path": "/app.toml"}, "id": "read"}], "The port is 1.")
+    task = middleware.tools[0]
+    args = {"description": "What is the port?", "subagent_type": "reader"}
+    assert _call_tool(task, args) == "The port is 1."
+    assert _call_tool(task, {**args, "description": "  what is the PORT"}) == "The port is 1."
+    assert (middleware.result_cache.hits, middleware.result_cache.misses) == (1, 1)  # type: ignore[union-attr]
+
+    (repo / "app.toml").write_text("port = 22\n")
+    _call_tool(task, args)
+    assert (middleware.result_cache.hits, middleware.result_cache.misses) == (1, 2)  # type: ignore[union-attr]
+
+
+@pytest.mark.parametrize(
+    "tool_call",
+    [
+        {"name": "grep", "args": {"pattern": "port"}, "id": "search"},
+        {"name": "glob", "args": {"pattern": "*.toml"}, "id": "search"},
+        {"name": "ls", "args": {"path": "/"}, "id": "search"},
+    ],
+)
+async def test_result_cache_skips_runs_that_searched(tmp_path: Path, repo: Path, tool_call: ToolCall) -> None:  # noqa: ARG001
+    """A search's results are not fingerprinted, so its answer could come from other files."""
+    middleware = _cached_middleware(tmp_path, [tool_call], "The port is set in /app.toml.")
+    task = middleware.tools[0]
+    args = {"description": "Where is the port configured?", "subagent_type": "reader"}
+    assert _call_tool(task, args) == "The port is set in /app.toml."
+    assert await _acall_tool(task, args) == "The port is set in /app.toml."
+    assert (middleware.result_cache.hits, middleware.result_cache.misses) == (0, 2)  # type: ignore[union-attr]
+    assert not (tmp_path / "cache" / "subagent_results").exists()
+
+
+def test_task_batch_reuses_empty_cached_result(tmp_path: Path) -> None:
+    middleware = _cached_middleware(tmp_path, [], "")
+    task_batch = middleware.tools[1]
+    args = {"tasks": [{"description": "Say nothing.", "subagent_type": "reader"}]}
+    _call_tool(task_batch, args)
+    _call_tool(task_batch, args)
+    assert (middleware.result_cache.hits, middleware.result_cache.misses) == (1, 1)  # type: ignore[union-attr]
+
+
+async def test_atask_batch_reuses_empty_cached_result(tmp_path: Path) -> None:
+    middleware = _cached_middleware(tmp_path, [], "")
+    task_batch = middleware.tools[1]
+    args = {"tasks": [{"description": "Say nothing.", "subagent_type": "reader"}]}
+    await _acall_tool(task_batch, args)
+    await _acall_tool(task_batch, args)
+    assert (middleware.result_cache.hits, middleware.result_cache.misses) == (1, 1)  # type: ignore[union-attr]
+
+
+SLOW_SECONDS = 1.0
+
+
+class _WriterState(TypedDict):
+    messages: Annotated[list[AnyMessage], add_messages]
+    files: NotRequired[dict[str, Any]]
+    notes: NotRequired[str]
+
+
+def _writer(name: str, *, slow: bool = False) -> Runnable:
+    """Subagent graph that writes `/{name}.md` and the `notes` key, optionally after a slow first step."""
+
+    def wait(_: _WriterState) -> dict[str, Any]:
+        time.sleep(SLOW_SECONDS)
+        return {}
+
+    def write(_: _WriterState) -> dict[str, Any]:
+        return {"messages": [AIMessage(f"Wrote {name}.")], "files": {f"/{name}.md": create_file_data(name)}, "notes": name}
+
+    graph = StateGraph(_WriterState)
+    graph.add_node("wait", wait)
+    graph.add_node("write", write)
+    graph.add_edge(START, "wait" if slow else "write")
+    graph.add_edge("wait", "write")
+    return graph.compile()
+
+
+def _fail(_: dict[str, Any]) -> dict[str, Any]:
+    msg = "boom"
+    raise RuntimeError(msg)
+
+
+def _batch_middleware(task_timeout: float | None = None) -> SubAgentMiddleware:
+    return SubAgentMiddleware(
+        default_model=FakeToolCallingModel(messages=iter([])),
+        general_purpose_agent=False,
+        subagents=[
+            {"name": "a", "description": "Writes /a.md.", "runnable": _writer("a")},
+            {"name": "b", "description": "Writes /b.md.", "runnable": _writer("b")},
+            {"name": "slow", "description": "Writes /slow.md slowly.", "runnable": _writer("slow", slow=True)},
+            {"name": "broken", "description": "Always fails.", "runnable": RunnableLambda(_fail)},
+        ],
+        max_concurrent_tasks=2,
+        task_timeout=task_timeout,
+    )
+
+
+def _batch_args(*subagent_types: str) -> dict[str, Any]:
+    return {"tasks": [{"description": f"Task for {name}", "subagent_type": name} for name in subagent_types], "runtime": _task_runtime()}
+
+
+def _run_batch(middleware: SubAgentMiddleware, *subagent_types: str) -> dict[str, Any]:
+    command = middleware.tools[1].invoke({"type": "tool_call", "name": "task_batch", "id": "call", "args": _batch_args(*subagent_types)})
+    return command.update
+
+
+async def _arun_batch(middleware: SubAgentMiddleware, *subagent_types: str) -> dict[str, Any]:
+    command = await middleware.tools[1].ainvoke({"type": "tool_call", "name": "task_batch", "id": "call", "args": _batch_args(*subagent_types)})
+    return command.update
+
+
+def test_task_batch_is_opt_in() -> None:
+    middleware = SubAgentMiddleware(default_model=FakeToolCallingModel(messages=iter([])), general_purpose_agent=False, subagents=[])
+    assert [tool.name for tool in middleware.tools] == ["task"]
+    assert middleware.system_prompt is not None
+    assert "task_batch" not in middleware.system_prompt
+
+
+def _check_merged(update: dict[str, Any]) -> None:
+    """Both writers' files are merged; on the conflicting `notes` key the later task wins."""
+    assert set(update["files"]) == {"/a.md", "/b.md"}
+    assert update["notes"] == "a"
+    report = update["messages"][0].content
+    assert "## Task 1/3 (b): completed" in report
+    assert "## Task 3/3 (a): completed" in report
+    assert "Wrote a." in report
+
+
+def test_task_batch_merges_state_across_subtasks() -> None:
+    _check_merged(_run_batch(_batch_middleware(), "b", "broken", "a"))
+
+
+async def test_atask_batch_merges_state_across_subtasks() -> None:
+    _check_merged(await _arun_batch(_batch_middleware(), "b", "broken", "a"))
+
+
+def _check_failure_isolated(update: dict[str, Any]) -> None:
+    report = update["messages"][0].content
+    assert "## Task 2/3 (broken): failed" in report
+    assert "Error: RuntimeError: boom" in report
+
+
+def test_task_batch_isolates_failures() -> None:
+    _check_failure_isolated(_run_batch(_batch_middleware(), "b", "broken", "a"))
+
+
+async def test_atask_batch_isolates_failures() -> None:
+    _check_failure_isolated(await _arun_batch(_batch_middleware(), "b", "broken", "a"))
+
+
+def _check_timed_out(update: dict[str, Any], started: float) -> None:
+    """The slow task is reported as timed out without holding up the batch, and its writes are dropped."""
+    assert time.perf_counter() - started < SLOW_SECONDS
+    report = update["messages"][0].content
+    assert "## Task 1/2 (slow): timed out" in report
+    assert "did not finish within 0.2 seconds" in report
+    assert "## Task 2/2 (a): completed" in report
+    assert set(update["files"]) == {"/a.md"}
+
+
+def test_task_batch_timeout() -> None:
+    started = time.perf_counter()
+    _check_timed_out(_run_batch(_batch_middleware(task_timeout=0.2), "slow", "a"), started)
+
+
+async def test_atask_batch_timeout() -> None:
+    started = time.perf_counter()
+    _check_timed_out(await _arun_batch(_batch_middleware(task_timeout=0.2), "slow", "a"), started)
+
+
+def _progress_middleware(tmp_path: Path, **kwargs: Any) -> SubAgentMiddleware:
+    """Middleware with two subagents, each with its own model, that read /app.toml and answer."""
+    (tmp_path / "app.toml").write_text("port = 1\n")
+    files = FilesystemBackend(root_dir=tmp_path, virtual_mode=True)
+
+    def reader() -> Runnable:
+        steps = [AIMessage("", tool_calls=[{"name": "read_file", "args": {"file_path": "/app.toml"}, "id": "read"}]), AIMessage("The port is 1.")]
+        return create_agent(FakeToolCallingModel(messages=cycle(steps)), middleware=[FilesystemMiddleware(backend=files)])
+
+    return SubAgentMiddleware(
+        default_model=FakeToolCallingModel(messages=iter([])),
+        general_purpose_agent=False,
+        subagents=[
+            {"name": "reader", "description": "Reads files.", "runnable": reader()},
+            {"name": "other", "description": "Also reads files.", "runnable": reader()},
+        ],
+        max_concurrent_tasks=2,
+        **kwargs,
+    )
+
+
+def _check_progress(events: list[Any], subagent_type: str, namespace: str) -> None:
+    task_events = [event for event in events if event["namespace"] == (namespace,)]
+    assert [(event["event"], event["data"]) for event in task_events] == [
+        ("start", None),
+        ("tool_call", {"name": "read_file", "args": {"file_path": "/app.toml"}}),
+        ("tool_result", {"name": "read_file", "content": "     1\tport = 1", "status": "success"}),
+        ("end", "completed"),
+    ]
+    assert all(
+        event["type"] == "subagent_progress" and event["subagent_type"] == subagent_type for event in events if event["namespace"] == (namespace,)
+    )
+
+
+def _progress_runtime(events: list[Any]) -> ToolRuntime:
+    return ToolRuntime(state={"messages": []}, context=None, stream_writer=events.append, store=None, config={}, tool_call_id="call")
+
+
+def test_task_streams_progress(tmp_path: Path) -> None:
+    task = _progress_middleware(tmp_path, stream_progress=True).tools[0]
+    call = {"name": "task", "args": {"description": "Port?", "subagent_type": "reader"}, "id": "t"}
+    parent = create_agent(FakeToolCallingModel(messages=iter([AIMessage("", tool_calls=[call]), AIMessage("Done.")])), tools=[task])
+    events = list(parent.stream({"messages": [("user", "What is the port?")]}, stream_mode="custom"))
+    _check_progress(events, "reader", "reader:t")
+
+
+async def test_atask_batch_streams_progress_per_subtask(tmp_path: Path) -> None:
+    events: list[Any] = []
+    task_batch = _progress_middleware(tmp_path, stream_progress=True).tools[1]
+    tasks = [{"description": "Port?", "subagent_type": "reader"}, {"description": "Port again?", "subagent_type": "other"}]
+    await task_batch.ainvoke(
+        {"type": "tool_call", "name": "task_batch", "id": "call", "args": {"tasks": tasks, "runtime": _progress_runtime(events)}}
+    )
+    _check_progress(events, "reader", "reader:call/0")
+    _check_progress(events, "other", "other:call/1")
+
+
+def test_progress_is_not_streamed_by_default(tmp_path: Path) -> None:
+    events: list[Any] = []
+    task = _progress_middleware(tmp_path).tools[0]
+    task.invoke(
+        {
+            "type": "tool_call",
+            "name": "task",
+            "id": "call",
+            "args": {"description": "Port?", "subagent_type": "reader", "runtime": _progress_runtime(events)},
+        }
+    )
+    assert events == []
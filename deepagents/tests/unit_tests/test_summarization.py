@@ -0,0 +1,138 @@
+import hashlib
+from pathlib import Path
+from typing import Any
+from unittest import mock
+
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage, AnyMessage, HumanMessage, ToolMessage
+
+from deepagents.backends import FilesystemBackend
+from deepagents.middleware.filesystem import FilesystemMiddleware
+from deepagents.middleware.summarization import SummarizationMiddleware, _stale_tool_results
+
+OLD_READ = "".join(f"old line {i} of the module\n" for i in range(200))
+NEW_READ = "".join(f"new line {i} of the module\n" for i in range(200))
+GREP_RESULT = "".join(f"/src/mod{i}.py:{i}: def handler_{i}(request): return {i}\n" for i in range(100))
+
+
+def _call(name: str, args: dict[str, Any], call_id: str) -> AIMessage:
+    return AIMessage("", tool_calls=[{"name": name, "args": args, "id": call_id}], id=f"ai-{call_id}")
+
+
+def _conversation() -> list[AnyMessage]:
+    """A read of /a.py, a grep, a second read of /a.py and two short listings."""
+    return [
+        HumanMessage("Fix the handler", id="human"),
+        _call("read_file", {"file_path": "/a.py"}, "read-1"),
+        ToolMessage(OLD_READ, tool_call_id="read-1", name="read_file", id="tool-read-1"),
+        _call("grep", {"pattern": "handler"}, "grep"),
+        ToolMessage(GREP_RESULT, tool_call_id="grep", name="grep", id="tool-grep"),
+        _call("read_file", {"file_path": "/a.py"}, "read-2"),
+        ToolMessage(NEW_READ, tool_call_id="read-2", name="read_file", id="tool-read-2"),
+        _call("ls", {"path": "/"}, "ls-1"),
+        ToolMessage("/a.py", tool_call_id="ls-1", name="ls", id="tool-ls-1"),
+        _call("ls", {"path": "/src"}, "ls-2"),
+        ToolMessage("/src/mod0.py", tool_call_id="ls-2", name="ls", id="tool-ls-2"),
+    ]
+
+
+def _middleware(backend: FilesystemBackend) -> SummarizationMiddleware:
+    # The trigger fires on the full conversation but not once the stale results are pruned
+    return SummarizationMiddleware(
+        model=GenericFakeChatModel(messages=iter([])),
+        backend=backend,
+        trigger=("tokens", 2500),
+        prune_tool_results_after=3,
+    )
+
+
+def test_stale_tool_results() -> None:
+    assert _stale_tool_results(_conversation(), 3) == {
+        2: "superseded by a later read of the same file",
+        4: "which you acted on 3 turns ago",
+    }
+
+
+def test_stale_tool_results_ignores_recent_and_short_results() -> None:
+    assert _stale_tool_results(_conversation(), 10) == {2: "superseded by a later read of the same file"}
+
+
+def _check_pruned(update: dict[str, Any], backend: FilesystemBackend) -> None:
+    stubs = {message.id: message for message in update["messages"]}
+    assert set(stubs) == {"tool-read-1", "tool-grep"}
+    assert stubs["tool-read-1"].tool_call_id == "read-1"
+    assert "superseded by a later read of the same file" in stubs["tool-read-1"].content
+    assert "which you acted on 3 turns ago" in stubs["tool-grep"].content
+
+    # The ledger is keyed by the full content hash, as for evicted results
+    ledger = update["evicted_results"]
+    assert set(ledger) == {hashlib.sha256(OLD_READ.encode()).hexdigest(), hashlib.sha256(GREP_RESULT.encode()).hexdigest()}
+    for record in ledger.values():
+        assert record["path"] in stubs[f"tool-{record['tool_call_ids'][0]}"].content
+    assert backend.read(ledger[hashlib.sha256(OLD_READ.encode()).hexdigest()]["path"], limit=1).endswith("old line 0 of the module")
+
+
+def test_before_model_prunes_stale_tool_results(tmp_path: Path) -> None:
+    backend = FilesystemBackend(root_dir=tmp_path, virtual_mode=True)
+    middleware = _middleware(backend)
+    update = middleware.before_model({"messages": _conversation()}, mock.Mock())
+    assert update is not None
+    _check_pruned(update, backend)
+    assert middleware.tool_results_pruned == len(update["messages"])
+
+
+async def test_abefore_model_prunes_stale_tool_results(tmp_path: Path) -> None:
+    backend = FilesystemBackend(root_dir=tmp_path, virtual_mode=True)
+    update = await _middleware(backend).abefore_model({"messages": _conversation()}, mock.Mock())
+    assert update is not None
+    _check_pruned(update, backend)
+
+
+def test_evicting_pruned_content_is_deduplicated(tmp_path: Path) -> None:
+    backend = FilesystemBackend(root_dir=tmp_path, virtual_mode=True)
+    update = _middleware(backend).before_model({"messages": _conversation()}, mock.Mock())
+    assert update is not None
+
+    filesystem = FilesystemMiddleware(backend=backend, tool_token_limit_before_evict=100)
+    message = ToolMessage(GREP_RESULT, tool_call_id="grep-again", name="grep")
+    with mock.patch.object(backend, "write", wraps=backend.write) as write:
+        stub, files_update, ledger_update = filesystem._process_large_message(message, backend, update["evicted_results"])
+    write.assert_not_called()
+    assert files_update is None
+    assert ledger_update == {hashlib.sha256(GREP_RESULT.encode()).hexdigest(): mock.ANY}
+    assert filesystem.eviction_metrics.results_deduplicated == 1
+    assert filesystem.eviction_metrics.results_evicted == 0
+    assert "/large_tool_results/" in stub.content
+
+
+def _history(start: int, count: int) -> list[AnyMessage]:
+    messages: list[AnyMessage] = []
+    for i in range(start, start + count):
+        messages.append(_call("grep", {"pattern": f"handler_{i}"}, f"grep-{i}"))
+        messages.append(ToolMessage(f"/src/mod{i}.py:1: def handler_{i}(request)", tool_call_id=f"grep-{i}", name="grep", id=f"tool-grep-{i}"))
+    return messages
+
+
+def test_search_history_without_thread_id(tmp_path: Path) -> None:
+    """Offloads and searches of a conversation without a thread_id share one archive."""
+    backend = FilesystemBackend(root_dir=tmp_path, virtual_mode=True)
+    middleware = SummarizationMiddleware(
+        model=GenericFakeChatModel(messages=iter([AIMessage("First summary"), AIMessage("Second summary")])),
+        backend=backend,
+        trigger=("messages", 10),
+        keep=("messages", 2),
+    )
+    search_history = middleware.tools[0]
+
+    first = middleware.before_model({"messages": [HumanMessage("Find the handlers", id="human"), *_history(0, 5)]}, mock.Mock())
+    assert first is not None
+    archive_id = first["history_archive_id"]
+    state = {"messages": [*first["messages"][1:], *_history(5, 5)], "history_archive_id": archive_id}
+    second = middleware.before_model(state, mock.Mock())
+    assert second is not None
+    assert second["history_archive_id"] == archive_id
+
+    runtime = mock.Mock(state={**state, "messages": second["messages"][1:]})
+    assert "handler_1" in search_history.func(runtime=runtime, query="handler_1")  # type: ignore[attr-defined]
+    assert "handler_6" in search_history.func(runtime=runtime, query="handler_6")  # type: ignore[attr-defined]
+    assert len(list((tmp_path / "conversation_history").glob("*.index.jsonl"))) == 1
@@ -0,0 +1,172 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any
+
+import pytest
+from langchain.tools.tool_node import ToolCallRequest
+from langchain_core.messages import AIMessage, ToolMessage
+
+from deepagents import create_deep_agent
+from deepagents.backends import FilesystemBackend
+from deepagents.middleware.tool_concurrency import _FREE, _READ, _WRITE, ToolConcurrencyMiddleware, ToolStepReport, _ToolStep
+from tests.unit_tests.chat_model import FakeToolCallingModel
+
+TOOL_SECONDS = 0.1
+
+
+def _requests(*names: str) -> list[ToolCallRequest]:
+    """Requests for one step: an AIMessage calling `names` in order."""
+    calls = [{"name": name, "args": {}, "id": f"{i}-{name}"} for i, name in enumerate(names)]
+    state = {"messages": [AIMessage("", tool_calls=calls)]}
+    return [ToolCallRequest(tool_call=call, tool=None, state=state, runtime=None) for call in state["messages"][0].tool_calls]  # type: ignore[arg-type]
+
+
+class _Recorder:
+    """Tool handler that records start/end order and the number of reads running at once."""
+
+    def __init__(self) -> None:
+        self.events: list[str] = []
+        self.running_reads = 0
+        self.max_running_reads = 0
+        self.lock = threading.Lock()
+
+    def _start(self, request: ToolCallRequest) -> None:
+        with self.lock:
+            self.events.append(f"start {request.tool_call['id']}")
+            if request.tool_call["name"] == "read_file":
+                self.running_reads += 1
+                self.max_running_reads = max(self.max_running_reads, self.running_reads)
+
+    def _end(self, request: ToolCallRequest) -> ToolMessage:
+        with self.lock:
+            self.events.append(f"end {request.tool_call['id']}")
+            if request.tool_call["name"] == "read_file":
+                self.running_reads -= 1
+        return ToolMessage("ok", tool_call_id=request.tool_call["id"])
+
+    def __call__(self, request: ToolCallRequest) -> ToolMessage:
+        self._start(request)
+        time.sleep(TOOL_SECONDS)
+        return self._end(request)
+
+    async def ahandler(self, request: ToolCallRequest) -> ToolMessage:
+        self._start(request)
+        await asyncio.sleep(TOOL_SECONDS)
+        return self._end(request)
+
+    def index(self, event: str) -> int:
+        return self.events.index(event)
+
+
+def _run(middleware: ToolConcurrencyMiddleware, requests: list[ToolCallRequest], recorder: _Recorder) -> None:
+    # Dispatch in reverse so the schedule, not the dispatch order, decides the order
+    with ThreadPoolExecutor(max_workers=len(requests)) as pool:
+        futures = [pool.submit(middleware.wrap_tool_call, request, recorder) for request in reversed(requests)]
+        for future in futures:
+            future.result()
+
+
+async def _arun(middleware: ToolConcurrencyMiddleware, requests: list[ToolCallRequest], recorder: _Recorder) -> None:
+    await asyncio.gather(*(middleware.awrap_tool_call(request, recorder.ahandler) for request in reversed(requests)))
+
+
+def test_step_ready_ordering() -> None:
+    kinds = [_READ, _WRITE, _READ, _FREE, _WRITE]
+    step = _ToolStep(kinds, threading.Condition(), threading.Semaphore(1))
+    assert step.expected == len(kinds) - 1
+    assert step.ready(0)
+    # A write waits for every earlier read and write
+    assert not step.ready(1)
+    step.done.add(0)
+    assert step.ready(1)
+    # A read waits only for earlier writes
+    assert not step.ready(2)
+    step.done.add(1)
+    assert step.ready(2)
+    # Unscheduled tools never block
+    assert not step.ready(4)
+    step.done.add(2)
+    assert step.ready(4)
+
+
+def test_reads_wait_for_earlier_writes_and_writes_run_in_order() -> None:
+    requests = _requests("read_file", "edit_file", "read_file", "write_file", "grep")
+    recorder = _Recorder()
+    _run(ToolConcurrencyMiddleware(), requests, recorder)
+    assert recorder.index("end 0-read_file") < recorder.index("start 1-edit_file")
+    assert recorder.index("end 1-edit_file") < recorder.index("start 2-read_file")
+    assert recorder.index("end 2-read_file") < recorder.index("start 3-write_file")
+    assert recorder.index("end 3-write_file") < recorder.index("start 4-grep")
+
+
+async def test_async_reads_wait_for_earlier_writes_and_writes_run_in_order() -> None:
+    requests = _requests("read_file", "edit_file", "read_file", "write_file", "grep")
+    recorder = _Recorder()
+    await _arun(ToolConcurrencyMiddleware(), requests, recorder)
+    assert recorder.index("end 0-read_file") < recorder.index("start 1-edit_file")
+    assert recorder.index("end 1-edit_file") < recorder.index("start 2-read_file")
+    assert recorder.index("end 2-read_file") < recorder.index("start 3-write_file")
+    assert recorder.index("end 3-write_file") < recorder.index("start 4-grep")
+
+
+def test_unscheduled_tools_run_immediately() -> None:
+    requests = _requests("edit_file", "task")
+    recorder = _Recorder()
+    middleware = ToolConcurrencyMiddleware()
+    result = middleware.wrap_tool_call(requests[1], recorder)
+    assert isinstance(result, ToolMessage)
+    assert recorder.events == ["start 1-task", "end 1-task"]
+
+
+@pytest.mark.parametrize("max_concurrency", [1, 3])
+def test_limiter_caps_concurrent_reads(max_concurrency: int) -> None:
+    recorder = _Recorder()
+    _run(ToolConcurrencyMiddleware(max_concurrency=max_concurrency), _requests(*["read_file"] * 6), recorder)
+    assert recorder.max_running_reads == max_concurrency
+
+
+@pytest.mark.parametrize("max_concurrency", [1, 3])
+async def test_async_limiter_caps_concurrent_reads(max_concurrency: int) -> None:
+    recorder = _Recorder()
+    await _arun(ToolConcurrencyMiddleware(max_concurrency=max_concurrency), _requests(*["read_file"] * 6), recorder)
+    assert recorder.max_running_reads == max_concurrency
+
+
+def test_step_report() -> None:
+    reads = 4
+    middleware = ToolConcurrencyMiddleware(max_concurrency=reads)
+    _run(middleware, _requests(*["read_file"] * reads, "task"), _Recorder())
+    (report,) = middleware.reports
+    assert report.tool_calls == reads
+    assert report.serial_seconds >= reads * TOOL_SECONDS
+    assert report.wall_seconds < 2 * TOOL_SECONDS
+    assert middleware.total_saved_seconds == report.saved_seconds > TOOL_SECONDS
+
+    _run(middleware, _requests("edit_file", "edit_file"), _Recorder())
+    assert [r.tool_calls for r in middleware.reports] == [reads, 2]
+    assert middleware.reports[1].saved_seconds == pytest.approx(0, abs=TOOL_SECONDS / 2)
+    assert middleware.total_saved_seconds == pytest.approx(sum(r.saved_seconds for r in middleware.reports))
+
+
+def test_step_report_saved_seconds() -> None:
+    assert ToolStepReport(tool_calls=3, serial_seconds=3.0, wall_seconds=1.25).saved_seconds == pytest.approx(1.75)
+
+
+def _edit_then_read(backend: Any) -> dict[str, Any]:  # noqa: ANN401
+    calls = [
+        {"name": "edit_file", "args": {"file_path": "/a.md", "old_string": "A", "new_string": "Z"}, "id": "edit"},
+        {"name": "read_file", "args": {"file_path": "/a.md"}, "id": "read"},
+    ]
+    model = FakeToolCallingModel(messages=iter([AIMessage("", tool_calls=calls), AIMessage("Done.")]))
+    return create_deep_agent(model=model, backend=backend).invoke({"messages": [("user", "Edit and read /a.md")]})
+
+
+def test_read_after_edit_in_one_turn_with_filesystem_backend(tmp_path: Path) -> None:
+    (tmp_path / "a.md").write_text("A\n")
+    result = _edit_then_read(FilesystemBackend(root_dir=tmp_path, virtual_mode=True))
+    read = next(m for m in result["messages"] if isinstance(m, ToolMessage) and m.tool_call_id == "read")
+    assert "Z" in read.content
+    assert "A" not in read.content